@@ -28,19 +28,35 @@ try:
 except ImportError:
 	HAS_ERROR_HANDLER = False
 
+# Toolkit modules import each other by bare module name
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+from assembler import AssemblerError, build_rom as assemble_rom
+from pipeline_stages import PipelineContext, StageResult, STAGES
+from build_trace import BuildTracer, HISTORY_FILE, traced
+from rom_manifest import RomManifest, changed_ranges, compare_manifests, refresh_manifest
+
 console = Console()
 
 class DragonWarriorBuild:
 	"""Complete Dragon Warrior build system"""
 
 	def __init__(self, source_dir: str = "source_files", assets_dir: str = "extracted_assets",
-				 build_dir: str = "build", output_dir: str = "output"):
+				 build_dir: str = "build", output_dir: str = "output", trace_file: Optional[str] = None):
 		self.source_dir = Path(source_dir)
 		self.assets_dir = Path(assets_dir)
 		self.build_dir = Path(build_dir)
 		self.output_dir = Path(output_dir)
 		self.tools_dir = Path("tools")
 
+		# Per-stage spans; saved to build/reports after each pipeline run
+		self.tracer = BuildTracer()
+		self.trace_file = Path(trace_file) if trace_file else None
+		self.history_file = self.build_dir / "reports" / HISTORY_FILE
+
+		# In-process stages share one ROM buffer and parsed assets
+		self.context = PipelineContext(assets_dir=self.assets_dir, source_dir=self.source_dir,
+									   build_dir=self.build_dir)
+
 		# Enhanced error handling
 		if HAS_ERROR_HANDLER:
 			self.error_handler = BuildErrorHandler()
@@ -90,6 +106,7 @@ class DragonWarriorBuild:
 		console.print("[green]✅ All prerequisites found[/green]")
 		return True
 
+	@traced("extract")
 	def extract_assets(self) -> bool:
 		"""Extract assets from ROM using asset pipeline
 
@@ -106,26 +123,9 @@ class DragonWarriorBuild:
 			console.print("[dim]Expected: Dragon Warrior (U) (PRG1) [!].nes in roms/ directory[/dim]")
 			return False
 
-		try:
-			result = subprocess.run([
-				sys.executable,
-				str(self.tools_dir / "asset_pipeline.py"),
-				str(rom_file),
-				"--extract-only",
-				"--output-dir",
-				str(self.assets_dir)
-			], capture_output=True, text=True, check=True)
-
-			console.print("[green]✅ Asset extraction complete[/green]")
-			return True
-
-		except subprocess.CalledProcessError as e:
-			console.print(f"[red]❌ Asset extraction failed: {e}[/red]")
-			if e.stdout:
-				console.print(f"[dim]stdout: {e.stdout}[/dim]")
-			if e.stderr:
-				console.print(f"[dim]stderr: {e.stderr}[/dim]")
-			return False
+		self.context.rom_path = rom_file
+		result = STAGES.run('extract_assets', self.context, output_dir=self.assets_dir)
+		return self._report_stage(result, "Asset extraction")
 
 	def show_asset_summary(self):
 		"""Show summary of extracted assets"""
@@ -226,72 +226,56 @@ class DragonWarriorBuild:
 		except Exception as e:
 			console.print(f"[red]❌ Failed to launch editor: {e}[/red]")
 
+	def _report_stage(self, result: StageResult, label: str) -> bool:
+		"""Print the outcome of an in-process pipeline stage"""
+		if result.success:
+			console.print(f"[green]✅ {label} complete ({result.duration:.1f}s)[/green]")
+			return True
+
+		console.print(f"[red]❌ {label} failed[/red]")
+		if result.error:
+			console.print(f"[dim]{result.error}[/dim]")
+		return False
+
+	@traced("generate")
 	def generate_assembly(self) -> bool:
 		"""Generate assembly code for asset reinsertion"""
 		console.print("\n[cyan]Generating assembly code for asset reinsertion...[/cyan]")
 
-		try:
-			result = subprocess.run([
-				sys.executable,
-				str(self.tools_dir / "asset_reinserter.py"),
-				str(self.assets_dir),
-				"--extract-defaults"
-			], capture_output=True, text=True, check=True)
-
-			console.print("[green]✅ Assembly generation complete[/green]")
-			return True
-
-		except subprocess.CalledProcessError as e:
-			console.print(f"[red]❌ Assembly generation failed: {e}[/red]")
-			if e.stdout:
-				console.print(f"[dim]stdout: {e.stdout}[/dim]")
-			if e.stderr:
-				console.print(f"[dim]stderr: {e.stderr}[/dim]")
-			return False
+		result = STAGES.run('generate_assembly', self.context, extract_defaults=True)
+		return self._report_stage(result, "Assembly generation")
 
+	@traced("patch")
 	def patch_source_files(self) -> bool:
-		"""Patch source files to use asset includes"""
-		console.print("\n[cyan]Patching source files to use asset includes...[/cyan]")
+		"""Overlay source files with asset includes
 
-		try:
-			result = subprocess.run([
-				sys.executable,
-				str(self.tools_dir / "source_patcher.py")
-			], capture_output=True, text=True, check=True)
+		The overlays live in self.context and are applied by the assembler's
+		loader; the files in source_dir are not modified.
+		"""
+		console.print("\n[cyan]Overlaying source files with asset includes...[/cyan]")
 
-			console.print("[green]✅ Source file patching complete[/green]")
-			return True
-
-		except subprocess.CalledProcessError as e:
-			console.print(f"[red]❌ Source patching failed: {e}[/red]")
-			if e.stdout:
-				console.print(f"[dim]stdout: {e.stdout}[/dim]")
-			if e.stderr:
-				console.print(f"[dim]stderr: {e.stderr}[/dim]")
-			return False
+		result = STAGES.run('patch_sources', self.context)
+		return self._report_stage(result, "Source file patching")
 
 	def restore_source_files(self) -> bool:
-		"""Restore original source files"""
-		console.print("\n[cyan]Restoring original source files...[/cyan]")
+		"""Build from the original sources again (drops the in-memory overlays)"""
+		console.print("\n[cyan]Dropping source overlays (sources on disk are unchanged)...[/cyan]")
 
-		try:
-			result = subprocess.run([
-				sys.executable,
-				str(self.tools_dir / "source_patcher.py"),
-				"--restore"
-			], capture_output=True, text=True, check=True)
+		result = STAGES.run('restore_sources', self.context)
+		return self._report_stage(result, "Source restoration")
 
-			console.print("[green]✅ Source files restored[/green]")
-			return True
+	def recover_source_backups(self) -> bool:
+		"""Overwrite sources with source_files_backup from the old in-place patching"""
+		console.print("\n[cyan]Recovering sources from legacy in-place patch backups...[/cyan]")
 
-		except subprocess.CalledProcessError as e:
-			console.print(f"[red]❌ Source restoration failed: {e}[/red]")
-			if e.stdout:
-				console.print(f"[dim]stdout: {e.stdout}[/dim]")
-			if e.stderr:
-				console.print(f"[dim]stderr: {e.stderr}[/dim]")
-			return False
+		def confirm(backups) -> bool:
+			names = ', '.join(path.name for path in backups)
+			return click.confirm(f"Overwrite {names} in {self.source_dir} with the backed-up copies?", default=False)
+
+		result = STAGES.run('recover_source_backups', self.context, confirm=confirm)
+		return self._report_stage(result, "Backup recovery")
 
+	@traced("patch-generation")
 	def generate_patches(self) -> bool:
 		"""Generate IPS and BPS patches if built ROM differs from reference"""
 		console.print("\n[cyan]Checking for ROM differences and generating patches...[/cyan]")
@@ -353,89 +337,76 @@ class DragonWarriorBuild:
 				console.print(f"[dim]stderr: {e.stderr}[/dim]")
 			return False
 
+	@traced("assemble")
 	def build_rom(self) -> bool:
-		"""Build final ROM with asset reinsertion"""
-		console.print("\n[cyan]Building ROM with modified assets...[/cyan]")
-
-		# Check for assembler
-		assembler_path = Path("Ophis") / "ophis.exe"
-		if not assembler_path.exists():
-			console.print(f"[red]❌ Assembler not found: {assembler_path}[/red]")
-			console.print("[yellow]Please ensure Ophis assembler is available[/yellow]")
-			return False
+		"""Build final ROM with asset reinsertion
 
-		# Create main assembly file that includes asset reinsertion
-		main_asm = self.build_dir / "dragon_warrior_modified.asm"
-
-		asm_content = f"""
-; Dragon Warrior Modified ROM
-; Includes asset reinsertion from extracted/edited data
-
-; Include original source files
-.include "{str(self.source_dir / 'Dragon_Warrior_Defines.asm')}"
-.include "{str(self.source_dir / 'Header.asm')}"
-
-; Include modified asset data (if generated)
-.ifdef INCLUDE_ASSET_REINSERTION
-.include "generated/asset_reinsertion.asm"
-.endif
+		Assembles Header.asm and each PRG bank in-process with the native
+		assembler (tools/assembler.py), then links them with CHR-ROM.
+		"""
+		console.print("\n[cyan]Building ROM with modified assets...[/cyan]")
 
-; Include remaining original banks
-.include "{str(self.source_dir / 'Bank00.asm')}"
-.include "{str(self.source_dir / 'Bank01.asm')}"
-.include "{str(self.source_dir / 'Bank02.asm')}"
-.include "{str(self.source_dir / 'Bank03.asm')}"
-"""
+		output_rom = self.output_dir / "dragon_warrior_modified.nes"
 
 		try:
-			with open(main_asm, 'w', encoding='utf-8') as f:
-				f.write(asm_content)
+			# Asset-include overlays (if any) are applied in memory at include time
+			result = assemble_rom(self.source_dir, loader=self.context.overlay)
+		except AssemblerError as e:
+			console.print("[red]❌ ROM build failed[/red]")
+
+			# Use enhanced error handler if available
+			errors = AssemblerErrorParser.parse_error(str(e), self.source_dir) if self.error_handler else []
+			if errors:
+				console.print(f"\n[bold yellow]📋 Detailed Error Analysis ({len(errors)} errors):[/bold yellow]")
+				for error in errors[:20]:
+					self.error_handler.print_error(error)
+				if len(errors) > 20:
+					console.print(f"[dim]... and {len(errors) - 20} more[/dim]")
+			else:
+				console.print(f"[dim]{e}[/dim]")
+			return False
+		except Exception as e:
+			console.print(f"[red]❌ ROM build error: {e}[/red]")
+			return False
 
-			# Build ROM
-			output_rom = self.output_dir / "dragon_warrior_modified.nes"
+		for warning in result.warnings:
+			console.print(f"[yellow]⚠️ {warning}[/yellow]")
 
-			# Ophis uses simple syntax: ophis infile outfile
-			build_cmd = [
-				str(assembler_path),
-				str(main_asm),
-				str(output_rom)
-			]
+		# Keep the checksum manifest current by rehashing only what changed
+		previous = RomManifest.load_current(output_rom)
+		touched = changed_ranges(output_rom.read_bytes(), result.rom) if previous else None
 
-			result = subprocess.run(build_cmd, capture_output=True, text=True, cwd=self.build_dir)
+		# Listings and symbol tables go alongside other build artifacts
+		result.write(self.output_dir, output_rom.name, self.build_dir / "listings")
+		console.print(f"[green]✅ ROM built successfully: {output_rom}[/green]")
+		try:
+			refresh_manifest(output_rom, previous, touched)
+		except OSError as e:
+			console.print(f"[yellow]⚠️ Could not write checksum manifest: {e}[/yellow]")
 
-			if result.returncode == 0:
-				console.print(f"[green]✅ ROM built successfully: {output_rom}[/green]")
+		# Automatically generate timestamped patches
+		self._generate_automatic_patches(output_rom)
 
-				# Automatically generate timestamped patches
-				self._generate_automatic_patches(output_rom)
+		return True
 
-				return True
-			else:
-				console.print("[red]❌ ROM build failed[/red]")
-
-				# Use enhanced error handler if available
-				if self.error_handler and result.stderr:
-					errors = AssemblerErrorParser.parse_error(result.stderr, self.source_dir)
-					if errors:
-						console.print("\n[bold yellow]📋 Detailed Error Analysis:[/bold yellow]")
-						for error in errors:
-							self.error_handler.print_error(error)
-					else:
-						# Fallback to raw output
-						if result.stdout:
-							console.print(f"[dim]stdout: {result.stdout}[/dim]")
-						if result.stderr:
-							console.print(f"[dim]stderr: {result.stderr}[/dim]")
-				else:
-					if result.stdout:
-						console.print(f"[dim]stdout: {result.stdout}[/dim]")
-					if result.stderr:
-						console.print(f"[dim]stderr: {result.stderr}[/dim]")
-				return False
+	def watch(self, interval: float = 0.2) -> None:
+		"""Rebuild the ROM whenever assets or sources are saved
 
-		except Exception as e:
-			console.print(f"[red]❌ ROM build error: {e}[/red]")
-			return False
+		Runs tools/build_watcher.py in this process: affected generators and
+		banks are rebuilt and the ROM is replaced atomically.
+		"""
+		from build_watcher import BuildWatcher
+
+		watcher = BuildWatcher(
+			Path.cwd(), self.source_dir,
+			self.output_dir / "dragon_warrior_modified.nes",
+			self.build_dir / ".cache",
+			watch_dirs=["assets/json", str(self.assets_dir), str(self.source_dir)],
+			listing_dir=self.build_dir / "listings",
+			interval=interval,
+			log=lambda message: console.print(message, markup=False, highlight=False)
+		)
+		watcher.run()
 
 	def _generate_automatic_patches(self, built_rom: Path) -> None:
 		"""Automatically generate timestamped patches after ROM build
@@ -487,6 +458,7 @@ class DragonWarriorBuild:
 		except Exception as e:
 			console.print(f"[dim]⚠️  Error generating automatic patches: {e}[/dim]")
 
+	@traced("verify")
 	def verify_rom(self) -> bool:
 		"""Verify built ROM against reference ROM with detailed analysis"""
 		console.print("\n[cyan]Verifying built ROM against reference...[/cyan]")
@@ -511,33 +483,50 @@ class DragonWarriorBuild:
 				console.print("[dim]Expected: Dragon Warrior (U) (PRG1) [!].nes in roms/ directory[/dim]")
 				return False
 
+		# Region checksums first: manifests are reused while the ROMs are unchanged
 		try:
-			result = subprocess.run([
+			mismatches = compare_manifests(RomManifest.load_or_build(reference_rom),
+										   RomManifest.load_or_build(built_rom))
+		except (OSError, ValueError) as e:
+			console.print(f"[red]❌ ROM verification error: {e}[/red]")
+			return False
+
+		if not mismatches:
+			console.print("[green]✅ ROM verification complete - ROMs are identical[/green]")
+			return True
+
+		console.print("[yellow]⚠️ Differing regions:[/yellow]")
+		for mismatch in mismatches:
+			console.print(f"[yellow]  • {mismatch}[/yellow]")
+
+		# Detailed byte-level report of the differences
+		try:
+			subprocess.run([
 				sys.executable,
 				str(self.tools_dir / "rom_verifier.py"),
 				str(reference_rom),
 				str(built_rom),
 				"--output-dir", "verification_reports"
 			], capture_output=True, text=True)
+		except Exception as e:
+			console.print(f"[yellow]⚠️ Detailed verification report failed: {e}[/yellow]")
+		else:
+			console.print("[dim]Check verification_reports/ for detailed analysis[/dim]")
 
-			if result.returncode == 0:
-				console.print("[green]✅ ROM verification complete - ROMs are identical[/green]")
-				return True
-			else:
-				console.print("[yellow]⚠️ ROM verification complete - differences found[/yellow]")
-				console.print("[dim]Check verification_reports/ for detailed analysis[/dim]")
-				return True  # Still successful verification, just not identical
+		return True  # Still successful verification, just not identical
 
-		except subprocess.CalledProcessError as e:
-			console.print(f"[red]❌ ROM verification failed: {e}[/red]")
-			if e.stdout:
-				console.print(f"[dim]stdout: {e.stdout}[/dim]")
-			if e.stderr:
-				console.print(f"[dim]stderr: {e.stderr}[/dim]")
-			return False
-		except Exception as e:
-			console.print(f"[red]❌ ROM verification error: {e}[/red]")
-			return False
+	def start_trace(self) -> None:
+		"""Begin a fresh set of stage spans for a pipeline run"""
+		self.tracer = BuildTracer()
+
+	def save_trace(self, success: bool) -> None:
+		"""Append the pipeline's stage timings to the build history (and trace file)"""
+		if not self.tracer.spans:
+			return
+		self.tracer.append_history(self.history_file, success, pipeline="dragon_warrior_build")
+		if self.trace_file:
+			self.tracer.write_chrome_trace(self.trace_file)
+			console.print(f"[dim]Trace written to {self.trace_file}[/dim]")
 
 	def clean_build(self):
 		"""Clean build artifacts"""
@@ -545,10 +534,14 @@ class DragonWarriorBuild:
 
 		import shutil
 
-		# Remove build directory contents
+		# Remove build directory contents (build history is kept for --compare)
+		history = self.history_file.read_bytes() if self.history_file.exists() else None
 		if self.build_dir.exists():
 			shutil.rmtree(self.build_dir)
 			self.build_dir.mkdir()
+		if history is not None:
+			self.history_file.parent.mkdir(parents=True, exist_ok=True)
+			self.history_file.write_bytes(history)
 
 		console.print("[green]✅ Build cleaned[/green]")
 
@@ -587,8 +580,8 @@ class DragonWarriorBuild:
 			console.print("1. Extract assets from ROM")
 			console.print("2. Launch asset editors")
 			console.print("3. Generate assembly code & extract defaults")
-			console.print("4. Patch source files for asset includes")
-			console.print("5. Restore original source files")
+			console.print("4. Overlay source files with asset includes")
+			console.print("5. Drop source overlays (sources on disk unchanged)")
 			console.print("6. Build modified ROM")
 			console.print("7. Generate patches (IPS/BPS)")
 			console.print("8. Verify ROM against reference")
@@ -639,6 +632,7 @@ class DragonWarriorBuild:
 			elif choice == "11":
 				# Full pipeline
 				console.print("\n[bold cyan]Running full build pipeline...[/bold cyan]")
+				self.start_trace()
 				if (self.extract_assets() and
 					self.generate_assembly() and
 					self.patch_source_files() and
@@ -651,8 +645,10 @@ class DragonWarriorBuild:
 					console.print("\n[cyan]Verifying built ROM...[/cyan]")
 					self.verify_rom()  # Non-blocking verification
 
+					self.save_trace(True)
 					console.print("\n[bold green]✅ Full build pipeline completed successfully![/bold green]")
 				else:
+					self.save_trace(False)
 					console.print("\n[bold red]❌ Build pipeline failed at some stage[/bold red]")
 					# Show error summary if available
 					if self.error_handler and self.error_handler.errors:
@@ -678,12 +674,24 @@ class DragonWarriorBuild:
 @click.option('--build-dir', '-b', default='build', help='Build directory')
 @click.option('--output-dir', '-o', default='output', help='Output ROM directory')
 @click.option('--interactive/--no-interactive', default=True, help='Run interactive menu')
-def build_system(source_dir: str, assets_dir: str, build_dir: str, output_dir: str, interactive: bool):
+@click.option('--watch', is_flag=True, help='Watch assets and sources, rebuilding the ROM on save')
+@click.option('--trace', 'trace_file', default=None, help='Write a Chrome trace-event JSON of each pipeline run')
+@click.option('--recover-backups', is_flag=True,
+			  help='Overwrite sources with source_files_backup left by old in-place patching (asks first)')
+def build_system(source_dir: str, assets_dir: str, build_dir: str, output_dir: str, interactive: bool, watch: bool,
+				 trace_file: Optional[str], recover_backups: bool):
 	"""Dragon Warrior complete build system with asset editing"""
 
-	builder = DragonWarriorBuild(source_dir, assets_dir, build_dir, output_dir)
+	builder = DragonWarriorBuild(source_dir, assets_dir, build_dir, output_dir, trace_file)
 	builder.show_banner()
 
+	if recover_backups:
+		sys.exit(0 if builder.recover_source_backups() else 1)
+
+	if watch:
+		builder.watch()
+		return
+
 	if not builder.check_prerequisites():
 		console.print("\n[red]❌ Prerequisites check failed. Please ensure all tools are available.[/red]")
 		sys.exit(1)
@@ -692,11 +700,14 @@ def build_system(source_dir: str, assets_dir: str, build_dir: str, output_dir: s
 		builder.run_interactive_menu()
 	else:
 		# Non-interactive mode - run full pipeline
-		if (builder.extract_assets() and
-			builder.generate_assembly() and
-			builder.patch_source_files() and
-			builder.build_rom() and
-			builder.generate_patches()):
+		builder.start_trace()
+		success = (builder.extract_assets() and
+				   builder.generate_assembly() and
+				   builder.patch_source_files() and
+				   builder.build_rom() and
+				   builder.generate_patches())
+		builder.save_trace(success)
+		if success:
 			console.print("\n[bold green]✅ Build completed successfully![/bold green]")
 		else:
 			console.print("\n[bold red]❌ Build failed[/bold red]")
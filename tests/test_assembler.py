@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process 6502 assembler (tools/assembler.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from assembler import (
+	AssemblerError, assemble_file, build_rom, parse_expression, evaluate,
+	BANK_FILES, PRG_BANK_SIZE, CHR_ROM_SIZE
+)
+
+
+class AssemblerTestCase(unittest.TestCase):
+	"""Base class that writes sources into a temporary directory."""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def write(self, name: str, text: str) -> Path:
+		path = self.temp_dir / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(text, encoding='utf-8')
+		return path
+
+	def assemble(self, text: str, **kwargs):
+		return assemble_file(self.write('test.asm', text), **kwargs)
+
+
+class TestExpressions(unittest.TestCase):
+	"""Test Ophis expression parsing"""
+
+	def test_number_formats(self):
+		"""Hex, binary, decimal and character literals"""
+		for text, value in [('$1F', 0x1F), ('%1010', 10), ('42', 42), ("'A'", 65)]:
+			self.assertEqual(evaluate(parse_expression(text), {}.__getitem__), value)
+
+	def test_operators(self):
+		"""Byte selection, arithmetic and bracket grouping"""
+		symbols = {'Table': 0xA653}
+		self.assertEqual(evaluate(parse_expression('<Table'), symbols.__getitem__), 0x53)
+		self.assertEqual(evaluate(parse_expression('>Table'), symbols.__getitem__), 0xA6)
+		self.assertEqual(evaluate(parse_expression('Table -$8000'), symbols.__getitem__), 0x2653)
+		self.assertEqual(evaluate(parse_expression('[2+3]*4'), symbols.__getitem__), 20)
+
+
+class TestAssembler(AssemblerTestCase):
+	"""Test instruction encoding and directives"""
+
+	def test_zero_page_collapse(self):
+		"""Aliases below $100 use zero-page modes, others absolute"""
+		result = self.assemble(
+			".alias ZpVar $24\n"
+			".alias RamVar $6000\n"
+			".org $C000\n"
+			"LDA ZpVar\n"
+			"STA RamVar,X\n"
+			"LDA (ZpVar),Y\n"
+			"LSR\n"
+			"RTS\n"
+		)
+		self.assertEqual(result.data, bytes([0xA5, 0x24, 0x9D, 0x00, 0x60, 0xB1, 0x24, 0x4A, 0x60]))
+
+	def test_forward_references_and_branches(self):
+		"""Forward labels resolve and branches are PC-relative"""
+		result = self.assemble(
+			".org $8000\n"
+			"Start:\n"
+			"\tJSR Later\t;($8000)\n"
+			"\tBNE Start\n"
+			"Later:  RTS\n"
+		)
+		self.assertEqual(result.data, bytes([0x20, 0x05, 0x80, 0xD0, 0xFB, 0x60]))
+		self.assertEqual(result.labels['Later'], 0x8005)
+
+	def test_anonymous_labels(self):
+		"""'*' labels with '-' and '+' references"""
+		result = self.assemble(
+			".org $C170\n"
+			"\t* DEC $24\n"
+			"\tBPL -\n"
+			"\tBEQ +\n"
+			"\tNOP\n"
+			"*\tRTS\n"
+		)
+		self.assertEqual(result.data, bytes([0xC6, 0x24, 0x10, 0xFC, 0xF0, 0x01, 0xEA, 0x60]))
+
+	def test_data_directives(self):
+		""".byte, .word, strings and .advance padding"""
+		result = self.assemble(
+			".org $8000\n"
+			"Ptr:  .word Data, $1234\n"
+			"Data: .byte $01, 2, \"AB\", <Ptr, >Ptr\n"
+			".advance $800C, $FF\n"
+		)
+		self.assertEqual(result.data, bytes([0x04, 0x80, 0x34, 0x12, 0x01, 0x02, 0x41, 0x42, 0x00, 0x80, 0xFF, 0xFF]))
+
+	def test_include_and_conditionals(self):
+		"""Includes resolve relative to the includer; .ifdef honours .define"""
+		self.write('generated/table.asm', '.include "defs.asm"\n.byte Value\n')
+		self.write('defs.asm', '.alias Value $07\n')
+		result = self.assemble(
+			".define USE_GENERATED_ASSETS\n"
+			".ifdef USE_GENERATED_ASSETS\n"
+			".include \"generated/table.asm\"\n"
+			".else\n"
+			".byte $00\n"
+			".endif\n"
+			".ifndef USE_GENERATED_ASSETS\n"
+			".byte $FF\n"
+			".endif\n"
+		)
+		self.assertEqual(result.data, bytes([0x07]))
+		self.assertEqual(len(result.includes), 3)
+
+	def test_errors_are_collected(self):
+		"""Every undefined symbol and duplicate label is reported with its location"""
+		with self.assertRaises(AssemblerError) as context:
+			self.assemble(
+				"Here:\n"
+				"LDA Missing1\n"
+				"Here:\n"
+				"STA Missing2\n"
+			)
+		messages = [error.location_message() for error in context.exception.errors]
+		self.assertEqual(len(messages), 3)
+		self.assertTrue(any("Undefined label 'Missing1'" in m and ':2:' in m for m in messages))
+		self.assertTrue(any("Duplicate label 'Here'" in m for m in messages))
+
+	def test_branch_out_of_range(self):
+		"""Branches further than 127 bytes are range errors"""
+		with self.assertRaises(AssemblerError) as context:
+			self.assemble("BNE Far\n.advance $0100\nFar: RTS\n")
+		self.assertIn("Range error", str(context.exception))
+
+	def test_listing_and_symbols(self):
+		"""Listing lines carry the PC and emitted bytes"""
+		result = self.assemble(".org $8000\nInit: LDX #$FF\nTXS\n")
+		self.assertIn("8000  A2 FF", result.listing_text())
+		self.assertEqual(result.to_symbol_dict()['labels']['Init'], '$8000')
+
+
+class TestRomBuild(AssemblerTestCase):
+	"""Test linking header, banks and CHR-ROM"""
+
+	def test_build_rom(self):
+		"""Banks are assembled independently and concatenated"""
+		self.write('Header.asm', '.org $0000\n.byte $4E, $45, $53, $1A, $04, $02\n.advance $0010\n')
+		for index, bank in enumerate(BANK_FILES):
+			origin = 0xC000 if index == 3 else 0x8000
+			# Each bank defines the same label, like the real sources
+			self.write(bank, f".org ${origin:04X}\nBankPointers: .byte {index}\n.advance ${origin + PRG_BANK_SIZE:04X}\n")
+
+		result = build_rom(self.temp_dir, chr_data=bytes([0xAA]) * CHR_ROM_SIZE)
+		self.assertEqual(len(result.rom), 16 + 4 * PRG_BANK_SIZE + CHR_ROM_SIZE)
+		self.assertEqual(result.rom[16 + PRG_BANK_SIZE], 1)
+		self.assertEqual(result.banks['Bank03.asm'].labels['BankPointers'], 0xC000)
+
+
+if __name__ == '__main__':
+	unittest.main()
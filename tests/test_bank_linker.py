@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for per-bank incremental assembly and linking (tools/bank_linker.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from assembler import BANK_FILES, HEADER_SIZE, PRG_BANK_SIZE, CHR_ROM_SIZE, build_rom
+from bank_linker import IncrementalBankBuilder
+from build_system_advanced import BuildCache
+
+
+CHR_DATA = bytes(CHR_ROM_SIZE)
+
+
+class TestIncrementalBankBuilder(unittest.TestCase):
+	"""Test cached bank objects and cross-bank relinking"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.source_dir = self.temp_dir / 'source'
+		self.write('Header.asm', '.org $0000\n.byte $4E, $45, $53, $1A, $04, $02\n.advance $0010\n')
+		for index, bank in enumerate(BANK_FILES[:3]):
+			self.write(bank,
+				".alias WaitForNMI $C010\n"
+				".org $8000\n"
+				f"BankStart: .byte {index}\n"
+				"\tJSR WaitForNMI\n"
+				"\tLDA #<WaitForNMI\n"
+				".advance $C000\n")
+		self.write_fixed_bank(padding=0x10)
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def write(self, name: str, text: str) -> None:
+		path = self.source_dir / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(text, encoding='utf-8')
+
+	def write_fixed_bank(self, padding: int) -> None:
+		self.write('Bank03.asm',
+			".org $C000\n"
+			f".advance ${0xC000 + padding:04X}\n"
+			"WaitForNMI: RTS\n"
+			".advance $10000\n")
+
+	def builder(self) -> IncrementalBankBuilder:
+		return IncrementalBankBuilder(self.source_dir, BuildCache(self.temp_dir / 'cache'))
+
+	def test_matches_full_build(self):
+		"""A cold incremental build equals the monolithic build"""
+		result = self.builder().build(chr_data=CHR_DATA)
+		self.assertEqual(result.rom, build_rom(self.source_dir, chr_data=CHR_DATA).rom)
+		self.assertEqual(len(result.rebuilt), 5)
+		self.assertEqual(result.stale_declarations, [])
+
+	def test_unchanged_sources_hit_cache(self):
+		"""A second build reuses every bank object"""
+		first = self.builder().build(chr_data=CHR_DATA)
+		second = self.builder().build(chr_data=CHR_DATA)
+		self.assertEqual(second.rebuilt, [])
+		self.assertEqual(second.rom, first.rom)
+
+	def test_only_edited_bank_rebuilds(self):
+		"""Moving an exported label relinks importers without reassembling them"""
+		self.builder().build(chr_data=CHR_DATA)
+		self.write_fixed_bank(padding=0x20)
+
+		result = self.builder().build(chr_data=CHR_DATA)
+		self.assertEqual(result.rebuilt, ['Bank03.asm'])
+		self.assertEqual(result.bindings['Bank00.asm']['WaitForNMI'], 0xC020)
+		self.assertIn(('Bank01.asm', 'WaitForNMI', 0xC010, 0xC020), result.stale_declarations)
+
+		bank01 = HEADER_SIZE + PRG_BANK_SIZE
+		self.assertEqual(result.rom[bank01 + 1:bank01 + 6], bytes([0x20, 0x20, 0xC0, 0xA9, 0x20]))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the BPS delta encoder (tools/bps_delta.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import random
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from bps_delta import DeltaStats, create_bps_patch
+from patch_engine import apply_patch_bytes
+from test_rom_image import make_rom
+
+
+def noisy_rom(seed: int = 1) -> bytes:
+	"""Synthetic ROM whose banks do not repeat, so matches are real."""
+	rng = random.Random(seed)
+	rom = make_rom()
+	rom[0x10:] = bytes(rng.randrange(256) for _ in range(len(rom) - 0x10))
+	return bytes(rom)
+
+
+class TestBpsDelta(unittest.TestCase):
+	"""Test long-range copies, runs and patch size"""
+
+	def test_relocated_data_becomes_copies(self):
+		"""Swapped banks and a moved table cost a few bytes each"""
+		source = noisy_rom()
+		target = bytearray(source)
+		target[0x4010:0x8010], target[0xC010:0x10010] = source[0xC010:0x10010], source[0x4010:0x8010]
+		target[0x9000:0x9400] = source[0x1000:0x1400]
+		target[0x2000:0x2100] = b'\xAB' * 0x100
+
+		stats = DeltaStats()
+		patch = create_bps_patch(source, target, stats=stats)
+		self.assertEqual(apply_patch_bytes(patch, source).data, target)
+		self.assertLess(len(patch), 100)
+		self.assertGreaterEqual(stats.source_copy, 0x8000)
+		self.assertGreaterEqual(stats.source_copy + stats.target_copy, 0x8400 + 0xFF)
+
+	def test_no_larger_than_read_only_encoding(self):
+		"""Sparse edits encode no larger than plain SourceRead/TargetRead runs"""
+		source = bytes(make_rom())
+		rng = random.Random(2)
+		target = bytearray(source)
+		for _ in range(200):
+			offset = rng.randrange(0x10, len(source) - 8)
+			target[offset:offset + 3] = bytes([rng.randrange(256)]) * 3
+		target = bytes(target)
+
+		patch = create_bps_patch(source, target, metadata=b'<hack/>')
+		result = apply_patch_bytes(patch, source)
+		self.assertEqual((result.data, result.metadata), (target, b'<hack/>'))
+
+		# One SourceRead per unchanged run and one TargetRead per changed run
+		changed = [source[i] != target[i] for i in range(len(source))]
+		runs = sum(1 for i, c in enumerate(changed) if c and (i == 0 or not changed[i - 1]))
+		read_only_size = 4 + 3 * 3 + 12 + sum(changed) + runs * 2 * 3
+		self.assertLessEqual(len(patch), read_only_size)
+		self.assertEqual(apply_patch_bytes(create_bps_patch(b'', b''), b'').data, b'')
+		self.assertEqual(apply_patch_bytes(create_bps_patch(b'abc', b''), b'abc').data, b'')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the advanced build system (tools/build_system_advanced.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from build_system_advanced import BuildCache, BuildConfig, BuildExecutor, BuildTask, BuildStatus, create_build_tasks
+
+
+class TestBuildCache(unittest.TestCase):
+	"""Test the content-addressed build cache"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.cache_dir = self.temp_dir / 'cache'
+		self.input_file = self.temp_dir / 'input.json'
+		self.output_file = self.temp_dir / 'out' / 'output.bin'
+		self.input_file.write_text('{"hp": 3}')
+		self.output_file.parent.mkdir()
+		self.output_file.write_bytes(b'\x01\x02\x03')
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def make_task(self) -> BuildTask:
+		task = BuildTask(id='convert', name='Convert', description='',
+						 inputs=[self.input_file], outputs=[self.output_file])
+		task.status = BuildStatus.SUCCESS
+		return task
+
+	def test_outputs_restored_from_store(self):
+		"""A clean checkout restores outputs instead of rebuilding"""
+		BuildCache(self.cache_dir).cache_task_result(self.make_task())
+		shutil.rmtree(self.output_file.parent)
+
+		self.assertTrue(BuildCache(self.cache_dir).is_task_cached(self.make_task()))
+		self.assertEqual(self.output_file.read_bytes(), b'\x01\x02\x03')
+
+	def test_changed_input_invalidates(self):
+		"""Editing an input misses the cache"""
+		BuildCache(self.cache_dir).cache_task_result(self.make_task())
+		self.input_file.write_text('{"hp": 4}')
+		self.assertFalse(BuildCache(self.cache_dir).is_task_cached(self.make_task()))
+
+	def test_stat_fast_path_skips_rehash(self):
+		"""Unchanged files reuse the recorded digest"""
+		cache = BuildCache(self.cache_dir)
+		with mock.patch('time.time', return_value=self.input_file.stat().st_mtime + 60):
+			digest = cache.get_file_hash(self.input_file)
+		with mock.patch('builtins.open', side_effect=AssertionError("file was rehashed")):
+			self.assertEqual(cache.get_file_hash(self.input_file), digest)
+
+	def test_batch_defers_index_write(self):
+		"""The index is written once when the batch exits"""
+		cache = BuildCache(self.cache_dir)
+		with cache.batch():
+			cache.cache_task_result(self.make_task())
+			self.assertFalse(cache.cache_file.exists())
+		self.assertIn('convert', BuildCache(self.cache_dir).cache)
+
+
+class TestScheduler(unittest.TestCase):
+	"""Test DAG-parallel task scheduling"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def make_executor(self, **options) -> BuildExecutor:
+		config = BuildConfig(project_root=self.temp_dir, build_dir=self.temp_dir / 'build',
+							 cache_dir=self.temp_dir / 'cache', output_dir=self.temp_dir / 'output',
+							 use_cache=False, incremental=False, **options)
+		return BuildExecutor(config)
+
+	def test_independent_tasks_overlap(self):
+		"""Tasks with satisfied dependencies run concurrently"""
+		both_started = threading.Barrier(2, timeout=5)
+		executor = self.make_executor(parallel_jobs=2)
+		executor.register_task(BuildTask(id='a', name='A', description='', command=lambda: both_started.wait() is not None))
+		executor.register_task(BuildTask(id='b', name='B', description='', command=lambda: both_started.wait() is not None))
+		executor.register_task(BuildTask(id='link', name='Link', description='', dependencies=['a', 'b'], command=lambda: True))
+
+		result = executor.build()
+		self.assertTrue(result.success)
+		self.assertEqual(result.tasks_run, 3)
+		self.assertEqual(result.critical_path[-1], 'link')
+
+	def test_keep_going(self):
+		"""Failures block dependents; independent tasks still run with keep_going"""
+		executor = self.make_executor(keep_going=True)
+		executor.register_task(BuildTask(id='broken', name='Broken', description='', command=lambda: False))
+		executor.register_task(BuildTask(id='after', name='After', description='', dependencies=['broken'], command=lambda: True))
+		executor.register_task(BuildTask(id='other', name='Other', description='', command=lambda: True))
+
+		result = executor.build()
+		self.assertFalse(result.success)
+		self.assertEqual(result.failed_tasks, ['broken'])
+		self.assertEqual(executor.tasks['other'].status, BuildStatus.SUCCESS)
+		self.assertEqual(executor.tasks['after'].status, BuildStatus.PENDING)
+
+	def test_fail_fast(self):
+		"""Without keep_going no new tasks start after a failure"""
+		executor = self.make_executor()
+		executor.register_task(BuildTask(id='broken', name='Broken', description='', command=lambda: False))
+		executor.register_task(BuildTask(id='other', name='Other', description='', command=lambda: True))
+
+		result = executor.build()
+		self.assertEqual(result.tasks_failed, 1)
+		self.assertEqual(executor.tasks['other'].status, BuildStatus.PENDING)
+
+	def test_stock_tasks_run_on_process_pool(self):
+		"""The stock task commands pickle, so the process backend really uses worker processes"""
+		rom_source = self.temp_dir / 'dw.nes'
+		rom_source.write_bytes(bytes(131072))
+		executor = self.make_executor(parallel_jobs=2, executor_backend='process', rom_source=rom_source)
+		for task in create_build_tasks(executor.config):
+			executor.register_task(task)
+		self.assertTrue(all(executor._use_process_pool(task) for task in executor.tasks.values()))
+
+		with mock.patch('builtins.print'):
+			result = executor.build(['clean', 'validate_rom'])
+		self.assertTrue(result.success)
+		self.assertEqual(sorted(span.name for span in result.spans), ['clean', 'validate_rom'])
+		self.assertTrue(all(span.pid != os.getpid() for span in result.spans))
+		self.assertTrue((self.temp_dir / 'build').is_dir())
+
+
+if __name__ == '__main__':
+	unittest.main()
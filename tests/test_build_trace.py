@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for build stage tracing and history comparison (tools/build_trace.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from build_trace import BuildTracer, compare_with_history, load_history, traced
+from build_system_advanced import BuildConfig, BuildExecutor, BuildTask
+
+
+def history_entry(wall: float, pipeline: str = "test", success: bool = True) -> dict:
+	return {'pipeline': pipeline, 'success': success,
+			'stages': {'assemble': {'wall': wall, 'cpu': wall}}}
+
+
+class TestBuildTracer(unittest.TestCase):
+	"""Test span collection and export"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_spans_exported(self):
+		"""Spans become Chrome trace events and a history line"""
+		tracer = BuildTracer()
+		with tracer.span('extract'):
+			(self.temp_dir / 'out.bin').write_bytes(bytes(4096))
+		with self.assertRaises(ValueError):
+			with tracer.span('assemble'):
+				raise ValueError("bad bank")
+
+		trace = json.loads(tracer.write_chrome_trace(self.temp_dir / 'trace.json').read_text())
+		events = {event['name']: event for event in trace['traceEvents']}
+		self.assertEqual(events['extract']['ph'], 'X')
+		self.assertFalse(events['assemble']['args']['success'])
+
+		tracer.append_history(self.temp_dir / 'history.jsonl', False, pipeline='test')
+		tracer.append_history(self.temp_dir / 'history.jsonl', True, pipeline='test')
+		history = load_history(self.temp_dir / 'history.jsonl')
+		self.assertEqual(len(history), 2)
+		self.assertEqual(set(history[0]['stages']), {'extract', 'assemble'})
+
+	def test_process_counters_only_for_serial_spans(self):
+		"""Spans overlapping on other threads get no share of the process-wide I/O counters"""
+		tracer = BuildTracer()
+		barrier = threading.Barrier(2)
+
+		def stage(name):
+			with tracer.span(name):
+				barrier.wait()
+				(self.temp_dir / f'{name}.bin').write_bytes(bytes(65536))
+				barrier.wait()
+
+		threads = [threading.Thread(target=stage, args=(name,)) for name in ('left', 'right')]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		with tracer.span('serial'):
+			with tracer.span('nested'):
+				(self.temp_dir / 'serial.bin').write_bytes(bytes(65536))
+
+		spans = {span.name: span for span in tracer.spans}
+		self.assertEqual((spans['left'].write_bytes, spans['right'].write_bytes), (0, 0))
+		entry = tracer.history_entry(True)
+		if Path('/proc/self/io').exists():
+			# Nested spans on one thread are still serial
+			self.assertGreaterEqual(spans['serial'].write_bytes, 65536)
+			self.assertGreaterEqual(spans['nested'].write_bytes, 65536)
+			self.assertGreaterEqual(entry['write_bytes'], 3 * 65536)
+		self.assertIn('child_cpu', entry)
+
+	def test_traced_method(self):
+		"""A False return marks the decorated stage as failed"""
+		class Builder:
+			tracer = BuildTracer()
+
+			@traced('verify')
+			def verify(self):
+				return False
+
+		builder = Builder()
+		self.assertFalse(builder.verify())
+		self.assertFalse(builder.tracer.spans[0].success)
+
+	def test_executor_records_task_spans(self):
+		"""Each executed task gets a span with its resource usage"""
+		config = BuildConfig(project_root=self.temp_dir, build_dir=self.temp_dir / 'build',
+							 cache_dir=self.temp_dir / 'cache', output_dir=self.temp_dir / 'out',
+							 use_cache=False, incremental=False,
+							 history_file=self.temp_dir / 'history.jsonl')
+		executor = BuildExecutor(config)
+		executor.register_task(BuildTask('a', 'A', 'first', command=lambda: True))
+		executor.register_task(BuildTask('b', 'B', 'second', dependencies=['a'], command=lambda: True))
+
+		result = executor.build()
+		self.assertEqual([span.name for span in result.spans], ['a', 'b'])
+		self.assertEqual(load_history(config.history_file)[0]['pipeline'], 'build_system')
+
+
+class TestHistoryComparison(unittest.TestCase):
+	"""Test regression detection against past builds"""
+
+	def test_regression_flagged(self):
+		"""A stage much slower than the median of past builds is flagged"""
+		history = [history_entry(1.0), history_entry(1.1), history_entry(0.9)]
+		regressions = compare_with_history(history_entry(2.0), history)
+		self.assertEqual({(r.stage, r.metric) for r in regressions}, {('assemble', 'wall'), ('assemble', 'cpu')})
+		self.assertEqual(regressions[0].baseline, 1.0)
+
+	def test_noise_and_other_pipelines_ignored(self):
+		"""Small absolute changes, failed builds and other pipelines are not baselines"""
+		self.assertEqual(compare_with_history(history_entry(0.03), [history_entry(0.01)]), [])
+		self.assertEqual(compare_with_history(history_entry(2.0), [history_entry(1.0, success=False)]), [])
+		self.assertEqual(compare_with_history(history_entry(2.0), [history_entry(1.0, pipeline='other')]), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for watch-mode rebuilds (tools/build_watcher.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from assembler import BANK_FILES, HEADER_SIZE, CHR_ROM_SIZE
+from build_watcher import BuildWatcher
+
+
+GENERATOR_SCRIPT = '''
+import json
+import sys
+import io
+from pathlib import Path
+
+if hasattr(sys.stdout, 'buffer'):
+	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+JSON_PATH = Path(__file__).parent.parent / "assets" / "json" / "items.json"
+OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "item_cost_table.asm"
+
+if __name__ == "__main__":
+	items = json.loads(JSON_PATH.read_text())
+	OUTPUT_PATH.write_text("ItemCostTbl: .byte " + ", ".join(str(i["cost"]) for i in items) + "\\n")
+	print(f"Generated {OUTPUT_PATH.name}")
+'''
+
+
+class TestBuildWatcher(unittest.TestCase):
+	"""Test change detection and incremental rebuilds"""
+
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.write('source_files/Header.asm', '.org $0000\n.byte $4E, $45, $53, $1A, $04, $02\n.advance $0010\n')
+		self.write('source_files/Bank00.asm', '.org $8000\n.include "generated/item_cost_table.asm"\n.advance $C000\n')
+		for bank in BANK_FILES[1:3]:
+			self.write(f'source_files/{bank}', '.org $8000\n.advance $C000\n')
+		self.write('source_files/Bank03.asm', '.org $C000\n.advance $10000\n')
+		(self.root / 'source_files/chr_rom.bin').write_bytes(bytes(CHR_ROM_SIZE))
+		self.write('source_files/generated/item_cost_table.asm', 'ItemCostTbl: .byte 0\n')
+		self.write('tools/generate_item_cost_table.py', GENERATOR_SCRIPT)
+		self.write('assets/json/items.json', '[{"cost": 10}]')
+
+		self.messages = []
+		self.watcher = BuildWatcher(self.root, cache_dir=self.root / 'cache',
+									watch_dirs=['assets/json', 'source_files'], log=self.messages.append)
+
+	def tearDown(self):
+		shutil.rmtree(self.root)
+
+	def write(self, name: str, text: str) -> None:
+		path = self.root / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(text, encoding='utf-8')
+
+	def test_json_edit_rebuilds_one_bank(self):
+		"""Saving a JSON file reruns its generator and reassembles only its bank"""
+		self.watcher._snapshot = self.watcher.snapshot()
+		self.assertEqual(len(self.watcher.rebuild([]).rebuilt), 5)
+
+		self.write('assets/json/items.json', '[{"cost": 25}, {"cost": 40}]')
+		changed = self.watcher.poll()
+		self.assertEqual(changed, [Path('assets/json/items.json')])
+
+		result = self.watcher.rebuild(changed)
+		self.assertEqual(result.rebuilt, ['Bank00.asm'])
+		rom = (self.root / 'output/dragon_warrior_modified.nes').read_bytes()
+		self.assertEqual(rom[HEADER_SIZE:HEADER_SIZE + 2], bytes([25, 40]))
+		self.assertIn('[GEN] generate_item_cost_table', self.messages)
+
+	def test_edits_during_build(self):
+		"""Files saved while a build runs are still reported; generated tables are not"""
+		self.watcher._snapshot = self.watcher.snapshot()
+		self.write('assets/json/items.json', '[{"cost": 25}]')
+		changed = self.watcher.poll()
+
+		build = self.watcher.builder.build
+		def edit_during_build(**kwargs):
+			self.write('source_files/Bank01.asm', '.org $8000\n.byte $07\n.advance $C000\n')
+			(self.root / 'source_files/chr_rom.bin').write_bytes(b'\x5A' * CHR_ROM_SIZE)
+			return build(**kwargs)
+
+		with mock.patch.object(self.watcher.builder, 'build', side_effect=edit_during_build):
+			self.watcher.rebuild(changed)
+		self.watcher._settle()
+		self.assertEqual(self.watcher.poll(), [Path('source_files/Bank01.asm'), Path('source_files/chr_rom.bin')])
+
+		# The saved CHR-ROM source is reloaded instead of reusing the cached data
+		self.watcher.rebuild([Path('source_files/chr_rom.bin')])
+		rom = (self.root / 'output/dragon_warrior_modified.nes').read_bytes()
+		self.assertEqual(rom[-CHR_ROM_SIZE:], b'\x5A' * CHR_ROM_SIZE)
+
+	def test_generator_failure_reported(self):
+		"""A failing generator stops the rebuild without raising"""
+		self.write('assets/json/items.json', 'not json')
+		self.assertIsNone(self.watcher.rebuild([Path('assets/json/items.json')]))
+		self.assertTrue(any('generate_item_cost_table failed' in m for m in self.messages))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the compression trial engine (tools/compression_lab.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from compression_lab import CODECS, WORLD_MAP_TILES, encode_dw_rle, encode_rle, run_trial, run_trials
+from extraction_engine import WORLD_MAP_OFFSET
+from test_rom_image import make_rom
+
+
+class TestCompressionLab(unittest.TestCase):
+	"""Test codec formats, round trips and pooled trials"""
+
+	def test_codecs(self):
+		"""Exact streams for the RLE formats and round trips for every codec"""
+		self.assertEqual(encode_dw_rle(bytes([2] * 18 + [5])), b'\x13\x00\x2f\x21\x50')
+		self.assertEqual(encode_rle(b'\x07' * 5 + b'\x01\x02'), b'\x07\x00\x82\x07\x01\x01\x02')
+
+		lzss = CODECS['lzss_12_4']
+		data = b'ABCABCABCABCx' + b'ABCABCABC'
+		stream = lzss.encode(data)
+		decoded, events = lzss.decode(stream)
+		self.assertEqual(decoded, data)
+		self.assertEqual(events['match'], 2)
+		self.assertEqual(events['copy_byte'], 9 + 9)
+
+		rng = random.Random(11)
+		for _ in range(30):
+			size = rng.choice([16, 64, 320])
+			data = bytes(rng.choice(b'\x00\x00\x01\x0f\x80\xff') for _ in range(size))
+			for codec in CODECS.values():
+				result = run_trial('random', data, codec)
+				self.assertTrue(result.verified or result.error, f"{codec.name} failed on {data.hex()}")
+				if result.verified:
+					self.assertGreater(result.cycles, 0)
+
+		self.assertIn('0x0F', run_trial('bytes', b'\x10\x20', CODECS['dw_rle']).error)
+		self.assertFalse(run_trial('odd', b'\x00' * 17, CODECS['chr_rows']).applicable)
+
+	def test_trials(self):
+		"""Pooled and in-process trials agree; best codec per region and JSON report"""
+		temp_dir = Path(tempfile.mkdtemp())
+		try:
+			rom = make_rom()
+			rom[0x8000:0x8400] = bytes(range(256)) * 4
+			# Overworld rows of random tiles and run lengths
+			rng = random.Random(5)
+			rom[WORLD_MAP_OFFSET:0x8000] = bytes(rng.getrandbits(8) for _ in range(0x8000 - WORLD_MAP_OFFSET))
+			path = temp_dir / 'dw.nes'
+			path.write_bytes(rom)
+			regions = {'repeats': (0x8000, 0x8400), 'tiles': (0x10010, 0x10410), WORLD_MAP_TILES: None}
+
+			pooled = run_trials(path, regions, workers=2)
+			inline = run_trials(bytes(rom), regions, workers=1)
+			self.assertEqual([r.compressed_size for r in pooled.results], [r.compressed_size for r in inline.results])
+			self.assertEqual(len(pooled.results), len(regions) * len(CODECS))
+			self.assertTrue(all(r.verified for r in pooled.results if r.applicable))
+
+			best = pooled.best()
+			self.assertEqual(best[WORLD_MAP_TILES].codec, 'dw_rle')
+			self.assertTrue(best['repeats'].codec.startswith('lzss'))
+			self.assertLess(best['tiles'].compressed_size, 0x400)
+
+			saved = json.loads(pooled.save(temp_dir / 'trials.json').read_text(encoding='utf-8'))
+			self.assertEqual(saved['best']['repeats'], best['repeats'].codec)
+			with self.assertRaises(ValueError):
+				run_trials(path, regions, codecs=['zip'])
+		finally:
+			shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for build dependency inference (tools/dependency_graph.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from dependency_graph import DependencyGraph
+from build_system_advanced import BuildCache
+
+
+GENERATOR_SCRIPT = '''
+from pathlib import Path
+
+JSON_PATH = Path(__file__).parent.parent / "assets" / "json" / "items.json"
+OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "item_cost_table.asm"
+'''
+
+
+class TestDependencyGraph(unittest.TestCase):
+	"""Test include scanning and generator mapping"""
+
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.write('source_files/Bank00.asm', '.include "Dragon_Warrior_Defines.asm"\n.include "generated/item_cost_table.asm"\n')
+		self.write('source_files/Bank01.asm', '.include "Dragon_Warrior_Defines.asm"\n')
+		self.write('source_files/Dragon_Warrior_Defines.asm', '.alias Zero $00\n')
+		self.write('source_files/generated/item_cost_table.asm', 'ItemCostTbl: .word 10\n')
+		self.write('tools/generate_item_cost_table.py', GENERATOR_SCRIPT)
+		self.write('assets/json/items.json', '{}')
+
+	def tearDown(self):
+		shutil.rmtree(self.root)
+
+	def write(self, name: str, text: str) -> None:
+		path = self.root / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(text, encoding='utf-8')
+
+	def scan(self, cache=None) -> DependencyGraph:
+		return DependencyGraph(self.root, cache=cache).scan()
+
+	def test_generator_mapping(self):
+		"""Generator paths are folded from the script's Path expressions"""
+		info = self.scan().generators['generate_item_cost_table']
+		self.assertEqual(info.inputs, [Path('assets/json/items.json')])
+		self.assertEqual(info.outputs, [Path('source_files/generated/item_cost_table.asm')])
+
+	def test_json_change_affects_one_bank(self):
+		"""A JSON edit reaches only the bank that includes the generated table"""
+		graph = self.scan()
+		changed = [Path('assets/json/items.json')]
+		self.assertEqual(graph.affected_generators(changed), ['generate_item_cost_table'])
+		self.assertEqual(graph.affected_banks(changed), ['Bank00.asm'])
+		self.assertEqual(graph.affected_banks([Path('source_files/Dragon_Warrior_Defines.asm')]),
+						 ['Bank00.asm', 'Bank01.asm'])
+
+	def test_scan_results_cached(self):
+		"""Unchanged files are not rescanned"""
+		cache = BuildCache(self.root / 'cache')
+		self.assertGreater(self.scan(cache).scanned, 0)
+		self.assertEqual(self.scan(cache).scanned, 0)
+
+		self.write('source_files/Bank01.asm', '.include "extra.asm"\n')
+		graph = self.scan(cache)
+		self.assertEqual(graph.scanned, 1)
+		self.assertEqual(graph.edges[Path('source_files/Bank01.asm')], [Path('source_files/extra.asm')])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared ROM diff engine (tools/diff_engine.py) and the
+comparators built on it.
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+import diff_engine
+from diff_engine import RomDiff, diff_spans
+from rom_comparison_advanced import ChangeType, ROMComparator
+from test_rom_image import make_rom
+
+
+def modified_rom() -> bytes:
+	rom = make_rom()
+	rom[0x5E60:0x5E64] = b'\xA1\xA2\xA3\xA4'
+	rom[0x5E70] = 0xA5
+	rom[0x8000:0x8010] = bytes(0x10)
+	return bytes(rom)
+
+
+class TestDiffEngine(unittest.TestCase):
+	"""Test run detection, padding, lazy per-byte detail and the comparators"""
+
+	def setUp(self):
+		self.original = bytes(make_rom())
+		self.modified = modified_rom()
+
+	def test_runs(self):
+		"""Runs, clusters and context match a byte-by-byte scan"""
+		diff = RomDiff(self.original, self.modified)
+		self.assertEqual([(run.offset, run.size) for run in diff.runs], [(0x5E60, 4), (0x5E70, 1), (0x8000, 0x10)])
+		self.assertEqual(diff.runs[0].original, b'\x01' * 4)
+		self.assertEqual(list(diff.byte_changes()),
+						 [(i, a, b) for i, (a, b) in enumerate(zip(self.original, self.modified)) if a != b])
+		self.assertEqual(diff.clusters(), [(0x5E60, 0x5E70), (0x8000, 0x800F)])
+		self.assertEqual(diff.context(0x5E60, 2), (b'\x01\x01', b'\x01\x01'))
+		self.assertEqual([(r.offset, r.size) for r in diff.runs_between(0x5E62, 0x8004)],
+						 [(0x5E62, 2), (0x5E70, 1), (0x8000, 4)])
+
+		with mock.patch.object(diff_engine, 'np', None):
+			self.assertEqual(diff_spans(self.original, self.modified), [(r.offset, r.end) for r in diff.runs])
+
+		# Zero padding ignores trailing zeros; the common prefix ignores the tail
+		grown = self.modified + b'\x00\x00\x07'
+		self.assertEqual(RomDiff(self.original, grown, pad=0).runs[-1].offset, len(self.original) + 2)
+		self.assertEqual(RomDiff(self.original, grown).changed_bytes, 21)
+		self.assertFalse(RomDiff(self.original, self.original[:-1]).identical)
+
+	def test_comparator(self):
+		"""ROMComparator statistics and lazily built ChangeRecords"""
+		comparator = ROMComparator(context_bytes=4)
+		changes = comparator.compare(self.original, self.modified)
+		self.assertEqual(len(changes), 21)
+		self.assertEqual(comparator.stats.changed_bytes, 21)
+		self.assertEqual(comparator.stats.changes_by_type, {'code': 21})
+		self.assertEqual(comparator.stats.change_clusters, [(0x5E60, 0x5E70), (0x8000, 0x800F)])
+
+		fifth = changes[4]
+		self.assertEqual((fifth.offset, fifth.original_value, fifth.modified_value), (0x5E70, 0x01, 0xA5))
+		self.assertEqual((fifth.context_before, fifth.context_after), (b'\x01' * 4, b'\x01' * 4))
+		self.assertEqual([c.offset for c in changes[-2:]], [0x800E, 0x800F])
+		self.assertEqual(len(comparator.get_changes_in_range(0x5E62, 0x6000)), 3)
+		self.assertEqual(len(comparator.get_changes_by_type(ChangeType.TEXT)), 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
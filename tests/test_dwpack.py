@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the .dwpack section container (tools/dwpack.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from dwpack import (PACK_FILE, DWPack, DWPackError, Section, current_pack, pack_dwdata_dir, refresh_pack,
+					unpack_to_dwdata)
+from extraction_engine import ExtractionEngine
+from binary_to_rom import ROMModifier
+from test_rom_image import make_rom
+
+
+class TestDWPack(unittest.TestCase):
+	"""Test packing, zero-copy reads and in-place updates"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.rom_path = self.temp_dir / 'dw.nes'
+		rom = make_rom()
+		rom[0x5e5b:0x5e5b + 16] = bytes(range(16))
+		self.rom_path.write_bytes(rom)
+		self.binary_dir = self.temp_dir / 'binary'
+		ExtractionEngine(self.rom_path).extract(self.binary_dir)
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_lossless_roundtrip(self):
+		"""Unpacking recreates byte-identical .dwdata files"""
+		pack_path = pack_dwdata_dir(self.binary_dir, compress=['graphics'])
+		unpacked = unpack_to_dwdata(pack_path, self.temp_dir / 'unpacked')
+		self.assertEqual(len(unpacked), 10)
+		for path in unpacked:
+			self.assertEqual(path.read_bytes(), (self.binary_dir / path.name).read_bytes())
+
+		with DWPack(pack_path) as pack:
+			self.assertTrue(all(pack.verify().values()))
+			self.assertIsInstance(pack.read('monsters'), memoryview)
+			self.assertLess(pack.entries['graphics'].stored_size, pack.entries['graphics'].size)
+
+	def test_in_place_update(self):
+		"""Updates reuse the slot when they fit and relocate when they do not"""
+		pack_path = pack_dwdata_dir(self.binary_dir)
+		with DWPack(pack_path, writable=True) as pack:
+			slot = pack.entries['spell_costs'].data_offset
+			pack.update('spell_costs', bytes(range(10, 20)))
+			self.assertEqual(pack.entries['spell_costs'].data_offset, slot)
+
+			pack.update('spell_costs', bytes(200))
+			self.assertNotEqual(pack.entries['spell_costs'].data_offset, slot)
+			size = pack_path.stat().st_size
+			pack.compact()
+			self.assertLess(pack_path.stat().st_size, size)
+
+		with DWPack(pack_path) as pack:
+			self.assertEqual(bytes(pack.read('spell_costs')), bytes(200))
+			self.assertEqual(bytes(pack.read('monsters')[:16]), bytes(range(16)))
+			self.assertTrue(all(pack.verify().values()))
+
+	def test_reinsert_from_pack(self):
+		"""ROMModifier reads sections from the pack in place of .dwdata files"""
+		pack_dir = self.temp_dir / 'packed'
+		ExtractionEngine(self.rom_path).extract(pack_dir, pack=True)
+		self.assertEqual([path.name for path in pack_dir.iterdir()], [PACK_FILE])
+
+		modifier = ROMModifier(str(self.rom_path), str(pack_dir))
+		self.assertTrue(modifier.load_rom())
+		results = modifier.reinsert_all()
+		self.assertTrue(all(success for success, _ in results.values()))
+		self.assertEqual(bytes(modifier.rom_data), self.rom_path.read_bytes())
+
+	def test_stale_pack(self):
+		"""A pack older than an edited .dwdata file is ignored until refreshed"""
+		pack_path = pack_dwdata_dir(self.binary_dir, compress=['graphics'])
+		self.assertEqual(current_pack(self.binary_dir), pack_path)
+
+		monsters = self.binary_dir / 'monsters.dwdata'
+		section = Section.from_dwdata(monsters)
+		section.data = b'\xA7' + section.data[1:]
+		monsters.write_bytes(section.to_dwdata())
+		later = pack_path.stat().st_mtime + 10
+		os.utime(monsters, (later, later))
+		self.assertIsNone(current_pack(self.binary_dir))
+
+		modifier = ROMModifier(str(self.rom_path), str(self.binary_dir))
+		self.assertTrue(modifier.load_rom())
+		modifier.reinsert_all()
+		self.assertEqual(modifier.rom_data[0x5e5b], 0xA7)
+
+		self.assertEqual(refresh_pack(self.binary_dir), pack_path)
+		self.assertEqual(current_pack(self.binary_dir), pack_path)
+		with DWPack(pack_path) as pack:
+			self.assertEqual(pack.read('monsters')[0], 0xA7)
+			self.assertTrue(pack.entries['graphics'].compressed)
+
+		empty = self.temp_dir / 'empty.dwpack'
+		empty.write_bytes(b'')
+		with self.assertRaises(DWPackError):
+			DWPack(empty)
+
+
+if __name__ == '__main__':
+	unittest.main()
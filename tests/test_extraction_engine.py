@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for single-pass and corpus extraction (tools/extraction_engine.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from extraction_engine import ExtractionEngine, corpus_output_dirs, decode_world_map, extract_corpus
+from extract_to_binary import ROMExtractor
+from test_rom_image import make_rom
+
+
+class TestExtractionEngine(unittest.TestCase):
+	"""Test one-load extraction against the per-table extractors"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.rom_path = self.temp_dir / 'dw.nes'
+		rom = make_rom()
+		rom[0x5e5b:0x5e5b + 16] = bytes(range(16))
+		self.rom_path.write_bytes(rom)
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_matches_single_table_extractors(self):
+		"""Every .dwdata section equals the one the per-table method writes"""
+		result = ExtractionEngine(self.rom_path).extract(self.temp_dir / 'engine')
+		self.assertTrue(result.success)
+		self.assertEqual(len(result.written), 10)
+
+		extractor = ROMExtractor(str(self.rom_path))
+		extractor.load_rom()
+		single = self.temp_dir / 'single'
+		extractor.extract_monsters(str(single / 'monsters.dwdata'))
+		extractor.extract_note_table(str(single / 'note_table.dwdata'))
+		extractor.extract_equipment_bonuses(str(single / 'equipment_bonuses.dwdata'))
+		for name in ('monsters.dwdata', 'note_table.dwdata', 'equipment_bonuses.dwdata'):
+			engine_data = (self.temp_dir / 'engine' / name).read_bytes()
+			single_data = (single / name).read_bytes()
+			# Identical apart from the header timestamp
+			self.assertEqual(engine_data[:0x14], single_data[:0x14])
+			self.assertEqual(engine_data[0x18:], single_data[0x18:])
+
+		again = ExtractionEngine(self.rom_path).extract(self.temp_dir / 'engine')
+		self.assertEqual(again.written, [])
+
+	def test_decoders_run_in_pool(self):
+		"""Decoded CHR/map/dialog JSON is produced by worker processes"""
+		result = ExtractionEngine(self.rom_path).extract(self.temp_dir / 'out', decode=True, workers=2)
+		self.assertTrue(result.success, result.errors)
+		tiles = json.loads((self.temp_dir / 'out' / 'graphics.json').read_text())
+		self.assertEqual(tiles['tile_count'], 1024)
+		self.assertTrue((self.temp_dir / 'out' / 'dialogs.json').exists())
+
+	def test_world_map_rle(self):
+		"""Runs are clipped at the row width"""
+		decoded = decode_world_map(bytes([0x1F, 0x23, 0x4F]), width=20, height=2)
+		self.assertEqual(decoded['rows'], ['1' * 16 + '2' * 4, '4' * 16])
+
+	def test_corpus(self):
+		"""Several ROMs are extracted concurrently, bad ones reported"""
+		other = self.temp_dir / 'hack.nes'
+		other.write_bytes(make_rom())
+		missing = self.temp_dir / 'missing.nes'
+
+		results = extract_corpus([self.rom_path, other, missing], self.temp_dir / 'corpus', workers=2)
+		self.assertTrue(results[str(self.rom_path)].success)
+		self.assertTrue((self.temp_dir / 'corpus' / 'hack' / 'monsters.dwdata').exists())
+		self.assertFalse(results[str(missing)].success)
+
+	def test_corpus_same_names(self):
+		"""Same-named hacks in different folders get their own output directories"""
+		roms = []
+		for folder, hp in (('hackA', 7), ('hackB', 9)):
+			rom = make_rom()
+			rom[0x5e5b + 2] = hp
+			path = self.temp_dir / 'hacks' / folder / 'Dragon Warrior (U).nes'
+			path.parent.mkdir(parents=True)
+			path.write_bytes(rom)
+			roms.append(path)
+		bin_copy = roms[0].with_suffix('.bin')
+		bin_copy.write_bytes(roms[0].read_bytes())
+
+		self.assertEqual(corpus_output_dirs(roms + [bin_copy, roms[0]]), {
+			str(roms[0]): Path('hackA/Dragon Warrior (U).nes'),
+			str(roms[1]): Path('hackB/Dragon Warrior (U)'),
+			str(bin_copy): Path('hackA/Dragon Warrior (U).bin'),
+		})
+
+		results = extract_corpus(roms, self.temp_dir / 'corpus', workers=2)
+		self.assertTrue(all(result.success for result in results.values()))
+		outputs = [self.temp_dir / 'corpus' / folder / 'Dragon Warrior (U)' for folder in ('hackA', 'hackB')]
+		self.assertEqual([results[str(rom)].output_dir for rom in roms], outputs)
+		monsters = [(output / 'monsters.dwdata').read_bytes() for output in outputs]
+		self.assertNotEqual(monsters[0], monsters[1])
+
+
+if __name__ == '__main__':
+	unittest.main()
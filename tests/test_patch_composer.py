@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for patch stack composition (tools/patch_composer.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import zlib
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from patch_composer import ComposeError, compose
+from patch_engine import apply_patch_bytes
+from bps_delta import create_bps_patch
+from binary_patch_tool import IPSPatcher
+from patch_generator_advanced import UPSPatchGenerator
+from test_rom_image import make_rom
+
+
+def patch_stack():
+	"""Base ROM, BPS bank swap, IPS edits, UPS edits and each stage's ROM."""
+	rng = random.Random(3)
+	base = bytes(rng.randrange(256) for _ in range(len(make_rom())))
+	swapped = bytearray(base)
+	swapped[0x4010:0x8010], swapped[0xC010:0x10010] = base[0xC010:0x10010], base[0x4010:0x8010]
+	swapped[0x100:0x110] = b'\x01' * 0x10
+	swapped = bytes(swapped)
+	tweaked = bytearray(swapped)
+	tweaked[0x5E60:0x5E64] = b'QQQQ'
+	tweaked[0x108:0x10C] = b'\x01\x01\x02\x02'
+	tweaked = bytes(tweaked) + b'tail'
+	hard = bytearray(tweaked)
+	hard[0x5E62:0x5E66] = b'ZZZZ'
+	hard[0x9000:0x9100] = swapped[0x100:0x200]
+	hard = bytes(hard)
+	layers = [('base.bps', create_bps_patch(base, swapped)),
+			  ('qol.ips', IPSPatcher.create_patch(swapped, tweaked)),
+			  ('hard.ups', UPSPatchGenerator().generate(tweaked, hard))]
+	return base, layers, hard
+
+
+class TestPatchComposer(unittest.TestCase):
+	"""Test composed output, conflict reports and stack validation"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.base, self.layers, self.target = patch_stack()
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_composed_formats(self):
+		"""One composed patch in each format produces the stacked result"""
+		composed = compose(self.layers)
+		self.assertEqual(composed.target_size, len(self.target))
+		for format in ('ips', 'ups', 'bps'):
+			patch = composed.to_format(format, self.base)
+			self.assertEqual(apply_patch_bytes(patch, self.base).data, self.target, format)
+
+		# The UPS layer XORs bytes the BPS layer copied from the base ROM
+		with self.assertRaises(ComposeError):
+			composed.to_bps()
+		path = composed.write(self.temp_dir / 'combined.bps', base=self.base)
+		result = apply_patch_bytes(path.read_bytes(), self.base)
+		self.assertEqual((result.data, result.crc_match), (self.target, True))
+		self.assertEqual(result.target_crc32, zlib.crc32(self.target))
+
+	def test_conflicts(self):
+		"""Overlapping writes are reported against the ROM layout"""
+		composed = compose(self.layers)
+		found = [(c.first, c.second, c.start, c.end) for c in composed.conflicts]
+		self.assertIn(('qol.ips', 'hard.ups', 0x5E62, 0x5E64), found)
+		self.assertIn(('base.bps', 'qol.ips', 0x5E60, 0x5E64), found)
+		self.assertIn('Monster Data', str(composed.conflicts[-1]))
+		with self.assertRaises(ComposeError):
+			compose(self.layers, strict=True)
+
+	def test_invalid_stacks(self):
+		"""Mismatched CRC chains and IPS without a base ROM are rejected"""
+		with self.assertRaises(ComposeError):
+			compose([self.layers[0], self.layers[2]])
+		with self.assertRaises(ComposeError):
+			compose(self.layers[1:])
+		with self.assertRaises(ComposeError):
+			compose(self.layers, base=self.target)
+		with self.assertRaises(ComposeError):
+			compose([])
+
+		# With the base ROM the IPS-first stack composes and checks the UPS chain
+		swapped = apply_patch_bytes(self.layers[0][1], self.base).data
+		composed = compose(self.layers[1:], base=swapped)
+		self.assertEqual(apply_patch_bytes(composed.to_ups(swapped), swapped).data, self.target)
+		self.assertEqual([c.first for c in composed.conflicts], ['qol.ips'])
+
+
+if __name__ == '__main__':
+	unittest.main()
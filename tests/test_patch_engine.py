@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming patch engine (tools/patch_engine.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import zlib
+import struct
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from patch_engine import (ChecksumError, PatchError, apply_patch_bytes, apply_patch_file,
+						  apply_patch_queue, encode_number, encode_signed)
+from binary_patch_tool import BPSPatcher, IPSPatcher, PatchManager
+from patch_generator_advanced import BPSPatchGenerator, UPSPatchGenerator
+from test_rom_image import make_rom
+
+
+def modified_rom() -> bytearray:
+	rom = make_rom()
+	rom[0x5E60:0x5E64] = b'\x01\x02\x03\x04'
+	rom[0x8000:0x8200] = bytes(0x200)
+	rom[0x10010:0x10020] = b'\xA5' * 0x10
+	return rom
+
+
+def bps_patch(source: bytes, target: bytes, body: bytes) -> bytes:
+	patch = b'BPS1' + encode_number(len(source)) + encode_number(len(target)) + encode_number(0) + body
+	patch += struct.pack('<II', zlib.crc32(source), zlib.crc32(target))
+	return patch + struct.pack('<I', zlib.crc32(patch))
+
+
+class TestPatchEngine(unittest.TestCase):
+	"""Test IPS/UPS/BPS application, CRC checks and streamed file output"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.original = bytes(make_rom())
+		self.modified = bytes(modified_rom())
+		self.source_path = self.temp_dir / 'dw.nes'
+		self.source_path.write_bytes(self.original)
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_ips(self):
+		"""RLE records, growth past the source and the truncation extension"""
+		patch = IPSPatcher.create_patch(self.original, self.modified)
+		result = apply_patch_bytes(patch, self.original)
+		self.assertEqual((result.format, result.data), ('ips', self.modified))
+		self.assertEqual(result.target_crc32, zlib.crc32(self.modified))
+
+		grown = b'PATCH' + (0x20).to_bytes(3, 'big') + b'\x00\x00\x00\x04\xEE' + b'EOF'
+		self.assertEqual(apply_patch_bytes(grown, b'\x11' * 0x10).data, b'\x11' * 0x10 + bytes(0x10) + b'\xEE' * 4)
+		truncated = apply_patch_bytes(b'PATCHEOF' + (8).to_bytes(3, 'big'), self.original)
+		self.assertEqual((truncated.data, truncated.truncated_to), (self.original[:8], 8))
+
+		with self.assertRaises(PatchError):
+			apply_patch_bytes(b'PATCH\x00\x00\x10\x00\x08ab', self.original)
+
+	def test_ups_both_directions(self):
+		"""UPS output matches the target and reverses when given the target"""
+		generator = UPSPatchGenerator()
+		longer = self.modified + b'\x42' * 5
+		patch = generator.generate(self.original, longer)
+		self.assertEqual(generator.apply_patch(self.original, patch), longer)
+
+		result = apply_patch_bytes(patch, longer)
+		self.assertEqual((result.data, result.reversed), (self.original, True))
+		self.assertEqual(result.source_crc32, zlib.crc32(longer))
+
+		with self.assertRaises(ChecksumError) as caught:
+			apply_patch_bytes(patch, self.modified[:-1] + b'\x00' + b'\x42' * 5)
+		self.assertEqual(caught.exception.which, 'source')
+
+	def test_bps_actions(self):
+		"""All four BPS actions, including an overlapping TargetCopy"""
+		source = b'ABCDEFGH'
+		target = b'ABCD' + b'xy' + b'xyxyxy' + b'FGH' + b'CD'
+		body = (encode_number(3 << 2 | 0)                           # SourceRead ABCD
+				+ encode_number(1 << 2 | 1) + b'xy'                  # TargetRead xy
+				+ encode_number(5 << 2 | 3) + encode_signed(4)        # TargetCopy from 4, overlapping
+				+ encode_number(2 << 2 | 2) + encode_signed(5)        # SourceCopy FGH
+				+ encode_number(1 << 2 | 2) + encode_signed(-6))      # SourceCopy CD
+		result = apply_patch_bytes(bps_patch(source, target, body), source)
+		self.assertEqual((result.data, result.records, result.crc_match), (target, 5, True))
+
+		corrupt = bytearray(bps_patch(source, target, body))
+		corrupt[-1] ^= 0x01
+		with self.assertRaises(ChecksumError) as caught:
+			apply_patch_bytes(bytes(corrupt), source)
+		self.assertEqual(caught.exception.which, 'patch')
+		loose = apply_patch_bytes(bytes(corrupt), source, strict=False)
+		self.assertEqual([m.which for m in loose.mismatches], ['patch'])
+
+	def test_generated_bps_round_trip(self):
+		"""Patches from both BPS generators apply to the expected ROM"""
+		window = slice(0x5E00, 0x6000)
+		cases = [(self.original, self.modified, BPSPatcher.create_patch(self.original, self.modified)),
+				 (self.original[window], self.modified[window],
+				  BPSPatchGenerator().generate(self.original[window], self.modified[window]))]
+		for source, target, patch in cases:
+			self.assertEqual(apply_patch_bytes(patch, source).data, target)
+		self.assertEqual(BPSPatcher.apply_patch(cases[0][2], self.original).output_data, self.modified)
+
+	def test_file_output_and_queue(self):
+		"""Files are written through a mapping; failed jobs leave no output"""
+		patch_path = self.temp_dir / 'hack.bps'
+		patch_path.write_bytes(BPSPatcher.create_patch(self.original, self.modified))
+		output_path = self.temp_dir / 'out' / 'hack.nes'
+		self.assertTrue(PatchManager.apply_patch(str(patch_path), str(self.source_path), str(output_path)))
+		self.assertEqual(output_path.read_bytes(), self.modified)
+
+		wrong_source = self.temp_dir / 'wrong.nes'
+		wrong_source.write_bytes(self.modified)
+		jobs = [(patch_path, self.source_path, self.temp_dir / f'out{i}.nes') for i in range(3)]
+		jobs.insert(1, (patch_path, wrong_source, self.temp_dir / 'bad.nes'))
+		results = list(apply_patch_queue(jobs))
+		self.assertEqual([isinstance(r, ChecksumError) for _, r in results], [False, True, False, False])
+		self.assertFalse((self.temp_dir / 'bad.nes').exists())
+		self.assertEqual((self.temp_dir / 'out2.nes').read_bytes(), self.modified)
+		self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir() if p.suffix == '.tmp'), [])
+		self.assertEqual(apply_patch_file(patch_path, self.source_path, self.temp_dir / 'x.nes').source_crc32,
+						 zlib.crc32(self.original))
+
+
+if __name__ == '__main__':
+	unittest.main()
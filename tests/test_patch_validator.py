@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for batch patch validation (tools/patch_validator.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import zlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+import patch_validator
+from patch_engine import BPS_MAGIC, UPS_MAGIC, encode_number
+from patch_validator import validate_directory, validate_patch
+from binary_patch_tool import BPSPatcher, IPSPatcher
+from patch_generator_advanced import UPSPatchGenerator
+from test_rom_image import make_rom
+
+
+class TestPatchValidator(unittest.TestCase):
+	"""Test per-patch checks, touched regions and the pooled batch report"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.base = bytes(make_rom())
+		self.base_path = self.temp_dir / 'dw.nes'
+		self.base_path.write_bytes(self.base)
+		self.patch_dir = self.temp_dir / 'patches'
+		self.patch_dir.mkdir()
+
+		self.modified = bytearray(self.base)
+		self.modified[0x5E60:0x5E64] = b'\xA1\xA2\xA3\xA4'
+		self.modified[0x8100] = 0x77
+		self.modified = bytes(self.modified)
+		(self.patch_dir / 'monsters.ips').write_bytes(IPSPatcher.create_patch(self.base, self.modified))
+		(self.patch_dir / 'monsters.bps').write_bytes(BPSPatcher.create_patch(self.base, self.modified))
+		(self.patch_dir / 'grown.ups').write_bytes(UPSPatchGenerator().generate(self.base, self.modified + b'xx'))
+		(self.patch_dir / 'other_rom.bps').write_bytes(BPSPatcher.create_patch(self.modified, self.base))
+		(self.patch_dir / 'broken.ips').write_bytes(b'PATCH\x00\x10')
+		(self.patch_dir / 'readme.txt').write_text('not a patch')
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_validate_patch(self):
+		"""Footer CRCs, dry-run output and touched layout sections"""
+		report = validate_patch(self.patch_dir / 'monsters.bps', self.base)
+		self.assertTrue(report.valid)
+		self.assertEqual((report.format, report.source_crc32), ('bps', zlib.crc32(self.base)))
+		self.assertEqual(report.output_crc32, zlib.crc32(self.modified))
+		self.assertEqual([(run.start, run.end) for run in report.touched], [(0x5E60, 0x5E64), (0x8100, 0x8101)])
+		self.assertEqual(report.regions[0], 'Monster Data')
+
+		grown = validate_patch(self.patch_dir / 'grown.ups', self.base)
+		self.assertEqual((grown.output_size, grown.bytes_changed), (len(self.base) + 2, 7))
+
+		other = validate_patch(self.patch_dir / 'other_rom.bps', self.base)
+		self.assertFalse(other.valid)
+		self.assertIn('Source CRC mismatch', other.mismatches[0])
+		self.assertIsNotNone(validate_patch(self.patch_dir / 'broken.ips', self.base).error)
+
+	def test_oversized_headers(self):
+		"""Huge declared sizes and unexpected errors fail one patch, not the batch"""
+		footer = bytes(12)
+		(self.patch_dir / 'huge.bps').write_bytes(BPS_MAGIC + encode_number(1000) + encode_number(1 << 62)
+												  + encode_number(0) + footer)
+		(self.patch_dir / 'huge.ups').write_bytes(UPS_MAGIC + encode_number(len(self.base))
+												  + encode_number(1 << 62) + footer)
+		for name in ('huge.bps', 'huge.ups'):
+			report = validate_patch(self.patch_dir / name, self.base)
+			self.assertFalse(report.valid)
+			self.assertIn('limit', report.error)
+
+		with mock.patch.object(patch_validator, 'apply_patch_bytes', side_effect=MemoryError()):
+			report = validate_patch(self.patch_dir / 'monsters.ips', self.base)
+		self.assertEqual((report.valid, report.error), (False, 'MemoryError: '))
+
+		batch = validate_directory(self.base_path, self.patch_dir, workers=2)
+		self.assertEqual(len(batch.patches), 7)
+		self.assertEqual(len(batch.failed), 4)
+
+	def test_validate_directory(self):
+		"""Pooled and in-process runs give the same JSON report"""
+		pooled = validate_directory(self.base_path, self.patch_dir, workers=2)
+		inline = validate_directory(self.base_path, self.patch_dir, workers=1)
+		self.assertEqual([Path(r.path).name for r in pooled.failed], ['broken.ips', 'other_rom.bps'])
+		self.assertEqual(len(pooled.patches), 5)
+
+		def results(report):
+			return [{k: v for k, v in r.to_dict().items() if k != 'elapsed'} for r in report.patches]
+		self.assertEqual(results(pooled), results(inline))
+
+		saved = json.loads(pooled.save(self.temp_dir / 'report.json').read_text(encoding='utf-8'))
+		self.assertEqual((saved['valid'], saved['failed']), (3, 2))
+		self.assertEqual(saved['base_crc32'], f"{zlib.crc32(self.base):08X}")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process pipeline stage registry (tools/pipeline_stages.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from pipeline_stages import PipelineContext, StageResult, StageRegistry, STAGES
+
+
+SCRIPT = '''
+import sys
+import io
+
+if hasattr(sys.stdout, 'buffer'):
+	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+if __name__ == "__main__":
+	print("args:", " ".join(sys.argv[1:]))
+	sys.exit(0 if sys.argv[1:] == ["ok"] else 2)
+'''
+
+EXIT_SCRIPT = '''
+import sys
+
+sys.exit(eval(sys.argv[1]))
+'''
+
+
+class TestStageRegistry(unittest.TestCase):
+	"""Test stage registration and structured results"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.context = PipelineContext(project_root=self.temp_dir)
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_register_and_run(self):
+		"""Stages receive the shared context and options"""
+		registry = StageRegistry()
+
+		@registry.register('count')
+		def count(context, value=0):
+			"""Count things."""
+			return StageResult('count', True, data={'value': value})
+
+		result = registry.run('count', self.context, value=3)
+		self.assertTrue(result.success)
+		self.assertEqual(result.data['value'], 3)
+		self.assertEqual(registry.describe('count'), "Count things.")
+
+	def test_exceptions_become_failures(self):
+		"""A raising stage returns a failed result"""
+		result = STAGES.run('extract_data', self.context)
+		self.assertFalse(result.success)
+		self.assertIn("No ROM path", result.error)
+		self.assertFalse(STAGES.run('no_such_stage', self.context).success)
+
+	def test_run_script_in_process(self):
+		"""Scripts run as __main__ with captured output and exit codes"""
+		script = self.temp_dir / 'tool.py'
+		script.write_text(SCRIPT, encoding='utf-8')
+		real_stdout = sys.stdout
+
+		result = STAGES.run('run_script', self.context, script=script, args=['ok'])
+		self.assertTrue(result.success)
+		self.assertEqual(result.data['stdout'], "args: ok\n")
+		self.assertFalse(STAGES.run('run_script', self.context, script=script, args=['bad']).success)
+		self.assertIs(sys.stdout, real_stdout)
+
+	def test_exit_codes(self):
+		"""Only exit codes None and 0 count as success"""
+		script = self.temp_dir / 'exit.py'
+		script.write_text(EXIT_SCRIPT, encoding='utf-8')
+		for code, success in (('None', True), ('0', True), ('1', False), ('True', False), ('3', False),
+							  ('"failed"', False)):
+			result = STAGES.run('run_script', self.context, script=script, args=[code])
+			self.assertEqual(result.success, success, f"sys.exit({code})")
+		result = STAGES.run('run_script', self.context, script=script, args=['"failed"'])
+		self.assertIn("failed", result.data['stderr'])
+
+	def test_restore_sources_leaves_files_alone(self):
+		"""Dropping overlays never restores backups; recovery is confirmed and refuses stale backups"""
+		source_dir = self.temp_dir / 'source_files'
+		backup_dir = self.temp_dir / 'source_files_backup'
+		source_dir.mkdir()
+		backup_dir.mkdir()
+		(backup_dir / 'Bank01.asm').write_text('old\n')
+		(source_dir / 'Bank01.asm').write_text('live\n')
+		os.utime(backup_dir / 'Bank01.asm', ns=(1_000_000_000, 1_000_000_000))
+		context = PipelineContext(project_root=self.temp_dir, source_dir=source_dir)
+		context.overlay = object()
+
+		self.assertTrue(STAGES.run('restore_sources', context).success)
+		self.assertIsNone(context.overlay)
+		self.assertEqual((source_dir / 'Bank01.asm').read_text(), 'live\n')
+
+		asked = []
+		result = STAGES.run('recover_source_backups', context, confirm=lambda backups: asked.append(backups) or True)
+		self.assertFalse(result.success)
+		self.assertIn('older than the live sources', result.error)
+		self.assertEqual((asked, (source_dir / 'Bank01.asm').read_text()), ([], 'live\n'))
+
+		# A newer backup is restored only once confirmed
+		os.utime(source_dir / 'Bank01.asm', ns=(1_000_000_000, 1_000_000_000))
+		self.assertFalse(STAGES.run('recover_source_backups', context).success)
+		self.assertFalse(STAGES.run('recover_source_backups', context, confirm=lambda backups: False).success)
+		self.assertEqual((source_dir / 'Bank01.asm').read_text(), 'live\n')
+		self.assertTrue(STAGES.run('recover_source_backups', context, confirm=lambda backups: True).success)
+		self.assertEqual((source_dir / 'Bank01.asm').read_text(), 'old\n')
+
+	def test_rom_read_once(self):
+		"""Every stage sees the same ROM buffer"""
+		rom = self.temp_dir / 'rom.nes'
+		rom.write_bytes(b'NES\x1a' + bytes(12))
+		context = PipelineContext(rom_path=rom)
+		first = context.rom_data
+		rom.write_bytes(b'changed')
+		self.assertIs(context.rom_data, first)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for batched .dwdata reinsertion (tools/reinsertion_plan.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+import diff_engine
+import reinsertion_plan
+from dwpack import Section
+from extraction_engine import ExtractionEngine
+from binary_to_rom import ROMModifier
+from reinsertion_plan import apply_plan, changed_runs, count_changes, plan_reinsertion
+from test_rom_image import make_rom
+
+
+class TestReinsertionPlan(unittest.TestCase):
+	"""Test overlap checks, one-pass diffing and IPS output"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_overlapping_sections_rejected(self):
+		"""Sections writing different bytes to one range are left unapplied"""
+		sections = [
+			Section('a', 1, 0x100, bytes(0x20)),
+			Section('b', 1, 0x110, b'\x01' * 0x20),
+			Section('c', 1, 0x130, bytes(0x10)),
+			Section('d', 1, 0x138, bytes(0x10)),
+			Section('e', 1, 0x14000, bytes(0x10)),
+		]
+		plan = plan_reinsertion(sections, 0x14008)
+		self.assertEqual([(c.first, c.second, c.start, c.end) for c in plan.conflicts],
+						 [('a', 'b', 0x110, 0x120)])
+		self.assertEqual([(o.first, o.second) for o in plan.overlaps], [('c', 'd')])
+		self.assertEqual([s.name for s in plan.out_of_bounds], ['e'])
+		self.assertEqual([s.name for s in plan.sections], ['c', 'd'])
+		self.assertFalse(plan.ok)
+
+	def test_log_and_ips(self):
+		"""Per-section change counts, changed runs and the IPS patch agree"""
+		rom = make_rom()
+		original = bytes(rom)
+		monsters = bytearray(rom[0x5E5B:0x5E5B + 64])
+		monsters[3:6] = b'\xAA\xBB\xCC'
+		monsters[40] ^= 0xFF
+		chr_data = bytes(0x4000)
+
+		log = apply_plan(rom, plan_reinsertion([Section('monsters', 1, 0x5E5B, bytes(monsters)),
+												Section('graphics', 6, 0x10010, chr_data)], len(rom)))
+		self.assertEqual([(m.name, m.changes) for m in log.modifications],
+						 [('monsters', 4), ('graphics', 0x4000)])
+		self.assertEqual(log.touched_ranges(), [(0x5E5E, 0x5E61), (0x5E83, 0x5E84), (0x10010, 0x14010)])
+		self.assertEqual(log.total_changes, 4 + 0x4000)
+
+		patched = bytearray(original)
+		ips = log.to_ips()
+		self.assertTrue(ips.startswith(b'PATCH') and ips.endswith(b'EOF'))
+		offset = 5
+		while ips[offset:offset + 3] != b'EOF':
+			address = int.from_bytes(ips[offset:offset + 3], 'big')
+			size = int.from_bytes(ips[offset + 3:offset + 5], 'big')
+			patched[address:address + size] = ips[offset + 5:offset + 5 + size]
+			offset += 5 + size
+		self.assertEqual(patched, rom)
+
+	def test_pure_python_diff_matches_numpy(self):
+		"""The block-compare fallback finds the same runs without NumPy"""
+		original = make_rom()
+		modified = bytearray(original)
+		modified[255:258] = b'\x01\x02\x03'
+		modified[0x4000:0x4100] = bytes(0x100)
+		expected = changed_runs(original, modified)
+		with mock.patch.object(reinsertion_plan, 'np', None), mock.patch.object(diff_engine, 'np', None):
+			self.assertEqual(changed_runs(original, modified), expected)
+			self.assertEqual(count_changes(original, modified), sum(len(data) for _, data in expected))
+
+	def test_modifier_reinserts_in_one_pass(self):
+		"""ROMModifier applies extracted sections and writes an IPS patch"""
+		rom_path = self.temp_dir / 'dw.nes'
+		rom_path.write_bytes(make_rom())
+		binary_dir = self.temp_dir / 'binary'
+		ExtractionEngine(rom_path).extract(binary_dir)
+
+		modifier = ROMModifier(str(rom_path), str(binary_dir))
+		self.assertTrue(modifier.load_rom())
+		results = modifier.reinsert_all()
+		self.assertEqual(list(results), ['monsters.dwdata', 'spells.dwdata', 'items.dwdata', 'graphics.dwdata'])
+		self.assertTrue(all(success for success, _ in results.values()))
+		self.assertEqual(modifier.modification_log.total_changes, 0)
+		self.assertTrue(modifier.write_ips(str(self.temp_dir / 'out.ips')))
+		self.assertEqual((self.temp_dir / 'out.ips').read_bytes(), b'PATCHEOF')
+
+
+if __name__ == '__main__':
+	unittest.main()
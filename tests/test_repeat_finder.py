@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the suffix-array repeat finder (tools/repeat_finder.py) and
+ROMSpaceAnalyzer.find_repeated_sequences.
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import random
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+import repeat_finder
+from analyze_rom_space import ROMSpaceAnalyzer
+from repeat_finder import find_repeats, lcp_array, suffix_array
+from rom_image import RomImage
+from test_rom_image import make_rom
+
+
+def brute_repeats(data: bytes, min_length: int, min_occurrences: int) -> dict:
+	"""Maximal repeats by enumerating every substring."""
+	offsets = {}
+	for start in range(len(data)):
+		for end in range(start + min_length, len(data) + 1):
+			offsets.setdefault(data[start:end], []).append(start)
+	repeats = {}
+	for sequence, found in offsets.items():
+		if len(found) < min_occurrences or len(set(sequence)) == 1:
+			continue
+		after = {data[o + len(sequence)] if o + len(sequence) < len(data) else None for o in found}
+		before = {data[o - 1] if o else None for o in found}
+		if (len(after) > 1 or None in after) and (len(before) > 1 or None in before):
+			repeats[sequence] = found
+	return repeats
+
+
+class TestRepeatFinder(unittest.TestCase):
+	"""Test the suffix/LCP arrays, maximal repeats and span restriction"""
+
+	def test_against_brute_force(self):
+		"""Suffix array, LCP array and maximal repeats match a naive scan"""
+		rng = random.Random(7)
+		for _ in range(40):
+			data = bytes(rng.choice(b'abc') for _ in range(rng.randint(2, 40)))
+			text = list(data)
+			expected = sorted(range(len(text)), key=lambda i: text[i:])
+			self.assertEqual(suffix_array(text), expected)
+			with mock.patch.object(repeat_finder, 'np', None):
+				self.assertEqual(suffix_array(text), expected)
+
+			lcp = lcp_array(text, expected)
+			for index in range(1, len(text)):
+				a, b = data[expected[index - 1]:], data[expected[index]:]
+				common = next((k for k in range(min(len(a), len(b))) if a[k] != b[k]), min(len(a), len(b)))
+				self.assertEqual(lcp[index], common)
+
+			found = {repeat.sequence: repeat.offsets for repeat in find_repeats(data, None, 2, 2, limit=None)}
+			self.assertEqual(found, brute_repeats(data, 2, 2))
+
+	def test_rom_spans(self):
+		"""Savings ranking, region and bank restriction on a ROM image"""
+		rng = random.Random(3)
+		rom = make_rom()
+		rom[0x10:] = bytes(rng.getrandbits(8) for _ in range(len(rom) - 0x10))
+		pattern = b'\x10\x20\x30\x40\x50\x60'
+		for offset in (0x0100, 0x4200, 0x4800, 0x9000):
+			rom[offset:offset + len(pattern)] = pattern
+		rom[0x5000:0x5040] = b'\xff' * 0x40
+
+		analyzer = ROMSpaceAnalyzer(RomImage.from_bytes(bytes(rom), 'test.nes'))
+		with mock.patch('builtins.print'):
+			self.assertTrue(analyzer.load_rom())
+		repeated = analyzer.find_repeated_sequences()
+		self.assertEqual(repeated[0], (pattern, 4, [0x0100, 0x4200, 0x4800, 0x9000]))
+		# Padding runs are left to find_unused_regions
+		self.assertFalse(any(len(set(sequence)) == 1 for sequence, _, _ in repeated))
+
+		# PRG bank 1 holds two of the four copies
+		self.assertEqual(analyzer.find_repeated_sequences(banks=[1]), [])
+		self.assertEqual(analyzer.find_repeated_sequences(min_occurrences=2, banks=[1])[0], (pattern, 2, [0x4200, 0x4800]))
+		# Repeats never run across the end of one span into the next
+		spans = [(0x41FD, 0x4203), (0x4803, 0x4809), (0x9000, 0x9006)]
+		self.assertEqual(find_repeats(bytes(rom), spans, 4, 2), [])
+		self.assertEqual([r.offsets for r in find_repeats(bytes(rom), spans, 3, 2)], [[0x4200, 0x9000], [0x4803, 0x9003]])
+		with self.assertRaises(ValueError):
+			analyzer.find_repeated_sequences(regions=['nowhere'])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite ROM corpus index (tools/rom_corpus.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+import rom_corpus
+from rom_corpus import CorpusIndex, REVISION_SIGNATURES, detect_revision
+from extract_to_binary import MONSTER_OFFSET
+from test_rom_image import make_rom
+
+
+DRAGONLORD = 38
+
+
+def make_revision(revision: str, dragonlord_hp: int = 100) -> bytearray:
+	rom = make_rom()
+	for offset, value in REVISION_SIGNATURES[revision].items():
+		rom[offset] = value
+	rom[MONSTER_OFFSET + DRAGONLORD * 16 + 2] = dragonlord_hp
+	return rom
+
+
+class TestRomCorpus(unittest.TestCase):
+	"""Test indexing, incremental re-runs and catalog queries"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.library = self.temp_dir / 'library'
+		(self.library / 'hacks' / 'hard').mkdir(parents=True)
+		(self.library / 'PRG0.nes').write_bytes(make_revision('PRG0'))
+		(self.library / 'PRG1.nes').write_bytes(make_revision('PRG1'))
+		(self.library / 'hacks' / 'hard' / 'tough.nes').write_bytes(make_revision('PRG1', 230))
+		(self.library / 'hacks' / 'copy.nes').write_bytes(make_revision('PRG1'))
+		(self.library / 'hacks' / 'notes.txt').write_text('not a ROM')
+		self.index = CorpusIndex(self.temp_dir / 'corpus.sqlite3')
+
+	def tearDown(self):
+		self.index.close()
+		shutil.rmtree(self.temp_dir)
+
+	def test_index_and_query(self):
+		"""Header, revision and decoded tables are queryable per file"""
+		result = self.index.update(self.library, workers=1)
+		self.assertEqual((result.scanned, result.analyzed, result.errors), (4, 3, {}))
+		self.assertEqual(detect_revision(bytes(make_revision('PRG0'))), 'PRG0')
+
+		strong = self.index.find_monsters('Dragonlord%', min_hp=200)
+		self.assertEqual([Path(row['path']).name for row in strong], ['tough.nes'])
+		self.assertEqual(strong[0]['revision'], 'PRG1')
+
+		stats = self.index.stats()
+		self.assertEqual((stats['files'], stats['roms']), (4, 3))
+		self.assertEqual(stats['revisions'], {'PRG0': 1, 'PRG1': 2})
+
+		rows = self.index.query("SELECT DISTINCT mapper, prg_banks, chr_banks FROM roms")
+		self.assertEqual(rows, [{'mapper': 0, 'prg_banks': 4, 'chr_banks': 2}])
+		self.assertEqual(len(self.index.query("SELECT * FROM spells WHERE name = 'HEAL'")), 3)
+
+		bank1 = self.index.query("SELECT sha1 FROM regions WHERE name = 'prg_bank_1' LIMIT 1")[0]['sha1']
+		self.assertEqual(len(self.index.files_with_region('prg_bank_1', bank1)), 3)
+
+	def test_incremental_update(self):
+		"""Unchanged files are not re-read; removed files are pruned"""
+		self.index.update(self.library, workers=1)
+
+		with mock.patch.object(rom_corpus, 'analyze_rom_file') as analyze, \
+				mock.patch.object(rom_corpus, '_sha1_file') as sha1:
+			result = self.index.update(self.library, workers=1)
+			analyze.assert_not_called()
+			sha1.assert_not_called()
+		self.assertEqual(result.unchanged, 4)
+
+		# A renamed copy of known content is hashed but not analyzed again
+		(self.library / 'hacks' / 'copy.nes').rename(self.library / 'hacks' / 'renamed.nes')
+		(self.library / 'hacks' / 'hard' / 'tough.nes').unlink()
+		with mock.patch.object(rom_corpus, 'analyze_rom_file') as analyze:
+			result = self.index.update(self.library, workers=1)
+			analyze.assert_not_called()
+		self.assertEqual((result.hashed, result.removed), (1, 2))
+		self.assertEqual(self.index.find_monsters('Dragonlord%', min_hp=200), [])
+		self.assertEqual(self.index.stats()['roms'], 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
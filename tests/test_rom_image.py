@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared memory-mapped ROM image (tools/rom_image.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import weakref
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from rom_image import (DW_ROM_SIZE, PRG_BANK_SIZE, RomImage, RomImageError,
+					   cached_images, clear_rom_cache, load_rom_image, write_rom_file)
+from extract_to_binary import ROMExtractor
+
+
+def make_rom() -> bytearray:
+	"""Dragon Warrior-shaped ROM whose PRG banks are filled with their index."""
+	rom = bytearray(DW_ROM_SIZE)
+	rom[0:6] = b'NES\x1a\x04\x02'
+	for bank in range(4):
+		start = 0x10 + bank * PRG_BANK_SIZE
+		rom[start:start + PRG_BANK_SIZE] = bytes([bank]) * PRG_BANK_SIZE
+	rom[0x10010:] = b'\xcc' * 0x4000
+	return rom
+
+
+class TestRomImage(unittest.TestCase):
+	"""Test bank views, address translation and the process cache"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.rom_path = self.temp_dir / 'dw.nes'
+		self.rom_path.write_bytes(make_rom())
+		clear_rom_cache()
+
+	def tearDown(self):
+		clear_rom_cache()
+		shutil.rmtree(self.temp_dir)
+
+	def test_bank_views(self):
+		"""Banks and CHR are zero-copy views with CPU address translation"""
+		rom = load_rom_image(self.rom_path)
+		self.assertEqual(rom.prg_bank_count, 4)
+		self.assertEqual(len(rom.chr), 0x4000)
+		self.assertEqual(rom.cpu_to_offset(0x9E4B, bank=1), 0x5E5B)
+		self.assertEqual(rom.cpu_to_offset(0xC000), 0xC010)
+		self.assertEqual(rom.offset_to_cpu(0x5E5B), (1, 0x9E4B))
+		self.assertEqual(bytes(rom.read_cpu(0xBFFE, 2, bank=2)), b'\x02\x02')
+		self.assertEqual(rom.prg_bank(3).data[0], 3)
+		self.assertIsInstance(rom[0x10:0x20], memoryview)
+
+		with self.assertRaises(RomImageError):
+			rom.read_cpu(0xBFFF, 2, bank=2)
+		with self.assertRaises(RomImageError):
+			rom.prg_bank(4)
+
+	def test_cache_reuses_until_file_changes(self):
+		"""The same mapping is shared until the file's mtime/size change"""
+		first = load_rom_image(self.rom_path)
+		self.assertIs(load_rom_image(str(self.rom_path)), first)
+
+		uncached = RomImage.open(self.rom_path)
+		patched = make_rom()
+		patched[0x10] = 0x7F
+		write_rom_file(self.rom_path, patched)
+		os.utime(self.rom_path, ns=(first.mtime_ns + 1_000_000, first.mtime_ns + 1_000_000))
+
+		second = load_rom_image(self.rom_path)
+		self.assertIsNot(second, first)
+		self.assertEqual(second[0x10], 0x7F)
+		# Images handed out before the write keep the old contents
+		self.assertFalse(first.closed)
+		self.assertEqual(first[0x10], 0)
+		self.assertEqual(uncached[0x10], 0)
+		uncached.close()
+
+	def test_held_image_survives_write(self):
+		"""The cache lets go of a rewritten file without closing images callers still hold"""
+		image = load_rom_image(self.rom_path)
+		bank = image.prg_bank(2).data
+		replace = os.replace
+
+		def check_uncached(source, target):
+			self.assertNotIn(self.rom_path.resolve(), cached_images())
+			replace(source, target)
+
+		patched = make_rom()
+		patched[0x10] = 0x7F
+		with mock.patch('os.replace', side_effect=check_uncached):
+			write_rom_file(self.rom_path, patched)
+
+		self.assertFalse(image.closed)
+		self.assertEqual((image[0x10], bank[0]), (0, 2))
+		self.assertEqual(bytes(image.read(0x10, 2)), b'\x00\x00')
+		self.assertEqual(load_rom_image(self.rom_path)[0x10], 0x7F)
+
+		# An image nobody else holds is unmapped as soon as the cache drops it
+		cached = weakref.ref(load_rom_image(self.rom_path))
+		write_rom_file(self.rom_path, make_rom())
+		self.assertIsNone(cached())
+
+	def test_extractor_accepts_image(self):
+		"""Extractors take a RomImage in place of a path"""
+		image = RomImage.from_bytes(make_rom(), self.rom_path)
+		extractor = ROMExtractor(image)
+		self.assertTrue(extractor.load_rom())
+		self.assertIs(extractor.rom_data, image.data)
+		self.assertTrue(extractor.extract_equipment_bonuses(str(self.temp_dir / 'out' / 'equipment.dwdata')))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for per-region ROM checksum manifests (tools/rom_manifest.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import zlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from rom_image import clear_rom_cache, write_rom_file
+from rom_manifest import RegionDigest, RomManifest, compare_manifests
+from test_rom_image import make_rom
+
+
+class TestRomManifest(unittest.TestCase):
+	"""Test region hashing, incremental updates and saved manifests"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.rom_path = self.temp_dir / 'dw.nes'
+		self.rom_path.write_bytes(make_rom())
+		clear_rom_cache()
+
+	def tearDown(self):
+		clear_rom_cache()
+		shutil.rmtree(self.temp_dir)
+
+	def test_regions(self):
+		"""Header, PRG banks, CHR halves and data regions are covered"""
+		manifest = RomManifest.build(self.rom_path)
+		for name in ('file', 'header', 'prg_bank_0', 'prg_bank_3', 'chr_0', 'chr_3', 'monsters', 'graphics'):
+			self.assertIn(name, manifest.regions)
+		self.assertEqual(manifest.digest('prg_bank_1').offset, 0x4010)
+		self.assertEqual(manifest.digest('chr_1').offset, 0x11010)
+		self.assertEqual(manifest.digest('file').crc32, format(zlib.crc32(make_rom()), '08x'))
+
+	def test_update_rehashes_only_touched_regions(self):
+		"""A change inside bank 1 rehashes only the regions containing it"""
+		manifest = RomManifest.build(self.rom_path)
+		patched = make_rom()
+		patched[0x5E60] = 0x55
+
+		with mock.patch.object(RegionDigest, 'compute', wraps=RegionDigest.compute) as compute:
+			updated = manifest.updated(bytes(patched), [(0x5E60, 0x5E61)])
+		rehashed = sorted(call.args[0] for call in compute.call_args_list)
+		self.assertEqual(rehashed, ['monsters', 'prg_bank_1', 'world_map'])
+		# The whole-file aggregates are left for later, so the small change hashes far less than the ROM
+		hashed = sum(len(call.args[1]) for call in compute.call_args_list)
+		self.assertEqual(hashed, sum(manifest.regions[name].size for name in rehashed))
+		self.assertLess(hashed * 2, len(patched))
+		self.assertEqual(sorted(updated.pending), ['file', 'prg'])
+
+		self.assertEqual([m.name for m in compare_manifests(manifest, updated)],
+						 ['prg_bank_1', 'monsters', 'world_map'])
+		self.assertEqual([m.name for m in manifest.verify(bytes(patched), touched=[(0x5E60, 0x5E61)])],
+						 ['prg_bank_1', 'monsters', 'world_map'])
+
+		# Pending aggregates are hashed on request, and survive a save/load round trip
+		full = RomManifest.build(bytes(patched))
+		self.assertEqual(updated.digest('file'), full.digest('file'))
+		self.assertEqual(updated.pending, {'prg': (0x10, 0x10000)})
+		self.assertEqual(RomManifest.from_dict(updated.to_dict()).pending, updated.pending)
+		self.assertEqual(updated.digest('prg'), full.digest('prg'))
+		self.assertEqual(updated.regions, {name: full.regions[name] for name in updated.regions})
+		self.assertEqual(len(updated.regions), len(full.regions))
+
+	def test_saved_manifest_reused_until_file_changes(self):
+		"""load_or_build() reuses the sidecar while mtime and size match"""
+		first = RomManifest.load_or_build(self.rom_path)
+		self.assertTrue(RomManifest.path_for(self.rom_path).exists())
+		with mock.patch.object(RomManifest, 'build') as build:
+			self.assertEqual(RomManifest.load_or_build(self.rom_path).regions, first.regions)
+			build.assert_not_called()
+
+		patched = make_rom()
+		patched[0x10010] = 0x01
+		write_rom_file(self.rom_path, patched)
+		os.utime(self.rom_path, ns=(first.mtime_ns + 1_000_000, first.mtime_ns + 1_000_000))
+		self.assertEqual([m.name for m in first.verify(self.rom_path)], ['file', 'chr', 'chr_0', 'graphics'])
+
+	def test_saved_pending_manifest(self):
+		"""A saved incremental manifest hashes its pending aggregates from the file on request"""
+		manifest = RomManifest.load_or_build(self.rom_path)
+		patched = make_rom()
+		patched[0x10010] = 0x02
+		write_rom_file(self.rom_path, patched)
+		clear_rom_cache()
+		updated = manifest.updated(self.rom_path, [(0x10010, 0x10011)])
+		updated.save(RomManifest.path_for(self.rom_path))
+
+		loaded = RomManifest.load_current(self.rom_path)
+		self.assertEqual(sorted(loaded.pending), ['chr', 'file'])
+		self.assertEqual(loaded.digest('file').crc32, format(zlib.crc32(patched), '08x'))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for N-way ROM comparison (tools/rom_variants.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from rom_variants import OTHER_REGION, compare_variants
+from test_rom_image import make_rom
+
+
+class TestRomVariants(unittest.TestCase):
+	"""Test the change matrix, pair detection and pooled runs"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.base = bytes(make_rom())
+		self.base_path = self.temp_dir / 'dw.nes'
+		self.base_path.write_bytes(self.base)
+		self.hacks = self.temp_dir / 'hacks'
+		self.hacks.mkdir()
+
+		def hack(name: str, edits: dict, tail: bytes = b''):
+			rom = bytearray(self.base)
+			for offset, data in edits.items():
+				rom[offset:offset + len(data)] = data
+			(self.hacks / name).write_bytes(bytes(rom) + tail)
+
+		hack('hard.nes', {0x5E60: b'\xA0\xA1\xA2\xA3'})
+		hack('harder.nes', {0x5E62: b'\xA2\xA3\xB4\xB5'})
+		hack('text.nes', {0x8100: b'\xEE' * 8})
+		hack('grown.nes', {0x8104: b'\xEE\xEE'}, tail=b'\x00\x07')
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def test_matrix_and_pairs(self):
+		"""Region counts per variant and shared/conflicting bytes per pair"""
+		report = compare_variants(self.base_path, [self.hacks], workers=1)
+		self.assertEqual([v.name for v in report.variants], ['grown.nes', 'hard.nes', 'harder.nes', 'text.nes'])
+
+		matrix = dict(zip(report.regions, report.matrix()))
+		self.assertEqual(matrix['Monster Data'], [0, 4, 4, 0])
+		self.assertEqual(matrix['Dialog Text'], [2, 0, 0, 8])
+		self.assertEqual(matrix[OTHER_REGION], [1, 0, 0, 0])
+
+		pairs = {(p.first, p.second): p for p in report.pairs}
+		self.assertEqual(set(pairs), {('hard.nes', 'harder.nes'), ('grown.nes', 'text.nes')})
+		monsters = pairs['hard.nes', 'harder.nes']
+		self.assertEqual((monsters.shared_bytes, monsters.conflicting_bytes), (2, 0))
+		self.assertEqual(monsters.similarity, round(2 / 6, 4))
+		self.assertTrue(monsters.compatible)
+		self.assertEqual(pairs['grown.nes', 'text.nes'].conflicting_bytes, 0)
+
+		# harder.nes writing different values where hard.nes did is a conflict
+		(self.hacks / 'harder.nes').write_bytes(self.base[:0x5E62] + b'\xC2\xA3' + self.base[0x5E64:])
+		report = compare_variants(self.base_path, [self.hacks], workers=1)
+		conflict = [p for p in report.pairs if p.first == 'hard.nes'][0]
+		self.assertEqual((conflict.conflicting_bytes, conflict.conflicts), (1, [(0x5E62, 0x5E63)]))
+		self.assertIn('Monster Data', conflict.conflict_regions)
+
+	def test_pool_and_outputs(self):
+		"""Pooled and in-process runs agree; JSON and CSV reports are written"""
+		pooled = compare_variants(self.base_path, [self.hacks], workers=2)
+		inline = compare_variants(self.base_path, [self.hacks], workers=1)
+		self.assertEqual(pooled.matrix(), inline.matrix())
+		self.assertEqual(pooled.pairs, inline.pairs)
+
+		saved = json.loads(pooled.save(self.temp_dir / 'variants.json').read_text(encoding='utf-8'))
+		self.assertEqual(saved['matrix']['variants'], [v.name for v in pooled.variants])
+		self.assertEqual(len(saved['pairs']), 2)
+		self.assertTrue(pooled.matrix_csv().startswith('Region,grown.nes,hard.nes'))
+		self.assertEqual(len(pooled.pairs_csv().splitlines()), 3)
+
+	def test_same_names_in_subfolders(self):
+		"""Same-named hacks in different folders get distinct names in the matrix and pairs"""
+		for folder, value in (('alpha', b'\xA0'), ('beta', b'\xB0')):
+			(self.hacks / folder).mkdir()
+			(self.hacks / folder / 'hard.nes').write_bytes(self.base[:0x5E60] + value + self.base[0x5E61:])
+		report = compare_variants(self.base_path, [self.hacks], workers=1)
+		names = [v.name for v in report.variants]
+		self.assertEqual(names, ['alpha/hard.nes', 'beta/hard.nes', 'grown.nes', 'hard.nes', 'harder.nes', 'text.nes'])
+		self.assertEqual({v.name: v.path for v in report.variants}['beta/hard.nes'], str(self.hacks / 'beta' / 'hard.nes'))
+		self.assertIn(('alpha/hard.nes', 'beta/hard.nes'), {(p.first, p.second) for p in report.pairs})
+		self.assertTrue(report.matrix_csv().startswith('Region,alpha/hard.nes,beta/hard.nes,'))
+
+		# The same relative name under two arguments falls back to the path given
+		report = compare_variants(self.base_path, [self.hacks / 'alpha', self.hacks / 'beta'], workers=1)
+		self.assertEqual([v.name for v in report.variants],
+						 [(self.hacks / folder / 'hard.nes').as_posix() for folder in ('alpha', 'beta')])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for in-memory source overlays (tools/source_overlay.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from assembler import assemble_file
+from bank_linker import IncrementalBankBuilder
+from build_system_advanced import BuildCache
+from source_overlay import Overlay, OverlayError, SourceOverlay, lines_digest
+
+
+BANK_SOURCE = (
+	".org $8000\n"
+	"EnStatTbl:\n"
+	".byte $01, $02\n"
+	".byte $03, $04\n"
+	"EndTbl: .byte $FF\n"
+)
+
+
+class TestSourceOverlay(unittest.TestCase):
+	"""Test overlays applied through the assembler loader"""
+
+	def setUp(self):
+		self.temp_dir = Path(tempfile.mkdtemp())
+		self.source_dir = self.temp_dir / 'source'
+		self.source_dir.mkdir()
+		self.bank = self.source_dir / 'Bank01.asm'
+		self.bank.write_text(BANK_SOURCE, encoding='utf-8')
+		(self.source_dir / 'table.asm').write_text(".byte $AA, $BB, $CC\n", encoding='utf-8')
+
+	def tearDown(self):
+		shutil.rmtree(self.temp_dir)
+
+	def table_overlay(self, **kwargs) -> Overlay:
+		return Overlay('Bank01.asm', 3, 4, '.include "table.asm"', **kwargs)
+
+	def test_overlay_assembled_without_touching_disk(self):
+		"""The assembler sees the patched text; the file on disk is unchanged"""
+		original = assemble_file(self.bank)
+		overlay = SourceOverlay(self.source_dir, [self.table_overlay()])
+
+		patched = assemble_file(self.bank, loader=overlay)
+		self.assertEqual(original.data, bytes([1, 2, 3, 4, 0xFF]))
+		self.assertEqual(patched.data, bytes([0xAA, 0xBB, 0xCC, 0xFF]))
+		self.assertEqual(self.bank.read_text(encoding='utf-8'), BANK_SOURCE)
+
+		written = overlay.write_patched(self.temp_dir / 'patched')
+		self.assertIn('.include "table.asm"', written[0].read_text(encoding='utf-8'))
+
+	def test_overlapping_overlays_rejected(self):
+		"""Two overlays on the same lines of a file cannot both apply"""
+		overlay = SourceOverlay(self.source_dir, [self.table_overlay()])
+		with self.assertRaises(OverlayError):
+			overlay.add(Overlay('Bank01.asm', 4, 5, '.byte $00'))
+		overlay.add(Overlay('Bank01.asm', 5, 5, 'EndTbl: .byte $FE'))
+		self.assertEqual(len(overlay), 2)
+
+	def test_changed_source_detected(self):
+		"""An overlay recorded against other text refuses to apply"""
+		lines = BANK_SOURCE.splitlines()[2:4]
+		overlay = SourceOverlay(self.source_dir, [self.table_overlay(original_digest=lines_digest(lines))])
+		assemble_file(self.bank, loader=overlay)
+
+		self.bank.write_text(BANK_SOURCE.replace('$03', '$09'), encoding='utf-8')
+		with self.assertRaises(OverlayError):
+			assemble_file(self.bank, loader=overlay)
+
+	def test_overlay_changes_bank_object_key(self):
+		"""Cached bank objects built with and without overlays are kept apart"""
+		cache = BuildCache(self.temp_dir / 'cache')
+		plain = IncrementalBankBuilder(self.source_dir, cache)
+		overlay = SourceOverlay(self.source_dir, [self.table_overlay()])
+		overlaid = IncrementalBankBuilder(self.source_dir, cache, loader=overlay)
+		self.assertNotEqual(plain.object_key('Bank01.asm'), overlaid.object_key('Bank01.asm'))
+		self.assertEqual(overlaid.object_key('Bank01.asm'),
+						 IncrementalBankBuilder(self.source_dir, cache, loader=overlay).object_key('Bank01.asm'))
+
+
+if __name__ == '__main__':
+	unittest.main()
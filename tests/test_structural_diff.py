@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-aware structural diff (tools/structural_diff.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from extract_to_binary import ITEM_COST_OFFSET, MONSTER_OFFSET, WEAPONS_BONUS_OFFSET
+from extraction_engine import TEXT_OFFSET, WORLD_MAP_OFFSET
+from structural_diff import SCHEMA, StructuralDiff, load_schema
+from test_rom_image import make_rom
+
+
+class TestStructuralDiff(unittest.TestCase):
+	"""Test field-level changes, sequence alignment and schema compilation"""
+
+	def setUp(self):
+		self.original = bytes(make_rom())
+		rom = bytearray(self.original)
+		rom[MONSTER_OFFSET + 24 * 16 + 2] = 120
+		rom[ITEM_COST_OFFSET + 4:ITEM_COST_OFFSET + 6] = (500).to_bytes(2, 'little')
+		rom[WEAPONS_BONUS_OFFSET + 7] = 99
+		rom[WORLD_MAP_OFFSET] = 0x23
+		self.modified = bytes(rom)
+
+	def test_field_changes(self):
+		"""Record, world map and dialog tables report decoded changes"""
+		changes = StructuralDiff().compare(self.original, self.modified)
+		labels = [str(change) for change in changes if change.table != 'world_map']
+		self.assertEqual(labels, ['Golem.hp 1 -> 120', 'Copper Sword.price 0 -> 500', "Erdrick's Sword.attack 0 -> 99"])
+
+		rows = [change for change in changes if change.table == 'world_map']
+		self.assertTrue(rows)
+		self.assertEqual(rows[0].record, 'world_map.row[0]')
+		self.assertTrue(rows[0].field.startswith('x0'))
+		self.assertEqual(StructuralDiff().summary(changes)['monsters'], 1)
+		self.assertEqual(StructuralDiff().compare(self.original, self.original), [])
+
+		# Only the requested tables are decoded
+		only = StructuralDiff(tables=['items']).compare(self.original, self.modified)
+		self.assertEqual([change.to_dict() for change in only],
+						 [{'table': 'items', 'record': 'Copper Sword', 'field': 'price', 'old': 0, 'new': 500}])
+
+		# A new dialog block is one insertion, not a change to every later block
+		rom = bytearray(self.original)
+		rom[TEXT_OFFSET + 0x100:TEXT_OFFSET + 0x104] = bytes([0x24, 0x25, 0x26, 0xFC])
+		dialogs = StructuralDiff(tables=['dialogs']).compare(self.original, bytes(rom))
+		self.assertTrue(dialogs)
+		self.assertLessEqual(len(dialogs), 3)
+		self.assertTrue(all(change.field == 'text' for change in dialogs))
+
+	def test_schema(self):
+		"""Schemas compile once and load from dicts or JSON files"""
+		self.assertIs(load_schema(), load_schema(SCHEMA))
+		monsters = load_schema()[0]
+		self.assertEqual(monsters.record.size, 16)
+		self.assertEqual(monsters.fields[:3], ('strength', 'defense', 'hp'))
+
+		temp_dir = Path(tempfile.mkdtemp())
+		try:
+			path = temp_dir / 'schema.json'
+			custom = {'golem': {'region': 'monsters', 'record_size': 16, 'fields': [['hp', 2, 'u8']]}}
+			path.write_text(json.dumps(custom), encoding='utf-8')
+			changes = StructuralDiff(path).compare(self.original, self.modified)
+			self.assertEqual([str(change) for change in changes], ['golem[24].hp 1 -> 120'])
+		finally:
+			shutil.rmtree(temp_dir)
+
+		for bad in ({'t': {'region': 'nowhere', 'record_size': 1, 'fields': []}},
+					{'t': {'region': 'monsters', 'record_size': 1, 'fields': [['hp', 0, 'u16']]}},
+					{'t': {'region': 'monsters', 'record_size': 4, 'fields': [['a', 0, 'u16'], ['b', 1, 'u8']]}}):
+			with self.assertRaises(ValueError):
+				load_schema(bad)
+
+
+if __name__ == '__main__':
+	unittest.main()
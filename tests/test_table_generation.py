@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for write-if-changed table generation (tools/table_generation.py).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add tools to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tools'))
+
+from table_generation import GenerationManifest, generate_file, write_if_changed
+
+
+class TestTableGeneration(unittest.TestCase):
+	"""Test rendering skips and unchanged-output writes"""
+
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.generator = self.root / 'tools' / 'generate_test_table.py'
+		self.generator.parent.mkdir()
+		self.generator.write_text('# generator\n', encoding='utf-8')
+		self.json_path = self.root / 'assets' / 'json' / 'items.json'
+		self.json_path.parent.mkdir(parents=True)
+		self.json_path.write_text('[1, 2]', encoding='utf-8')
+		self.output = self.root / 'source_files' / 'generated' / 'items.asm'
+		self.renders = 0
+
+	def tearDown(self):
+		shutil.rmtree(self.root)
+
+	def render(self) -> str:
+		self.renders += 1
+		return f".byte {self.json_path.read_text(encoding='utf-8').strip('[]')}\n"
+
+	def generate(self, **options):
+		return generate_file(self.output, [self.json_path], self.render, generator=self.generator, **options)
+
+	def test_write_if_changed_keeps_mtime(self):
+		"""Identical content is not rewritten"""
+		self.assertTrue(write_if_changed(self.output, "ItemTbl:\n"))
+		os.utime(self.output, ns=(1_000_000_000, 1_000_000_000))
+		self.assertFalse(write_if_changed(self.output, "ItemTbl:\n"))
+		self.assertEqual(self.output.stat().st_mtime_ns, 1_000_000_000)
+		self.assertTrue(write_if_changed(self.output, "ItemTbl: .byte 1\n"))
+
+	def test_unchanged_inputs_skip_rendering(self):
+		"""Rendering only happens when inputs, options or the output change"""
+		self.assertEqual(self.generate().status, 'written')
+		self.assertEqual(self.generate().status, 'up-to-date')
+		self.assertEqual(self.renders, 1)
+
+		# Touching the JSON without changing it still skips the write
+		os.utime(self.json_path, ns=(2_000_000_000, 2_000_000_000))
+		self.assertEqual(self.generate().status, 'up-to-date')
+
+		self.assertEqual(self.generate(options={'comments': False}).status, 'unchanged')
+		self.assertEqual(self.renders, 2)
+
+		self.json_path.write_text('[3]', encoding='utf-8')
+		self.assertEqual(self.generate(options={'comments': False}).status, 'written')
+		self.assertEqual(self.output.read_text(encoding='utf-8'), ".byte 3\n")
+
+		# Hand edits to the output are overwritten on the next run
+		self.output.write_text("edited\n", encoding='utf-8')
+		self.assertEqual(self.generate(options={'comments': False}).status, 'written')
+
+	def test_generator_current(self):
+		"""The manifest tells callers when a generator need not run at all"""
+		manifest = GenerationManifest(self.root)
+		self.assertFalse(manifest.generator_current(self.generator))
+
+		self.generate()
+		manifest = GenerationManifest(self.root)
+		self.assertTrue(manifest.generator_current(self.generator))
+
+		self.generator.write_text('# generator v2\n', encoding='utf-8')
+		self.assertFalse(manifest.generator_current(self.generator))
+
+		manifest.forget(self.generator)
+		self.assertEqual(GenerationManifest(self.root).outputs_of(self.generator), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -8,13 +8,18 @@ Features:
 - Identify unused byte sequences (0x00 or 0xff padding)
 - Find sparse data regions
 - Detect compressible patterns (RLE candidates)
+- Find maximal repeated sequences with a suffix array (repeat_finder),
+  optionally within named regions or PRG banks
 - Calculate potential space savings
+- Run real compression trials per region (compression_lab)
 - Generate comprehensive space usage report
 
 Usage:
 	python tools/analyze_rom_space.py
 	python tools/analyze_rom_space.py --rom custom_rom.nes
 	python tools/analyze_rom_space.py --detailed
+	python tools/analyze_rom_space.py --detailed --repeat-bank 0 --repeat-bank 1
+	python tools/analyze_rom_space.py --compression-trials
 	python tools/analyze_rom_space.py --export-report
 
 Author: Dragon Warrior ROM Hacking Toolkit
@@ -26,18 +31,23 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported by other tools.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
 from pathlib import Path
-from typing import List, Tuple, Dict, Set
+from typing import List, Optional, Sequence, Tuple, Dict, Set, Union
 from collections import Counter, defaultdict
 import argparse
 import json
 
+from rom_image import DW_ROM_SIZE, RomImage, open_rom
+from repeat_finder import find_repeats
+from compression_lab import TrialReport, default_regions, run_trials
+
 # Default ROM path
 DEFAULT_ROM = "roms/Dragon Warrior (U) (PRG1) [!].nes"
 
@@ -57,31 +67,32 @@ ROM_REGIONS = {
 class ROMSpaceAnalyzer:
 	"""Analyze ROM space usage and optimization opportunities"""
 
-	def __init__(self, rom_path: str):
+	def __init__(self, rom_path: Union[str, RomImage]):
 		"""
 		Initialize analyzer with ROM file
 
 		Args:
-			rom_path: Path to Dragon Warrior ROM
+			rom_path: Path to Dragon Warrior ROM, or a loaded RomImage
 		"""
-		self.rom_path = rom_path
+		self.rom = rom_path if isinstance(rom_path, RomImage) else None
+		self.rom_path = str(self.rom.path) if self.rom else rom_path
 		self.rom_data = None
 		self.rom_size = 0
 
 	def load_rom(self) -> bool:
 		"""Load and validate ROM file"""
-		if not os.path.exists(self.rom_path):
-			print(f"❌ ROM file not found: {self.rom_path}")
-			return False
-
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		if self.rom is None:
+			if not os.path.exists(self.rom_path):
+				print(f"❌ ROM file not found: {self.rom_path}")
+				return False
+			self.rom = open_rom(self.rom_path)
 
+		self.rom_data = self.rom.data
 		self.rom_size = len(self.rom_data)
 
 		# Validate ROM
-		if self.rom_size != 81936:
-			print(f"⚠ Warning: ROM size is {self.rom_size} bytes (expected 81936)")
+		if self.rom_size != DW_ROM_SIZE:
+			print(f"⚠ Warning: ROM size is {self.rom_size} bytes (expected {DW_ROM_SIZE})")
 
 		if self.rom_data[0:4] != b'NES\x1A':
 			print(f"❌ Invalid NES header")
@@ -134,38 +145,51 @@ class ROMSpaceAnalyzer:
 		"""
 		return Counter(self.rom_data)
 
-	def find_repeated_sequences(self, min_length: int = 4, min_occurrences: int = 3) -> List[Tuple[bytes, int, List[int]]]:
+	def repeat_spans(self, regions: Optional[Sequence[str]] = None,
+					 banks: Optional[Sequence[int]] = None) -> Optional[List[Tuple[int, int]]]:
+		"""
+		File spans for a repeated-sequence search
+
+		Args:
+			regions: Names from ROM_REGIONS
+			banks: PRG bank indices
+
+		Returns:
+			List of (start, end) offsets, or None for the whole ROM
+		"""
+		if not regions and not banks:
+			return None
+		spans = []
+		for name in regions or ():
+			if name not in ROM_REGIONS:
+				raise ValueError(f"Unknown region: {name} (choose from {', '.join(ROM_REGIONS)})")
+			spans.append(ROM_REGIONS[name][:2])
+		for index in banks or ():
+			bank = self.rom.prg_bank(index)
+			spans.append((bank.offset, bank.offset + len(bank.data)))
+		return spans
+
+	def find_repeated_sequences(self, min_length: int = 4, min_occurrences: int = 3,
+								regions: Optional[Sequence[str]] = None,
+								banks: Optional[Sequence[int]] = None) -> List[Tuple[bytes, int, List[int]]]:
 		"""
 		Find repeated byte sequences (potential compression candidates)
 
+		Only maximal repeats are reported (a sequence that always occurs
+		inside a longer repeated one is covered by the longer one).
+
 		Args:
 			min_length: Minimum sequence length
 			min_occurrences: Minimum number of occurrences
+			regions: Only search these ROM_REGIONS
+			banks: Only search these PRG banks
 
 		Returns:
 			List of (sequence, count, [offsets]) tuples
 		"""
-		sequences = defaultdict(list)
-
-		# Scan for sequences
-		for length in range(min_length, min(33, self.rom_size // 100)):  # Up to 32 bytes
-			for i in range(self.rom_size - length + 1):
-				seq = bytes(self.rom_data[i:i+length])
-
-				# Skip sequences of all same byte (already found by unused_regions)
-				if len(set(seq)) > 1:
-					sequences[seq].append(i)
-
-		# Filter by minimum occurrences
-		repeated = []
-		for seq, offsets in sequences.items():
-			if len(offsets) >= min_occurrences:
-				repeated.append((seq, len(offsets), offsets[:10]))  # Limit offset list
-
-		# Sort by potential savings (length × occurrences)
-		repeated.sort(key=lambda x: len(x[0]) * x[1], reverse=True)
-
-		return repeated[:50]  # Top 50 patterns
+		# Sorted by potential savings (length × occurrences), top 50 patterns
+		repeats = find_repeats(self.rom_data, self.repeat_spans(regions, banks), min_length, min_occurrences, limit=50)
+		return [(repeat.sequence, repeat.count, repeat.offsets[:10]) for repeat in repeats]  # Limit offset list
 
 	def estimate_rle_compression(self, data: bytes) -> Tuple[int, float, int]:
 		"""
@@ -230,6 +254,20 @@ class ROMSpaceAnalyzer:
 
 		return results
 
+	def run_compression_trials(self, workers: Optional[int] = None) -> TrialReport:
+		"""
+		Encode, decode and verify every ROM region with every compression_lab codec
+
+		Args:
+			workers: Worker processes (default: CPU count)
+
+		Returns:
+			TrialReport with exact sizes and decoder cycle estimates
+		"""
+		# The pool maps the ROM file itself; an in-memory image runs in-process
+		rom = self.rom_path if self.rom_path and os.path.exists(self.rom_path) else self.rom
+		return run_trials(rom, default_regions(), workers=workers)
+
 	def find_duplicate_tiles(self) -> List[Tuple[int, List[int]]]:
 		"""
 		Find duplicate CHR tiles in graphics data
@@ -290,12 +328,16 @@ class ROMSpaceAnalyzer:
 
 		return entropy
 
-	def generate_report(self, detailed: bool = False) -> Dict:
+	def generate_report(self, detailed: bool = False, repeat_regions: Optional[Sequence[str]] = None,
+						repeat_banks: Optional[Sequence[int]] = None, compression_trials: bool = False) -> Dict:
 		"""
 		Generate comprehensive space analysis report
 
 		Args:
 			detailed: Include detailed analysis
+			repeat_regions: Limit the repeated-sequence search to these ROM_REGIONS
+			repeat_banks: Limit the repeated-sequence search to these PRG banks
+			compression_trials: Run the compression_lab codecs on every region
 
 		Returns:
 			Report dict
@@ -357,6 +399,21 @@ class ROMSpaceAnalyzer:
 			'regions': compression
 		}
 
+		if compression_trials:
+			print("\n--- Compression Trials ---")
+			trials = self.run_compression_trials()
+			best = trials.best()
+
+			print(f"Trials: {len(trials.results)} in {trials.elapsed:.2f}s")
+			for name, result in best.items():
+				print(f"  {name:16} {result.codec:10} {result.original_size:6,} -> {result.compressed_size:6,} bytes "
+					  f"({result.cycles_per_byte:.1f} cycles/byte)")
+			unverified = [r for r in trials.results if r.applicable and not r.verified]
+			if unverified:
+				print(f"❌ {len(unverified)} trials failed round-trip verification")
+
+			report['sections']['compression_trials'] = trials.to_dict()
+
 		# 3. Duplicate Tiles Analysis
 		print("\n--- CHR Tile Duplicates ---")
 		duplicates = self.find_duplicate_tiles()
@@ -410,7 +467,8 @@ class ROMSpaceAnalyzer:
 		# 5. Repeated Sequences (if detailed)
 		if detailed:
 			print("\n--- Repeated Sequences (Dictionary Compression Candidates) ---")
-			repeated = self.find_repeated_sequences(min_length=4, min_occurrences=3)
+			repeated = self.find_repeated_sequences(min_length=4, min_occurrences=3,
+													regions=repeat_regions, banks=repeat_banks)
 
 			if repeated:
 				print("\nTop Repeated Patterns:")
@@ -430,9 +488,10 @@ class ROMSpaceAnalyzer:
 						'length': len(seq),
 						'count': count,
 						'savings': (len(seq) - 2) * count,
-						'pattern': seq[:16].hex()
+						'pattern': seq[:16].hex(),
+						'offsets': [f"0x{offset:05X}" for offset in offsets]
 					}
-					for seq, count, _ in repeated[:15]
+					for seq, count, offsets in repeated[:15]
 				]
 			}
 
@@ -529,6 +588,26 @@ Examples:
 		help='Export report to JSON file'
 	)
 
+	parser.add_argument(
+		'--repeat-region',
+		action='append',
+		choices=sorted(ROM_REGIONS),
+		help='Limit the repeated-sequence search to a region (repeatable)'
+	)
+
+	parser.add_argument(
+		'--repeat-bank',
+		type=int,
+		action='append',
+		help='Limit the repeated-sequence search to a PRG bank (repeatable)'
+	)
+
+	parser.add_argument(
+		'--compression-trials',
+		action='store_true',
+		help='Encode every region with the compression_lab codecs (exact sizes)'
+	)
+
 	parser.add_argument(
 		'--min-unused',
 		type=int,
@@ -545,7 +624,12 @@ Examples:
 		return 1
 
 	# Generate report
-	report = analyzer.generate_report(detailed=args.detailed)
+	try:
+		report = analyzer.generate_report(detailed=args.detailed, repeat_regions=args.repeat_region,
+										  repeat_banks=args.repeat_bank, compression_trials=args.compression_trials)
+	except ValueError as e:
+		print(f"❌ {e}")
+		return 1
 
 	# Export if requested
 	if args.export_report:
@@ -33,11 +33,13 @@ if hasattr(sys.stderr, 'buffer'):
 import os
 import re
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Union
 from collections import Counter
 import argparse
 import json
 
+from rom_image import DW_ROM_SIZE, RomImage, open_rom
+
 # Default ROM path
 DEFAULT_ROM = "roms/Dragon Warrior (U) (PRG1) [!].nes"
 
@@ -84,29 +86,31 @@ TEXT_END = 0x8fff
 class TextFrequencyAnalyzer:
 	"""Analyze text frequency for compression opportunities"""
 
-	def __init__(self, rom_path: str):
+	def __init__(self, rom_path: Union[str, RomImage]):
 		"""
 		Initialize analyzer
 
 		Args:
-			rom_path: Path to Dragon Warrior ROM
+			rom_path: Path to Dragon Warrior ROM, or a loaded RomImage
 		"""
-		self.rom_path = rom_path
+		self.rom = rom_path if isinstance(rom_path, RomImage) else None
+		self.rom_path = str(self.rom.path) if self.rom else rom_path
 		self.rom_data = None
 		self.text_data = None
 		self.decoded_text = ""
 
 	def load_rom(self) -> bool:
 		"""Load and validate ROM file"""
-		if not os.path.exists(self.rom_path):
-			print(f"❌ ROM file not found: {self.rom_path}")
-			return False
+		if self.rom is None:
+			if not os.path.exists(self.rom_path):
+				print(f"❌ ROM file not found: {self.rom_path}")
+				return False
+			self.rom = open_rom(self.rom_path)
 
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		self.rom_data = self.rom.data
 
-		if len(self.rom_data) != 81936:
-			print(f"⚠ Warning: ROM size is {len(self.rom_data)} bytes (expected 81936)")
+		if len(self.rom_data) != DW_ROM_SIZE:
+			print(f"⚠ Warning: ROM size is {len(self.rom_data)} bytes (expected {DW_ROM_SIZE})")
 
 		if self.rom_data[0:4] != b'NES\x1A':
 			print(f"❌ Invalid NES header")
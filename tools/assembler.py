@@ -0,0 +1,1197 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior In-Process 6502 Assembler
+
+Pure-Python assembler for the Ophis syntax used by source_files/*.asm.
+Replaces the bundled Windows Ophis/ophis.exe so ROM builds run natively on
+any platform without a subprocess (or wine) per build.
+
+Supported syntax:
+- Labels (`Name:`), anonymous labels (`*`) and `-`/`+` references
+- .org, .advance, .checkpc, .alias, .define
+- .byte (including "strings"), .word, .incbin, .include
+- .ifdef / .ifndef / .else / .endif
+- Expressions: $hex, %binary, decimal, 'c', + - * / & | ^, unary < > -,
+  and [ ] for grouping
+- All official 6502 opcodes and addressing modes, with automatic
+  zero-page collapsing the same way Ophis does it
+
+Like Ophis, output is a plain byte stream: .org only moves the program
+counter, .advance pads with fill bytes. The four PRG banks reuse the same
+label names, so each bank is assembled separately and then linked with the
+header and CHR-ROM (see build_rom), matching build_rom.ps1.
+
+Usage:
+	from tools.assembler import assemble_file, build_rom
+
+	result = assemble_file("source_files/Bank00.asm")
+	print(len(result.data), result.symbols["BankPointers"])
+
+	rom = build_rom("source_files")
+	Path("output/dragon_warrior.nes").write_bytes(rom.rom)
+
+	python tools/assembler.py source_files/Bank01.asm build/bank01.bin --listing build/bank01.lst
+	python tools/assembler.py --rom source_files output/dragon_warrior.nes
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import json
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union, Any
+from dataclasses import dataclass, field
+
+
+# ============================================================================
+# ROM LAYOUT
+# ============================================================================
+
+HEADER_FILE = "Header.asm"
+BANK_FILES = ("Bank00.asm", "Bank01.asm", "Bank02.asm", "Bank03.asm")
+HEADER_SIZE = 0x10
+PRG_BANK_SIZE = 0x4000
+CHR_ROM_SIZE = 0x4000
+CHR_ROM_OFFSET = HEADER_SIZE + PRG_BANK_SIZE * len(BANK_FILES)
+CHR_ROM_FILE = "chr_rom.bin"
+
+# Primary reference ROM: Dragon Warrior (U) (PRG1) [!].nes
+REFERENCE_ROM = Path("roms") / "Dragon Warrior (U) (PRG1) [!].nes"
+
+MAX_PASSES = 16
+
+# Lowest CPU address of PRG-ROM; aliases at or above it may be cross-bank references
+ROM_SPACE_START = 0x8000
+
+# Parsed expression: ('num', v) | ('sym', name) | ('un', op, a) | ('bin', op, a, b)
+Expr = Tuple
+
+
+# ============================================================================
+# 6502 INSTRUCTION SET
+# ============================================================================
+
+# Addressing modes: implied, accumulator, immediate, zero page (,X ,Y),
+# absolute (,X ,Y), indirect, (indirect,X), (indirect),Y and relative.
+MODE_SIZES = {
+	'imp': 1, 'acc': 1, 'imm': 2,
+	'zp': 2, 'zpx': 2, 'zpy': 2,
+	'abs': 3, 'absx': 3, 'absy': 3,
+	'ind': 3, 'indx': 2, 'indy': 2,
+	'rel': 2,
+}
+
+OPCODES: Dict[str, Dict[str, int]] = {
+	'ADC': {'imm': 0x69, 'zp': 0x65, 'zpx': 0x75, 'abs': 0x6D, 'absx': 0x7D, 'absy': 0x79, 'indx': 0x61, 'indy': 0x71},
+	'AND': {'imm': 0x29, 'zp': 0x25, 'zpx': 0x35, 'abs': 0x2D, 'absx': 0x3D, 'absy': 0x39, 'indx': 0x21, 'indy': 0x31},
+	'ASL': {'acc': 0x0A, 'zp': 0x06, 'zpx': 0x16, 'abs': 0x0E, 'absx': 0x1E},
+	'BCC': {'rel': 0x90},
+	'BCS': {'rel': 0xB0},
+	'BEQ': {'rel': 0xF0},
+	'BIT': {'zp': 0x24, 'abs': 0x2C},
+	'BMI': {'rel': 0x30},
+	'BNE': {'rel': 0xD0},
+	'BPL': {'rel': 0x10},
+	'BRK': {'imp': 0x00},
+	'BVC': {'rel': 0x50},
+	'BVS': {'rel': 0x70},
+	'CLC': {'imp': 0x18},
+	'CLD': {'imp': 0xD8},
+	'CLI': {'imp': 0x58},
+	'CLV': {'imp': 0xB8},
+	'CMP': {'imm': 0xC9, 'zp': 0xC5, 'zpx': 0xD5, 'abs': 0xCD, 'absx': 0xDD, 'absy': 0xD9, 'indx': 0xC1, 'indy': 0xD1},
+	'CPX': {'imm': 0xE0, 'zp': 0xE4, 'abs': 0xEC},
+	'CPY': {'imm': 0xC0, 'zp': 0xC4, 'abs': 0xCC},
+	'DEC': {'zp': 0xC6, 'zpx': 0xD6, 'abs': 0xCE, 'absx': 0xDE},
+	'DEX': {'imp': 0xCA},
+	'DEY': {'imp': 0x88},
+	'EOR': {'imm': 0x49, 'zp': 0x45, 'zpx': 0x55, 'abs': 0x4D, 'absx': 0x5D, 'absy': 0x59, 'indx': 0x41, 'indy': 0x51},
+	'INC': {'zp': 0xE6, 'zpx': 0xF6, 'abs': 0xEE, 'absx': 0xFE},
+	'INX': {'imp': 0xE8},
+	'INY': {'imp': 0xC8},
+	'JMP': {'abs': 0x4C, 'ind': 0x6C},
+	'JSR': {'abs': 0x20},
+	'LDA': {'imm': 0xA9, 'zp': 0xA5, 'zpx': 0xB5, 'abs': 0xAD, 'absx': 0xBD, 'absy': 0xB9, 'indx': 0xA1, 'indy': 0xB1},
+	'LDX': {'imm': 0xA2, 'zp': 0xA6, 'zpy': 0xB6, 'abs': 0xAE, 'absy': 0xBE},
+	'LDY': {'imm': 0xA0, 'zp': 0xA4, 'zpx': 0xB4, 'abs': 0xAC, 'absx': 0xBC},
+	'LSR': {'acc': 0x4A, 'zp': 0x46, 'zpx': 0x56, 'abs': 0x4E, 'absx': 0x5E},
+	'NOP': {'imp': 0xEA},
+	'ORA': {'imm': 0x09, 'zp': 0x05, 'zpx': 0x15, 'abs': 0x0D, 'absx': 0x1D, 'absy': 0x19, 'indx': 0x01, 'indy': 0x11},
+	'PHA': {'imp': 0x48},
+	'PHP': {'imp': 0x08},
+	'PLA': {'imp': 0x68},
+	'PLP': {'imp': 0x28},
+	'ROL': {'acc': 0x2A, 'zp': 0x26, 'zpx': 0x36, 'abs': 0x2E, 'absx': 0x3E},
+	'ROR': {'acc': 0x6A, 'zp': 0x66, 'zpx': 0x76, 'abs': 0x6E, 'absx': 0x7E},
+	'RTI': {'imp': 0x40},
+	'RTS': {'imp': 0x60},
+	'SBC': {'imm': 0xE9, 'zp': 0xE5, 'zpx': 0xF5, 'abs': 0xED, 'absx': 0xFD, 'absy': 0xF9, 'indx': 0xE1, 'indy': 0xF1},
+	'SEC': {'imp': 0x38},
+	'SED': {'imp': 0xF8},
+	'SEI': {'imp': 0x78},
+	'STA': {'zp': 0x85, 'zpx': 0x95, 'abs': 0x8D, 'absx': 0x9D, 'absy': 0x99, 'indx': 0x81, 'indy': 0x91},
+	'STX': {'zp': 0x86, 'zpy': 0x96, 'abs': 0x8E},
+	'STY': {'zp': 0x84, 'zpx': 0x94, 'abs': 0x8C},
+	'TAX': {'imp': 0xAA},
+	'TAY': {'imp': 0xA8},
+	'TSX': {'imp': 0xBA},
+	'TXA': {'imp': 0x8A},
+	'TXS': {'imp': 0x9A},
+	'TYA': {'imp': 0x98},
+}
+
+# Operand syntax -> (zero page mode, absolute mode)
+_DIRECT_MODES = {
+	'direct': ('zp', 'abs'),
+	'x': ('zpx', 'absx'),
+	'y': ('zpy', 'absy'),
+}
+
+
+# ============================================================================
+# ERRORS AND RESULTS
+# ============================================================================
+
+class AssemblerError(Exception):
+	"""Assembly error with source location.
+
+	Formatted as 'file:line: message' so that
+	build_errors.AssemblerErrorParser can explain it like an Ophis error.
+	"""
+
+	def __init__(self, message: str, file: Optional[Union[str, Path]] = None, line: Optional[int] = None):
+		self.message = message
+		self.file = str(file) if file is not None else None
+		self.line = line
+		self.errors: List['AssemblerError'] = [self]
+		super().__init__(self.location_message())
+
+	def __str__(self) -> str:
+		if len(getattr(self, 'errors', ())) > 1:
+			return '\n'.join(error.location_message() for error in self.errors)
+		return self.location_message()
+
+	def location_message(self) -> str:
+		"""Single error as 'file:line: message'."""
+		if self.file is not None and self.line is not None:
+			return f"{self.file}:{self.line}: {self.message}"
+		return self.message
+
+	@classmethod
+	def combine(cls, errors: List['AssemblerError']) -> 'AssemblerError':
+		"""Wrap several errors; str() lists them one per line like Ophis."""
+		combined = cls(errors[0].message, errors[0].file, errors[0].line)
+		combined.errors = list(errors)
+		return combined
+
+
+class _Unresolved(Exception):
+	"""Raised internally when an expression references an unknown symbol."""
+
+	def __init__(self, name: str):
+		self.name = name
+		super().__init__(name)
+
+
+@dataclass
+class ListingEntry:
+	"""One source line in the assembly listing."""
+	file: str
+	line: int
+	pc: int
+	data: bytes
+	source: str
+
+
+@dataclass
+class Relocation:
+	"""An emitted value that depends on ROM-space aliases.
+
+	Cross-bank references in the sources are .alias forward declarations
+	(e.g. `.alias WaitForNMI $FF74`). Recording where those values were
+	emitted lets a linker rebind them to another bank's real label
+	addresses without reassembling.
+
+	kind is 'byte', 'word' or 'rel' (branch offset from pc + 2).
+	"""
+	offset: int
+	kind: str
+	pc: int
+	expr: Expr
+	symbols: Tuple[str, ...]
+
+
+@dataclass
+class AssemblyResult:
+	"""Output of assembling one top-level source file."""
+	source: Path
+	data: bytes
+	labels: Dict[str, int] = field(default_factory=dict)
+	aliases: Dict[str, int] = field(default_factory=dict)
+	listing: List[ListingEntry] = field(default_factory=list)
+	includes: List[Path] = field(default_factory=list)
+	passes: int = 0
+	origin: int = 0
+	alias_exprs: Dict[str, Expr] = field(default_factory=dict)
+	relocations: List[Relocation] = field(default_factory=list)
+
+	@property
+	def imports(self) -> List[str]:
+		"""ROM-space aliases this file's output depends on."""
+		return sorted({name for reloc in self.relocations for name in reloc.symbols})
+
+	@property
+	def symbols(self) -> Dict[str, int]:
+		"""All named symbols (aliases overridden by labels)."""
+		symbols = dict(self.aliases)
+		symbols.update(self.labels)
+		return symbols
+
+	def listing_text(self) -> str:
+		"""Render the listing as 'PC  bytes  source' lines."""
+		lines = []
+		current_file = None
+		for entry in self.listing:
+			if entry.file != current_file:
+				current_file = entry.file
+				lines.append(f"; ---- {current_file}")
+			hex_bytes = ' '.join(f"{b:02X}" for b in entry.data[:8])
+			if len(entry.data) > 8:
+				hex_bytes += ' ..'
+			lines.append(f"{entry.pc:04X}  {hex_bytes:<26} {entry.line:5d}  {entry.source.rstrip()}")
+		return '\n'.join(lines) + '\n'
+
+	def to_symbol_dict(self) -> Dict[str, Any]:
+		"""Symbol table as a JSON-friendly dictionary."""
+		return {
+			'source': str(self.source),
+			'size': len(self.data),
+			'labels': {name: f"${value:04X}" for name, value in sorted(self.labels.items(), key=lambda kv: (kv[1], kv[0]))},
+			'aliases': {name: f"${value:04X}" for name, value in sorted(self.aliases.items())},
+		}
+
+	def write_listing(self, path: Union[str, Path]) -> None:
+		"""Write listing text file."""
+		Path(path).write_text(self.listing_text(), encoding='utf-8')
+
+	def write_symbols(self, path: Union[str, Path]) -> None:
+		"""Write symbol table as JSON."""
+		with open(path, 'w', encoding='utf-8') as f:
+			json.dump(self.to_symbol_dict(), f, indent=2)
+
+
+# ============================================================================
+# EXPRESSIONS
+# ============================================================================
+
+_TOKEN_RE = re.compile(r"\s*(\$[0-9A-Fa-f]+|%[01]+|\d+|'.'|[A-Za-z_][A-Za-z0-9_]*|[-+*/&|^<>\[\]()])")
+
+
+def parse_expression(text: str) -> Expr:
+	"""Parse an Ophis expression into a small tuple AST."""
+	tokens = []
+	pos = 0
+	text = text.rstrip()
+	while pos < len(text):
+		match = _TOKEN_RE.match(text, pos)
+		if not match:
+			raise ValueError(f"Bad expression '{text}'")
+		tokens.append(match.group(1))
+		pos = match.end()
+
+	if not tokens:
+		raise ValueError("Missing expression")
+
+	index = 0
+
+	def peek() -> Optional[str]:
+		return tokens[index] if index < len(tokens) else None
+
+	def take() -> str:
+		nonlocal index
+		token = tokens[index]
+		index += 1
+		return token
+
+	def binary(sub: Callable[[], Expr], ops: str) -> Callable[[], Expr]:
+		def parse() -> Expr:
+			node = sub()
+			while peek() is not None and peek() in ops:
+				op = take()
+				node = ('bin', op, node, sub())
+			return node
+		return parse
+
+	def unary() -> Expr:
+		token = peek()
+		if token in ('<', '>', '-'):
+			take()
+			return ('un', token, unary())
+		return atom()
+
+	def atom() -> Expr:
+		if peek() is None:
+			raise ValueError(f"Incomplete expression '{text}'")
+		token = take()
+		if token in ('[', '('):
+			node = expr()
+			closing = ']' if token == '[' else ')'
+			if peek() != closing:
+				raise ValueError(f"Unbalanced brackets in '{text}'")
+			take()
+			return node
+		if token[0] == '$':
+			return ('num', int(token[1:], 16))
+		if token[0] == '%':
+			return ('num', int(token[1:], 2))
+		if token[0] == "'":
+			return ('num', ord(token[1]))
+		if token[0].isdigit():
+			return ('num', int(token))
+		if token[0].isalpha() or token[0] == '_':
+			return ('sym', token)
+		raise ValueError(f"Unexpected '{token}' in '{text}'")
+
+	mul = binary(unary, '*/')
+	add = binary(mul, '+-')
+	band = binary(add, '&')
+	bxor = binary(band, '^')
+	expr = binary(bxor, '|')
+
+	node = expr()
+	if index != len(tokens):
+		raise ValueError(f"Unexpected '{tokens[index]}' in '{text}'")
+	return node
+
+
+def evaluate(node: Expr, lookup: Callable[[str], int]) -> int:
+	"""Evaluate a parsed expression using lookup() for symbols."""
+	kind = node[0]
+	if kind == 'num':
+		return node[1]
+	if kind == 'sym':
+		return lookup(node[1])
+	if kind == 'un':
+		value = evaluate(node[2], lookup)
+		if node[1] == '<':
+			return value & 0xFF
+		if node[1] == '>':
+			return (value >> 8) & 0xFF
+		return -value
+	op = node[1]
+	a = evaluate(node[2], lookup)
+	b = evaluate(node[3], lookup)
+	if op == '+':
+		return a + b
+	if op == '-':
+		return a - b
+	if op == '*':
+		return a * b
+	if op == '/':
+		if b == 0:
+			raise ValueError("Division by zero")
+		return a // b
+	if op == '&':
+		return a & b
+	if op == '|':
+		return a | b
+	return a ^ b
+
+
+def expression_symbols(node: Expr) -> Set[str]:
+	"""Names referenced by a parsed expression."""
+	kind = node[0]
+	if kind == 'sym':
+		return {node[1]}
+	if kind == 'un':
+		return expression_symbols(node[2])
+	if kind == 'bin':
+		return expression_symbols(node[2]) | expression_symbols(node[3])
+	return set()
+
+
+# ============================================================================
+# SOURCE PARSING
+# ============================================================================
+
+@dataclass
+class Statement:
+	"""One parsed, include-expanded source statement."""
+	kind: str
+	file: str
+	line: int
+	source: str
+	name: str = ""
+	exprs: List[Any] = field(default_factory=list)
+	operand: str = ""
+	syntax: str = ""
+	data: bytes = b""
+
+
+_LABEL_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*):')
+_WORD_RE = re.compile(r'(\S+)\s*(.*)$')
+_INDY_RE = re.compile(r'^\((.+)\)\s*,\s*[Yy]$')
+_INDX_RE = re.compile(r'^\((.+?)\s*,\s*[Xx]\s*\)$')
+_IND_RE = re.compile(r'^\((.+)\)$')
+_INDEXED_RE = re.compile(r'^(.+?)\s*,\s*([XxYy])$')
+_ANON_REF_RE = re.compile(r'^(\++|-+)$')
+
+
+def strip_comment(text: str) -> str:
+	"""Remove a trailing ';' comment, ignoring semicolons inside quotes."""
+	in_string = False
+	i = 0
+	length = len(text)
+	while i < length:
+		char = text[i]
+		if char == '"':
+			in_string = not in_string
+		elif char == "'" and not in_string and i + 2 < length and text[i + 2] == "'":
+			i += 3
+			continue
+		elif char == ';' and not in_string:
+			return text[:i]
+		i += 1
+	return text
+
+
+def split_arguments(text: str) -> List[str]:
+	"""Split a directive argument list on commas outside quotes."""
+	args = []
+	current = []
+	in_string = False
+	for char in text:
+		if char == '"':
+			in_string = not in_string
+		if char == ',' and not in_string:
+			args.append(''.join(current).strip())
+			current = []
+		else:
+			current.append(char)
+	tail = ''.join(current).strip()
+	if tail or args:
+		args.append(tail)
+	return args
+
+
+def read_source_file(path: Path) -> str:
+	"""Default source loader: read a file from disk."""
+	return path.read_text(encoding='utf-8-sig', errors='replace')
+
+
+def resolve_include(name: str, current_dir: Path, include_paths: List[Path]) -> Optional[Path]:
+	"""Resolve an .include/.incbin name relative to the includer, then the include paths."""
+	candidate = Path(name)
+	if candidate.is_absolute():
+		return candidate if candidate.exists() else None
+	for base in [current_dir] + list(include_paths):
+		path = base / candidate
+		if path.exists():
+			return path
+	return None
+
+
+_INCLUDE_RE = re.compile(r'^[ \t]*(?:[A-Za-z_][A-Za-z0-9_]*:[ \t]*)*\.(include|incbin)[ \t]+"([^"]+)"',
+						 re.IGNORECASE | re.MULTILINE)
+
+
+def include_targets(text: str) -> List[Tuple[str, str]]:
+	"""(directive, file name) for every .include/.incbin line in text."""
+	return [(match.group(1).lower(), match.group(2)) for match in _INCLUDE_RE.finditer(text)]
+
+
+def include_closure(path: Union[str, Path], include_paths: Optional[List[Union[str, Path]]] = None,
+					loader: Optional[Callable[[Path], str]] = None) -> List[Path]:
+	"""Every file a source can read through .include/.incbin.
+
+	Conditionals are ignored, so the result is a superset of what one
+	assembly actually reads. Missing files are skipped; the assembler
+	reports them. The top-level file comes first.
+	"""
+	loader = loader or read_source_file
+	paths = [Path(p) for p in (include_paths or [])]
+	root = Path(path).resolve()
+	found = [root]
+	pending = [root]
+	while pending:
+		current = pending.pop()
+		if current.suffix.lower() != '.asm':
+			continue
+		try:
+			text = loader(current)
+		except OSError:
+			continue
+		for _, name in include_targets(text):
+			target = resolve_include(name, current.parent, paths)
+			if target is None:
+				continue
+			target = target.resolve()
+			if target not in found:
+				found.append(target)
+				pending.append(target)
+	return found
+
+
+class Assembler:
+	"""Two-phase Ophis-compatible assembler.
+
+	Phase one expands includes and conditionals into a flat statement list.
+	Phase two runs layout passes until every label address is stable, then
+	emits the final bytes, listing and symbol table.
+	"""
+
+	def __init__(self, include_paths: Optional[List[Union[str, Path]]] = None,
+				 defines: Optional[Dict[str, int]] = None,
+				 loader: Optional[Callable[[Path], str]] = None):
+		self.include_paths = [Path(p) for p in (include_paths or [])]
+		self.defines: Dict[str, Optional[int]] = dict(defines or {})
+		self.loader = loader or read_source_file
+		self.statements: List[Statement] = []
+		self.includes: List[Path] = []
+		self._expr_cache: Dict[str, Expr] = {}
+
+	# ------------------------------------------------------------------
+	# Phase one: parsing
+	# ------------------------------------------------------------------
+
+	def _resolve_path(self, name: str, current_dir: Path, file: str, line: int) -> Path:
+		"""Find an included file relative to the includer, then the include paths."""
+		path = resolve_include(name, current_dir, self.include_paths)
+		if path is None:
+			raise AssemblerError(f"File not found: '{name}'", file, line)
+		return path
+
+	def _expr(self, text: str, file: str, line: int) -> Expr:
+		"""Parse (and memoize) an expression."""
+		cached = self._expr_cache.get(text)
+		if cached is not None:
+			return cached
+		try:
+			node = parse_expression(text)
+		except ValueError as e:
+			raise AssemblerError(str(e), file, line)
+		self._expr_cache[text] = node
+		return node
+
+	def parse_file(self, path: Path, stack: Optional[List[Path]] = None) -> None:
+		"""Parse a file (recursively expanding includes) into statements."""
+		path = Path(path)
+		stack = stack or []
+		resolved = path.resolve()
+		if resolved in stack:
+			raise AssemblerError(f"Recursive include of '{path.name}'",
+								 stack[-1] if stack else path, None)
+		stack = stack + [resolved]
+		if resolved not in self.includes:
+			self.includes.append(resolved)
+
+		try:
+			text = self.loader(path)
+		except OSError as e:
+			raise AssemblerError(f"File not found: '{path}' ({e})")
+
+		file = str(path)
+		# Stack of (active, seen_else) for .ifdef nesting
+		conditions: List[Tuple[bool, bool]] = []
+
+		for line_no, raw in enumerate(text.splitlines(), 1):
+			code = strip_comment(raw).strip()
+			if not code:
+				continue
+
+			active = all(state for state, _ in conditions)
+			lower = code.lower()
+
+			# Conditionals are tracked even inside inactive blocks
+			if lower.startswith(('.ifdef', '.ifndef')):
+				parts = code.split()
+				if len(parts) != 2:
+					raise AssemblerError(f"Malformed conditional '{code}'", file, line_no)
+				defined = self._is_defined(parts[1])
+				wanted = defined if lower.startswith('.ifdef') else not defined
+				conditions.append((wanted if active else False, False))
+				continue
+			if lower.startswith('.else'):
+				if not conditions or conditions[-1][1]:
+					raise AssemblerError(".else without matching .ifdef", file, line_no)
+				state, _ = conditions.pop()
+				parent_active = all(s for s, _ in conditions)
+				conditions.append(((not state) and parent_active, True))
+				continue
+			if lower.startswith('.endif'):
+				if not conditions:
+					raise AssemblerError(".endif without matching .ifdef", file, line_no)
+				conditions.pop()
+				continue
+			if not active:
+				continue
+
+			self._parse_line(code, raw, path, file, line_no, stack)
+
+		if conditions:
+			raise AssemblerError("Unterminated .ifdef block", file, len(text.splitlines()))
+
+	def _is_defined(self, name: str) -> bool:
+		"""Whether a name is visible to .ifdef at this point of parsing."""
+		if name in self.defines:
+			return True
+		return any(s.name == name for s in self.statements if s.kind in ('label', 'alias'))
+
+	def _parse_line(self, code: str, raw: str, path: Path, file: str, line_no: int,
+					stack: List[Path]) -> None:
+		"""Parse one non-empty, active source line."""
+		# Labels
+		while True:
+			match = _LABEL_RE.match(code)
+			if not match:
+				break
+			self.statements.append(Statement('label', file, line_no, raw, name=match.group(1)))
+			code = code[match.end():].strip()
+
+		# Anonymous label
+		if code == '*' or code.startswith(('* ', '*\t')):
+			self.statements.append(Statement('anon', file, line_no, raw))
+			code = code[1:].strip()
+
+		if not code:
+			return
+
+		match = _WORD_RE.match(code)
+		word, rest = match.group(1), match.group(2).strip()
+
+		if word.startswith('.'):
+			self._parse_directive(word[1:].lower(), rest, raw, path, file, line_no, stack)
+			return
+
+		mnemonic = word.upper()
+		if mnemonic not in OPCODES:
+			raise AssemblerError(f"Illegal instruction '{word}'", file, line_no)
+		self._parse_instruction(mnemonic, rest, raw, file, line_no)
+
+	def _parse_directive(self, name: str, rest: str, raw: str, path: Path, file: str,
+						 line_no: int, stack: List[Path]) -> None:
+		"""Parse a '.directive' line."""
+		if name == 'include':
+			target = self._resolve_path(rest.strip('"'), path.parent, file, line_no)
+			self.parse_file(target, stack)
+		elif name == 'incbin':
+			target = self._resolve_path(rest.strip('"'), path.parent, file, line_no)
+			if target.resolve() not in self.includes:
+				self.includes.append(target.resolve())
+			self.statements.append(Statement('incbin', file, line_no, raw, data=target.read_bytes()))
+		elif name in ('byte', 'word'):
+			items: List[Any] = []
+			for arg in split_arguments(rest):
+				if not arg:
+					raise AssemblerError(f"Empty .{name} argument", file, line_no)
+				if arg.startswith('"'):
+					if name != 'byte' or not arg.endswith('"') or len(arg) < 2:
+						raise AssemblerError(f"Bad string '{arg}'", file, line_no)
+					items.append(arg[1:-1].encode('ascii'))
+				else:
+					items.append(self._expr(arg, file, line_no))
+			self.statements.append(Statement(name, file, line_no, raw, exprs=items))
+		elif name == 'alias':
+			parts = rest.split(None, 1)
+			if len(parts) != 2:
+				raise AssemblerError(f"Malformed .alias '{rest}'", file, line_no)
+			self.statements.append(Statement('alias', file, line_no, raw, name=parts[0],
+											 exprs=[self._expr(parts[1], file, line_no)]))
+		elif name == 'define':
+			parts = rest.split(None, 1)
+			if not parts:
+				raise AssemblerError("Malformed .define", file, line_no)
+			self.defines.setdefault(parts[0], None)
+			if len(parts) == 2:
+				self.statements.append(Statement('alias', file, line_no, raw, name=parts[0],
+												 exprs=[self._expr(parts[1], file, line_no)]))
+		elif name in ('org', 'checkpc'):
+			self.statements.append(Statement(name, file, line_no, raw,
+											 exprs=[self._expr(rest, file, line_no)]))
+		elif name == 'advance':
+			args = split_arguments(rest)
+			if not 1 <= len(args) <= 2:
+				raise AssemblerError(f"Malformed .advance '{rest}'", file, line_no)
+			self.statements.append(Statement('advance', file, line_no, raw,
+											 exprs=[self._expr(a, file, line_no) for a in args]))
+		elif name in ('segment', 'text', 'data'):
+			# Segment markers from the generated asset files carry no layout
+			# information in a flat Ophis build.
+			pass
+		else:
+			raise AssemblerError(f"Unknown directive '.{name}'", file, line_no)
+
+	def _parse_instruction(self, mnemonic: str, operand: str, raw: str, file: str, line_no: int) -> None:
+		"""Classify an instruction operand by syntax."""
+		modes = OPCODES[mnemonic]
+		statement = Statement('insn', file, line_no, raw, name=mnemonic, operand=operand)
+
+		if not operand or (operand.upper() == 'A' and 'acc' in modes):
+			if 'imp' in modes:
+				statement.syntax = 'imp'
+			elif 'acc' in modes:
+				statement.syntax = 'acc'
+			else:
+				raise AssemblerError(f"{mnemonic} requires an operand", file, line_no)
+		elif 'rel' in modes:
+			anon = _ANON_REF_RE.match(operand)
+			statement.syntax = 'rel'
+			if anon:
+				statement.exprs = [('anon', anon.group(1))]
+			else:
+				statement.exprs = [self._expr(operand, file, line_no)]
+		elif operand.startswith('#'):
+			statement.syntax = 'imm'
+			statement.exprs = [self._expr(operand[1:], file, line_no)]
+		else:
+			anon = _ANON_REF_RE.match(operand)
+			if anon:
+				statement.syntax = 'direct'
+				statement.exprs = [('anon', anon.group(1))]
+			elif _INDY_RE.match(operand):
+				statement.syntax = 'indy'
+				statement.exprs = [self._expr(_INDY_RE.match(operand).group(1), file, line_no)]
+			elif _INDX_RE.match(operand):
+				statement.syntax = 'indx'
+				statement.exprs = [self._expr(_INDX_RE.match(operand).group(1), file, line_no)]
+			elif _IND_RE.match(operand) and 'ind' in modes:
+				statement.syntax = 'ind'
+				statement.exprs = [self._expr(_IND_RE.match(operand).group(1), file, line_no)]
+			elif _INDEXED_RE.match(operand):
+				match = _INDEXED_RE.match(operand)
+				statement.syntax = match.group(2).lower()
+				statement.exprs = [self._expr(match.group(1), file, line_no)]
+			else:
+				statement.syntax = 'direct'
+				statement.exprs = [self._expr(operand, file, line_no)]
+
+		if statement.syntax in ('imp', 'acc', 'imm', 'ind', 'indx', 'indy', 'rel') and statement.syntax not in modes:
+			raise AssemblerError(f"Illegal addressing mode for {mnemonic}: '{operand}'", file, line_no)
+		self.statements.append(statement)
+
+	# ------------------------------------------------------------------
+	# Phase two: layout and emission
+	# ------------------------------------------------------------------
+
+	def assemble(self, path: Union[str, Path]) -> AssemblyResult:
+		"""Assemble a top-level source file.
+
+		Raises AssemblerError listing every problem found in the final pass.
+		"""
+		path = Path(path)
+		self.statements = []
+		self.includes = []
+		self.parse_file(path)
+
+		previous_labels: Dict[str, int] = {}
+		for pass_no in range(1, MAX_PASSES + 1):
+			labels, _, _, _, _ = self._run_pass(previous_labels)
+			if labels == previous_labels:
+				break
+			previous_labels = labels
+		else:
+			raise AssemblerError(f"Layout did not converge after {MAX_PASSES} passes", path, None)
+
+		errors: List[AssemblerError] = []
+		labels, aliases, data, listing, _ = self._run_pass(previous_labels, errors)
+		if errors:
+			raise AssemblerError.combine(errors)
+
+		del labels['__anon__']
+		emitted = [entry.pc for entry in listing if entry.data]
+		return AssemblyResult(
+			source=path,
+			data=bytes(data),
+			labels=labels,
+			aliases=aliases,
+			listing=listing,
+			includes=list(self.includes),
+			passes=pass_no + 1,
+			origin=emitted[0] if emitted else 0,
+			alias_exprs={name: where.exprs[0] for name, where in self._alias_statements.items()},
+			relocations=self._relocations(labels, aliases),
+		)
+
+	def _run_pass(self, previous_labels: Dict[str, int], errors: Optional[List[AssemblerError]] = None):
+		"""Lay out every statement once.
+
+		Layout passes use label addresses from the previous pass for forward
+		references. The final pass (errors is a list) also builds the listing
+		and records undefined symbols and range errors.
+
+		Returns (labels, aliases, data, listing, unresolved).
+		"""
+		final = errors is not None
+		labels: Dict[str, int] = {}
+		alias_exprs: Dict[str, Statement] = {}
+		alias_values: Dict[str, int] = {}
+		evaluating: Set[str] = set()
+		anon_positions: List[int] = []
+		anon_index = 0
+		unresolved: List[str] = []
+		data = bytearray()
+		listing: List[ListingEntry] = []
+		operands: List[Tuple[int, str, int, Expr]] = []
+		pc = 0
+		statement: Optional[Statement] = None
+
+		def fail(message: str, where: Statement) -> None:
+			if final:
+				errors.append(AssemblerError(message, where.file, where.line))
+
+		# Aliases are visible everywhere (forward references are allowed),
+		# but a name may only be bound to one expression.
+		for candidate in self.statements:
+			if candidate.kind == 'alias':
+				existing = alias_exprs.get(candidate.name)
+				if existing is not None and existing.exprs[0] != candidate.exprs[0]:
+					raise AssemblerError(f"Duplicate alias '{candidate.name}'", candidate.file, candidate.line)
+				alias_exprs[candidate.name] = candidate
+			elif candidate.kind == 'anon':
+				anon_positions.append(0)
+
+		previous_anon = previous_labels.get('__anon__', ())
+
+		def lookup(name: str) -> int:
+			if name in labels:
+				return labels[name]
+			if name in alias_exprs:
+				if name in alias_values:
+					return alias_values[name]
+				if name in evaluating:
+					where = alias_exprs[name]
+					raise AssemblerError(f"Circular alias '{name}'", where.file, where.line)
+				evaluating.add(name)
+				try:
+					value = evaluate(alias_exprs[name].exprs[0], lookup)
+				finally:
+					evaluating.discard(name)
+				alias_values[name] = value
+				return value
+			if name in previous_labels:
+				return previous_labels[name]
+			if self.defines.get(name) is not None:
+				return self.defines[name]
+			raise _Unresolved(name)
+
+		def resolve_anon(ref: str) -> int:
+			target = anon_index - len(ref) if ref[0] == '-' else anon_index + len(ref) - 1
+			if target < 0 or target >= len(anon_positions):
+				raise _Unresolved(ref)
+			if target < anon_index:
+				return anon_positions[target]
+			if target < len(previous_anon):
+				return previous_anon[target]
+			raise _Unresolved(ref)
+
+		def value_of(node: Any) -> Optional[int]:
+			try:
+				if node[0] == 'anon':
+					return resolve_anon(node[1])
+				return evaluate(node, lookup)
+			except _Unresolved as e:
+				fail(f"Undefined label '{e.name}'", statement)
+				unresolved.append(e.name)
+				return None
+			except ValueError as e:
+				fail(str(e), statement)
+				return None
+
+		for statement in self.statements:
+			kind = statement.kind
+			start_pc = pc
+			emitted = b""
+
+			if kind == 'label':
+				if statement.name in labels:
+					fail(f"Duplicate label '{statement.name}'", statement)
+				else:
+					labels[statement.name] = pc
+				continue
+			elif kind == 'anon':
+				anon_positions[anon_index] = pc
+				anon_index += 1
+				continue
+			elif kind == 'alias':
+				continue
+			elif kind == 'org':
+				value = value_of(statement.exprs[0])
+				if value is None:
+					raise AssemblerError(".org requires a known address", statement.file, statement.line)
+				pc = value
+				continue
+			elif kind == 'checkpc':
+				value = value_of(statement.exprs[0])
+				if value is not None and pc > value:
+					fail(f"Program counter ${pc:04X} exceeds ${value:04X}", statement)
+				continue
+			elif kind == 'advance':
+				target = value_of(statement.exprs[0])
+				fill = value_of(statement.exprs[1]) if len(statement.exprs) > 1 else 0
+				if target is None:
+					raise AssemblerError(".advance requires a known address", statement.file, statement.line)
+				if pc > target:
+					raise AssemblerError(f"Cannot .advance backwards from ${pc:04X} to ${target:04X}",
+										 statement.file, statement.line)
+				emitted = bytes([(fill or 0) & 0xFF]) * (target - pc)
+			elif kind == 'incbin':
+				emitted = statement.data
+			elif kind == 'byte':
+				out = bytearray()
+				for item in statement.exprs:
+					if isinstance(item, bytes):
+						out += item
+						continue
+					value = value_of(item)
+					if value is None:
+						value = 0
+					elif not -128 <= value <= 0xFF:
+						fail(f"Range error: value {value} does not fit in a byte", statement)
+					if final:
+						operands.append((len(data) + len(out), 'byte', pc, item))
+					out.append(value & 0xFF)
+				emitted = bytes(out)
+			elif kind == 'word':
+				out = bytearray()
+				for item in statement.exprs:
+					value = value_of(item)
+					if value is None:
+						value = 0
+					elif not -0x8000 <= value <= 0xFFFF:
+						fail(f"Range error: value {value} does not fit in a word", statement)
+					if final:
+						operands.append((len(data) + len(out), 'word', pc, item))
+					out += bytes((value & 0xFF, (value >> 8) & 0xFF))
+				emitted = bytes(out)
+			elif kind == 'insn':
+				emitted = self._encode(statement, pc, value_of(statement.exprs[0]) if statement.exprs else None, fail)
+				if final and statement.exprs and statement.exprs[0][0] != 'anon':
+					reloc_kind = 'rel' if statement.syntax == 'rel' else ('word' if len(emitted) == 3 else 'byte')
+					operands.append((len(data) + 1, reloc_kind, pc, statement.exprs[0]))
+
+			data += emitted
+			pc += len(emitted)
+			if final:
+				listing.append(ListingEntry(statement.file, statement.line, start_pc, emitted, statement.source))
+
+		labels['__anon__'] = tuple(anon_positions)
+		aliases = {}
+		for name, where in alias_exprs.items():
+			statement = where
+			try:
+				aliases[name] = lookup(name)
+			except _Unresolved as e:
+				fail(f"Undefined label '{e.name}'", where)
+		if final:
+			self._operands = operands
+			self._alias_statements = alias_exprs
+		return labels, aliases, data, listing, unresolved
+
+	def _relocations(self, labels: Dict[str, int], aliases: Dict[str, int]) -> List[Relocation]:
+		"""Select final-pass operands that depend on ROM-space aliases."""
+		dependencies: Dict[str, Set[str]] = {}
+
+		def rom_aliases(name: str, seen: Set[str]) -> Set[str]:
+			if name in dependencies:
+				return dependencies[name]
+			if name in labels or name not in self._alias_statements or name in seen:
+				return set()
+			seen.add(name)
+			found = {name} if aliases.get(name, 0) >= ROM_SPACE_START else set()
+			for child in expression_symbols(self._alias_statements[name].exprs[0]):
+				found |= rom_aliases(child, seen)
+			dependencies[name] = found
+			return found
+
+		relocations = []
+		for offset, kind, pc, expr in self._operands:
+			names: Set[str] = set()
+			for name in expression_symbols(expr):
+				names |= rom_aliases(name, set())
+			if names:
+				relocations.append(Relocation(offset, kind, pc, expr, tuple(sorted(names))))
+		return relocations
+
+	def _encode(self, statement: Statement, pc: int, value: Optional[int],
+				fail: Callable[[str, Statement], None]) -> bytes:
+		"""Encode one instruction at pc (value is None while unresolved)."""
+		mnemonic = statement.name
+		modes = OPCODES[mnemonic]
+		syntax = statement.syntax
+
+		if syntax in ('imp', 'acc'):
+			return bytes([modes[syntax]])
+
+		if syntax == 'rel':
+			if value is None:
+				return bytes([modes['rel'], 0])
+			offset = value - (pc + 2)
+			if not -128 <= offset <= 127:
+				fail(f"Range error: value branch to ${value & 0xFFFF:04X} is out of range", statement)
+				offset = 0
+			return bytes([modes['rel'], offset & 0xFF])
+
+		if syntax in ('imm', 'indx', 'indy'):
+			if value is not None and not -128 <= value <= 0xFF:
+				fail(f"Range error: value {value} does not fit in a byte", statement)
+			return bytes([modes[syntax], (value or 0) & 0xFF])
+
+		if syntax == 'ind':
+			value = value or 0
+			return bytes([modes['ind'], value & 0xFF, (value >> 8) & 0xFF])
+
+		zp_mode, abs_mode = _DIRECT_MODES[syntax]
+		if value is not None and 0 <= value <= 0xFF and zp_mode in modes:
+			return bytes([modes[zp_mode], value])
+		if abs_mode not in modes:
+			if zp_mode in modes and value is None:
+				return bytes([modes[zp_mode], 0])
+			fail(f"Illegal addressing mode for {mnemonic}: '{statement.operand}'", statement)
+			return bytes([modes[zp_mode] if zp_mode in modes else 0xEA, 0])
+		if value is None:
+			value = 0
+		elif not 0 <= value <= 0xFFFF:
+			fail(f"Range error: value {value} does not fit in an address", statement)
+		return bytes([modes[abs_mode], value & 0xFF, (value >> 8) & 0xFF])
+
+
+def assemble_file(path: Union[str, Path], include_paths: Optional[List[Union[str, Path]]] = None,
+				  defines: Optional[Dict[str, int]] = None,
+				  loader: Optional[Callable[[Path], str]] = None) -> AssemblyResult:
+	"""Assemble a single source file (e.g. one PRG bank)."""
+	path = Path(path)
+	paths = [path.parent] + [Path(p) for p in (include_paths or [])]
+	return Assembler(paths, defines, loader).assemble(path)
+
+
+# ============================================================================
+# ROM BUILD
+# ============================================================================
+
+@dataclass
+class RomBuildResult:
+	"""Assembled header, PRG banks and CHR-ROM linked into an iNES image."""
+	rom: bytes
+	header: AssemblyResult
+	banks: Dict[str, AssemblyResult]
+	chr_source: str
+	warnings: List[str] = field(default_factory=list)
+
+	def write(self, output_dir: Union[str, Path], rom_name: str = "dragon_warrior_modified.nes",
+			  listing_dir: Optional[Union[str, Path]] = None) -> Path:
+		"""Write the ROM, plus per-bank listings and symbol tables."""
+		output_dir = Path(output_dir)
+		output_dir.mkdir(parents=True, exist_ok=True)
+		rom_path = output_dir / rom_name
+		rom_path.write_bytes(self.rom)
+
+		if listing_dir is not None:
+			listing_dir = Path(listing_dir)
+			listing_dir.mkdir(parents=True, exist_ok=True)
+			for name, result in self.banks.items():
+				stem = Path(name).stem.lower()
+				result.write_listing(listing_dir / f"{stem}.lst")
+				result.write_symbols(listing_dir / f"{stem}.sym.json")
+		return rom_path
+
+
+def load_chr_rom(source_dir: Union[str, Path], reference_rom: Optional[Union[str, Path]] = None) -> Tuple[bytes, str, List[str]]:
+	"""Locate CHR-ROM data the same way build_rom.ps1 does.
+
+	Returns (data, source description, warnings).
+	"""
+	chr_file = Path(source_dir) / CHR_ROM_FILE
+	if chr_file.exists():
+		data = chr_file.read_bytes()
+		warnings = [] if len(data) == CHR_ROM_SIZE else [f"{chr_file} is {len(data)} bytes (expected {CHR_ROM_SIZE})"]
+		return data[:CHR_ROM_SIZE].ljust(CHR_ROM_SIZE, b'\x00'), str(chr_file), warnings
+
+	reference = Path(reference_rom) if reference_rom else REFERENCE_ROM
+	if reference.exists():
+		data = reference.read_bytes()[CHR_ROM_OFFSET:CHR_ROM_OFFSET + CHR_ROM_SIZE]
+		if len(data) == CHR_ROM_SIZE:
+			return data, str(reference), []
+
+	return bytes(CHR_ROM_SIZE), "placeholder", ["No CHR-ROM source found, using blank CHR-ROM"]
+
+
+def build_rom(source_dir: Union[str, Path] = "source_files",
+			  chr_data: Optional[bytes] = None,
+			  reference_rom: Optional[Union[str, Path]] = None,
+			  defines: Optional[Dict[str, int]] = None,
+			  loader: Optional[Callable[[Path], str]] = None) -> RomBuildResult:
+	"""Assemble Header.asm and every BankNN.asm, then link with CHR-ROM."""
+	source_dir = Path(source_dir)
+	warnings: List[str] = []
+
+	header = assemble_file(source_dir / HEADER_FILE, [source_dir], defines, loader)
+	if len(header.data) != HEADER_SIZE:
+		raise AssemblerError(f"Header should be {HEADER_SIZE} bytes, got {len(header.data)}",
+							 header.source, None)
+
+	banks: Dict[str, AssemblyResult] = {}
+	for bank_file in BANK_FILES:
+		result = assemble_file(source_dir / bank_file, [source_dir], defines, loader)
+		if len(result.data) != PRG_BANK_SIZE:
+			raise AssemblerError(f"{bank_file} is {len(result.data)} bytes (expected {PRG_BANK_SIZE})",
+								 result.source, None)
+		banks[bank_file] = result
+
+	if chr_data is None:
+		chr_data, chr_source, chr_warnings = load_chr_rom(source_dir, reference_rom)
+		warnings.extend(chr_warnings)
+	else:
+		chr_source = "provided"
+
+	rom = header.data + b''.join(banks[name].data for name in BANK_FILES) + chr_data
+	return RomBuildResult(rom=rom, header=header, banks=banks, chr_source=chr_source, warnings=warnings)
+
+
+# ============================================================================
+# MAIN CLI
+# ============================================================================
+
+def main() -> int:
+	"""Main entry point."""
+	parser = argparse.ArgumentParser(description="Dragon Warrior in-process 6502 assembler (Ophis syntax)")
+	parser.add_argument('input', help="Source .asm file, or source directory with --rom")
+	parser.add_argument('output', help="Output binary (or ROM with --rom)")
+	parser.add_argument('--rom', action='store_true', help="Build a full iNES ROM from a source directory")
+	parser.add_argument('--listing', help="Write listing file (or listing directory with --rom)")
+	parser.add_argument('--symbols', help="Write symbol table JSON")
+	parser.add_argument('--reference', help="Reference ROM for CHR-ROM data")
+	parser.add_argument('-D', '--define', action='append', default=[], help="Define a symbol (NAME or NAME=VALUE)")
+	args = parser.parse_args()
+
+	defines: Dict[str, int] = {}
+	for item in args.define:
+		name, _, value = item.partition('=')
+		defines[name] = int(value, 0) if value else 1
+
+	try:
+		if args.rom:
+			result = build_rom(args.input, reference_rom=args.reference, defines=defines)
+			output = Path(args.output)
+			result.write(output.parent, output.name, args.listing)
+			for warning in result.warnings:
+				print(f"Warning: {warning}")
+			print(f"Built {output} ({len(result.rom):,} bytes)")
+		else:
+			result = assemble_file(args.input, defines=defines)
+			Path(args.output).write_bytes(result.data)
+			if args.listing:
+				result.write_listing(args.listing)
+			if args.symbols:
+				result.write_symbols(args.symbols)
+			print(f"Assembled {args.input} -> {args.output} ({len(result.data):,} bytes, {result.passes} passes)")
+	except AssemblerError as e:
+		print(str(e), file=sys.stderr)
+		return 1
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
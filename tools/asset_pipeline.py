@@ -10,9 +10,10 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported as a stage.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import subprocess
 from pathlib import Path
@@ -28,13 +29,14 @@ from rich import print as rprint
 # Add extraction directory to path
 sys.path.append(str(Path(__file__).parent / 'extraction'))
 from data_structures import GameData
+from pipeline_stages import PipelineContext, STAGES, StageResult
 
 console = Console()
 
 class AssetPipeline:
 	"""Complete asset extraction, editing, and reinsertion pipeline"""
 
-	def __init__(self, rom_path: str, output_dir: str = "assets"):
+	def __init__(self, rom_path: str, output_dir: str = "assets", context: Optional[PipelineContext] = None):
 		# Validate ROM file exists and is readable
 		self.rom_path = Path(rom_path)
 		if not self.rom_path.exists():
@@ -72,6 +74,9 @@ class AssetPipeline:
 		except Exception as e:
 			raise IOError(f"Error creating output directory: {e}")
 
+		# Stages share one loaded ROM buffer and parsed assets
+		self.context = context or PipelineContext(rom_path=self.rom_path, assets_dir=self.output_dir)
+
 		# Asset directories
 		self.json_dir = self.output_dir / "json"
 		self.graphics_dir = self.output_dir / "graphics"
@@ -130,59 +135,25 @@ class AssetPipeline:
 
 		return True
 
-	def _run_graphics_extractor(self):
-		"""Run the graphics extractor"""
-		extractor_path = Path(__file__).parent / "extraction" / "graphics_extractor.py"
-
-		if not extractor_path.exists():
-			raise FileNotFoundError(f"Graphics extractor not found: {extractor_path}")
-
-		try:
-			result = subprocess.run([
-				sys.executable, str(extractor_path),
-				str(self.rom_path),
-				"--output-dir", str(self.output_dir)
-			], capture_output=True, text=True, check=True, timeout=300)  # 5 minute timeout
-
-			if result.stdout:
-				console.print(f"[dim]Graphics extractor output: {result.stdout.strip()}[/dim]")
-
-		except subprocess.TimeoutExpired:
-			raise RuntimeError("Graphics extraction timed out (exceeded 5 minutes)")
-		except subprocess.CalledProcessError as e:
-			error_msg = f"Graphics extraction failed (exit code {e.returncode})"
-			if e.stderr:
-				error_msg += f": {e.stderr.strip()}"
-			raise RuntimeError(error_msg)
-		except Exception as e:
-			raise RuntimeError(f"Unexpected error running graphics extractor: {e}")
-
-	def _run_data_extractor(self):
-		"""Run the data extractor"""
-		extractor_path = Path(__file__).parent / "extraction" / "data_extractor.py"
-
-		if not extractor_path.exists():
-			raise FileNotFoundError(f"Data extractor not found: {extractor_path}")
-
-		try:
-			result = subprocess.run([
-				sys.executable, str(extractor_path),
-				str(self.rom_path),
-				"--output-dir", str(self.output_dir)
-			], capture_output=True, text=True, check=True, timeout=300)  # 5 minute timeout
-
-			if result.stdout:
-				console.print(f"[dim]Data extractor output: {result.stdout.strip()}[/dim]")
-
-		except subprocess.TimeoutExpired:
-			raise RuntimeError("Data extraction timed out (exceeded 5 minutes)")
-		except subprocess.CalledProcessError as e:
-			error_msg = f"Data extraction failed (exit code {e.returncode})"
-			if e.stderr:
-				error_msg += f": {e.stderr.strip()}"
-			raise RuntimeError(error_msg)
-		except Exception as e:
-			raise RuntimeError(f"Unexpected error running data extractor: {e}")
+	def _run_graphics_extractor(self) -> StageResult:
+		"""Run the graphics extractor stage"""
+		result = STAGES.run('extract_graphics', self.context, output_dir=self.output_dir)
+		if not result.success:
+			raise RuntimeError(f"Graphics extraction failed: {result.error}")
+
+		counts = ', '.join(f"{count} {name}" for name, count in result.data['counts'].items())
+		console.print(f"[dim]Graphics extractor: {counts} ({result.duration:.2f}s)[/dim]")
+		return result
+
+	def _run_data_extractor(self) -> StageResult:
+		"""Run the data extractor stage"""
+		result = STAGES.run('extract_data', self.context, output_dir=self.output_dir)
+		if not result.success:
+			raise RuntimeError(f"Data extraction failed: {result.error}")
+
+		counts = ', '.join(f"{count} {name}" for name, count in result.data['counts'].items())
+		console.print(f"[dim]Data extractor: {counts} ({result.duration:.2f}s)[/dim]")
+		return result
 
 	def _merge_data_files(self):
 		"""Merge all extracted data into complete game data"""
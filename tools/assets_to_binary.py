@@ -575,6 +575,16 @@ class BinaryPackager:
 		results['items.dwdata'] = self.package_items()
 		results['graphics.dwdata'] = self.package_graphics()
 
+		# Keep an existing .dwpack in step with the new .dwdata files
+		if any(results.values()):
+			from dwpack import DWPackError, refresh_pack
+			try:
+				pack_path = refresh_pack(self.output_dir)
+				if pack_path:
+					print(f"\n✓ Updated {pack_path}")
+			except (OSError, DWPackError) as e:
+				print(f"\n⚠ Could not update .dwpack: {e}")
+
 		return results
 
 
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Incremental Bank Builder
+
+Assembles each PRG bank into a cached object and links the objects into
+an iNES ROM, so editing one bank (or one generated table it includes)
+only reassembles that bank.
+
+Object model:
+- Each BankNN.asm (and Header.asm) is assembled on its own into a
+  BankObject: bytes, exported labels, and relocations for every value
+  that came from a ROM-space .alias (the sources' cross-bank forward
+  declarations, e.g. `.alias WaitForNMI $FF74` in Bank00).
+- Objects are keyed by a content hash of the bank's full include
+  closure and stored through BuildCache artifacts.
+- The link step binds each import to the exporting bank's actual label
+  address, re-encodes the affected bytes, and concatenates header, PRG
+  banks and CHR-ROM. Moving a routine in Bank03 therefore relinks the
+  other banks without reassembling them.
+
+Usage:
+	from bank_linker import IncrementalBankBuilder
+	from build_system_advanced import BuildCache
+
+	builder = IncrementalBankBuilder("source_files", BuildCache(Path("build/.cache")))
+	result = builder.build()
+	print(result.rebuilt, len(result.rom))
+
+	python tools/bank_linker.py source_files output/dragon_warrior.nes
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import base64
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
+from dataclasses import dataclass, field
+
+from assembler import (
+	AssemblerError, AssemblyResult, Relocation, Expr,
+	assemble_file, include_closure, load_chr_rom, evaluate,
+	HEADER_FILE, BANK_FILES, HEADER_SIZE, PRG_BANK_SIZE,
+)
+
+
+# Bump when the object layout or assembler output changes
+OBJECT_FORMAT_VERSION = 1
+
+# Banks 0-2 are switched in at $8000; bank 3 is fixed at $C000
+FIXED_BANK_START = 0xC000
+
+
+# ============================================================================
+# BANK OBJECTS
+# ============================================================================
+
+@dataclass
+class BankObject:
+	"""Assembled bank with exports and relocatable imports."""
+	name: str
+	key: str
+	origin: int
+	data: bytes
+	labels: Dict[str, int] = field(default_factory=dict)
+	aliases: Dict[str, int] = field(default_factory=dict)
+	alias_exprs: Dict[str, Expr] = field(default_factory=dict)
+	relocations: List[Relocation] = field(default_factory=list)
+	includes: List[str] = field(default_factory=list)
+
+	@property
+	def exports(self) -> Dict[str, int]:
+		"""Labels other banks may reference."""
+		return self.labels
+
+	@property
+	def imports(self) -> List[str]:
+		"""ROM-space aliases whose values were emitted into this bank."""
+		return sorted({name for reloc in self.relocations for name in reloc.symbols})
+
+	@property
+	def is_fixed_bank(self) -> bool:
+		"""Whether the bank lives at $C000-$FFFF."""
+		return self.origin >= FIXED_BANK_START
+
+	@classmethod
+	def from_result(cls, name: str, key: str, result: AssemblyResult) -> 'BankObject':
+		"""Build an object from a fresh assembly."""
+		return cls(
+			name=name,
+			key=key,
+			origin=result.origin,
+			data=result.data,
+			labels=dict(result.labels),
+			aliases=dict(result.aliases),
+			alias_exprs=dict(result.alias_exprs),
+			relocations=list(result.relocations),
+			includes=[str(p) for p in result.includes],
+		)
+
+	def to_symbol_dict(self) -> Dict[str, Any]:
+		"""Symbol table in the same shape as AssemblyResult.to_symbol_dict()."""
+		return {
+			'source': self.name,
+			'size': len(self.data),
+			'labels': {name: f"${value:04X}" for name, value in sorted(self.labels.items(), key=lambda kv: (kv[1], kv[0]))},
+			'aliases': {name: f"${value:04X}" for name, value in sorted(self.aliases.items())},
+		}
+
+	def to_dict(self) -> Dict[str, Any]:
+		"""Serialize for the build cache."""
+		return {
+			'version': OBJECT_FORMAT_VERSION,
+			'name': self.name,
+			'key': self.key,
+			'origin': self.origin,
+			'data': base64.b64encode(self.data).decode('ascii'),
+			'labels': self.labels,
+			'aliases': self.aliases,
+			'alias_exprs': self.alias_exprs,
+			'relocations': [[r.offset, r.kind, r.pc, r.expr, list(r.symbols)] for r in self.relocations],
+			'includes': self.includes,
+		}
+
+	@classmethod
+	def from_dict(cls, data: Dict[str, Any]) -> Optional['BankObject']:
+		"""Deserialize a cached object (None if the format is outdated)."""
+		if data.get('version') != OBJECT_FORMAT_VERSION:
+			return None
+		return cls(
+			name=data['name'],
+			key=data['key'],
+			origin=data['origin'],
+			data=base64.b64decode(data['data']),
+			labels=data['labels'],
+			aliases=data['aliases'],
+			alias_exprs=data['alias_exprs'],
+			relocations=[Relocation(offset, kind, pc, expr, tuple(symbols))
+						 for offset, kind, pc, expr, symbols in data['relocations']],
+			includes=data['includes'],
+		)
+
+
+@dataclass
+class LinkResult:
+	"""Linked ROM plus incremental build bookkeeping."""
+	rom: bytes
+	objects: Dict[str, BankObject]
+	rebuilt: List[str] = field(default_factory=list)
+	bindings: Dict[str, Dict[str, int]] = field(default_factory=dict)
+	stale_declarations: List[Tuple[str, str, int, int]] = field(default_factory=list)
+	assembled: Dict[str, AssemblyResult] = field(default_factory=dict)
+	chr_source: str = ""
+	warnings: List[str] = field(default_factory=list)
+
+	def write(self, output_dir: Union[str, Path], rom_name: str = "dragon_warrior_modified.nes",
+			  listing_dir: Optional[Union[str, Path]] = None) -> Path:
+		"""Write the ROM; listings for rebuilt banks and symbols for all banks."""
+		output_dir = Path(output_dir)
+		output_dir.mkdir(parents=True, exist_ok=True)
+		rom_path = output_dir / rom_name
+		temp_path = rom_path.with_suffix(rom_path.suffix + '.tmp')
+		temp_path.write_bytes(self.rom)
+		temp_path.replace(rom_path)
+
+		if listing_dir is not None:
+			listing_dir = Path(listing_dir)
+			listing_dir.mkdir(parents=True, exist_ok=True)
+			for name, result in self.assembled.items():
+				result.write_listing(listing_dir / f"{Path(name).stem.lower()}.lst")
+			for name, obj in self.objects.items():
+				with open(listing_dir / f"{Path(name).stem.lower()}.sym.json", 'w', encoding='utf-8') as f:
+					json.dump(obj.to_symbol_dict(), f, indent=2)
+		return rom_path
+
+
+# ============================================================================
+# INCREMENTAL BUILDER
+# ============================================================================
+
+class IncrementalBankBuilder:
+	"""Assemble banks through a content-addressed object cache and link them.
+
+	cache must provide get_file_hash(), get_artifact() and
+	store_artifact() (see build_system_advanced.BuildCache).
+	"""
+
+	def __init__(self, source_dir: Union[str, Path], cache: Any,
+				 defines: Optional[Dict[str, int]] = None,
+				 loader: Optional[Callable[[Path], str]] = None):
+		self.source_dir = Path(source_dir)
+		self.cache = cache
+		self.defines = dict(defines or {})
+		self.loader = loader
+		# Latest object per bank, so long-lived builders (watch mode) skip decoding
+		self._objects: Dict[str, BankObject] = {}
+
+	def object_key(self, file_name: str) -> str:
+		"""Content hash of a bank's include closure and build options."""
+		hasher = hashlib.sha256()
+		hasher.update(f"bank-object-v{OBJECT_FORMAT_VERSION}:{file_name}".encode())
+		for name, value in sorted(self.defines.items()):
+			hasher.update(f"define:{name}={value}".encode())
+
+		# Loaders that patch sources in memory (source_overlay.SourceOverlay) identify their patches
+		overlay_digest = getattr(self.loader, 'overlay_digest', None)
+
+		root = self.source_dir.resolve()
+		for path in include_closure(self.source_dir / file_name, [self.source_dir], self.loader):
+			try:
+				relative = path.relative_to(root)
+			except ValueError:
+				relative = path
+			hasher.update(str(relative).replace('\\', '/').encode())
+			hasher.update(self.cache.get_file_hash(path).encode())
+			if overlay_digest is not None:
+				hasher.update(overlay_digest(path).encode())
+		return hasher.hexdigest()
+
+	def load_object(self, file_name: str) -> Tuple[BankObject, Optional[AssemblyResult]]:
+		"""Return a bank object, assembling it only on a cache miss.
+
+		Returns (object, assembly result or None if it came from cache).
+		"""
+		key = self.object_key(file_name)
+		remembered = self._objects.get(file_name)
+		if remembered is not None and remembered.key == key:
+			return remembered, None
+
+		cached = self.cache.get_artifact(f"bank-{key}")
+		if cached is not None:
+			obj = BankObject.from_dict(cached)
+			if obj is not None:
+				self._objects[file_name] = obj
+				return obj, None
+
+		result = assemble_file(self.source_dir / file_name, [self.source_dir], self.defines, self.loader)
+		obj = BankObject.from_result(file_name, key, result)
+		self.cache.store_artifact(f"bank-{key}", obj.to_dict())
+		self._objects[file_name] = obj
+		return obj, result
+
+	def resolve_imports(self, objects: Dict[str, BankObject]) -> Tuple[Dict[str, Dict[str, int]], List[Tuple[str, str, int, int]]]:
+		"""Bind every bank's imports to exporting banks' labels.
+
+		An alias declared in the fixed bank's range ($C000+) binds to the
+		fixed bank; one declared in $8000-$BFFF binds to the single
+		switchable bank exporting that name. Ambiguous or unknown names keep
+		their declared value.
+
+		Returns (bindings per bank, stale declarations as
+		(bank, name, declared, actual)).
+		"""
+		banks = {name: obj for name, obj in objects.items() if name != HEADER_FILE}
+		bindings: Dict[str, Dict[str, int]] = {}
+		stale: List[Tuple[str, str, int, int]] = []
+
+		for name, obj in banks.items():
+			bound: Dict[str, int] = {}
+			for symbol in obj.imports:
+				declared = obj.aliases.get(symbol)
+				if declared is None:
+					continue
+				wants_fixed = declared >= FIXED_BANK_START
+				exporters = [other for other_name, other in banks.items()
+							 if other_name != name and symbol in other.labels
+							 and other.is_fixed_bank == wants_fixed]
+				if len(exporters) != 1:
+					continue
+				actual = exporters[0].labels[symbol]
+				bound[symbol] = actual
+				if actual != declared:
+					stale.append((name, symbol, declared, actual))
+			bindings[name] = bound
+		return bindings, stale
+
+	def _patch(self, obj: BankObject, bound: Dict[str, int]) -> bytes:
+		"""Re-encode relocations whose imports were rebound."""
+		if not bound:
+			return obj.data
+		data = bytearray(obj.data)
+
+		def lookup(name: str) -> int:
+			if name in bound:
+				return bound[name]
+			if name in obj.labels:
+				return obj.labels[name]
+			if name in obj.alias_exprs:
+				return evaluate(obj.alias_exprs[name], lookup)
+			if self.defines.get(name) is not None:
+				return self.defines[name]
+			raise AssemblerError(f"Undefined label '{name}'", obj.name, None)
+
+		for reloc in obj.relocations:
+			if not any(symbol in bound for symbol in reloc.symbols):
+				continue
+			value = evaluate(reloc.expr, lookup)
+			if reloc.kind == 'word':
+				if not -0x8000 <= value <= 0xFFFF:
+					raise AssemblerError(f"Range error: value {value} does not fit in a word", obj.name, None)
+				data[reloc.offset] = value & 0xFF
+				data[reloc.offset + 1] = (value >> 8) & 0xFF
+			elif reloc.kind == 'rel':
+				offset = value - (reloc.pc + 2)
+				if not -128 <= offset <= 127:
+					raise AssemblerError(f"Range error: value branch to ${value & 0xFFFF:04X} is out of range",
+										 obj.name, None)
+				data[reloc.offset] = offset & 0xFF
+			else:
+				if not -128 <= value <= 0xFF:
+					raise AssemblerError(f"Range error: value {value} does not fit in a byte", obj.name, None)
+				data[reloc.offset] = value & 0xFF
+		return bytes(data)
+
+	def link(self, objects: Dict[str, BankObject], chr_data: bytes) -> LinkResult:
+		"""Resolve imports, patch relocations and concatenate the ROM image."""
+		header = objects[HEADER_FILE]
+		if len(header.data) != HEADER_SIZE:
+			raise AssemblerError(f"Header should be {HEADER_SIZE} bytes, got {len(header.data)}", HEADER_FILE, None)
+
+		bindings, stale = self.resolve_imports(objects)
+		parts = [header.data]
+		for name in BANK_FILES:
+			data = self._patch(objects[name], bindings.get(name, {}))
+			if len(data) != PRG_BANK_SIZE:
+				raise AssemblerError(f"{name} is {len(data)} bytes (expected {PRG_BANK_SIZE})", name, None)
+			parts.append(data)
+		parts.append(chr_data)
+
+		return LinkResult(rom=b''.join(parts), objects=objects, bindings=bindings, stale_declarations=stale)
+
+	def build(self, chr_data: Optional[bytes] = None,
+			  reference_rom: Optional[Union[str, Path]] = None) -> LinkResult:
+		"""Assemble changed banks, reuse cached ones, and link."""
+		objects: Dict[str, BankObject] = {}
+		assembled: Dict[str, AssemblyResult] = {}
+		for name in (HEADER_FILE,) + BANK_FILES:
+			obj, result = self.load_object(name)
+			objects[name] = obj
+			if result is not None:
+				assembled[name] = result
+
+		warnings: List[str] = []
+		if chr_data is None:
+			chr_data, chr_source, chr_warnings = load_chr_rom(self.source_dir, reference_rom)
+			warnings.extend(chr_warnings)
+		else:
+			chr_source = "provided"
+
+		result = self.link(objects, chr_data)
+		result.rebuilt = list(assembled)
+		result.assembled = assembled
+		result.chr_source = chr_source
+		result.warnings = warnings + [
+			f"{bank}: forward declaration {name} = ${declared:04X} is stale, linked to ${actual:04X}"
+			for bank, name, declared, actual in result.stale_declarations
+		]
+		return result
+
+
+# ============================================================================
+# MAIN CLI
+# ============================================================================
+
+def main() -> int:
+	"""Main entry point."""
+	from build_system_advanced import BuildCache
+
+	parser = argparse.ArgumentParser(description="Incremental per-bank ROM build")
+	parser.add_argument('source_dir', help="Directory containing Header.asm and BankNN.asm")
+	parser.add_argument('output', help="Output ROM path")
+	parser.add_argument('--cache-dir', default="build/.cache", help="Build cache directory")
+	parser.add_argument('--reference', help="Reference ROM for CHR-ROM data")
+	parser.add_argument('--listing', help="Directory for listings of rebuilt banks and symbol tables")
+	args = parser.parse_args()
+
+	builder = IncrementalBankBuilder(args.source_dir, BuildCache(Path(args.cache_dir)))
+	try:
+		result = builder.build(reference_rom=args.reference)
+	except AssemblerError as e:
+		print(str(e), file=sys.stderr)
+		return 1
+
+	output = Path(args.output)
+	result.write(output.parent, output.name, args.listing)
+	for warning in result.warnings:
+		print(f"Warning: {warning}")
+	rebuilt = ', '.join(result.rebuilt) if result.rebuilt else "none (all cached)"
+	print(f"Rebuilt: {rebuilt}")
+	print(f"Built {output} ({len(result.rom):,} bytes)")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -60,14 +60,13 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
 import hashlib
-import binascii
 import zlib
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
@@ -76,6 +75,11 @@ from enum import Enum
 import argparse
 from datetime import datetime
 
+from bps_delta import create_bps_patch
+from patch_validator import validate_directory
+from patch_engine import (PatchError, apply_patch_bytes, apply_patch_file, decode_number,
+						  detect_format, encode_number)
+
 
 # ============================================================================
 # DATA STRUCTURES
@@ -219,91 +223,7 @@ class IPSPatcher:
 	@staticmethod
 	def apply_patch(patch: bytes, source: bytes) -> PatchResult:
 		"""Apply IPS patch to source data."""
-		result = PatchResult(success=False)
-
-		# Verify header
-		if not patch.startswith(IPSPatcher.MAGIC_HEADER):
-			result.errors.append("Invalid IPS header")
-			return result
-
-		# Parse patch
-		output = bytearray(source)
-		offset = 5  # Skip "PATCH"
-		truncate_size = None
-
-		while offset < len(patch):
-			# Check for EOF
-			if patch[offset:offset + 3] == IPSPatcher.MAGIC_EOF:
-				# Check for truncation marker
-				if offset + 3 + 3 <= len(patch):
-					truncate_size = struct.unpack('>I', b'\x00' + patch[offset + 3:offset + 6])[0]
-				break
-
-			if offset + 3 > len(patch):
-				result.errors.append("Unexpected end of patch (offset)")
-				return result
-
-			# Read offset (3 bytes, big-endian)
-			patch_offset = struct.unpack('>I', b'\x00' + patch[offset:offset + 3])[0]
-			offset += 3
-
-			if offset + 2 > len(patch):
-				result.errors.append("Unexpected end of patch (size)")
-				return result
-
-			# Read size (2 bytes, big-endian)
-			size = struct.unpack('>H', patch[offset:offset + 2])[0]
-			offset += 2
-
-			if size == 0:
-				# RLE record
-				if offset + 2 > len(patch):
-					result.errors.append("Unexpected end of patch (RLE size)")
-					return result
-
-				rle_size = struct.unpack('>H', patch[offset:offset + 2])[0]
-				offset += 2
-
-				if offset + 1 > len(patch):
-					result.errors.append("Unexpected end of patch (RLE byte)")
-					return result
-
-				rle_byte = patch[offset]
-				offset += 1
-
-				# Expand output if needed
-				required_size = patch_offset + rle_size
-				if len(output) < required_size:
-					output.extend(b'\x00' * (required_size - len(output)))
-
-				# Apply RLE
-				output[patch_offset:patch_offset + rle_size] = bytes([rle_byte] * rle_size)
-
-			else:
-				# Regular record
-				if offset + size > len(patch):
-					result.errors.append("Unexpected end of patch (data)")
-					return result
-
-				data = patch[offset:offset + size]
-				offset += size
-
-				# Expand output if needed
-				required_size = patch_offset + size
-				if len(output) < required_size:
-					output.extend(b'\x00' * (required_size - len(output)))
-
-				# Apply patch
-				output[patch_offset:patch_offset + size] = data
-
-		# Apply truncation
-		if truncate_size is not None:
-			output = output[:truncate_size]
-			result.warnings.append(f"File truncated to {truncate_size} bytes")
-
-		result.output_data = bytes(output)
-		result.success = True
-		return result
+		return _engine_result(patch, source, 'ips')
 
 	@staticmethod
 	def inspect_patch(patch: bytes) -> PatchMetadata:
@@ -388,172 +308,41 @@ class BPSPatcher:
 
 	@staticmethod
 	def create_patch(source: bytes, target: bytes) -> bytes:
-		"""Create BPS patch from source to target."""
-		patch = bytearray(BPSPatcher.MAGIC_HEADER)
-
-		# Write sizes (variable-length encoding)
-		patch.extend(BPSPatcher._encode_number(len(source)))
-		patch.extend(BPSPatcher._encode_number(len(target)))
-
-		# Metadata size (0 for now)
-		patch.extend(BPSPatcher._encode_number(0))
-
-		# Find differences
-		source_offset = 0
-		target_offset = 0
-
-		while target_offset < len(target):
-			# Find matching region
-			match_length = 0
-			while (target_offset + match_length < len(target) and
-				   source_offset + match_length < len(source) and
-				   target[target_offset + match_length] == source[source_offset + match_length]):
-				match_length += 1
-
-			if match_length > 0:
-				# SourceRead command
-				patch.append(0)  # Action: SourceRead
-				patch.extend(BPSPatcher._encode_number(match_length))
-				source_offset += match_length
-				target_offset += match_length
-			else:
-				# Find different region
-				diff_length = 0
-				while (target_offset + diff_length < len(target) and
-					   (source_offset + diff_length >= len(source) or
-						target[target_offset + diff_length] != source[source_offset + diff_length])):
-					diff_length += 1
-					if diff_length >= 1024:  # Limit chunk size
-						break
-
-				# TargetRead command
-				patch.append(1)  # Action: TargetRead
-				patch.extend(BPSPatcher._encode_number(diff_length))
-				patch.extend(target[target_offset:target_offset + diff_length])
-
-				target_offset += diff_length
-				source_offset += diff_length
-
-		# Add checksums
-		source_crc = binascii.crc32(source) & 0xffffffff
-		target_crc = binascii.crc32(target) & 0xffffffff
-		patch_crc = binascii.crc32(bytes(patch)) & 0xffffffff
-
-		patch.extend(struct.pack('<I', source_crc))
-		patch.extend(struct.pack('<I', target_crc))
-		patch.extend(struct.pack('<I', patch_crc))
-
-		return bytes(patch)
+		"""Create BPS patch from source to target (SourceRead/Copy, TargetRead/Copy)."""
+		return create_bps_patch(source, target)
 
 	@staticmethod
 	def _encode_number(value: int) -> bytes:
 		"""Variable-length integer encoding."""
-		result = bytearray()
-
-		while True:
-			byte = value & 0x7f
-			value >>= 7
-
-			if value == 0:
-				result.append(byte | 0x80)
-				break
-			else:
-				result.append(byte)
-
-		return bytes(result)
+		return encode_number(value)
 
 	@staticmethod
 	def _decode_number(data: bytes, offset: int) -> Tuple[int, int]:
 		"""Decode variable-length integer."""
-		value = 0
-		shift = 0
-
-		while offset < len(data):
-			byte = data[offset]
-			offset += 1
-
-			value |= (byte & 0x7f) << shift
-
-			if byte & 0x80:
-				break
-
-			shift += 7
-
-		return value, offset
+		return decode_number(data, offset)
 
 	@staticmethod
 	def apply_patch(patch: bytes, source: bytes) -> PatchResult:
 		"""Apply BPS patch to source data."""
-		result = PatchResult(success=False)
-
-		# Verify header
-		if not patch.startswith(BPSPatcher.MAGIC_HEADER):
-			result.errors.append("Invalid BPS header")
-			return result
-
-		# Verify patch CRC
-		patch_crc_stored = struct.unpack('<I', patch[-12:-8])[0]
-		patch_crc_calc = binascii.crc32(patch[:-12]) & 0xffffffff
-
-		if patch_crc_stored != patch_crc_calc:
-			result.errors.append(f"Patch CRC mismatch: {patch_crc_calc:08X} != {patch_crc_stored:08X}")
-			return result
-
-		# Read metadata
-		offset = 4
-		source_size, offset = BPSPatcher._decode_number(patch, offset)
-		target_size, offset = BPSPatcher._decode_number(patch, offset)
-		metadata_size, offset = BPSPatcher._decode_number(patch, offset)
-
-		# Skip metadata
-		offset += metadata_size
-
-		# Verify source CRC
-		source_crc_stored = struct.unpack('<I', patch[-12:-8])[0]
-		source_crc_calc = binascii.crc32(source) & 0xffffffff
-
-		if source_crc_stored != source_crc_calc:
-			result.errors.append(f"Source CRC mismatch: {source_crc_calc:08X} != {source_crc_stored:08X}")
-			result.crc_match = False
-			# Continue anyway (warning only)
-
-		# Apply patch
-		output = bytearray(target_size)
-		source_offset = 0
-		target_offset = 0
-
-		while offset < len(patch) - 12:  # Stop before checksums
-			action = patch[offset] & 0x03
-			offset += 1
-
-			if action == 0:
-				# SourceRead
-				length, offset = BPSPatcher._decode_number(patch, offset)
-				output[target_offset:target_offset + length] = source[source_offset:source_offset + length]
-				source_offset += length
-				target_offset += length
-
-			elif action == 1:
-				# TargetRead
-				length, offset = BPSPatcher._decode_number(patch, offset)
-				output[target_offset:target_offset + length] = patch[offset:offset + length]
-				offset += length
-				target_offset += length
-
-			# Actions 2-3 (SourceCopy, TargetCopy) not implemented for simplicity
-
-		# Verify target CRC
-		target_crc_stored = struct.unpack('<I', patch[-8:-4])[0]
-		target_crc_calc = binascii.crc32(bytes(output)) & 0xffffffff
-
-		if target_crc_stored != target_crc_calc:
-			result.errors.append(f"Target CRC mismatch: {target_crc_calc:08X} != {target_crc_stored:08X}")
-			result.crc_match = False
-
-		result.output_data = bytes(output)
-		result.success = len(result.errors) == 0
+		return _engine_result(patch, source, 'bps')
+
+
+def _engine_result(patch: bytes, source: bytes, format: str) -> PatchResult:
+	"""Apply a patch with patch_engine, reporting problems in a PatchResult."""
+	result = PatchResult(success=False)
+	try:
+		applied = apply_patch_bytes(patch, source, format, strict=False)
+	except PatchError as e:
+		result.errors.append(str(e))
 		return result
 
+	result.output_data = applied.data
+	result.warnings.extend(applied.warnings)
+	result.errors.extend(str(mismatch) for mismatch in applied.mismatches)
+	result.crc_match = applied.crc_match
+	result.success = not result.errors
+	return result
+
 
 # ============================================================================
 # PATCH MANAGER
@@ -568,12 +357,8 @@ class PatchManager:
 		with open(patch_path, 'rb') as f:
 			header = f.read(5)
 
-		if header.startswith(IPSPatcher.MAGIC_HEADER):
-			return PatchFormat.IPS
-		elif header.startswith(BPSPatcher.MAGIC_HEADER):
-			return PatchFormat.BPS
-		else:
-			return PatchFormat.AUTO
+		format = detect_format(header)
+		return PatchFormat(format) if format else PatchFormat.AUTO
 
 	@staticmethod
 	def create_patch(source_path: str, target_path: str, output_path: str,
@@ -618,42 +403,21 @@ class PatchManager:
 
 		print(f"Detected {format.value.upper()} patch format")
 
-		# Load files
-		with open(patch_path, 'rb') as f:
-			patch = f.read()
-
-		with open(source_path, 'rb') as f:
-			source = f.read()
-
-		# Apply patch
-		if format == PatchFormat.IPS:
-			result = IPSPatcher.apply_patch(patch, source)
-		elif format == PatchFormat.BPS:
-			result = BPSPatcher.apply_patch(patch, source)
-		else:
-			print(f"ERROR: Unsupported format: {format}")
-			return False
-
-		# Check result
-		if not result.success:
+		# Stream the patch into a memory-mapped output; CRCs are checked on the
+		# way and nothing is written if they do not match
+		try:
+			result = apply_patch_file(patch_path, source_path, output_path, format.value)
+		except (PatchError, OSError) as e:
 			print("ERROR: Patch application failed")
-			for error in result.errors:
-				print(f"  ✗ {error}")
+			print(f"  ✗ {e}")
 			return False
 
-		if result.warnings:
-			for warning in result.warnings:
-				print(f"  ⚠️  {warning}")
-
-		if not result.crc_match:
-			print("  ⚠️  CRC mismatch (output may be incorrect)")
-
-		# Save output
-		with open(output_path, 'wb') as f:
-			f.write(result.output_data)
+		for warning in result.warnings:
+			print(f"  ⚠️  {warning}")
 
 		print(f"✓ Patch applied successfully: {output_path}")
-		print(f"  Output size: {len(result.output_data):,} bytes")
+		print(f"  Output size: {result.output_size:,} bytes")
+		print(f"  Output CRC32: {result.target_crc32:08X}")
 
 		return True
 
@@ -739,6 +503,13 @@ def main():
 	inspect_parser = subparsers.add_parser('inspect', help='Inspect patch')
 	inspect_parser.add_argument('patch', help='Patch file to inspect')
 
+	# Validate a directory of patches
+	validate_parser = subparsers.add_parser('validate', help='Validate a directory of patches against a base ROM')
+	validate_parser.add_argument('base', help='Base ROM')
+	validate_parser.add_argument('directory', help='Directory of patches')
+	validate_parser.add_argument('--report', default='patch_report.json', help='JSON report file')
+	validate_parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+
 	args = parser.parse_args()
 
 	if not args.command:
@@ -759,6 +530,14 @@ def main():
 		PatchManager.inspect_patch(args.patch)
 		return 0
 
+	elif args.command == 'validate':
+		report = validate_directory(args.base, args.directory, workers=args.workers)
+		report.save(args.report)
+		print(f"{len(report.patches) - len(report.failed)}/{len(report.patches)} patches valid -> {args.report}")
+		for entry in report.failed:
+			print(f"  ❌ {entry.path}: {entry.error or '; '.join(entry.mismatches)}")
+		return 1 if report.failed else 0
+
 	return 0
 
 
@@ -22,9 +22,10 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported by other tools.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import json
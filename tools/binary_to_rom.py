@@ -20,9 +20,10 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported by other tools.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
@@ -33,6 +34,10 @@ from typing import Dict, List, Tuple
 import argparse
 from datetime import datetime
 
+from dwpack import Section
+from reinsertion_plan import ReinsertionError, apply_plan, count_changes, plan_reinsertion
+from rom_manifest import RomManifest, refresh_manifest
+
 # Constants
 MAGIC = b'DWDT'
 
@@ -144,6 +149,7 @@ class ROMModifier:
 		self.binary_dir = binary_dir
 		self.rom_data = None
 		self.modifications = []
+		self.modification_log = None
 
 	def load_rom(self) -> bool:
 		"""
@@ -207,16 +213,130 @@ class ROMModifier:
 		if not reader.load():
 			return False, {}
 
-		data = reader.get_data_section()
-		rom_offset = reader.header['rom_offset']
-		data_size = reader.header['data_size']
-		data_type = reader.get_type_name()
+		return self._reinsert(os.path.basename(dwdata_path), reader.get_type_name(), reader.get_data_section(),
+							  reader.header['rom_offset'], reader.header['crc32'])
+
+	def reinsert_pack(self, pack_path: str, names: List[str]) -> Dict[str, Tuple[bool, Dict]]:
+		"""
+		Reinsert sections from a .dwpack container (one open, one mapping)
+
+		Args:
+			pack_path: Path to .dwpack file
+			names: Section names to reinsert
+
+		Returns:
+			Dict mapping section filenames to (success, info) tuples
+		"""
+		sections, results = self.load_pack_sections(pack_path, names)
+		results.update(self.reinsert_sections(sections))
+		return {f"{name}.dwdata": results[f"{name}.dwdata"] for name in names}
+
+	def load_pack_sections(self, pack_path: str, names: List[str]) -> Tuple[List[Section], Dict[str, Tuple[bool, Dict]]]:
+		"""
+		Read and CRC-check sections from a .dwpack container
+
+		Returns:
+			Tuple of (valid sections, failures keyed by section filename)
+		"""
+		from dwpack import DWPack, DWPackError
+
+		sections = []
+		failures = {}
+		try:
+			pack = DWPack(pack_path)
+		except (OSError, DWPackError) as e:
+			print(f"❌ Cannot open {pack_path}: {e}")
+			return [], {f"{name}.dwdata": (False, {}) for name in names}
+
+		with pack:
+			for name in names:
+				filename = f"{name}.dwdata"
+				if name not in pack:
+					print(f"\n⚠ Skipping {filename} (not in pack)")
+					failures[filename] = (False, {})
+				elif not pack.verify(name)[name]:
+					print(f"\n❌ {filename}: CRC mismatch in pack")
+					failures[filename] = (False, {})
+				else:
+					sections.append(pack.section(name))
+		return sections, failures
+
+	def load_dwdata_sections(self, filenames: List[str]) -> Tuple[List[Section], Dict[str, Tuple[bool, Dict]]]:
+		"""
+		Read and validate .dwdata files from binary_dir
+
+		Returns:
+			Tuple of (valid sections, failures keyed by filename)
+		"""
+		sections = []
+		failures = {}
+		for filename in filenames:
+			path = os.path.join(self.binary_dir, filename)
+			if not os.path.exists(path):
+				print(f"\n⚠ Skipping {filename} (not found)")
+				failures[filename] = (False, {})
+				continue
+			reader = BinaryReader(path)
+			if not reader.load():
+				failures[filename] = (False, {})
+				continue
+			sections.append(Section(os.path.splitext(filename)[0], reader.header['data_type'],
+									reader.header['rom_offset'], reader.get_data_section()))
+		return sections, failures
+
+	def reinsert_sections(self, sections: List[Section]) -> Dict[str, Tuple[bool, Dict]]:
+		"""
+		Reinsert several sections in one pass
+
+		All sections are checked against the ROM size and each other first;
+		overlapping or out-of-bounds sections are rejected and not written.
+		The resulting ModificationLog is kept in self.modification_log.
+
+		Returns:
+			Dict mapping section filenames to (success, info) tuples
+		"""
+		plan = plan_reinsertion(sections, len(self.rom_data))
+		results = {}
+
+		for section in plan.out_of_bounds:
+			print(f"\n❌ {section.name}.dwdata: offset out of bounds "
+				  f"(0x{section.rom_offset:04X}+{len(section.data)} > {len(self.rom_data)})")
+		for conflict in plan.conflicts:
+			print(f"\n❌ Overlapping sections: {conflict}")
+		for name in plan.rejected:
+			results[f"{name}.dwdata"] = (False, {})
+
+		log = apply_plan(self.rom_data, plan)
+		self.modification_log = log
+
+		for mod in log.modifications:
+			mod_info = {
+				'type': TYPE_NAMES.get(mod.data_type, "Unknown"),
+				'offset': mod.offset,
+				'size': mod.size,
+				'changes': mod.changes,
+				'percent': mod.percent,
+				'crc32': mod.crc32
+			}
+			self.modifications.append(mod_info)
+			results[f"{mod.name}.dwdata"] = (True, mod_info)
+
+			print(f"\n--- Reinserted {mod_info['type']} Data ({mod.name}.dwdata) ---")
+			print(f"  ROM Offset: 0x{mod.offset:04X}, {mod.size} bytes, CRC32 {mod.crc32:08X}")
+			print(f"  ✓ Changed: {mod.changes} bytes ({mod.percent:.1f}%)")
+
+		return results
+
+	def _reinsert(self, source: str, data_type: str, data: bytes, rom_offset: int,
+				  crc32: int) -> Tuple[bool, Dict]:
+		"""Copy one data section into the ROM and record the change"""
+		data_size = len(data)
 
 		print(f"\n--- Reinserting {data_type} Data ---")
-		print(f"  Source: {os.path.basename(dwdata_path)}")
+		print(f"  Source: {source}")
 		print(f"  ROM Offset: 0x{rom_offset:04X}")
 		print(f"  Data Size: {data_size} bytes")
-		print(f"  CRC32: {reader.header['crc32']:08X}")
+		print(f"  CRC32: {crc32:08X}")
 
 		# Verify offset is valid
 		if rom_offset + data_size > len(self.rom_data):
@@ -229,7 +349,7 @@ class ROMModifier:
 		original_data = bytes(self.rom_data[rom_offset:rom_offset + data_size])
 
 		# Count changes
-		changes = sum(1 for i in range(data_size) if original_data[i] != data[i])
+		changes = count_changes(original_data, data)
 		change_percent = (changes / data_size) * 100 if data_size > 0 else 0
 
 		# Reinsert data
@@ -242,7 +362,7 @@ class ROMModifier:
 			'size': data_size,
 			'changes': changes,
 			'percent': change_percent,
-			'crc32': reader.header['crc32']
+			'crc32': crc32
 		}
 
 		self.modifications.append(mod_info)
@@ -256,9 +376,16 @@ class ROMModifier:
 		"""
 		Reinsert all .dwdata files
 
+		binary_dir may also be a .dwpack file, in which case the sections
+		come from the pack. A pack inside binary_dir (dwpack.PACK_FILE) is
+		only used when it is at least as new as every .dwdata file there,
+		so a stale pack never overrides later edits.
+
 		Returns:
 			Dict mapping filenames to (success, info) tuples
 		"""
+		from dwpack import current_pack
+
 		files = [
 			'monsters.dwdata',
 			'spells.dwdata',
@@ -266,19 +393,34 @@ class ROMModifier:
 			'graphics.dwdata'
 		]
 
-		results = {}
+		pack_path = self.binary_dir if self.binary_dir.endswith('.dwpack') else current_pack(self.binary_dir)
+		if pack_path is not None:
+			return self.reinsert_pack(pack_path, [os.path.splitext(filename)[0] for filename in files])
 
-		for filename in files:
-			path = os.path.join(self.binary_dir, filename)
+		sections, results = self.load_dwdata_sections(files)
+		results.update(self.reinsert_sections(sections))
+		return {filename: results[filename] for filename in files}
 
-			if os.path.exists(path):
-				success, info = self.reinsert_binary(path)
-				results[filename] = (success, info)
-			else:
-				print(f"\n⚠ Skipping {filename} (not found)")
-				results[filename] = (False, {})
+	def write_ips(self, output_path: str) -> bool:
+		"""
+		Write the last reinsert_sections() changes as an IPS patch
 
-		return results
+		Args:
+			output_path: Path for .ips file
+
+		Returns:
+			True if successful
+		"""
+		if self.modification_log is None:
+			print("❌ Nothing reinserted yet")
+			return False
+		try:
+			self.modification_log.write_ips(output_path)
+		except (OSError, ReinsertionError) as e:
+			print(f"❌ Failed to write IPS patch: {e}")
+			return False
+		print(f"✓ Wrote IPS patch: {output_path} ({len(self.modification_log.runs)} records)")
+		return True
 
 	def save_rom(self, output_path: str) -> bool:
 		"""
@@ -299,11 +441,27 @@ class ROMModifier:
 			print(f"\n✓ Saved modified ROM: {output_path}")
 			print(f"  Size: {len(self.rom_data)} bytes")
 
+			self.save_manifest(output_path)
+
 			return True
 		except Exception as e:
 			print(f"\n❌ Failed to save ROM: {e}")
 			return False
 
+	def save_manifest(self, output_path: str) -> None:
+		"""
+		Save the checksum manifest of a saved ROM
+
+		The source ROM's manifest is reused and only regions touched by the
+		last reinsertion are rehashed.
+		"""
+		try:
+			previous = RomManifest.load_or_build(self.rom_path)
+			touched = self.modification_log.touched_ranges() if self.modification_log else None
+			refresh_manifest(output_path, previous, touched)
+		except (OSError, ValueError) as e:
+			print(f"  ⚠ Could not write checksum manifest: {e}")
+
 	def generate_report(self, output_path: str) -> bool:
 		"""
 		Generate modification report
@@ -386,7 +544,7 @@ Examples:
 	parser.add_argument(
 		'--binary-dir',
 		default=DEFAULT_BINARY_DIR,
-		help=f'.dwdata files directory (default: {DEFAULT_BINARY_DIR})'
+		help=f'.dwdata files directory or .dwpack file (default: {DEFAULT_BINARY_DIR})'
 	)
 
 	parser.add_argument(
@@ -407,6 +565,12 @@ Examples:
 		help='Skip backup creation'
 	)
 
+	parser.add_argument(
+		'--ips',
+		default=None,
+		help='Also write the changes as an IPS patch'
+	)
+
 	parser.add_argument(
 		'--report',
 		default='build/reports/modification_report.txt',
@@ -459,6 +623,9 @@ Examples:
 	if not modifier.save_rom(args.output):
 		return 1
 
+	if args.ips:
+		modifier.write_ips(args.ips)
+
 	# Generate report
 	modifier.generate_report(args.report)
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+BPS Delta Encoder
+
+Builds BPS patches from a source and target ROM in near-linear time:
+
+- Every 4-byte gram of the source is indexed once (gram -> ascending
+  positions); target grams are indexed as the encoder moves past them,
+  so TargetCopy can reuse bytes the patch has already produced.
+- At each target position the encoder compares SourceRead (same offset
+  in the source, nothing to encode but the length), the best SourceCopy
+  and the best TargetCopy, and takes the one that saves the most patch
+  bytes. Matches can come from anywhere in the file, so relocated tables
+  and swapped banks become single copies.
+- Candidates are probed outward from the current relative offset, so
+  short (cheap) offsets are tried first, and the number of probes is
+  bounded so long runs of identical bytes do not turn quadratic.
+- Match lengths are measured by comparing slices of doubling size and
+  then bisecting: a long match costs a few memcmp calls, not a Python
+  loop per byte.
+- Bytes no match covers are batched into one TargetRead.
+
+The output is a standard BPS file; patch_engine applies it.
+
+Usage:
+	from bps_delta import create_bps_patch
+
+	patch = create_bps_patch(original_rom, modified_rom)
+
+	python tools/bps_delta.py original.nes modified.nes hack.bps
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import zlib
+import struct
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from patch_engine import (BPS_MAGIC, BPS_SOURCE_COPY, BPS_SOURCE_READ, BPS_TARGET_COPY,
+						  BPS_TARGET_READ, encode_number, encode_signed)
+
+
+GRAM_SIZE = 4
+# Candidate positions tried per gram lookup
+MAX_PROBES = 16
+# A match is used only if it saves at least this many bytes over literals
+# (a split TargetRead costs about one extra command byte)
+MIN_GAIN = 2
+# First comparison size when measuring a match
+PROBE_SIZE = 32
+
+
+def _match_length(a: bytes, i: int, b: bytes, j: int, limit: int) -> int:
+	"""Length of the common prefix of a[i:] and b[j:], at most limit."""
+	length = 0
+	step = PROBE_SIZE
+	while True:
+		end = min(length + step, limit)
+		if a[i + length:i + end] != b[j + length:j + end]:
+			break
+		length = end
+		if length == limit:
+			return length
+		step *= 2
+	# a[i:i+length] matches and a[i:i+end] does not: bisect in between
+	while end - length > 1:
+		middle = (length + end) // 2
+		if a[i + length:i + middle] == b[j + length:j + middle]:
+			length = middle
+		else:
+			end = middle
+	return length
+
+
+class _GramIndex:
+	"""Positions of every GRAM_SIZE-byte gram of data, indexed up to a point."""
+
+	def __init__(self, data: bytes):
+		self.data = data
+		self.positions: Dict[bytes, List[int]] = {}
+		self.indexed = 0
+
+	def extend(self, end: int) -> None:
+		"""Index the grams starting before end."""
+		data = self.data
+		positions = self.positions
+		for position in range(self.indexed, min(end, len(data) - GRAM_SIZE + 1)):
+			gram = data[position:position + GRAM_SIZE]
+			found = positions.get(gram)
+			if found is None:
+				positions[gram] = [position]
+			else:
+				found.append(position)
+		self.indexed = max(self.indexed, end)
+
+	def longest_match(self, target: bytes, offset: int, anchor: int, limit: int) -> Tuple[int, int]:
+		"""(length, position) of the longest match for target[offset:], nearest anchor first."""
+		positions = self.positions.get(target[offset:offset + GRAM_SIZE])
+		if not positions:
+			return 0, 0
+		best_length, best_position = 0, 0
+		above = bisect_left(positions, anchor)
+		below = above - 1
+		for _ in range(MAX_PROBES):
+			if above < len(positions) and (below < 0 or positions[above] - anchor <= anchor - positions[below]):
+				position = positions[above]
+				above += 1
+			elif below >= 0:
+				position = positions[below]
+				below -= 1
+			else:
+				break
+			length = _match_length(self.data, position, target, offset, limit)
+			if length > best_length:
+				best_length, best_position = length, position
+				if length == limit:
+					break
+		return best_length, best_position
+
+
+@dataclass
+class DeltaStats:
+	"""Bytes of the target produced by each BPS action."""
+	source_read: int = 0
+	target_read: int = 0
+	source_copy: int = 0
+	target_copy: int = 0
+	commands: int = 0
+
+
+def _command(action: int, length: int) -> bytes:
+	return encode_number((length - 1) << 2 | action)
+
+
+def create_bps_patch(source: Union[bytes, bytearray], target: Union[bytes, bytearray],
+					 metadata: bytes = b'', stats: Optional[DeltaStats] = None) -> bytes:
+	"""BPS patch turning source into target."""
+	source = bytes(source)
+	target = bytes(target)
+	patch = bytearray(BPS_MAGIC)
+	patch += encode_number(len(source)) + encode_number(len(target)) + encode_number(len(metadata)) + metadata
+	stats = stats if stats is not None else DeltaStats()
+
+	source_index = _GramIndex(source)
+	source_index.extend(len(source))
+	target_index = _GramIndex(target)
+
+	position = 0
+	literal_start = 0
+	source_relative = 0
+	target_relative = 0
+
+	def flush_literals() -> None:
+		if position > literal_start:
+			patch.extend(_command(BPS_TARGET_READ, position - literal_start))
+			patch.extend(target[literal_start:position])
+			stats.target_read += position - literal_start
+			stats.commands += 1
+
+	while position < len(target):
+		limit = len(target) - position
+		best = None  # (gain, action, length, copy_from)
+
+		if position < len(source):
+			length = _match_length(source, position, target, position, min(limit, len(source) - position))
+			if length:
+				best = (length - len(_command(BPS_SOURCE_READ, length)), BPS_SOURCE_READ, length, position)
+
+		if limit >= GRAM_SIZE:
+			length, copy_from = source_index.longest_match(target, position, source_relative, limit)
+			if length:
+				gain = length - len(_command(BPS_SOURCE_COPY, length)) - len(encode_signed(copy_from - source_relative))
+				if best is None or gain > best[0]:
+					best = (gain, BPS_SOURCE_COPY, length, copy_from)
+
+			target_index.extend(position)
+			length, copy_from = target_index.longest_match(target, position, position, limit)
+			if length:
+				gain = length - len(_command(BPS_TARGET_COPY, length)) - len(encode_signed(copy_from - target_relative))
+				if best is None or gain > best[0]:
+					best = (gain, BPS_TARGET_COPY, length, copy_from)
+
+		if best is None or best[0] < MIN_GAIN:
+			position += 1
+			continue
+
+		gain, action, length, copy_from = best
+		flush_literals()
+		patch.extend(_command(action, length))
+		if action == BPS_SOURCE_READ:
+			stats.source_read += length
+		elif action == BPS_SOURCE_COPY:
+			patch.extend(encode_signed(copy_from - source_relative))
+			source_relative = copy_from + length
+			stats.source_copy += length
+		else:
+			patch.extend(encode_signed(copy_from - target_relative))
+			target_relative = copy_from + length
+			stats.target_copy += length
+		stats.commands += 1
+		position += length
+		literal_start = position
+
+	flush_literals()
+	patch += struct.pack('<II', zlib.crc32(source) & 0xffffffff, zlib.crc32(target) & 0xffffffff)
+	patch += struct.pack('<I', zlib.crc32(patch) & 0xffffffff)
+	return bytes(patch)
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Create a BPS patch from two ROMs')
+	parser.add_argument('source')
+	parser.add_argument('target')
+	parser.add_argument('output')
+	args = parser.parse_args()
+
+	stats = DeltaStats()
+	patch = create_bps_patch(Path(args.source).read_bytes(), Path(args.target).read_bytes(), stats=stats)
+	Path(args.output).write_bytes(patch)
+	print(f"✓ {args.output}: {len(patch):,} bytes, {stats.commands} commands")
+	print(f"  SourceRead {stats.source_read:,}  TargetRead {stats.target_read:,}  "
+		  f"SourceCopy {stats.source_copy:,}  TargetCopy {stats.target_copy:,}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -2,6 +2,9 @@
 """
 Dragon Warrior Build Reporter
 Generate comprehensive build reports with asset analysis and ROM comparison
+
+Use --compare N to check the latest build in build/reports/build_history.jsonl
+against the previous N builds and flag stages that regressed.
 """
 
 import os
@@ -9,12 +12,15 @@ import sys
 import json
 import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from build_trace import HISTORY_FILE, Regression, compare_with_history, load_history
+
 console = Console()
 
 class BuildReporter:
@@ -334,14 +340,71 @@ class BuildReporter:
 
 		return saved_files
 
+	def compare_builds(self, last: int = 10, threshold: float = 0.25,
+					   min_seconds: float = 0.05) -> Tuple[Optional[Dict[str, Any]], List[Regression]]:
+		"""Compare the latest build's stages against the previous `last` builds"""
+		history = load_history(self.reports_dir / HISTORY_FILE)
+		if not history:
+			return None, []
+
+		current = history[-1]
+		previous = [entry for entry in history[:-1] if entry.get('pipeline') == current.get('pipeline')]
+		return current, compare_with_history(current, previous[-last:], threshold, min_seconds)
+
+	def print_comparison(self, current: Dict[str, Any], regressions: List[Regression]) -> None:
+		"""Show per-stage timings of the latest build, marking regressions"""
+		flagged = {(r.stage, r.metric): r for r in regressions}
+
+		table = Table(title=f"Build {current.get('timestamp', '?')} ({current.get('pipeline', 'build')})")
+		table.add_column("Stage")
+		table.add_column("Wall", justify="right")
+		table.add_column("CPU", justify="right")
+		table.add_column("Read", justify="right")
+		table.add_column("Written", justify="right")
+		table.add_column("Max RSS so far", justify="right")
+
+		for stage, values in current.get('stages', {}).items():
+			cells = []
+			for metric in ('wall', 'cpu'):
+				text = f"{values.get(metric, 0.0):.2f}s"
+				regression = flagged.get((stage, metric))
+				if regression:
+					text = f"[red]{text} (+{(regression.ratio - 1) * 100:.0f}%)[/red]"
+				cells.append(text)
+			table.add_row(stage, *cells,
+						  f"{values.get('read_bytes', 0) / 1024:,.0f} KB",
+						  f"{values.get('write_bytes', 0) / 1024:,.0f} KB",
+						  f"{values.get('peak_rss', 0) / (1024 * 1024):,.1f} MB")
+
+		console.print(table)
+
 @click.command()
 @click.argument('build_dir', type=click.Path(exists=True))
 @click.option('--format', 'format_type', type=click.Choice(['markdown', 'html', 'both']), default='both')
-def generate_report(build_dir: str, format_type: str):
+@click.option('--compare', 'compare_last', type=int, default=None,
+			  help='Compare the latest build against the last N builds instead of writing reports')
+@click.option('--threshold', type=float, default=0.25, help='Slowdown ratio that counts as a regression')
+def generate_report(build_dir: str, format_type: str, compare_last: Optional[int], threshold: float):
 	"""Generate comprehensive build report"""
 
 	console.print("[bold blue]Dragon Warrior Build Reporter[/bold blue]\n")
 
+	if compare_last is not None:
+		reporter = BuildReporter(build_dir)
+		current, regressions = reporter.compare_builds(compare_last, threshold)
+		if current is None:
+			console.print(f"[yellow]No build history in {reporter.reports_dir / HISTORY_FILE}[/yellow]")
+			return
+
+		reporter.print_comparison(current, regressions)
+		if regressions:
+			console.print(f"\n[red]❌ {len(regressions)} stage regression(s) against the last {compare_last} builds:[/red]")
+			for r in regressions:
+				console.print(f"   {r.stage} {r.metric}: {r.current:.2f}s vs {r.baseline:.2f}s median")
+			sys.exit(1)
+		console.print(f"\n[green]✅ No stage regressions against the last {compare_last} builds[/green]")
+		return
+
 	try:
 		reporter = BuildReporter(build_dir)
 
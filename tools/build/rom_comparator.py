@@ -8,7 +8,6 @@ Based on FFMQ comparison patterns
 import os
 import sys
 import struct
-import hashlib
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 import json
@@ -18,6 +17,10 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.progress import track
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from diff_engine import RomDiff, count_changes
+from rom_manifest import RomManifest, compare_manifests
+
 console = Console()
 
 class ROMComparator:
@@ -66,14 +69,19 @@ class ROMComparator:
 
 		return comparison
 
-	def _compare_checksums(self) -> Dict[str, str]:
-		"""Compare ROM checksums"""
+	def _compare_checksums(self) -> Dict[str, Any]:
+		"""Compare ROM checksums (whole file and per region, from the ROMs' manifests)"""
+		ref_manifest = RomManifest.load_or_build(self.reference_rom)
+		built_manifest = RomManifest.load_or_build(self.built_rom)
+		ref_file = ref_manifest.digest("file")
+		built_file = built_manifest.digest("file")
 		return {
-			"reference_md5": hashlib.md5(self.ref_data).hexdigest(),
-			"built_md5": hashlib.md5(self.built_data).hexdigest(),
-			"reference_sha1": hashlib.sha1(self.ref_data).hexdigest(),
-			"built_sha1": hashlib.sha1(self.built_data).hexdigest(),
-			"md5_match": hashlib.md5(self.ref_data).hexdigest() == hashlib.md5(self.built_data).hexdigest()
+			"reference_md5": ref_file.md5,
+			"built_md5": built_file.md5,
+			"reference_sha1": ref_file.sha1,
+			"built_sha1": built_file.sha1,
+			"md5_match": ref_file.md5 == built_file.md5,
+			"differing_regions": [str(mismatch) for mismatch in compare_manifests(ref_manifest, built_manifest)]
 		}
 
 	def _analyze_bytes(self) -> Dict[str, Any]:
@@ -85,14 +93,8 @@ class ROMComparator:
 				"different_bytes": 0
 			}
 
-		matching = 0
-		different = 0
-
-		for i in range(len(self.ref_data)):
-			if self.ref_data[i] == self.built_data[i]:
-				matching += 1
-			else:
-				different += 1
+		different = count_changes(self.ref_data, self.built_data)
+		matching = len(self.ref_data) - different
 
 		return {
 			"total_bytes": len(self.ref_data),
@@ -156,35 +158,16 @@ class ROMComparator:
 		if len(ref_data) != len(built_data):
 			return [{"error": "Section sizes don't match"}]
 
-		differences = []
-		current_diff = None
-
-		for i in range(len(ref_data)):
-			if ref_data[i] != built_data[i]:
-				if current_diff is None:
-					current_diff = {
-						"start_offset": base_offset + i,
-						"length": 1,
-						"reference_bytes": [ref_data[i]],
-						"built_bytes": [built_data[i]]
-					}
-				else:
-					# Extend current difference
-					current_diff["length"] += 1
-					current_diff["reference_bytes"].append(ref_data[i])
-					current_diff["built_bytes"].append(built_data[i])
-			else:
-				if current_diff is not None:
-					# End current difference
-					differences.append(current_diff)
-					current_diff = None
-
-		# Add final difference if exists
-		if current_diff is not None:
-			differences.append(current_diff)
-
 		# Limit to first 50 differences to avoid huge reports
-		return differences[:50]
+		return [
+			{
+				"start_offset": base_offset + run.offset,
+				"length": run.size,
+				"reference_bytes": list(run.original),
+				"built_bytes": list(run.modified)
+			}
+			for run in RomDiff(ref_data, built_data).runs[:50]
+		]
 
 	def _find_differences(self) -> List[Dict[str, Any]]:
 		"""Find all byte-level differences"""
@@ -226,6 +209,10 @@ class ROMComparator:
 			f"- **Built SHA1:** `{checksums['built_sha1']}`",
 			""
 		])
+		if checksums.get("differing_regions"):
+			report_lines.append("### Differing Regions")
+			report_lines.extend(f"- {region}" for region in checksums["differing_regions"])
+			report_lines.append("")
 
 		# Byte analysis
 		if "byte_analysis" in comparison and "error" not in comparison["byte_analysis"]:
@@ -14,7 +14,7 @@ Features:
 - Build configuration profiles
 - Pre/post-build hooks
 - Error recovery and rollback
-- Build metrics and timing
+- Build metrics and timing (Chrome trace + JSON-lines history)
 - CI/CD integration support
 
 Usage:
@@ -36,6 +36,9 @@ Examples:
 	# Dry run (show what would be built)
 	python tools/build_system_advanced.py --dry-run all
 
+	# Write a Chrome trace of the build
+	python tools/build_system_advanced.py --trace build/reports/build_trace.json
+
 Author: Dragon Warrior ROM Hacking Toolkit
 Version: 2.0
 """
@@ -45,24 +48,33 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported under pytest.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import time
 import hashlib
 import json
 import shutil
+import pickle
+import functools
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Set, Callable, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from contextlib import contextmanager
 import argparse
 from datetime import datetime
 import concurrent.futures
 
+from assembler import AssemblerError
+from bank_linker import IncrementalBankBuilder
+from dependency_graph import DependencyGraph, GENERATED_DIR
+from build_trace import BuildTracer, Span, measure
+
 
 # ============================================================================
 # BUILD CONFIGURATION
@@ -98,11 +110,14 @@ class BuildConfig:
 
 	# Paths
 	rom_source: Path = Path("roms/dragon_warrior.nes")
+	source_dir: Path = Path("source_files")
 	assets_dir: Path = Path("assets")
 	tools_dir: Path = Path("tools")
 
 	# Build options
 	parallel_jobs: int = 1
+	executor_backend: str = "thread"  # "thread" or "process"
+	keep_going: bool = False
 	incremental: bool = True
 	verbose: bool = False
 	dry_run: bool = False
@@ -115,6 +130,10 @@ class BuildConfig:
 	use_cache: bool = True
 	cache_ttl: int = 86400  # 1 day in seconds
 
+	# Tracing
+	trace_file: Optional[Path] = None    # Chrome trace-event JSON
+	history_file: Optional[Path] = None  # JSON-lines build history
+
 
 @dataclass
 class BuildTask:
@@ -150,6 +169,8 @@ class BuildResult:
 	total_duration: float
 	failed_tasks: List[str] = field(default_factory=list)
 	error_messages: List[str] = field(default_factory=list)
+	critical_path: List[str] = field(default_factory=list)
+	spans: List[Span] = field(default_factory=list)
 
 
 # ============================================================================
@@ -157,42 +178,96 @@ class BuildResult:
 # ============================================================================
 
 class BuildCache:
-	"""Manage build cache for incremental builds."""
+	"""Manage build cache for incremental builds.
+
+	Layout under cache_dir:
+	- build_cache.json: index of task entries and file stat records
+	- objects/ab/cdef...: task outputs stored by SHA-256 digest
+	- artifacts/KEY.json: structured artifacts (e.g. assembled banks)
+
+	File digests are reused while a file's size, mtime and inode are
+	unchanged, so unchanged inputs are not rehashed. Index writes are
+	atomic and can be deferred with batch().
+	"""
+
+	INDEX_VERSION = 2
+
+	# Files modified this recently may change again within the same mtime tick
+	RACY_WINDOW = 2.0
 
 	def __init__(self, cache_dir: Path):
 		self.cache_dir = cache_dir
 		self.cache_dir.mkdir(parents=True, exist_ok=True)
 		self.cache_file = cache_dir / "build_cache.json"
+		self.objects_dir = cache_dir / "objects"
+		self.file_stats: Dict[str, List[Any]] = {}
 		self.cache: Dict[str, Any] = self._load_cache()
+		self._batch_depth = 0
+		self._dirty = False
 
 	def _load_cache(self) -> Dict[str, Any]:
 		"""Load cache from disk."""
 		if self.cache_file.exists():
 			try:
 				with open(self.cache_file, 'r') as f:
-					return json.load(f)
+					data = json.load(f)
+				if data.get('version') == self.INDEX_VERSION:
+					self.file_stats = data.get('files', {})
+					return data.get('tasks', {})
 			except Exception as e:
 				print(f"Warning: Failed to load cache: {e}")
 		return {}
 
 	def _save_cache(self) -> None:
-		"""Save cache to disk."""
+		"""Save cache to disk (deferred while inside batch())."""
+		if self._batch_depth:
+			self._dirty = True
+			return
+
+		temp_file = self.cache_file.with_suffix('.json.tmp')
 		try:
-			with open(self.cache_file, 'w') as f:
-				json.dump(self.cache, f, indent=2)
+			with open(temp_file, 'w') as f:
+				json.dump({'version': self.INDEX_VERSION, 'tasks': self.cache, 'files': self.file_stats},
+						  f, separators=(',', ':'))
+			os.replace(temp_file, self.cache_file)
+			self._dirty = False
 		except Exception as e:
 			print(f"Warning: Failed to save cache: {e}")
 
+	@contextmanager
+	def batch(self):
+		"""Defer index writes until the outermost batch exits."""
+		self._batch_depth += 1
+		try:
+			yield self
+		finally:
+			self._batch_depth -= 1
+			if self._batch_depth == 0 and self._dirty:
+				self._save_cache()
+
 	def get_file_hash(self, filepath: Path) -> str:
-		"""Calculate hash of file."""
-		if not filepath.exists():
+		"""Calculate hash of file (reusing the digest if its stat is unchanged)."""
+		try:
+			stat = os.stat(filepath)
+		except OSError:
 			return ""
 
+		key = str(filepath)
+		signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+		record = self.file_stats.get(key)
+		if record is not None and record[:3] == signature:
+			return record[3]
+
 		hasher = hashlib.sha256()
 		with open(filepath, 'rb') as f:
-			while chunk := f.read(8192):
+			while chunk := f.read(65536):
 				hasher.update(chunk)
-		return hasher.hexdigest()
+		digest = hasher.hexdigest()
+
+		if time.time() - stat.st_mtime > self.RACY_WINDOW:
+			self.file_stats[key] = signature + [digest]
+			self._dirty = True
+		return digest
 
 	def get_task_hash(self, task: BuildTask) -> str:
 		"""Calculate hash of task inputs."""
@@ -210,8 +285,50 @@ class BuildCache:
 
 		return hasher.hexdigest()
 
+	def _object_path(self, digest: str) -> Path:
+		"""Path of a stored object."""
+		return self.objects_dir / digest[:2] / digest[2:]
+
+	def store_file(self, filepath: Path) -> str:
+		"""Copy a file into the object store; returns its digest."""
+		digest = self.get_file_hash(filepath)
+		object_path = self._object_path(digest)
+		if not object_path.exists():
+			object_path.parent.mkdir(parents=True, exist_ok=True)
+			temp_file = object_path.with_name(object_path.name + '.tmp')
+			shutil.copyfile(filepath, temp_file)
+			os.replace(temp_file, object_path)
+		return digest
+
+	def restore_file(self, digest: str, filepath: Path) -> bool:
+		"""Materialize a stored object at filepath."""
+		object_path = self._object_path(digest)
+		if not object_path.exists():
+			return False
+		filepath.parent.mkdir(parents=True, exist_ok=True)
+		temp_file = filepath.with_name(filepath.name + '.tmp')
+		shutil.copyfile(object_path, temp_file)
+		os.replace(temp_file, filepath)
+		return True
+
+	def restore_outputs(self, task: BuildTask) -> bool:
+		"""Bring a cached task's outputs on disk up to date from the store."""
+		outputs = self.cache.get(task.id, {}).get('outputs', {})
+		for output in task.outputs:
+			digest = outputs.get(str(output))
+			if digest is None:
+				return False
+			if output.exists() and self.get_file_hash(output) == digest:
+				continue
+			if not self.restore_file(digest, output):
+				return False
+		return True
+
 	def is_task_cached(self, task: BuildTask, max_age: int = 86400) -> bool:
-		"""Check if task results are cached and valid."""
+		"""Check if task results are cached and valid.
+
+		Missing or modified outputs are restored from the object store.
+		"""
 		task_hash = self.get_task_hash(task)
 
 		if task.id not in self.cache:
@@ -228,26 +345,47 @@ class BuildCache:
 		if time.time() - cache_time > max_age:
 			return False
 
-		# Check outputs exist
-		for output in task.outputs:
-			if not output.exists():
-				return False
-
-		return True
+		# Check outputs exist (or can be restored)
+		return self.restore_outputs(task)
 
 	def cache_task_result(self, task: BuildTask) -> None:
-		"""Cache task result."""
+		"""Cache task result and store its outputs."""
 		task_hash = self.get_task_hash(task)
 
 		self.cache[task.id] = {
 			'hash': task_hash,
 			'timestamp': time.time(),
 			'status': task.status.value,
-			'duration': task.duration
+			'duration': task.duration,
+			'outputs': {str(output): self.store_file(output) for output in task.outputs if output.exists()}
 		}
 
 		self._save_cache()
 
+	def get_artifact(self, key: str) -> Optional[Dict[str, Any]]:
+		"""Load a cached build artifact (e.g. an assembled bank object)."""
+		artifact_file = self.cache_dir / "artifacts" / f"{key}.json"
+		if not artifact_file.exists():
+			return None
+		try:
+			with open(artifact_file, 'r') as f:
+				return json.load(f)
+		except Exception as e:
+			print(f"Warning: Failed to load artifact {key}: {e}")
+			return None
+
+	def store_artifact(self, key: str, artifact: Dict[str, Any]) -> None:
+		"""Store a build artifact under its content key."""
+		artifact_dir = self.cache_dir / "artifacts"
+		artifact_dir.mkdir(parents=True, exist_ok=True)
+		temp_file = artifact_dir / f"{key}.json.tmp"
+		try:
+			with open(temp_file, 'w') as f:
+				json.dump(artifact, f, separators=(',', ':'))
+			os.replace(temp_file, artifact_dir / f"{key}.json")
+		except Exception as e:
+			print(f"Warning: Failed to store artifact {key}: {e}")
+
 	def invalidate_task(self, task_id: str) -> None:
 		"""Invalidate cached task."""
 		if task_id in self.cache:
@@ -257,6 +395,8 @@ class BuildCache:
 	def clear(self) -> None:
 		"""Clear entire cache."""
 		self.cache = {}
+		self.file_stats = {}
+		shutil.rmtree(self.objects_dir, ignore_errors=True)
 		self._save_cache()
 
 
@@ -264,6 +404,21 @@ class BuildCache:
 # BUILD EXECUTOR
 # ============================================================================
 
+def _call_task_command(command: Optional[Callable]) -> Tuple[bool, str]:
+	if command is None:
+		return True, ""
+	try:
+		return bool(command()), ""
+	except Exception as e:
+		return False, str(e)
+
+
+def _run_task_command(command: Optional[Callable]) -> Tuple[bool, str, Dict[str, Any]]:
+	"""Run a task command in a worker; returns (success, error message, resource usage)."""
+	(success, error), usage = measure(lambda: _call_task_command(command))
+	return success, error, usage
+
+
 class BuildExecutor:
 	"""Execute build tasks with dependency resolution."""
 
@@ -271,6 +426,7 @@ class BuildExecutor:
 		self.config = config
 		self.cache = BuildCache(config.cache_dir)
 		self.tasks: Dict[str, BuildTask] = {}
+		self.tracer = BuildTracer()
 
 	def register_task(self, task: BuildTask) -> None:
 		"""Register a build task."""
@@ -317,13 +473,12 @@ class BuildExecutor:
 			all_outputs_exist = all(output.exists() for output in task.outputs)
 
 			if all_outputs_exist and task.outputs:
-				# Check if any input is newer than outputs
-				newest_output = max((out.stat().st_mtime for out in task.outputs if out.exists()),
+				# Up to date only if every output is newer than every input
+				oldest_output = min(out.stat().st_mtime for out in task.outputs)
+				newest_input = max((inp.stat().st_mtime for inp in task.inputs if inp.exists()),
 								   default=0)
-				oldest_input = min((inp.stat().st_mtime for inp in task.inputs if inp.exists()),
-								  default=float('inf'))
 
-				if newest_output > oldest_input:
+				if oldest_output >= newest_input:
 					return False, "up-to-date"
 
 		return True, "needed"
@@ -335,53 +490,172 @@ class BuildExecutor:
 			task.status = BuildStatus.SUCCESS
 			return True
 
-		print(f"[BUILD] {task.name}...")
+		self._start_task(task)
+		success, error, usage = _run_task_command(task.command)
+		return self._finish_task(task, success, error, usage)
 
+	def _start_task(self, task: BuildTask) -> None:
+		"""Mark a task as running."""
+		print(f"[BUILD] {task.name}...")
 		task.start_time = time.time()
 		task.status = BuildStatus.RUNNING
 
-		try:
-			if task.command:
-				# Execute task command
-				success = task.command()
+	def _finish_task(self, task: BuildTask, success: bool, error: str = "",
+					 usage: Optional[Dict[str, Any]] = None) -> bool:
+		"""Record a task's outcome (always called from the scheduling thread)."""
+		task.end_time = time.time()
+		if usage is not None and task.command:
+			self.tracer.record(task.id, task.start_time, usage, category="task",
+							   success=success, task=task.name)
 
-				if success:
-					task.status = BuildStatus.SUCCESS
-					task.end_time = time.time()
+		if success:
+			task.status = BuildStatus.SUCCESS
 
-					# Cache result
-					if self.config.use_cache:
-						self.cache.cache_task_result(task)
+			# Cache result
+			if self.config.use_cache and task.command:
+				self.cache.cache_task_result(task)
 
-					print(f"[✓] {task.name} completed in {task.duration:.2f}s")
-					return True
-				else:
-					raise RuntimeError("Task command returned failure")
-			else:
-				# No command - just mark as success
-				task.status = BuildStatus.SUCCESS
-				task.end_time = time.time()
-				return True
+			if task.command:
+				print(f"[✓] {task.name} completed in {task.duration:.2f}s")
+			return True
 
-		except Exception as e:
-			task.status = BuildStatus.FAILED
-			task.end_time = time.time()
-			task.error_message = str(e)
-			print(f"[✗] {task.name} failed: {e}")
+		task.status = BuildStatus.FAILED
+		task.error_message = error or "Task command returned failure"
+		print(f"[✗] {task.name} failed: {task.error_message}")
+		return False
+
+	def _use_process_pool(self, task: BuildTask) -> bool:
+		"""Whether a task can run on the process backend."""
+		if self.config.executor_backend != "process" or task.command is None:
 			return False
+		try:
+			pickle.dumps(task.command)
+		except Exception:
+			# Closures over local state cannot cross process boundaries
+			print(f"Warning: {task.name} cannot be pickled, running it on a thread")
+			return False
+		return True
 
 	def execute_parallel(self, task_ids: List[str]) -> bool:
-		"""Execute tasks in parallel."""
-		with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.parallel_jobs) as executor:
-			futures = {executor.submit(self.execute_task, self.tasks[tid]): tid
-					  for tid in task_ids}
+		"""Execute tasks in parallel, respecting dependencies among them."""
+		return self._schedule(task_ids).success
+
+	def _schedule(self, task_order: List[str]) -> BuildResult:
+		"""Run tasks as soon as their dependencies are satisfied.
+
+		Up to config.parallel_jobs tasks run at once. Commands run on a
+		thread pool, or on a process pool when executor_backend is
+		"process" and the command is picklable. Cache and status updates
+		stay on the calling thread.
+		"""
+		selected = set(task_order)
+		waiting_on = {tid: {dep for dep in self.tasks[tid].dependencies if dep in selected}
+					  for tid in task_order}
+		dependents: Dict[str, List[str]] = {tid: [] for tid in task_order}
+		for tid, deps in waiting_on.items():
+			for dep in deps:
+				dependents[dep].append(tid)
+
+		ready = [tid for tid in task_order if not waiting_on[tid]]
+		running: Dict[concurrent.futures.Future, str] = {}
+		result = BuildResult(success=True, tasks_run=0, tasks_skipped=0, tasks_cached=0,
+							 tasks_failed=0, total_duration=0.0)
+		stop = False
+
+		def complete(task_id: str) -> None:
+			for dependent in dependents[task_id]:
+				waiting_on[dependent].discard(task_id)
+				if not waiting_on[dependent]:
+					ready.append(dependent)
+
+		def fail(task: BuildTask) -> None:
+			nonlocal stop
+			result.tasks_failed += 1
+			result.failed_tasks.append(task.id)
+			result.error_messages.append(f"{task.name}: {task.error_message}")
+			if not self.config.keep_going:
+				stop = True
+
+		jobs = max(1, self.config.parallel_jobs)
+		thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+		process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
 
-			all_success = True
-			for future in concurrent.futures.as_completed(futures):
-				if not future.result():
-					all_success = False
+		try:
+			while (ready and not stop) or running:
+				while ready and not stop and len(running) < jobs:
+					task = self.tasks[ready.pop(0)]
+
+					# Check if task should run
+					should_run, reason = self.should_run_task(task)
+					if not should_run:
+						if reason == "cached":
+							task.status = BuildStatus.CACHED
+							result.tasks_cached += 1
+							print(f"[CACHED] {task.name}")
+						else:
+							task.status = BuildStatus.SKIPPED
+							result.tasks_skipped += 1
+							if self.config.verbose:
+								print(f"[SKIP] {task.name} ({reason})")
+						complete(task.id)
+						continue
+
+					if self.config.dry_run:
+						self.execute_task(task)
+						result.tasks_run += 1
+						complete(task.id)
+						continue
+
+					self._start_task(task)
+					if self._use_process_pool(task):
+						if process_pool is None:
+							process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+						future = process_pool.submit(_run_task_command, task.command)
+					else:
+						future = thread_pool.submit(_run_task_command, task.command)
+					running[future] = task.id
+
+				if not running:
+					continue
+
+				done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					task = self.tasks[running.pop(future)]
+					try:
+						success, error, usage = future.result()
+					except Exception as e:
+						success, error, usage = False, str(e), None
+
+					if self._finish_task(task, success, error, usage):
+						result.tasks_run += 1
+						complete(task.id)
+					else:
+						fail(task)
+		finally:
+			thread_pool.shutdown(wait=True)
+			if process_pool is not None:
+				process_pool.shutdown(wait=True)
+
+		result.success = result.tasks_failed == 0
+		return result
+
+	def critical_path(self, task_ids: Optional[List[str]] = None) -> Tuple[List[str], float]:
+		"""Longest chain of dependent task durations from the last build."""
+		order = [tid for tid in self.get_task_order() if task_ids is None or tid in task_ids]
+		best: Dict[str, Tuple[float, List[str]]] = {}
+
+		for task_id in order:
+			task = self.tasks[task_id]
+			chain_time, chain = max(
+				(best[dep] for dep in task.dependencies if dep in best),
+				key=lambda entry: entry[0], default=(0.0, [])
+			)
+			best[task_id] = (chain_time + task.duration, chain + [task_id])
 
-			return all_success
+		if not best:
+			return [], 0.0
+		total, path = max(best.values(), key=lambda entry: entry[0])
+		return path, total
 
 	def build(self, target_tasks: Optional[List[str]] = None) -> BuildResult:
 		"""Execute build pipeline."""
@@ -419,122 +693,144 @@ class BuildExecutor:
 
 			task_order = [tid for tid in task_order if tid in required_tasks]
 
-		# Execute tasks
-		tasks_run = 0
-		tasks_skipped = 0
-		tasks_cached = 0
-		tasks_failed = 0
-		failed_tasks = []
-		error_messages = []
-
-		for task_id in task_order:
-			task = self.tasks[task_id]
-
-			# Check if task should run
-			should_run, reason = self.should_run_task(task)
-
-			if not should_run:
-				if reason == "cached":
-					task.status = BuildStatus.CACHED
-					tasks_cached += 1
-					print(f"[CACHED] {task.name}")
-				else:
-					task.status = BuildStatus.SKIPPED
-					tasks_skipped += 1
-					if self.config.verbose:
-						print(f"[SKIP] {task.name} ({reason})")
-				continue
+		# Index updates are written once, when the run finishes
+		with self.cache.batch():
+			result = self._schedule(task_order)
 
-			# Execute task
-			success = self.execute_task(task)
+		result.total_duration = time.time() - start_time
+		result.critical_path, critical_time = self.critical_path(task_order)
+		if result.tasks_run and result.critical_path:
+			print(f"[CRITICAL PATH] {' -> '.join(result.critical_path)} ({critical_time:.2f}s)")
 
-			if success:
-				tasks_run += 1
-			else:
-				tasks_failed += 1
-				failed_tasks.append(task_id)
-				error_messages.append(f"{task.name}: {task.error_message}")
+		result.spans = list(self.tracer.spans)
+		if not self.config.dry_run:
+			self.save_trace(result.success)
 
-				# Stop on first failure
-				break
+		return result
 
-		total_duration = time.time() - start_time
-
-		return BuildResult(
-			success=(tasks_failed == 0),
-			tasks_run=tasks_run,
-			tasks_skipped=tasks_skipped,
-			tasks_cached=tasks_cached,
-			tasks_failed=tasks_failed,
-			total_duration=total_duration,
-			failed_tasks=failed_tasks,
-			error_messages=error_messages
-		)
+	def save_trace(self, success: bool) -> None:
+		"""Write the Chrome trace and append to the build history (if configured)."""
+		if self.config.trace_file:
+			path = self.tracer.write_chrome_trace(self.config.trace_file)
+			print(f"[TRACE] {path}")
+		if self.config.history_file and self.tracer.spans:
+			self.tracer.append_history(self.config.history_file, success, pipeline="build_system")
 
 
 # ============================================================================
 # BUILD TASK DEFINITIONS
 # ============================================================================
 
+# Task commands are module-level functions bound to the config with
+# functools.partial, so they pickle and can run on the process backend.
+
+def clean_build(config: BuildConfig) -> bool:
+	"""Remove all build artifacts (the build history is kept)."""
+	# Build history outlives clean builds so regressions stay comparable
+	history = config.history_file.read_bytes() if config.history_file and config.history_file.exists() else None
+	if config.build_dir.exists():
+		shutil.rmtree(config.build_dir)
+	config.build_dir.mkdir(parents=True, exist_ok=True)
+	if history is not None:
+		config.history_file.parent.mkdir(parents=True, exist_ok=True)
+		config.history_file.write_bytes(history)
+	return True
+
+
+def validate_rom_source(config: BuildConfig) -> bool:
+	"""Check the source ROM exists and has the expected size."""
+	if not config.rom_source.exists():
+		print(f"Error: ROM not found: {config.rom_source}")
+		return False
+
+	# Check ROM size
+	size = config.rom_source.stat().st_size
+	if size != 131072:  # 128KB
+		print(f"Warning: Unexpected ROM size: {size} bytes")
+
+	return True
+
+
+def run_tool_script(config: BuildConfig, script: Path) -> bool:
+	"""Run a toolkit script from the project root; False if it fails."""
+	if not script.is_absolute():
+		script = config.project_root / script
+	if not script.exists():
+		print(f"Error: Script not found: {script}")
+		return False
+
+	result = subprocess.run(
+		[sys.executable, str(script)],
+		cwd=config.project_root,
+		capture_output=True,
+		text=True
+	)
+
+	if result.returncode != 0:
+		print(f"{script.name} failed:\n{result.stderr}")
+		return False
+
+	return True
+
+
+def build_output_rom(config: BuildConfig) -> bool:
+	"""Reassemble changed banks and relink the output ROM."""
+	# Unchanged banks come from cached objects and are only relinked
+	builder = IncrementalBankBuilder(config.source_dir, BuildCache(config.cache_dir))
+	try:
+		result = builder.build()
+	except AssemblerError as e:
+		print(f"Build failed:\n{e}")
+		return False
+
+	for warning in result.warnings:
+		print(f"Warning: {warning}")
+	print(f"Reassembled: {', '.join(result.rebuilt) if result.rebuilt else 'none'}")
+
+	result.write(config.output_dir, "dragon_warrior_modified.nes", config.build_dir / "listings")
+	return True
+
+
+def validate_output_rom(config: BuildConfig) -> bool:
+	"""Check the built ROM exists and has the right size."""
+	output_rom = config.output_dir / "dragon_warrior_modified.nes"
+
+	if not output_rom.exists():
+		print(f"Error: Output ROM not found: {output_rom}")
+		return False
+
+	# Check size
+	size = output_rom.stat().st_size
+	if size != 131072:
+		print(f"Error: Output ROM has wrong size: {size} bytes")
+		return False
+
+	print(f"✓ Output ROM validated: {size:,} bytes")
+	return True
+
+
 def create_build_tasks(config: BuildConfig) -> List[BuildTask]:
 	"""Create all build tasks."""
 	tasks = []
 
 	# Task: Clean build directories
-	def clean_task():
-		if config.build_dir.exists():
-			shutil.rmtree(config.build_dir)
-		config.build_dir.mkdir(parents=True, exist_ok=True)
-		return True
-
 	tasks.append(BuildTask(
 		id="clean",
 		name="Clean Build",
 		description="Remove all build artifacts",
-		command=clean_task
+		command=functools.partial(clean_build, config)
 	))
 
 	# Task: Validate ROM source
-	def validate_rom():
-		if not config.rom_source.exists():
-			print(f"Error: ROM not found: {config.rom_source}")
-			return False
-
-		# Check ROM size
-		size = config.rom_source.stat().st_size
-		if size != 131072:  # 128KB
-			print(f"Warning: Unexpected ROM size: {size} bytes")
-
-		return True
-
 	tasks.append(BuildTask(
 		id="validate_rom",
 		name="Validate ROM Source",
 		description="Verify source ROM integrity",
 		inputs=[config.rom_source],
-		command=validate_rom
+		command=functools.partial(validate_rom_source, config)
 	))
 
 	# Task: Extract assets
-	def extract_assets():
-		extract_script = config.tools_dir / "extract_all_data.py"
-		if not extract_script.exists():
-			print(f"Error: Extract script not found: {extract_script}")
-			return False
-
-		result = subprocess.run(
-			[sys.executable, str(extract_script)],
-			cwd=config.project_root,
-			capture_output=True,
-			text=True
-		)
-
-		if result.returncode != 0:
-			print(f"Extract failed:\n{result.stderr}")
-			return False
-
-		return True
-
 	tasks.append(BuildTask(
 		id="extract_assets",
 		name="Extract Assets",
@@ -546,25 +842,10 @@ def create_build_tasks(config: BuildConfig) -> List[BuildTask]:
 			config.assets_dir / "items.json",
 			config.assets_dir / "spells.json"
 		],
-		command=extract_assets
+		command=functools.partial(run_tool_script, config, config.tools_dir / "extract_all_data.py")
 	))
 
 	# Task: Convert to binary
-	def convert_binary():
-		binary_script = config.tools_dir / "extract_to_binary.py"
-		if not binary_script.exists():
-			print(f"Error: Binary script not found: {binary_script}")
-			return False
-
-		result = subprocess.run(
-			[sys.executable, str(binary_script)],
-			cwd=config.project_root,
-			capture_output=True,
-			text=True
-		)
-
-		return result.returncode == 0
-
 	tasks.append(BuildTask(
 		id="convert_binary",
 		name="Convert to Binary",
@@ -578,66 +859,52 @@ def create_build_tasks(config: BuildConfig) -> List[BuildTask]:
 			config.build_dir / "monsters.dwdata",
 			config.build_dir / "items.dwdata"
 		],
-		command=convert_binary
+		command=functools.partial(run_tool_script, config, config.tools_dir / "extract_to_binary.py")
 	))
 
-	# Task: Build ROM
-	def build_rom():
-		build_script = config.tools_dir / "dragon_warrior_build.py"
-		if not build_script.exists():
-			print(f"Error: Build script not found: {build_script}")
-			return False
-
-		result = subprocess.run(
-			[sys.executable, str(build_script)],
-			cwd=config.project_root,
-			capture_output=True,
-			text=True
-		)
-
-		if result.returncode != 0:
-			print(f"Build failed:\n{result.stderr}")
-			return False
-
-		return True
+	# Tasks: Table generators (inferred from the scripts and .include chains)
+	graph = DependencyGraph(config.project_root, config.source_dir, config.tools_dir,
+							BuildCache(config.cache_dir)).scan()
+	rom_sources = graph.build_inputs()
+	generator_ids = []
+
+	for info in sorted(graph.generators.values(), key=lambda g: g.name):
+		outputs = [out for out in info.outputs if out in rom_sources or out.parent == GENERATED_DIR]
+		if not any(out in rom_sources for out in outputs):
+			continue
+
+		generator_ids.append(info.name)
+		tasks.append(BuildTask(
+			id=info.name,
+			name=f"Generate {info.name[len('generate_'):].replace('_', ' ')}",
+			description=f"Regenerate {', '.join(out.name for out in outputs)}",
+			inputs=[config.project_root / p for p in info.inputs + [info.script]],
+			outputs=[config.project_root / p for p in outputs],
+			command=functools.partial(run_tool_script, config, info.script)
+		))
 
+	# Task: Build ROM
 	tasks.append(BuildTask(
 		id="build_rom",
 		name="Build ROM",
 		description="Assemble final ROM file",
-		dependencies=["convert_binary"],
+		dependencies=["convert_binary"] + generator_ids,
 		inputs=[
 			config.build_dir / "monsters.dwdata",
-			config.build_dir / "items.dwdata"
-		],
+			config.build_dir / "items.dwdata",
+		] + [config.project_root / p for p in rom_sources],
 		outputs=[config.output_dir / "dragon_warrior_modified.nes"],
-		command=build_rom
+		command=functools.partial(build_output_rom, config)
 	))
 
 	# Task: Validate output
-	def validate_output():
-		output_rom = config.output_dir / "dragon_warrior_modified.nes"
-
-		if not output_rom.exists():
-			print(f"Error: Output ROM not found: {output_rom}")
-			return False
-
-		# Check size
-		size = output_rom.stat().st_size
-		if size != 131072:
-			print(f"Error: Output ROM has wrong size: {size} bytes")
-			return False
-
-		print(f"✓ Output ROM validated: {size:,} bytes")
-		return True
-
 	tasks.append(BuildTask(
 		id="validate_output",
 		name="Validate Output",
 		description="Verify built ROM integrity",
 		dependencies=["build_rom"],
 		inputs=[config.output_dir / "dragon_warrior_modified.nes"],
-		command=validate_output
+		command=functools.partial(validate_output_rom, config)
 	))
 
 	return tasks
@@ -657,6 +924,10 @@ def main():
 					   help="Build targets (clean, assets, binary, rom, validate, all)")
 	parser.add_argument('-j', '--jobs', type=int, default=1,
 					   help="Number of parallel jobs")
+	parser.add_argument('--backend', choices=['thread', 'process'], default='thread',
+					   help="Worker pool for task commands (process for CPU-bound tasks)")
+	parser.add_argument('-k', '--keep-going', action='store_true',
+					   help="Keep building independent tasks after a failure")
 	parser.add_argument('--no-cache', action='store_true',
 					   help="Disable build cache")
 	parser.add_argument('--no-incremental', action='store_true',
@@ -667,6 +938,10 @@ def main():
 					   help="Verbose output")
 	parser.add_argument('--clean', action='store_true',
 					   help="Clean before building")
+	parser.add_argument('--trace', type=Path, metavar='FILE',
+					   help="Write a Chrome trace-event JSON of the build")
+	parser.add_argument('--no-history', action='store_true',
+					   help="Do not append this build to build/reports/build_history.jsonl")
 
 	args = parser.parse_args()
 
@@ -679,10 +954,14 @@ def main():
 		cache_dir=project_root / "build" / ".cache",
 		output_dir=project_root / "output",
 		parallel_jobs=args.jobs,
+		executor_backend=args.backend,
+		keep_going=args.keep_going,
 		incremental=not args.no_incremental,
 		use_cache=not args.no_cache,
 		verbose=args.verbose,
-		dry_run=args.dry_run
+		dry_run=args.dry_run,
+		trace_file=args.trace,
+		history_file=None if args.no_history else project_root / "build" / "reports" / "build_history.jsonl"
 	)
 
 	# Create build executor
@@ -698,7 +977,7 @@ def main():
 	print("=" * 70)
 	print(f"Project: {config.project_root}")
 	print(f"Build Dir: {config.build_dir}")
-	print(f"Parallel Jobs: {config.parallel_jobs}")
+	print(f"Parallel Jobs: {config.parallel_jobs} ({config.executor_backend})")
 	print(f"Incremental: {config.incremental}")
 	print(f"Cache: {'Enabled' if config.use_cache else 'Disabled'}")
 	print("=" * 70)
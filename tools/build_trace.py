@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Build Tracing
+
+Structured per-stage spans for the build pipelines: wall time, CPU time
+(including child processes), bytes read/written and the process RSS
+high-water mark. Spans can be exported as Chrome trace-event JSON
+(chrome://tracing, Perfetto) and appended to a JSON-lines build history
+that the build reporter compares against.
+
+Bytes read/written and child-process CPU come from process-wide counters
+(/proc/self/io, RUSAGE_CHILDREN). A span only gets them when no span on
+another thread of the process overlapped it; the history entry always
+carries the whole build's totals.
+
+Usage:
+	from build_trace import BuildTracer
+
+	tracer = BuildTracer()
+	with tracer.span("assemble", category="rom"):
+		...
+	tracer.write_chrome_trace("build/reports/build_trace.json")
+	tracer.append_history("build/reports/build_history.jsonl", success=True)
+
+	python tools/build/build_reporter.py build --compare 10
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+from statistics import median
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+try:
+	import resource
+	HAS_RESOURCE = True
+except ImportError:  # Windows
+	HAS_RESOURCE = False
+
+
+HISTORY_FILE = "build_history.jsonl"
+TRACE_FILE = "build_trace.json"
+
+
+# ============================================================================
+# RESOURCE SAMPLING
+# ============================================================================
+
+def _io_counters() -> Tuple[int, int]:
+	"""Bytes read/written by this process so far (0, 0 if unavailable)."""
+	try:
+		with open('/proc/self/io', 'r') as f:
+			counters = dict(line.split(':', 1) for line in f if ':' in line)
+		# rchar/wchar include cached I/O, which is what the build actually waits on
+		return int(counters['rchar']), int(counters['wchar'])
+	except (OSError, KeyError, ValueError):
+		return 0, 0
+
+
+def _peak_rss() -> int:
+	"""Largest resident set size in bytes this process or a child has reached so far.
+
+	ru_maxrss is a lifetime high-water mark: a span reports the highest RSS
+	seen up to its end, not the peak of its own work.
+	"""
+	if not HAS_RESOURCE:
+		return 0
+	scale = 1 if sys.platform == 'darwin' else 1024
+	own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+	return max(own, children) * scale
+
+
+def _child_cpu() -> float:
+	"""CPU seconds used by finished child processes."""
+	if not HAS_RESOURCE:
+		return 0.0
+	usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return usage.ru_utime + usage.ru_stime
+
+
+# Open spans per thread, and how many spans started while a span on
+# another thread was open (a span saw no overlap if this did not change)
+_open_lock = threading.Lock()
+_open_spans: Dict[int, int] = {}
+_overlaps = 0
+
+
+def _enter() -> Optional[int]:
+	"""Mark a span open on this thread; None if another thread has one open."""
+	global _overlaps
+	tid = threading.get_ident()
+	with _open_lock:
+		concurrent = any(count for other, count in _open_spans.items() if other != tid)
+		if concurrent:
+			_overlaps += 1
+		_open_spans[tid] = _open_spans.get(tid, 0) + 1
+		return None if concurrent else _overlaps
+
+
+def _leave(token: Optional[int]) -> bool:
+	"""Close a span opened by _enter(); True if it ran alone in the process."""
+	tid = threading.get_ident()
+	with _open_lock:
+		_open_spans[tid] -= 1
+		if not _open_spans[tid]:
+			del _open_spans[tid]
+		return token is not None and token == _overlaps
+
+
+@dataclass
+class Sample:
+	"""Resource counters at one instant."""
+	wall: float
+	cpu: float
+	child_cpu: float
+	read_bytes: int
+	write_bytes: int
+	token: Optional[int] = None
+
+	@classmethod
+	def take(cls) -> 'Sample':
+		read_bytes, write_bytes = _io_counters()
+		# thread_time keeps concurrent tasks on a thread pool from sharing CPU time
+		return cls(time.perf_counter(), time.thread_time(), _child_cpu(), read_bytes, write_bytes)
+
+	@classmethod
+	def begin(cls) -> 'Sample':
+		"""Sample at the start of a span (pair with finish())."""
+		token = _enter()
+		sample = cls.take()
+		sample.token = token
+		return sample
+
+	def finish(self) -> Dict[str, Any]:
+		"""Usage since begin(); process-wide counters only if the span ran alone."""
+		end = Sample.take()
+		return end.delta(self, alone=_leave(self.token))
+
+	def delta(self, start: 'Sample', alone: bool = True) -> Dict[str, Any]:
+		usage = {
+			'wall': self.wall - start.wall,
+			'cpu': self.cpu - start.cpu,
+			'read_bytes': 0,
+			'write_bytes': 0,
+			'peak_rss': _peak_rss(),
+		}
+		if alone:
+			usage['cpu'] += self.child_cpu - start.child_cpu
+			usage['read_bytes'] = max(0, self.read_bytes - start.read_bytes)
+			usage['write_bytes'] = max(0, self.write_bytes - start.write_bytes)
+		return usage
+
+
+def measure(function: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+	"""Call function and return (result, resource usage).
+
+	Used inside worker threads/processes, where the span is recorded by
+	the scheduling thread; the usage carries the worker's pid/tid.
+	"""
+	start = Sample.begin()
+	try:
+		result = function()
+	finally:
+		usage = start.finish()
+	usage.update(pid=os.getpid(), tid=threading.get_ident())
+	return result, usage
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+@dataclass
+class Span:
+	"""One timed build stage."""
+	name: str
+	category: str = "build"
+	start: float = 0.0          # epoch seconds
+	wall: float = 0.0
+	cpu: float = 0.0
+	read_bytes: int = 0         # 0 when the span overlapped one on another thread
+	write_bytes: int = 0
+	peak_rss: int = 0           # process RSS high-water mark at the span's end
+	pid: int = 0
+	tid: int = 0
+	success: bool = True
+	args: Dict[str, Any] = field(default_factory=dict)
+
+	def to_trace_event(self) -> Dict[str, Any]:
+		"""Chrome trace 'complete' event (timestamps in microseconds)."""
+		return {
+			'name': self.name,
+			'cat': self.category,
+			'ph': 'X',
+			'ts': int(self.start * 1_000_000),
+			'dur': max(1, int(self.wall * 1_000_000)),
+			'pid': self.pid,
+			'tid': self.tid,
+			'args': dict(self.args, cpu_s=round(self.cpu, 6), read_bytes=self.read_bytes,
+						 write_bytes=self.write_bytes, peak_rss=self.peak_rss, success=self.success),
+		}
+
+
+class BuildTracer:
+	"""Collect spans for one build."""
+
+	def __init__(self):
+		self.spans: List[Span] = []
+		self.started = time.time()
+		self._start = Sample.take()
+		self._lock = threading.Lock()
+
+	def record(self, name: str, start: float, usage: Dict[str, Any], category: str = "build",
+			   success: bool = True, **args) -> Span:
+		"""Add a span measured elsewhere (e.g. by measure() in a worker)."""
+		usage = dict(usage)
+		pid = usage.pop('pid', os.getpid())
+		tid = usage.pop('tid', threading.get_ident())
+		span = Span(name=name, category=category, start=start, success=success,
+					pid=pid, tid=tid, args=args, **usage)
+		with self._lock:
+			self.spans.append(span)
+		return span
+
+	@contextmanager
+	def span(self, name: str, category: str = "build", **args) -> Iterator[Dict[str, Any]]:
+		"""Time a block; set ['success'] = False on the yielded dict to mark failure."""
+		state: Dict[str, Any] = {'success': True}
+		start_time = time.time()
+		start = Sample.begin()
+		try:
+			yield state
+		except BaseException:
+			state['success'] = False
+			raise
+		finally:
+			self.record(name, start_time, start.finish(), category,
+						success=state['success'], **args)
+
+	def stage_totals(self) -> Dict[str, Dict[str, Any]]:
+		"""Per-stage totals (spans with the same name are summed)."""
+		totals: Dict[str, Dict[str, Any]] = {}
+		for span in self.spans:
+			entry = totals.setdefault(span.name, {'wall': 0.0, 'cpu': 0.0, 'read_bytes': 0,
+												  'write_bytes': 0, 'peak_rss': 0, 'success': True})
+			entry['wall'] += span.wall
+			entry['cpu'] += span.cpu
+			entry['read_bytes'] += span.read_bytes
+			entry['write_bytes'] += span.write_bytes
+			entry['peak_rss'] = max(entry['peak_rss'], span.peak_rss)
+			entry['success'] = entry['success'] and span.success
+		return totals
+
+	def to_chrome_trace(self) -> Dict[str, Any]:
+		"""Trace-event JSON document."""
+		return {'traceEvents': [span.to_trace_event() for span in self.spans], 'displayTimeUnit': 'ms'}
+
+	def write_chrome_trace(self, path: Union[str, Path]) -> Path:
+		"""Write the Chrome trace JSON."""
+		path = Path(path)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		with open(path, 'w', encoding='utf-8') as f:
+			json.dump(self.to_chrome_trace(), f)
+		return path
+
+	def history_entry(self, success: bool, **extra) -> Dict[str, Any]:
+		"""One build's history record (extra keys, e.g. pipeline, are stored as-is)."""
+		# Process-wide counters for the whole build, whether or not stages overlapped
+		end = Sample.take()
+		return dict({
+			'timestamp': datetime.fromtimestamp(self.started).isoformat(),
+			'success': success,
+			'total_wall': time.time() - self.started,
+			'read_bytes': max(0, end.read_bytes - self._start.read_bytes),
+			'write_bytes': max(0, end.write_bytes - self._start.write_bytes),
+			'child_cpu': end.child_cpu - self._start.child_cpu,
+			'peak_rss': _peak_rss(),
+			'stages': self.stage_totals(),
+		}, **extra)
+
+	def append_history(self, path: Union[str, Path], success: bool, **extra) -> Dict[str, Any]:
+		"""Append this build to a JSON-lines history file."""
+		path = Path(path)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		entry = self.history_entry(success, **extra)
+		with open(path, 'a', encoding='utf-8') as f:
+			f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+		return entry
+
+
+def traced(name: str, category: str = "build") -> Callable:
+	"""Method decorator: time the call in self.tracer (if set).
+
+	A falsy return value marks the span as failed.
+	"""
+	def decorator(method: Callable) -> Callable:
+		@functools.wraps(method)
+		def wrapper(self, *args, **kwargs):
+			tracer = getattr(self, 'tracer', None)
+			if tracer is None:
+				return method(self, *args, **kwargs)
+			with tracer.span(name, category) as state:
+				result = method(self, *args, **kwargs)
+				state['success'] = result is not False
+				return result
+		return wrapper
+	return decorator
+
+
+# ============================================================================
+# HISTORY COMPARISON
+# ============================================================================
+
+@dataclass
+class Regression:
+	"""A stage that got slower than its recent baseline."""
+	stage: str
+	metric: str
+	current: float
+	baseline: float
+
+	@property
+	def ratio(self) -> float:
+		return self.current / self.baseline if self.baseline else float('inf')
+
+
+def load_history(path: Union[str, Path], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+	"""Read history entries, oldest first (the last `limit` if given)."""
+	path = Path(path)
+	if not path.exists():
+		return []
+	entries = []
+	with open(path, 'r', encoding='utf-8') as f:
+		for line in f:
+			line = line.strip()
+			if not line:
+				continue
+			try:
+				entries.append(json.loads(line))
+			except json.JSONDecodeError:
+				continue
+	return entries[-limit:] if limit else entries
+
+
+def compare_with_history(current: Dict[str, Any], history: List[Dict[str, Any]],
+						 threshold: float = 0.25, min_seconds: float = 0.05,
+						 metrics: Tuple[str, ...] = ('wall', 'cpu')) -> List[Regression]:
+	"""Stages whose time exceeds the median of successful past builds.
+
+	Only builds of the same pipeline are compared. A stage regresses when
+	it is more than `threshold` slower than the baseline and by more than
+	`min_seconds`, so timer noise on fast stages is ignored.
+	"""
+	baseline_builds = [entry for entry in history
+					   if entry.get('success') and entry.get('pipeline') == current.get('pipeline')]
+	regressions = []
+	for stage, values in current.get('stages', {}).items():
+		for metric in metrics:
+			previous = [entry['stages'][stage][metric] for entry in baseline_builds
+						if stage in entry.get('stages', {})]
+			if not previous:
+				continue
+			baseline = median(previous)
+			value = values.get(metric, 0.0)
+			if value - baseline > min_seconds and value > baseline * (1 + threshold):
+				regressions.append(Regression(stage, metric, value, baseline))
+	return sorted(regressions, key=lambda r: r.current - r.baseline, reverse=True)
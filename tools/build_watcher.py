@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Watch-Mode Builder
+
+Keeps one long-lived process with the dependency graph, cached bank
+objects, CHR-ROM data and compiled generator scripts in memory, polls
+the asset and source directories, and rebuilds only what a saved file
+affects:
+
+1. Changed assets/json files rerun the generators that read them
+2. Banks whose include closure changed are reassembled
+3. All banks are relinked and the ROM is replaced atomically
+
+Usage:
+	python tools/build_watcher.py
+	python tools/build_watcher.py --output output/dragon_warrior_modified.nes --interval 0.1
+
+	python dragon_warrior_build.py --watch
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from assembler import CHR_ROM_FILE, AssemblerError, load_chr_rom
+from bank_linker import IncrementalBankBuilder, LinkResult
+from dependency_graph import DependencyGraph, GeneratorInfo
+from build_system_advanced import BuildCache
+from pipeline_stages import ScriptRunner
+
+
+DEFAULT_WATCH_DIRS = ("assets/json", "extracted_assets", "source_files")
+
+# Editor swap/backup files that should never trigger a build
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.bak', '~')
+
+
+# ============================================================================
+# WATCHER
+# ============================================================================
+
+class BuildWatcher:
+	"""Poll watched directories and rebuild the ROM incrementally."""
+
+	def __init__(self, project_root: Union[str, Path] = ".", source_dir: Union[str, Path] = "source_files",
+				 output_rom: Union[str, Path] = "output/dragon_warrior_modified.nes",
+				 cache_dir: Union[str, Path] = "build/.cache",
+				 watch_dirs: Optional[List[Union[str, Path]]] = None,
+				 listing_dir: Optional[Union[str, Path]] = None,
+				 interval: float = 0.2,
+				 log: Callable[[str], None] = print):
+		self.project_root = Path(project_root)
+		self.source_dir = Path(source_dir)
+		self.output_rom = Path(output_rom)
+		self.listing_dir = Path(listing_dir) if listing_dir else None
+		self.watch_dirs = [Path(d) for d in (watch_dirs or DEFAULT_WATCH_DIRS)]
+		self.interval = interval
+		self.log = log
+
+		self.cache = BuildCache(self._absolute(Path(cache_dir)))
+		self.graph = DependencyGraph(self.project_root, self.source_dir, cache=self.cache)
+		self.builder = IncrementalBankBuilder(self._absolute(self.source_dir), self.cache)
+		self.runner = ScriptRunner(self.project_root)
+		self.chr_data: Optional[bytes] = None
+		self._chr_stamp: Optional[Tuple[int, int]] = None
+		self._generated: List[Path] = []
+		self._snapshot: Dict[Path, Tuple[int, int]] = {}
+
+	def _absolute(self, path: Path) -> Path:
+		return path if path.is_absolute() else self.project_root / path
+
+	def snapshot(self) -> Dict[Path, Tuple[int, int]]:
+		"""(size, mtime_ns) of every watched file, keyed by project-relative path."""
+		files: Dict[Path, Tuple[int, int]] = {}
+		for directory in self.watch_dirs:
+			root = self._absolute(directory)
+			for dirpath, _, filenames in os.walk(root):
+				for filename in filenames:
+					if filename.endswith(IGNORED_SUFFIXES):
+						continue
+					path = Path(dirpath) / filename
+					try:
+						stat = path.stat()
+					except OSError:
+						continue
+					files[path.relative_to(self.project_root)] = (stat.st_size, stat.st_mtime_ns)
+		return files
+
+	def poll(self) -> List[Path]:
+		"""Files added, removed or modified since the last poll."""
+		current = self.snapshot()
+		changed = [path for path in set(current) | set(self._snapshot)
+				   if current.get(path) != self._snapshot.get(path)]
+		self._snapshot = current
+		return sorted(changed)
+
+	def _settle(self) -> None:
+		"""Take the tables written by the last build into the snapshot.
+
+		Everything else keeps the state the build started from, so a file
+		saved while the build ran is picked up by the next poll.
+		"""
+		current = self.snapshot()
+		for path in self._generated:
+			if path in current:
+				self._snapshot[path] = current[path]
+			else:
+				self._snapshot.pop(path, None)
+
+	def _chr_file_stamp(self) -> Optional[Tuple[int, int]]:
+		"""(size, mtime_ns) of the CHR-ROM source, None when it is missing."""
+		try:
+			stat = (self._absolute(self.source_dir) / CHR_ROM_FILE).stat()
+		except OSError:
+			return None
+		return stat.st_size, stat.st_mtime_ns
+
+	def rebuild(self, changed: List[Path]) -> Optional[LinkResult]:
+		"""Regenerate affected tables, reassemble affected banks and relink."""
+		start = time.perf_counter()
+		self.graph.scan()
+		self._generated = []
+
+		for name in self.graph.affected_generators(changed):
+			info: GeneratorInfo = self.graph.generators[name]
+			self._generated.extend(info.outputs)
+			success, stdout, stderr = self.runner.run(info.script)
+			if not success:
+				self.log(f"[✗] {name} failed:\n{(stdout + stderr).rstrip()}")
+				return None
+			self.log(f"[GEN] {name}")
+
+		# Reload CHR-ROM data when its source was saved since the last load
+		chr_stamp = self._chr_file_stamp()
+		if self.chr_data is None or chr_stamp != self._chr_stamp:
+			self.chr_data, _, warnings = load_chr_rom(self._absolute(self.source_dir))
+			self._chr_stamp = chr_stamp
+			for warning in warnings:
+				self.log(f"Warning: {warning}")
+
+		try:
+			result = self.builder.build(chr_data=self.chr_data)
+		except AssemblerError as e:
+			self.log(f"[✗] Build failed:\n{e}")
+			return None
+
+		output = self._absolute(self.output_rom)
+		result.write(output.parent, output.name,
+					 self._absolute(self.listing_dir) if self.listing_dir else None)
+
+		elapsed = time.perf_counter() - start
+		rebuilt = ', '.join(result.rebuilt) if result.rebuilt else 'relink only'
+		self.log(f"[✓] {output.name} rebuilt in {elapsed:.2f}s ({rebuilt})")
+		return result
+
+	def run(self, max_builds: Optional[int] = None) -> None:
+		"""Build once, then rebuild on every change until interrupted."""
+		self._snapshot = self.snapshot()
+		self.rebuild([])
+		self._settle()
+		builds = 0
+
+		watched = ', '.join(d.as_posix() for d in self.watch_dirs)
+		self.log(f"Watching {watched} (Ctrl+C to stop)")
+		try:
+			while max_builds is None or builds < max_builds:
+				time.sleep(self.interval)
+				changed = self.poll()
+				if not changed:
+					continue
+
+				# Let editors finish writing (save + rename) before building
+				time.sleep(self.interval)
+				changed = sorted(set(changed) | set(self.poll()))
+
+				for path in changed[:5]:
+					self.log(f"  changed: {path.as_posix()}")
+				if len(changed) > 5:
+					self.log(f"  ... and {len(changed) - 5} more")
+
+				self.rebuild(changed)
+				# Generated tables written by this build are not new edits
+				self._settle()
+				builds += 1
+		except KeyboardInterrupt:
+			self.log("Stopped watching")
+
+
+# ============================================================================
+# MAIN CLI
+# ============================================================================
+
+def main() -> int:
+	"""Main entry point."""
+	parser = argparse.ArgumentParser(description="Rebuild the ROM whenever assets or sources change")
+	parser.add_argument('--source-dir', default="source_files", help="Assembly source directory")
+	parser.add_argument('--output', default="output/dragon_warrior_modified.nes", help="Output ROM path")
+	parser.add_argument('--cache-dir', default="build/.cache", help="Build cache directory")
+	parser.add_argument('--listing', help="Directory for listings of rebuilt banks and symbol tables")
+	parser.add_argument('--interval', type=float, default=0.2, help="Polling interval in seconds")
+	parser.add_argument('--watch-dir', action='append', dest='watch_dirs',
+						help=f"Directory to watch (repeatable; default: {', '.join(DEFAULT_WATCH_DIRS)})")
+	args = parser.parse_args()
+
+	watcher = BuildWatcher(
+		Path.cwd(), args.source_dir, args.output, args.cache_dir,
+		watch_dirs=args.watch_dirs, listing_dir=args.listing, interval=args.interval
+	)
+	watcher.run()
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
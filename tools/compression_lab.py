@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Compression Lab
+
+Runs real compression trials on ROM regions: every region is encoded
+with every candidate codec, decoded again and compared with the original,
+so the report holds exact sizes instead of estimates:
+
+- dw_rle: the overworld's RLE (one byte per run: high nibble value, low
+  nibble run length - 1). Only applies to data whose values fit in a
+  nibble, such as the decoded world map tiles.
+- rle: PackBits-style byte RLE (a control byte starts either a literal
+  block or a repeated byte).
+- lzss_8_8, lzss_10_6, lzss_12_4: LZSS with a flag byte per 8 tokens and
+  two-byte matches, split between offset and length bits (256, 1KB and
+  4KB windows).
+- chr_rows: CHR tiles plane by plane, one mask byte per 8-row plane
+  marking rows that repeat the row above.
+- chr_dedup: unique CHR tiles plus one index per tile.
+
+Every compressed stream starts with the 16-bit decoded size, and sizes
+include it. The decoders count their work (tokens, literal and copied
+bytes), which is priced with per-event 6502 cycle estimates
+(CYCLE_COSTS) for a straightforward RAM decoder. These are planning
+numbers, not cycle-exact timings.
+
+Regions x codecs are evaluated on a process pool. Each worker maps the
+ROM once when it starts (rom_image.RomImage.open, read-only); only region
+spans and codec names go to the workers.
+
+Usage:
+	python tools/compression_lab.py roms/dw.nes
+	python tools/compression_lab.py roms/dw.nes --region map_data --codec rle --codec lzss_12_4 -o build/trials.json
+
+	from compression_lab import run_trials
+
+	report = run_trials("roms/dw.nes")
+	for name, result in report.best().items():
+		print(name, result.codec, result.savings)
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import concurrent.futures
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+from extraction_engine import WORLD_MAP_DATA_SIZE, WORLD_MAP_OFFSET, decode_world_map
+from rom_image import RomImage, open_rom
+from table_generation import atomic_write
+
+
+HEADER = struct.Struct('<H')
+# Pseudo-region: the overworld decoded to one tile value per byte
+WORLD_MAP_TILES = 'world_map_tiles'
+
+TILE_SIZE = 16
+PLANE_SIZE = 8
+LZSS_MIN_MATCH = 3
+# Hash-chain candidates tried per position by the LZSS encoder
+LZSS_MAX_CHAIN = 32
+
+# Estimated 6502 cycles per decoder event
+CYCLE_COSTS: Dict[str, Dict[str, int]] = {
+	'dw_rle': {'token': 28, 'byte': 13},
+	'rle': {'literal_token': 24, 'literal_byte': 17, 'run_token': 26, 'run_byte': 13},
+	'lzss': {'flags': 22, 'literal': 30, 'match': 52, 'copy_byte': 24},
+	'chr_rows': {'plane': 34, 'row_literal': 21, 'row_repeat': 12},
+	'chr_dedup': {'tile': 38, 'byte': 17},
+}
+
+Events = Counter
+
+
+class CodecError(ValueError):
+	"""Data a codec cannot encode (or a stream it cannot decode)."""
+
+
+# ============================================================================
+# CODECS
+# ============================================================================
+
+def _with_header(data: bytes, payload: bytearray) -> bytes:
+	if len(data) > 0xFFFF:
+		raise CodecError(f"{len(data)} bytes is larger than a 16-bit size header")
+	return HEADER.pack(len(data)) + bytes(payload)
+
+
+def encode_dw_rle(data: bytes) -> bytes:
+	"""Overworld RLE: one byte per run of up to 16 equal values below 0x10."""
+	if data and max(data) > 0x0F:
+		raise CodecError("values above 0x0F do not fit the run nibble format")
+	out = bytearray()
+	i = 0
+	while i < len(data):
+		run = 1
+		while run < 16 and i + run < len(data) and data[i + run] == data[i]:
+			run += 1
+		out.append(data[i] << 4 | (run - 1))
+		i += run
+	return _with_header(data, out)
+
+
+def decode_dw_rle(stream: bytes) -> Tuple[bytes, Events]:
+	size, = HEADER.unpack_from(stream)
+	out = bytearray()
+	events = Counter()
+	offset = HEADER.size
+	while len(out) < size:
+		byte = stream[offset]
+		offset += 1
+		out.extend([byte >> 4] * ((byte & 0x0F) + 1))
+		events['token'] += 1
+	events['byte'] = size
+	return bytes(out[:size]), events
+
+
+def encode_rle(data: bytes) -> bytes:
+	"""PackBits: 0x00-0x7F = n + 1 literal bytes follow, 0x80-0xFF = next byte repeated n - 0x80 + 3 times."""
+	out = bytearray()
+	literal = bytearray()
+
+	def flush() -> None:
+		for start in range(0, len(literal), 0x80):
+			chunk = literal[start:start + 0x80]
+			out.append(len(chunk) - 1)
+			out.extend(chunk)
+		literal.clear()
+
+	i = 0
+	while i < len(data):
+		run = 1
+		while run < 0x82 and i + run < len(data) and data[i + run] == data[i]:
+			run += 1
+		if run >= 3:
+			flush()
+			out += bytes((0x80 + run - 3, data[i]))
+			i += run
+		else:
+			literal.append(data[i])
+			i += 1
+	flush()
+	return _with_header(data, out)
+
+
+def decode_rle(stream: bytes) -> Tuple[bytes, Events]:
+	size, = HEADER.unpack_from(stream)
+	out = bytearray()
+	events = Counter()
+	offset = HEADER.size
+	while len(out) < size:
+		control = stream[offset]
+		offset += 1
+		if control < 0x80:
+			out += stream[offset:offset + control + 1]
+			offset += control + 1
+			events['literal_token'] += 1
+			events['literal_byte'] += control + 1
+		else:
+			out += bytes([stream[offset]]) * (control - 0x80 + 3)
+			offset += 1
+			events['run_token'] += 1
+			events['run_byte'] += control - 0x80 + 3
+	return bytes(out[:size]), events
+
+
+def _lzss_codec(offset_bits: int) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], Tuple[bytes, Events]]]:
+	"""LZSS encoder/decoder pair with offset_bits of window and 16 - offset_bits of length per match."""
+	length_bits = 16 - offset_bits
+	window = 1 << offset_bits
+	max_match = LZSS_MIN_MATCH + (1 << length_bits) - 1
+
+	def encode(data: bytes) -> bytes:
+		out = bytearray()
+		chains: Dict[bytes, List[int]] = {}
+		flags_at = -1
+		token = 8
+		i = 0
+		while i < len(data):
+			if token == 8:
+				flags_at = len(out)
+				out.append(0)
+				token = 0
+
+			best_length, best_distance = 0, 0
+			key = data[i:i + LZSS_MIN_MATCH]
+			candidates = chains.get(key, ()) if len(key) == LZSS_MIN_MATCH else ()
+			limit = min(max_match, len(data) - i)
+			for candidate in reversed(candidates[-LZSS_MAX_CHAIN:]):
+				if i - candidate > window:
+					break
+				# Only extend candidates that could beat the best match
+				if best_length and data[candidate + best_length] != data[i + best_length]:
+					continue
+				length = LZSS_MIN_MATCH
+				while length < limit and data[candidate + length] == data[i + length]:
+					length += 1
+				if length > best_length:
+					best_length, best_distance = length, i - candidate
+					if length == limit:
+						break
+
+			step = best_length if best_length >= LZSS_MIN_MATCH else 1
+			if step == 1:
+				out[flags_at] |= 1 << token
+				out.append(data[i])
+			else:
+				out += struct.pack('<H', (best_distance - 1) << length_bits | (best_length - LZSS_MIN_MATCH))
+			for position in range(i, i + step):
+				prefix = data[position:position + LZSS_MIN_MATCH]
+				if len(prefix) == LZSS_MIN_MATCH:
+					chains.setdefault(prefix, []).append(position)
+			i += step
+			token += 1
+		return _with_header(data, out)
+
+	def decode(stream: bytes) -> Tuple[bytes, Events]:
+		size, = HEADER.unpack_from(stream)
+		out = bytearray()
+		events = Counter()
+		offset = HEADER.size
+		while len(out) < size:
+			flags = stream[offset]
+			offset += 1
+			events['flags'] += 1
+			for bit in range(8):
+				if len(out) >= size:
+					break
+				if flags >> bit & 1:
+					out.append(stream[offset])
+					offset += 1
+					events['literal'] += 1
+					continue
+				word, = struct.unpack_from('<H', stream, offset)
+				offset += 2
+				distance = (word >> length_bits) + 1
+				length = (word & ((1 << length_bits) - 1)) + LZSS_MIN_MATCH
+				if distance > len(out):
+					raise CodecError(f"match reaches {distance} bytes back at output byte {len(out)}")
+				# Byte by byte: a match may overlap the bytes it produces
+				for _ in range(length):
+					out.append(out[-distance])
+				events['match'] += 1
+				events['copy_byte'] += length
+		return bytes(out[:size]), events
+
+	return encode, decode
+
+
+def _tiles(data: bytes) -> List[bytes]:
+	if len(data) % TILE_SIZE:
+		raise CodecError(f"{len(data)} bytes is not a whole number of {TILE_SIZE} byte tiles")
+	return [bytes(data[i:i + TILE_SIZE]) for i in range(0, len(data), TILE_SIZE)]
+
+
+def encode_chr_rows(data: bytes) -> bytes:
+	"""Per 8-byte plane: a mask of rows equal to the row above (0x00 above row 0), then the other rows."""
+	out = bytearray()
+	for tile in _tiles(data):
+		for plane in (tile[:PLANE_SIZE], tile[PLANE_SIZE:]):
+			mask = 0
+			rows = bytearray()
+			previous = 0
+			for row, value in enumerate(plane):
+				if value == previous:
+					mask |= 1 << row
+				else:
+					rows.append(value)
+				previous = value
+			out.append(mask)
+			out += rows
+	return _with_header(data, out)
+
+
+def decode_chr_rows(stream: bytes) -> Tuple[bytes, Events]:
+	size, = HEADER.unpack_from(stream)
+	out = bytearray()
+	events = Counter()
+	offset = HEADER.size
+	while len(out) < size:
+		mask = stream[offset]
+		offset += 1
+		events['plane'] += 1
+		previous = 0
+		for row in range(PLANE_SIZE):
+			if not mask >> row & 1:
+				previous = stream[offset]
+				offset += 1
+				events['row_literal'] += 1
+			else:
+				events['row_repeat'] += 1
+			out.append(previous)
+	return bytes(out[:size]), events
+
+
+def encode_chr_dedup(data: bytes) -> bytes:
+	"""Unique tiles (count, then tiles) followed by one index per tile (two bytes above 256 unique tiles)."""
+	tiles = _tiles(data)
+	unique: Dict[bytes, int] = {}
+	for tile in tiles:
+		unique.setdefault(tile, len(unique))
+	out = bytearray(HEADER.pack(len(unique)))
+	for tile in unique:
+		out += tile
+	index_format = 'B' if len(unique) <= 0x100 else '<H'
+	for tile in tiles:
+		out += struct.pack(index_format, unique[tile])
+	return _with_header(data, out)
+
+
+def decode_chr_dedup(stream: bytes) -> Tuple[bytes, Events]:
+	size, = HEADER.unpack_from(stream)
+	count, = HEADER.unpack_from(stream, HEADER.size)
+	offset = 2 * HEADER.size
+	unique = [stream[offset + i * TILE_SIZE:offset + (i + 1) * TILE_SIZE] for i in range(count)]
+	offset += count * TILE_SIZE
+	index_size = 1 if count <= 0x100 else 2
+	out = bytearray()
+	events = Counter()
+	while len(out) < size:
+		index = int.from_bytes(stream[offset:offset + index_size], 'little')
+		offset += index_size
+		out += unique[index]
+		events['tile'] += 1
+		events['byte'] += TILE_SIZE
+	return bytes(out[:size]), events
+
+
+@dataclass(frozen=True)
+class Codec:
+	"""A candidate compression scheme."""
+	name: str
+	encode: Callable[[bytes], bytes]
+	decode: Callable[[bytes], Tuple[bytes, Events]]
+	costs: str
+	description: str
+
+	def cycles(self, events: Events) -> int:
+		costs = CYCLE_COSTS[self.costs]
+		return sum(costs[event] * count for event, count in events.items())
+
+
+CODECS: Dict[str, Codec] = {
+	'dw_rle': Codec('dw_rle', encode_dw_rle, decode_dw_rle, 'dw_rle', 'Overworld nibble RLE'),
+	'rle': Codec('rle', encode_rle, decode_rle, 'rle', 'PackBits byte RLE'),
+	'lzss_8_8': Codec('lzss_8_8', *_lzss_codec(8), 'lzss', 'LZSS, 256 byte window'),
+	'lzss_10_6': Codec('lzss_10_6', *_lzss_codec(10), 'lzss', 'LZSS, 1KB window'),
+	'lzss_12_4': Codec('lzss_12_4', *_lzss_codec(12), 'lzss', 'LZSS, 4KB window'),
+	'chr_rows': Codec('chr_rows', encode_chr_rows, decode_chr_rows, 'chr_rows', 'CHR row-repeat masks'),
+	'chr_dedup': Codec('chr_dedup', encode_chr_dedup, decode_chr_dedup, 'chr_dedup', 'CHR unique tiles + index'),
+}
+
+
+# ============================================================================
+# TRIALS
+# ============================================================================
+
+@dataclass
+class TrialResult:
+	"""One codec run on one region."""
+	region: str
+	codec: str
+	original_size: int
+	compressed_size: int = 0
+	cycles: int = 0
+	verified: bool = False
+	error: Optional[str] = None
+	elapsed: float = 0.0
+
+	@property
+	def applicable(self) -> bool:
+		return self.error is None
+
+	@property
+	def savings(self) -> int:
+		return self.original_size - self.compressed_size if self.applicable else 0
+
+	@property
+	def ratio(self) -> float:
+		return self.compressed_size / self.original_size if self.applicable and self.original_size else 1.0
+
+	@property
+	def cycles_per_byte(self) -> float:
+		return self.cycles / self.original_size if self.original_size else 0.0
+
+	def to_dict(self) -> Dict:
+		data = asdict(self)
+		data.update(savings=self.savings, ratio=round(self.ratio, 4), cycles_per_byte=round(self.cycles_per_byte, 2))
+		data['elapsed'] = round(self.elapsed, 4)
+		return data
+
+
+@dataclass
+class TrialReport:
+	"""Results of every region x codec trial."""
+	rom: str
+	results: List[TrialResult] = field(default_factory=list)
+	elapsed: float = 0.0
+
+	def best(self) -> Dict[str, TrialResult]:
+		"""Smallest verified result per region (regions nothing compresses are left out)."""
+		best: Dict[str, TrialResult] = {}
+		for result in self.results:
+			if not result.verified or result.savings <= 0:
+				continue
+			current = best.get(result.region)
+			if current is None or (result.compressed_size, result.cycles) < (current.compressed_size, current.cycles):
+				best[result.region] = result
+		return best
+
+	def to_dict(self) -> Dict:
+		return {
+			'rom': self.rom,
+			'elapsed': round(self.elapsed, 3),
+			'best': {region: result.codec for region, result in self.best().items()},
+			'results': [result.to_dict() for result in self.results],
+		}
+
+	def save(self, path: Union[str, Path]) -> Path:
+		path = Path(path)
+		atomic_write(path, json.dumps(self.to_dict(), indent=2).encode('utf-8'))
+		return path
+
+
+def region_data(rom: RomImage, span: Optional[Tuple[int, int]]) -> bytes:
+	"""Bytes of a file span, or the decoded world map tiles for span None."""
+	if span is None:
+		rows = decode_world_map(bytes(rom.data[WORLD_MAP_OFFSET:WORLD_MAP_OFFSET + WORLD_MAP_DATA_SIZE]))['rows']
+		return bytes(int(tile, 16) for row in rows for tile in row)
+	start, end = span
+	return bytes(rom.data[start:min(end, len(rom))])
+
+
+def run_trial(region: str, data: bytes, codec: Codec) -> TrialResult:
+	"""Encode, decode and verify one region with one codec."""
+	start = time.perf_counter()
+	result = TrialResult(region, codec.name, len(data))
+	try:
+		stream = codec.encode(data)
+	except CodecError as e:
+		result.error = str(e)
+	else:
+		result.compressed_size = len(stream)
+		try:
+			decoded, events = codec.decode(stream)
+			result.cycles = codec.cycles(events)
+			result.verified = decoded == data
+		except (CodecError, IndexError, struct.error):
+			# A stream the decoder cannot read fails verification
+			result.verified = False
+	result.elapsed = time.perf_counter() - start
+	return result
+
+
+# The ROM, mapped once per worker process
+_rom: Optional[RomImage] = None
+
+Task = Tuple[str, Optional[Tuple[int, int]], str]
+
+
+def _init_worker(rom_path: str) -> None:
+	global _rom
+	_rom = RomImage.open(rom_path)
+
+
+def _trial_in_worker(task: Task) -> TrialResult:
+	region, span, codec = task
+	return run_trial(region, region_data(_rom, span), CODECS[codec])
+
+
+def default_regions() -> Dict[str, Optional[Tuple[int, int]]]:
+	"""analyze_rom_space.ROM_REGIONS (without the header) plus the decoded world map."""
+	from analyze_rom_space import ROM_REGIONS
+	regions: Dict[str, Optional[Tuple[int, int]]] = {
+		name: (start, end) for name, (start, end, _) in ROM_REGIONS.items() if name != 'header'
+	}
+	regions[WORLD_MAP_TILES] = None
+	return regions
+
+
+def run_trials(rom: Union[str, Path, RomImage, bytes, bytearray],
+			   regions: Optional[Dict[str, Optional[Tuple[int, int]]]] = None,
+			   codecs: Optional[Sequence[str]] = None, workers: Optional[int] = None) -> TrialReport:
+	"""
+	Run every codec on every region
+
+	Args:
+		rom: ROM path, image or bytes (only paths are run on the pool)
+		regions: Region name -> (start, end) file span, or None for the
+			decoded world map tiles (default: default_regions())
+		codecs: Names from CODECS (default: all)
+		workers: Worker processes (default: CPU count)
+
+	Returns:
+		TrialReport, results in region then codec order
+	"""
+	start = time.perf_counter()
+	regions = default_regions() if regions is None else regions
+	codecs = list(CODECS) if codecs is None else list(codecs)
+	for name in codecs:
+		if name not in CODECS:
+			raise ValueError(f"Unknown codec: {name} (choose from {', '.join(CODECS)})")
+	tasks: List[Task] = [(region, span, codec) for region, span in regions.items() for codec in codecs]
+	workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+
+	path = rom if isinstance(rom, (str, Path)) else None
+	report = TrialReport(str(path or getattr(rom, 'path', None) or '<memory>'))
+	if workers == 1 or path is None:
+		image = open_rom(rom)
+		cache: Dict[str, bytes] = {}
+		for region, span, codec in tasks:
+			if region not in cache:
+				cache[region] = region_data(image, span)
+			report.results.append(run_trial(region, cache[region], CODECS[codec]))
+	else:
+		with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+													initargs=(str(path),)) as pool:
+			report.results = list(pool.map(_trial_in_worker, tasks))
+
+	report.elapsed = time.perf_counter() - start
+	return report
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Compression trials for Dragon Warrior ROM regions')
+	parser.add_argument('rom', help='Dragon Warrior ROM')
+	parser.add_argument('--region', action='append', help='Only this region (repeatable, default: all)')
+	parser.add_argument('--codec', action='append', help=f"Only this codec (repeatable: {', '.join(CODECS)})")
+	parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+	parser.add_argument('-o', '--output', help='Write the JSON report here')
+	args = parser.parse_args()
+
+	regions = default_regions()
+	if args.region:
+		unknown = [name for name in args.region if name not in regions]
+		if unknown:
+			print(f"❌ Unknown region: {', '.join(unknown)} (choose from {', '.join(regions)})", file=sys.stderr)
+			return 1
+		regions = {name: regions[name] for name in args.region}
+
+	try:
+		report = run_trials(args.rom, regions, args.codec, args.workers)
+	except (OSError, ValueError) as e:
+		print(f"❌ {e}", file=sys.stderr)
+		return 1
+
+	best = report.best()
+	print(f"{'Region':18} {'Codec':10} {'Original':>9} {'Packed':>9} {'Ratio':>6} {'Cyc/B':>6}")
+	for result in report.results:
+		if not result.applicable:
+			print(f"{result.region:18} {result.codec:10} {'n/a':>9}  {result.error}")
+			continue
+		mark = '✓' if result.verified else '❌'
+		star = ' *' if best.get(result.region) is result else ''
+		print(f"{result.region:18} {result.codec:10} {result.original_size:9,} {result.compressed_size:9,} "
+			  f"{result.ratio:6.1%} {result.cycles_per_byte:6.1f} {mark}{star}")
+
+	failed = [result for result in report.results if result.applicable and not result.verified]
+	print(f"\n{len(report.results)} trials in {report.elapsed:.2f}s, "
+		  f"best savings {sum(result.savings for result in best.values()):,} bytes (* = best per region)")
+	if args.output:
+		print(f"Report: {report.save(args.output)}")
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
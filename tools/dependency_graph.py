@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Build Dependency Graph
+
+Infers file-level build dependencies instead of relying on hand-listed
+task inputs:
+- .include/.incbin chains from DragonWarrior.asm, Build_Config.asm,
+  Header.asm and the bank files
+- tools/generate_*_table(s).py generators, mapped to the assets/json
+  files they read and the .asm files they write (found by statically
+  folding the path expressions in each script)
+
+Per-file scan results are cached through BuildCache artifacts and only
+rescanned when a file's content hash changes.
+
+Usage:
+	from dependency_graph import DependencyGraph
+
+	graph = DependencyGraph(Path.cwd()).scan()
+	graph.affected_banks([Path("assets/json/items.json")])   # ['Bank00.asm']
+	graph.affected_generators([Path("assets/json/items.json")])
+
+	python tools/dependency_graph.py --changed assets/json/items.json
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import re
+import ast
+import sys
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from dataclasses import dataclass, field
+
+from assembler import HEADER_FILE, BANK_FILES, include_targets, resolve_include
+
+
+# Bump when the scan logic changes
+GRAPH_FORMAT_VERSION = 1
+
+SOURCE_ROOTS = ("DragonWarrior.asm", "Build_Config.asm", HEADER_FILE) + BANK_FILES
+GENERATOR_PATTERNS = ("generate_*_table.py", "generate_*_tables.py")
+
+# Where bare file names in generator scripts live
+JSON_DIR = Path("assets") / "json"
+GENERATED_DIR = Path("source_files") / "generated"
+
+_PATH_LITERAL_RE = re.compile(r'^[\w./\\-]+\.(json|asm)$')
+
+
+# ============================================================================
+# GENERATOR SCANNING
+# ============================================================================
+
+@dataclass
+class GeneratorInfo:
+	"""Files a table generator reads and writes (project-relative)."""
+	script: Path
+	inputs: List[Path] = field(default_factory=list)
+	outputs: List[Path] = field(default_factory=list)
+
+	@property
+	def name(self) -> str:
+		"""Generator id (script stem)."""
+		return self.script.stem
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			'script': self.script.as_posix(),
+			'inputs': [p.as_posix() for p in self.inputs],
+			'outputs': [p.as_posix() for p in self.outputs],
+		}
+
+	@classmethod
+	def from_dict(cls, data: Dict[str, Any]) -> 'GeneratorInfo':
+		return cls(Path(data['script']), [Path(p) for p in data['inputs']], [Path(p) for p in data['outputs']])
+
+
+def _fold_path(node: ast.AST, env: Dict[str, str]) -> Optional[str]:
+	"""Fold a `base / "dir" / "file"` expression into a relative path string.
+
+	Unknown bases (Path(__file__).parent.parent, project_root, ...) fold to
+	'' and are treated as the project root.
+	"""
+	if isinstance(node, ast.Constant) and isinstance(node.value, str):
+		return node.value
+	if isinstance(node, ast.Name):
+		return env.get(node.id, '')
+	if isinstance(node, ast.Attribute):
+		return ''
+	if isinstance(node, ast.Call):
+		if isinstance(node.func, ast.Name) and node.func.id == 'Path' and len(node.args) == 1:
+			return _fold_path(node.args[0], env)
+		return ''
+	if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+		left = _fold_path(node.left, env)
+		right = _fold_path(node.right, env)
+		if left is None or right is None:
+			return None
+		return '/'.join(part for part in (left, right) if part)
+	return None
+
+
+def scan_generator(script: Path, project_root: Path) -> GeneratorInfo:
+	"""Find the JSON inputs and .asm outputs referenced by a generator script."""
+	tree = ast.parse(script.read_text(encoding='utf-8'), filename=str(script))
+
+	# Module-level path constants (ASSETS_JSON = PROJECT_ROOT / "assets" / "json")
+	env: Dict[str, str] = {}
+	for statement in tree.body:
+		if isinstance(statement, ast.Assign) and len(statement.targets) == 1 \
+				and isinstance(statement.targets[0], ast.Name):
+			folded = _fold_path(statement.value, env)
+			if folded is not None:
+				env[statement.targets[0].id] = folded
+
+	found: Set[str] = set()
+	for node in ast.walk(tree):
+		if isinstance(node, (ast.BinOp, ast.Constant)):
+			folded = _fold_path(node, env)
+			if folded and _PATH_LITERAL_RE.match(folded):
+				found.add(folded.replace('\\', '/'))
+
+	inputs: Set[Path] = set()
+	outputs: Set[Path] = set()
+	for text in found:
+		path = Path(text)
+		if path.suffix == '.json':
+			inputs.add(path if len(path.parts) > 1 else JSON_DIR / path)
+		else:
+			outputs.add(path if len(path.parts) > 1 else GENERATED_DIR / path)
+
+	try:
+		relative_script = script.resolve().relative_to(project_root.resolve())
+	except ValueError:
+		relative_script = script
+	return GeneratorInfo(relative_script, sorted(inputs), sorted(outputs))
+
+
+# ============================================================================
+# DEPENDENCY GRAPH
+# ============================================================================
+
+class DependencyGraph:
+	"""File-level dependency graph for the ROM build.
+
+	edges maps each file to the files it reads. All paths are relative to
+	project_root. cache is optional and must provide get_file_hash(),
+	get_artifact() and store_artifact() (see build_system_advanced.BuildCache).
+	"""
+
+	ARTIFACT_KEY = "dependency-graph"
+
+	def __init__(self, project_root: Union[str, Path], source_dir: Union[str, Path] = "source_files",
+				 tools_dir: Union[str, Path] = "tools", cache: Any = None):
+		self.project_root = Path(project_root)
+		self.source_dir = Path(source_dir)
+		self.tools_dir = Path(tools_dir)
+		self.cache = cache
+		self.edges: Dict[Path, List[Path]] = {}
+		self.generators: Dict[str, GeneratorInfo] = {}
+		self.scanned = 0
+
+	def _absolute(self, path: Path) -> Path:
+		return path if path.is_absolute() else self.project_root / path
+
+	def _relative(self, path: Path) -> Path:
+		try:
+			return path.resolve().relative_to(self.project_root.resolve())
+		except ValueError:
+			return path
+
+	def _digest(self, path: Path) -> str:
+		return self.cache.get_file_hash(path) if self.cache is not None else ''
+
+	def _scan_source(self, path: Path) -> List[Path]:
+		"""Files one source reads directly (missing files included)."""
+		absolute = self._absolute(path)
+		text = absolute.read_text(encoding='utf-8', errors='replace')
+		source_dir = self._absolute(self.source_dir)
+		deps = []
+		for _, name in include_targets(text):
+			target = resolve_include(name, absolute.parent, [source_dir])
+			deps.append(self._relative(target if target is not None else absolute.parent / name))
+		return deps
+
+	def scan(self) -> 'DependencyGraph':
+		"""Scan sources and generators, reusing cached per-file results."""
+		previous: Dict[str, Any] = {}
+		if self.cache is not None:
+			cached = self.cache.get_artifact(self.ARTIFACT_KEY)
+			if cached and cached.get('version') == GRAPH_FORMAT_VERSION:
+				previous = cached.get('files', {})
+
+		files: Dict[str, Any] = {}
+		self.edges = {}
+		self.generators = {}
+		self.scanned = 0
+
+		def cached_entry(path: Path) -> Optional[Dict[str, Any]]:
+			key = path.as_posix()
+			digest = self._digest(self._absolute(path))
+			entry = previous.get(key)
+			if entry is not None and digest and entry.get('digest') == digest:
+				files[key] = entry
+				return entry
+			files[key] = {'digest': digest}
+			self.scanned += 1
+			return None
+
+		# Assembly sources, following includes
+		pending = [self.source_dir / name for name in SOURCE_ROOTS]
+		while pending:
+			path = pending.pop()
+			if path in self.edges or not self._absolute(path).exists():
+				continue
+			entry = cached_entry(path)
+			if entry is not None:
+				deps = [Path(p) for p in entry['deps']]
+			else:
+				deps = self._scan_source(path)
+				files[path.as_posix()]['deps'] = [p.as_posix() for p in deps]
+			self.edges[path] = deps
+			pending.extend(dep for dep in deps if dep.suffix.lower() == '.asm')
+
+		# Table generators
+		tools_dir = self._absolute(self.tools_dir)
+		scripts = sorted({script for pattern in GENERATOR_PATTERNS for script in tools_dir.glob(pattern)})
+		for script in scripts:
+			path = self._relative(script)
+			entry = cached_entry(path)
+			if entry is not None:
+				info = GeneratorInfo.from_dict(entry['generator'])
+			else:
+				info = scan_generator(script, self.project_root)
+				files[path.as_posix()]['generator'] = info.to_dict()
+			self.generators[info.name] = info
+			for output in info.outputs:
+				self.edges.setdefault(output, [])
+				self.edges[output] = sorted(set(self.edges[output]) | set(info.inputs) | {info.script})
+
+		if self.cache is not None and self.scanned:
+			self.cache.store_artifact(self.ARTIFACT_KEY, {'version': GRAPH_FORMAT_VERSION, 'files': files})
+		return self
+
+	def dependencies(self, path: Union[str, Path]) -> Set[Path]:
+		"""Every file path transitively reads."""
+		found: Set[Path] = set()
+		pending = [Path(path)]
+		while pending:
+			for dep in self.edges.get(pending.pop(), []):
+				if dep not in found:
+					found.add(dep)
+					pending.append(dep)
+		return found
+
+	def dependents(self, changed: Iterable[Union[str, Path]]) -> Set[Path]:
+		"""Every file that transitively reads any of the changed files."""
+		reverse: Dict[Path, Set[Path]] = {}
+		for target, deps in self.edges.items():
+			for dep in deps:
+				reverse.setdefault(dep, set()).add(target)
+
+		found: Set[Path] = set()
+		pending = [Path(p) for p in changed]
+		while pending:
+			for dependent in reverse.get(pending.pop(), ()):
+				if dependent not in found:
+					found.add(dependent)
+					pending.append(dependent)
+		return found
+
+	def affected_generators(self, changed: Iterable[Union[str, Path]]) -> List[str]:
+		"""Generators whose inputs or script changed."""
+		changed = {Path(p) for p in changed}
+		return [name for name, info in sorted(self.generators.items())
+				if info.script in changed or changed & set(info.inputs)]
+
+	def affected_banks(self, changed: Iterable[Union[str, Path]]) -> List[str]:
+		"""Bank and header sources that must be reassembled."""
+		changed = [Path(p) for p in changed]
+		affected = self.dependents(changed) | set(changed)
+		return [name for name in (HEADER_FILE,) + BANK_FILES if self.source_dir / name in affected]
+
+	def build_inputs(self) -> List[Path]:
+		"""Every existing file the assembled banks read."""
+		found: Set[Path] = set()
+		for name in (HEADER_FILE,) + BANK_FILES:
+			path = self.source_dir / name
+			found.add(path)
+			found |= self.dependencies(path)
+		# Generator scripts and JSON belong to the generator tasks
+		return sorted(p for p in found if p.suffix.lower() in ('.asm', '.bin') and self._absolute(p).exists())
+
+
+# ============================================================================
+# MAIN CLI
+# ============================================================================
+
+def main() -> int:
+	"""Main entry point."""
+	parser = argparse.ArgumentParser(description="Show inferred build dependencies")
+	parser.add_argument('--source-dir', default="source_files", help="Assembly source directory")
+	parser.add_argument('--tools-dir', default="tools", help="Directory containing generate_*_table.py")
+	parser.add_argument('--changed', nargs='*', default=[], help="Report what these files affect")
+	args = parser.parse_args()
+
+	graph = DependencyGraph(Path.cwd(), args.source_dir, args.tools_dir).scan()
+
+	if args.changed:
+		print(f"Generators: {', '.join(graph.affected_generators(args.changed)) or 'none'}")
+		print(f"Banks:      {', '.join(graph.affected_banks(args.changed)) or 'none'}")
+		return 0
+
+	for name, info in sorted(graph.generators.items()):
+		inputs = ', '.join(p.as_posix() for p in info.inputs) or '?'
+		outputs = ', '.join(p.as_posix() for p in info.outputs) or '?'
+		print(f"{name}: {inputs} -> {outputs}")
+	for name in (HEADER_FILE,) + BANK_FILES:
+		deps = sorted(p.as_posix() for p in graph.dependencies(graph.source_dir / name))
+		print(f"{name}: {len(deps)} dependencies")
+		for dep in deps:
+			print(f"  {dep}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
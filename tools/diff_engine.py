@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior ROM Diff Engine
+
+The byte comparison shared by rom_diff, rom_comparison_advanced,
+build/rom_comparator, reinsertion_plan and the patch tools:
+
+- Differences are found as maximal runs of changed bytes. With NumPy the
+  two buffers are compared in one vectorized pass (np.flatnonzero on the
+  edges of the a != b mask); without it, fixed-size blocks are compared
+  as slices and only the blocks that differ are scanned.
+- RomDiff keeps the runs (DiffRun: offset, original bytes, modified
+  bytes) and the two buffers. Per-byte (offset, old, new) tuples and
+  context windows are produced only when a caller asks for them, so a
+  report that only needs counts or clusters never touches single bytes.
+- ROMs of different sizes are compared either over the common prefix or
+  with the shorter one padded with a fill byte (pad=0 matches the
+  behaviour of the old zero-padding comparator).
+
+Usage:
+	from diff_engine import RomDiff
+
+	diff = RomDiff(original_rom, modified_rom)
+	print(diff.changed_bytes, len(diff.runs))
+	for run in diff.runs:
+		print(f"0x{run.offset:05X}: {run.original.hex()} -> {run.modified.hex()}")
+	before, after = diff.context(diff.runs[0].offset, 8)
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+# Block size for the pure-Python diff: whole blocks are compared as
+# slices, and only differing blocks are scanned further
+DIFF_BLOCK_SIZE = 256
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+def diff_mask(original: Buffer, modified: Buffer):
+	"""NumPy boolean array, True where two equal-length buffers differ."""
+	return np.frombuffer(original, dtype=np.uint8) != np.frombuffer(modified, dtype=np.uint8)
+
+
+def _differing_blocks(original: Buffer, modified: Buffer) -> Iterable[int]:
+	"""Start offsets of DIFF_BLOCK_SIZE blocks that differ (no NumPy)."""
+	original = memoryview(original)
+	modified = memoryview(modified)
+	for start in range(0, len(original), DIFF_BLOCK_SIZE):
+		end = start + DIFF_BLOCK_SIZE
+		if original[start:end] != modified[start:end]:
+			yield start
+
+
+def diff_spans(original: Buffer, modified: Buffer) -> List[Tuple[int, int]]:
+	"""(start, end) of the maximal runs of differing bytes in two equal-length buffers."""
+	if len(original) != len(modified):
+		raise ValueError(f"Length mismatch: {len(original)} != {len(modified)}")
+
+	if np is not None:
+		mask = diff_mask(original, modified)
+		if not mask.any():
+			return []
+		edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+		return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+	original = bytes(original)
+	modified = bytes(modified)
+	spans: List[List[int]] = []
+	for block in _differing_blocks(original, modified):
+		end = min(block + DIFF_BLOCK_SIZE, len(original))
+		# Only blocks that differ are scanned byte by byte
+		offset = block
+		while offset < end:
+			if original[offset] == modified[offset]:
+				offset += 1
+				continue
+			run_start = offset
+			while offset < end and original[offset] != modified[offset]:
+				offset += 1
+			if spans and spans[-1][1] == run_start:
+				spans[-1][1] = offset
+			else:
+				spans.append([run_start, offset])
+	return [(start, end) for start, end in spans]
+
+
+def changed_runs(original: Buffer, modified: Buffer) -> List[Tuple[int, bytes]]:
+	"""Maximal runs of differing bytes as (offset, modified bytes)."""
+	modified = bytes(modified)
+	return [(start, modified[start:end]) for start, end in diff_spans(original, modified)]
+
+
+def count_changes(original: Buffer, modified: Buffer) -> int:
+	"""Number of byte positions that differ between two equal-length buffers."""
+	if len(original) != len(modified):
+		raise ValueError(f"Length mismatch: {len(original)} != {len(modified)}")
+	if np is not None:
+		return int(np.count_nonzero(diff_mask(original, modified)))
+	return sum(end - start for start, end in diff_spans(original, modified))
+
+
+# ============================================================================
+# RUN-LEVEL DIFF
+# ============================================================================
+
+@dataclass(frozen=True)
+class DiffRun:
+	"""A maximal run of changed bytes."""
+	offset: int
+	original: bytes
+	modified: bytes
+
+	@property
+	def size(self) -> int:
+		return len(self.modified)
+
+	@property
+	def end(self) -> int:
+		return self.offset + len(self.modified)
+
+	def byte_changes(self) -> Iterator[Tuple[int, int, int]]:
+		"""(offset, old byte, new byte) for each byte of the run."""
+		for index, (old, new) in enumerate(zip(self.original, self.modified)):
+			yield self.offset + index, old, new
+
+	def cut(self, start: int, end: int) -> 'DiffRun':
+		"""The part of this run inside [start, end)."""
+		start = max(start, self.offset)
+		end = min(end, self.end)
+		return DiffRun(start, self.original[start - self.offset:end - self.offset],
+					   self.modified[start - self.offset:end - self.offset])
+
+
+class RomDiff:
+	"""Changed runs between two ROM images, with per-byte detail on demand.
+
+	Buffers of different sizes are compared over the common prefix, or,
+	when pad is given, with the shorter one padded with that byte.
+	"""
+
+	def __init__(self, original: Buffer, modified: Buffer, pad: Optional[int] = None):
+		self.original = memoryview(original).toreadonly()
+		self.modified = memoryview(modified).toreadonly()
+		self.pad = pad
+		common = min(len(original), len(modified))
+		self.size = max(len(original), len(modified)) if pad is not None else common
+
+		spans = diff_spans(self.original[:common], self.modified[:common])
+		if self.size > common:
+			longer = self.original if len(original) > common else self.modified
+			tail = longer[common:self.size]
+			for start, end in diff_spans(tail, bytes([pad]) * len(tail)):
+				if spans and spans[-1][1] == common + start:
+					spans[-1] = (spans[-1][0], common + end)
+				else:
+					spans.append((common + start, common + end))
+
+		self.runs: List[DiffRun] = [DiffRun(start, self._slice(self.original, start, end),
+											self._slice(self.modified, start, end)) for start, end in spans]
+		self._starts = [run.offset for run in self.runs]
+
+	def _slice(self, buffer: memoryview, start: int, end: int) -> bytes:
+		data = bytes(buffer[start:end])
+		if len(data) < end - start:
+			data += bytes([self.pad or 0]) * (end - start - len(data))
+		return data
+
+	def __len__(self) -> int:
+		return len(self.runs)
+
+	def __iter__(self) -> Iterator[DiffRun]:
+		return iter(self.runs)
+
+	@property
+	def identical(self) -> bool:
+		return not self.runs and len(self.original) == len(self.modified)
+
+	@property
+	def changed_bytes(self) -> int:
+		return sum(run.size for run in self.runs)
+
+	@property
+	def largest_run(self) -> int:
+		return max((run.size for run in self.runs), default=0)
+
+	def byte_changes(self) -> Iterator[Tuple[int, int, int]]:
+		"""(offset, old byte, new byte) for every changed byte, in order."""
+		for run in self.runs:
+			yield from run.byte_changes()
+
+	def runs_between(self, start: int, end: int) -> List[DiffRun]:
+		"""Runs inside [start, end), cut at the edges."""
+		index = max(0, bisect_left(self._starts, start) - 1)
+		result = []
+		for run in self.runs[index:]:
+			if run.offset >= end:
+				break
+			if run.end > start:
+				result.append(run if start <= run.offset and run.end <= end else run.cut(start, end))
+		return result
+
+	def changes_between(self, start: int, end: int) -> int:
+		"""Number of changed bytes inside [start, end)."""
+		return sum(run.size for run in self.runs_between(start, end))
+
+	def context(self, offset: int, before: int, after: Optional[int] = None,
+				modified: bool = False) -> Tuple[bytes, bytes]:
+		"""Bytes before and after offset (of the original ROM unless modified)."""
+		after = before if after is None else after
+		buffer = self.modified if modified else self.original
+		return (self._slice(buffer, max(0, offset - before), offset),
+				self._slice(buffer, offset + 1, min(self.size, offset + 1 + after)))
+
+	def clusters(self, max_gap: int = 16) -> List[Tuple[int, int]]:
+		"""(first, last) changed offsets of groups of runs at most max_gap apart."""
+		clusters: List[List[int]] = []
+		for run in self.runs:
+			if clusters and run.offset - clusters[-1][1] <= max_gap:
+				clusters[-1][1] = run.end - 1
+			else:
+				clusters.append([run.offset, run.end - 1])
+		return [(first, last) for first, last in clusters]
+
+	def groups(self, max_gap: int = 16) -> List[List[DiffRun]]:
+		"""Runs grouped the same way as clusters()."""
+		groups: List[List[DiffRun]] = []
+		for run in self.runs:
+			if groups and run.offset - (groups[-1][-1].end - 1) <= max_gap:
+				groups[-1].append(run)
+			else:
+				groups.append([run])
+		return groups
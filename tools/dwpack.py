@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Packed Binary Container (.dwpack)
+
+One indexed file holding every .dwdata section, so the round-trip
+pipeline opens, reads and verifies a single file instead of ten.
+
+Layout (little-endian):
+
+	0x00  header (32 bytes)
+	      magic 'DWPK', version major/minor, section count,
+	      index offset, index entry size
+	0x20  index: one fixed-size entry per section
+	      name, data type, flags, ROM offset, size, stored size,
+	      slot capacity, data offset, CRC32, plus the original .dwdata
+	      version/flags/timestamp/reserved bytes (for lossless unpacking)
+	....  section data, each in a 16-byte aligned slot
+
+The file is read through mmap: read(name) returns a zero-copy memoryview
+for uncompressed sections without touching the others. Sections can be
+zlib-compressed individually (FLAG_ZLIB). update() rewrites a section in
+place when it fits its slot, otherwise appends a new slot; compact()
+drops the dead space.
+
+Usage:
+	from dwpack import DWPack, pack_dwdata_dir, unpack_to_dwdata
+
+	pack_dwdata_dir("extracted_assets/binary", "extracted_assets/binary/binary.dwpack")
+	with DWPack("extracted_assets/binary/binary.dwpack") as pack:
+		monsters = pack.read("monsters")
+
+	python tools/dwpack.py pack extracted_assets/binary
+	python tools/dwpack.py unpack extracted_assets/binary/binary.dwpack out/
+	python tools/dwpack.py verify extracted_assets/binary/binary.dwpack
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import mmap
+import zlib
+import struct
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from dataclasses import dataclass
+
+from table_generation import atomic_write
+
+
+PACK_MAGIC = b'DWPK'
+PACK_VERSION = (1, 0)
+PACK_FILE = "binary.dwpack"
+
+DWDATA_MAGIC = b'DWDT'
+DWDATA_HEADER_SIZE = 32
+
+# magic, version major, version minor, section count, index offset, entry size, reserved
+_HEADER = struct.Struct('<4sBBHII16x')
+# name, data type, dwdata major, dwdata minor, dwdata flags, pack flags,
+# rom offset, size, stored size, capacity, data offset, crc32, timestamp, dwdata reserved
+_ENTRY = struct.Struct('<24sBBBBB3xIIIIIII8s4x')
+
+FLAG_ZLIB = 0x01
+ALIGNMENT = 16
+
+
+class DWPackError(ValueError):
+	"""Malformed pack or section data."""
+
+
+def _align(value: int) -> int:
+	return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+
+@dataclass
+class Section:
+	"""One .dwdata payload and the header fields needed to recreate it."""
+	name: str
+	data_type: int
+	rom_offset: int
+	data: bytes
+	version: tuple = (1, 0)
+	flags: int = 0
+	timestamp: int = 0
+	reserved: bytes = bytes(8)
+
+	@classmethod
+	def parse(cls, name: str, raw: bytes) -> 'Section':
+		"""Parse and CRC-check the contents of a .dwdata file."""
+		if len(raw) < DWDATA_HEADER_SIZE or raw[0:4] != DWDATA_MAGIC:
+			raise DWPackError(f"{name}: not a .dwdata file")
+		size, rom_offset, crc, timestamp = struct.unpack_from('<IIII', raw, 0x08)
+		data = bytes(raw[DWDATA_HEADER_SIZE:DWDATA_HEADER_SIZE + size])
+		if len(data) != size or zlib.crc32(data) & 0xffffffff != crc:
+			raise DWPackError(f"{name}: size or CRC mismatch")
+		return cls(name, raw[6], rom_offset, data, (raw[4], raw[5]), raw[7], timestamp, bytes(raw[0x18:0x20]))
+
+	@classmethod
+	def from_dwdata(cls, path: Union[str, Path]) -> 'Section':
+		"""Read a .dwdata file (section name = file stem)."""
+		path = Path(path)
+		return cls.parse(path.stem, path.read_bytes())
+
+	def to_dwdata(self) -> bytes:
+		"""Byte-identical .dwdata file."""
+		header = bytearray(DWDATA_HEADER_SIZE)
+		header[0:4] = DWDATA_MAGIC
+		header[4], header[5] = self.version
+		header[6] = self.data_type
+		header[7] = self.flags
+		struct.pack_into('<IIII', header, 0x08, len(self.data), self.rom_offset,
+						 zlib.crc32(self.data) & 0xffffffff, self.timestamp)
+		header[0x18:0x20] = self.reserved
+		return bytes(header) + bytes(self.data)
+
+
+@dataclass
+class PackEntry:
+	"""Index entry of one section."""
+	name: str
+	data_type: int
+	rom_offset: int
+	size: int
+	stored_size: int
+	capacity: int
+	data_offset: int
+	crc32: int
+	pack_flags: int = 0
+	version: tuple = (1, 0)
+	dwdata_flags: int = 0
+	timestamp: int = 0
+	reserved: bytes = bytes(8)
+
+	@property
+	def compressed(self) -> bool:
+		return bool(self.pack_flags & FLAG_ZLIB)
+
+	def pack(self) -> bytes:
+		return _ENTRY.pack(self.name.encode('ascii'), self.data_type, self.version[0], self.version[1],
+						   self.dwdata_flags, self.pack_flags, self.rom_offset, self.size, self.stored_size,
+						   self.capacity, self.data_offset, self.crc32, self.timestamp, self.reserved)
+
+	@classmethod
+	def unpack(cls, raw: bytes) -> 'PackEntry':
+		(name, data_type, major, minor, dwdata_flags, pack_flags, rom_offset, size, stored_size,
+		 capacity, data_offset, crc32, timestamp, reserved) = _ENTRY.unpack(raw)
+		return cls(name.rstrip(b'\x00').decode('ascii'), data_type, rom_offset, size, stored_size,
+				   capacity, data_offset, crc32, pack_flags, (major, minor), dwdata_flags, timestamp, reserved)
+
+
+# ============================================================================
+# PACK FILE
+# ============================================================================
+
+class DWPack:
+	"""Memory-mapped .dwpack file."""
+
+	def __init__(self, path: Union[str, Path], writable: bool = False):
+		self.path = Path(path)
+		self.writable = writable
+		self._map: Optional[mmap.mmap] = None
+		self.entries: Dict[str, PackEntry] = {}
+		self._open()
+
+	def _open(self) -> None:
+		self._file = open(self.path, 'r+b' if self.writable else 'rb')
+		try:
+			self._load()
+		except BaseException:
+			self._file.close()
+			raise
+
+	def _release_map(self) -> None:
+		if self._map is not None:
+			try:
+				self._map.close()
+			except BufferError:
+				# Views from read() are still alive; the mapping goes with them
+				pass
+			self._map = None
+
+	def _load(self) -> None:
+		self._release_map()
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError as e:
+			# mmap refuses empty files
+			raise DWPackError(f"{self.path}: cannot map .dwpack file ({e})") from e
+		if len(self._map) < _HEADER.size:
+			raise DWPackError(f"{self.path}: too small for a .dwpack header")
+		magic, major, _minor, count, index_offset, entry_size = _HEADER.unpack_from(self._map, 0)
+		if magic != PACK_MAGIC or major != PACK_VERSION[0] or entry_size != _ENTRY.size:
+			raise DWPackError(f"{self.path}: not a version {PACK_VERSION[0]} .dwpack file")
+		if index_offset + count * entry_size > len(self._map):
+			raise DWPackError(f"{self.path}: index runs past the end of the file")
+		self.entries = {}
+		for i in range(count):
+			entry = PackEntry.unpack(self._map[index_offset + i * entry_size:index_offset + (i + 1) * entry_size])
+			if entry.data_offset + entry.stored_size > len(self._map):
+				raise DWPackError(f"{self.path}: section {entry.name} runs past the end of the file")
+			self.entries[entry.name] = entry
+		self._index_offset = index_offset
+
+	def close(self) -> None:
+		self._release_map()
+		self._file.close()
+
+	def __enter__(self) -> 'DWPack':
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.entries
+
+	def names(self) -> List[str]:
+		return list(self.entries)
+
+	# ------------------------------------------------------------------
+	# Reading
+	# ------------------------------------------------------------------
+
+	def read(self, name: str) -> Union[memoryview, bytes]:
+		"""Section data: a zero-copy view, or decompressed bytes for FLAG_ZLIB."""
+		entry = self._entry(name)
+		stored = memoryview(self._map)[entry.data_offset:entry.data_offset + entry.stored_size]
+		if not entry.compressed:
+			return stored
+		return zlib.decompress(stored)
+
+	def section(self, name: str) -> Section:
+		"""Section with its .dwdata header fields (data copied out of the mapping)."""
+		entry = self._entry(name)
+		return Section(entry.name, entry.data_type, entry.rom_offset, bytes(self.read(name)), entry.version,
+					   entry.dwdata_flags, entry.timestamp, entry.reserved)
+
+	def verify(self, name: Optional[str] = None) -> Dict[str, bool]:
+		"""CRC-check one section or all of them."""
+		names = [name] if name else self.names()
+		results = {}
+		for section_name in names:
+			data = self.read(section_name)
+			entry = self.entries[section_name]
+			results[section_name] = len(data) == entry.size and zlib.crc32(data) & 0xffffffff == entry.crc32
+			if isinstance(data, memoryview):
+				data.release()
+		return results
+
+	def _entry(self, name: str) -> PackEntry:
+		try:
+			return self.entries[name]
+		except KeyError:
+			raise KeyError(f"No section '{name}' in {self.path}") from None
+
+	# ------------------------------------------------------------------
+	# Writing
+	# ------------------------------------------------------------------
+
+	@staticmethod
+	def _stored(data: bytes, compress: bool) -> bytes:
+		return zlib.compress(bytes(data), 9) if compress else bytes(data)
+
+	def update(self, name: str, data: bytes, rom_offset: Optional[int] = None,
+			   compress: Optional[bool] = None) -> None:
+		"""Replace a section's data in place (or in a new slot if it outgrew its slot)."""
+		if not self.writable:
+			raise DWPackError(f"{self.path} is open read-only")
+		entry = self._entry(name)
+		compress = entry.compressed if compress is None else compress
+		stored = self._stored(data, compress)
+
+		if len(stored) > entry.capacity:
+			self._file.seek(0, os.SEEK_END)
+			entry.data_offset = _align(self._file.tell())
+			entry.capacity = _align(len(stored))
+		self._file.seek(entry.data_offset)
+		self._file.write(stored.ljust(entry.capacity, b'\x00'))
+
+		entry.size = len(data)
+		entry.stored_size = len(stored)
+		entry.crc32 = zlib.crc32(data) & 0xffffffff
+		entry.pack_flags = (entry.pack_flags | FLAG_ZLIB) if compress else (entry.pack_flags & ~FLAG_ZLIB)
+		if rom_offset is not None:
+			entry.rom_offset = rom_offset
+
+		index = list(self.entries).index(name)
+		self._file.seek(self._index_offset + index * _ENTRY.size)
+		self._file.write(entry.pack())
+		self._file.flush()
+		os.fsync(self._file.fileno())
+		self._load()
+
+	def compact(self) -> None:
+		"""Rewrite the pack without dead space left by grown sections."""
+		sections = [self.section(name) for name in self.names()]
+		compressed = {name for name, entry in self.entries.items() if entry.compressed}
+		self.close()
+		write_pack(self.path, sections, compressed)
+		self._open()
+
+
+def build_pack(sections: Iterable[Section], compress: Union[bool, Iterable[str]] = ()) -> bytes:
+	"""Contents of a .dwpack holding sections, in order.
+
+	compress is True for every section, or the names of sections to
+	zlib-compress.
+	"""
+	sections = list(sections)
+	names = set(section.name for section in sections)
+	if len(names) != len(sections):
+		raise DWPackError("Duplicate section names")
+	compressed = names if compress is True else set(compress or ())
+
+	index_offset = _HEADER.size
+	offset = _align(index_offset + len(sections) * _ENTRY.size)
+	entries = []
+	payloads = []
+	for section in sections:
+		if len(section.name.encode('ascii')) > 24:
+			raise DWPackError(f"Section name too long: {section.name}")
+		stored = DWPack._stored(section.data, section.name in compressed)
+		entry = PackEntry(section.name, section.data_type, section.rom_offset, len(section.data), len(stored),
+						  _align(len(stored)), offset, zlib.crc32(section.data) & 0xffffffff,
+						  FLAG_ZLIB if section.name in compressed else 0, tuple(section.version),
+						  section.flags, section.timestamp, section.reserved)
+		entries.append(entry)
+		payloads.append(stored.ljust(entry.capacity, b'\x00'))
+		offset += entry.capacity
+
+	header = _HEADER.pack(PACK_MAGIC, PACK_VERSION[0], PACK_VERSION[1], len(entries), index_offset, _ENTRY.size)
+	index = b''.join(entry.pack() for entry in entries)
+	padding = bytes(_align(index_offset + len(index)) - index_offset - len(index))
+
+	return header + index + padding + b''.join(payloads)
+
+
+def write_pack(path: Union[str, Path], sections: Iterable[Section],
+			   compress: Union[bool, Iterable[str]] = ()) -> Path:
+	"""Write a new .dwpack (via a temp file and rename)."""
+	path = Path(path)
+	atomic_write(path, build_pack(sections, compress))
+	return path
+
+
+# ============================================================================
+# .dwdata CONVERSION
+# ============================================================================
+
+def pack_dwdata_dir(binary_dir: Union[str, Path], pack_path: Optional[Union[str, Path]] = None,
+					compress: Union[bool, Iterable[str]] = ()) -> Path:
+	"""Pack every .dwdata file in a directory (sorted by name)."""
+	binary_dir = Path(binary_dir)
+	files = sorted(binary_dir.glob('*.dwdata'))
+	if not files:
+		raise DWPackError(f"No .dwdata files in {binary_dir}")
+	return write_pack(pack_path or binary_dir / PACK_FILE, [Section.from_dwdata(path) for path in files], compress)
+
+
+def current_pack(binary_dir: Union[str, Path]) -> Optional[Path]:
+	"""
+	The directory's PACK_FILE, if it is at least as new as every .dwdata file beside it.
+
+	Readers use this to pick the pack over the .dwdata files; a pack older
+	than an edited .dwdata file is stale and is ignored.
+	"""
+	binary_dir = Path(binary_dir)
+	pack_path = binary_dir / PACK_FILE
+	if not pack_path.is_file():
+		return None
+	pack_time = pack_path.stat().st_mtime_ns
+	if any(path.stat().st_mtime_ns > pack_time for path in binary_dir.glob('*.dwdata')):
+		return None
+	return pack_path
+
+
+def refresh_pack(binary_dir: Union[str, Path]) -> Optional[Path]:
+	"""
+	Rebuild the directory's PACK_FILE from its .dwdata files, if it has one.
+
+	Sections that were compressed stay compressed. Sections only in the old
+	pack (no .dwdata file) are kept.
+	"""
+	binary_dir = Path(binary_dir)
+	pack_path = binary_dir / PACK_FILE
+	if not pack_path.is_file():
+		return None
+	sections = {path.stem: Section.from_dwdata(path) for path in sorted(binary_dir.glob('*.dwdata'))}
+	try:
+		with DWPack(pack_path) as pack:
+			compress = [name for name, entry in pack.entries.items() if entry.compressed]
+			for name in pack.names():
+				if name not in sections:
+					sections[name] = pack.section(name)
+	except DWPackError:
+		# An unreadable pack is simply replaced
+		compress = []
+	write_pack(pack_path, [sections[name] for name in sorted(sections)], compress)
+	# The pack now holds every .dwdata file, so it must not look older than any of them
+	newest = max((path.stat().st_mtime_ns for path in binary_dir.glob('*.dwdata')), default=0)
+	if newest > pack_path.stat().st_mtime_ns:
+		os.utime(pack_path, ns=(newest, newest))
+	return pack_path
+
+
+def unpack_to_dwdata(pack_path: Union[str, Path], output_dir: Union[str, Path]) -> List[Path]:
+	"""Recreate the .dwdata files a pack was built from."""
+	output_dir = Path(output_dir)
+	output_dir.mkdir(parents=True, exist_ok=True)
+	written = []
+	with DWPack(pack_path) as pack:
+		for name in pack.names():
+			path = output_dir / f"{name}.dwdata"
+			path.write_bytes(pack.section(name).to_dwdata())
+			written.append(path)
+	return written
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Pack, unpack and verify .dwpack containers')
+	sub = parser.add_subparsers(dest='command', required=True)
+
+	pack_cmd = sub.add_parser('pack', help='Pack a directory of .dwdata files')
+	pack_cmd.add_argument('binary_dir')
+	pack_cmd.add_argument('--output', default=None, help=f'Pack path (default: <binary_dir>/{PACK_FILE})')
+	pack_cmd.add_argument('--compress', nargs='*', default=None,
+						  help='Sections to zlib-compress (no names: all)')
+
+	unpack_cmd = sub.add_parser('unpack', help='Recreate .dwdata files from a pack')
+	unpack_cmd.add_argument('pack')
+	unpack_cmd.add_argument('output_dir')
+
+	verify_cmd = sub.add_parser('verify', help='CRC-check every section')
+	verify_cmd.add_argument('pack')
+
+	args = parser.parse_args()
+
+	try:
+		if args.command == 'pack':
+			compress = True if args.compress == [] else (args.compress or ())
+			path = pack_dwdata_dir(args.binary_dir, args.output, compress)
+			print(f"✓ Wrote {path} ({path.stat().st_size} bytes)")
+		elif args.command == 'unpack':
+			for path in unpack_to_dwdata(args.pack, args.output_dir):
+				print(f"✓ Wrote {path}")
+		else:
+			with DWPack(args.pack) as pack:
+				results = pack.verify()
+			for name, valid in results.items():
+				print(f"  {'✓' if valid else '❌'} {name}")
+			return 0 if all(results.values()) else 1
+	except (OSError, DWPackError) as e:
+		print(f"❌ {e}")
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -42,10 +42,12 @@ import argparse
 import json
 import random
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+from rom_image import RomImage, open_rom
+
 
 class ZoneType(Enum):
 	"""Types of encounter zones."""
@@ -238,14 +240,14 @@ class EncounterExtractor:
 	ENCOUNTER_TABLE_OFFSET = 0x0f300
 	NUM_ZONES = 16
 
-	def __init__(self, rom_path: Path):
-		self.rom_path = rom_path
+	def __init__(self, rom_path: Union[Path, RomImage]):
+		self.rom = open_rom(rom_path)
+		self.rom_path = self.rom.path
 		self.rom_data = self._load_rom()
 
-	def _load_rom(self) -> bytes:
-		"""Load ROM file."""
-		with open(self.rom_path, 'rb') as f:
-			return f.read()
+	def _load_rom(self) -> memoryview:
+		"""Zero-copy view of the (shared) ROM image."""
+		return self.rom.data
 
 	def extract_zone_table(self, zone_id: int) -> Optional[EncounterTable]:
 		"""
@@ -13,8 +13,11 @@ if hasattr(sys.stdout, 'buffer'):
 if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 from pathlib import Path
+from typing import Union
 from PIL import Image
 
+from rom_image import RomImage, open_rom
+
 class CHRExtractor:
 	"""Extracts CHR tiles from NES ROM"""
 
@@ -86,25 +89,25 @@ class CHRExtractor:
 		(0, 0, 0),         # 0x3f
 	]
 
-	def __init__(self, rom_path: str):
-		self.rom_path = Path(rom_path)
-		if not self.rom_path.exists():
+	def __init__(self, rom_path: Union[str, Path, RomImage]):
+		if not isinstance(rom_path, RomImage) and not Path(rom_path).exists():
 			raise FileNotFoundError(f"ROM not found: {rom_path}")
 
-		with open(rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		self.rom = open_rom(rom_path)
+		self.rom_path = self.rom.path
+		self.rom_data = self.rom.data
 
 		# Verify NES header
-		if self.rom_data[:4] != b'NES\x1a':
+		if not self.rom.is_ines:
 			raise ValueError("Invalid NES ROM header")
 
 		# CHR starts at offset 0x10 + PRG size
 		# Dragon Warrior: 16-byte header + 64KB PRG (4 × 16KB) + 8KB CHR (2 × 4KB)
-		self.prg_size = self.rom_data[4] * 16384  # PRG ROM size in bytes
-		self.chr_size = self.rom_data[5] * 8192   # CHR ROM size in bytes
-		self.chr_offset = 0x10 + self.prg_size
+		self.prg_size = len(self.rom.prg)    # PRG ROM size in bytes
+		self.chr_size = len(self.rom.chr)    # CHR ROM size in bytes
+		self.chr_offset = self.rom.chr_offset
 
-		print(f"ROM: {rom_path}")
+		print(f"ROM: {self.rom_path}")
 		print(f"PRG size: {self.prg_size} bytes ({self.prg_size // 1024}KB)")
 		print(f"CHR size: {self.chr_size} bytes ({self.chr_size // 1024}KB)")
 		print(f"CHR offset: 0x{self.chr_offset:X}")
@@ -23,9 +23,11 @@ import zlib
 import time
 import io
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Union
 import argparse
 
+from rom_image import DW_ROM_SIZE, RomImage, load_rom_image
+
 # Fix Unicode output on Windows
 if sys.platform == 'win32':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -98,6 +100,7 @@ NOTE_TABLE_SIZE = 146          # 73 notes * 2 bytes
 
 # Bank 1 start in ROM (after 16-byte header)
 BANK1_START = 0x4010
+MUSIC_BANK = 1
 
 # Default paths
 DEFAULT_ROM = "roms/Dragon Warrior (U) (PRG1) [!].nes"
@@ -199,14 +202,15 @@ class DWDataBuilder:
 class ROMExtractor:
 	"""Extract data from Dragon Warrior ROM"""
 
-	def __init__(self, rom_path: str):
+	def __init__(self, rom_path: Union[str, RomImage]):
 		"""
 		Initialize extractor with ROM file
 
 		Args:
-			rom_path: Path to Dragon Warrior ROM
+			rom_path: Path to Dragon Warrior ROM, or an already loaded RomImage
 		"""
-		self.rom_path = rom_path
+		self.rom_image = rom_path if isinstance(rom_path, RomImage) else None
+		self.rom_path = str(rom_path.path) if self.rom_image else rom_path
 		self.rom_data = None
 		self.builder = DWDataBuilder()
 
@@ -217,16 +221,18 @@ class ROMExtractor:
 		Returns:
 			True if valid ROM loaded
 		"""
-		if not os.path.exists(self.rom_path):
-			print(f"❌ ERROR: ROM file not found: {self.rom_path}")
-			return False
+		if self.rom_image is None:
+			if not os.path.exists(self.rom_path):
+				print(f"❌ ERROR: ROM file not found: {self.rom_path}")
+				return False
+			self.rom_image = load_rom_image(self.rom_path)
 
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		# Zero-copy view of the shared mapping
+		self.rom_data = self.rom_image.data
 
 		# Validate ROM
-		if len(self.rom_data) != 81936:
-			print(f"❌ ERROR: Invalid ROM size: {len(self.rom_data)} (expected 81936)")
+		if len(self.rom_data) != DW_ROM_SIZE:
+			print(f"❌ ERROR: Invalid ROM size: {len(self.rom_data)} (expected {DW_ROM_SIZE})")
 			return False
 
 		if self.rom_data[0:4] != b'NES\x1A':
@@ -374,8 +380,8 @@ class ROMExtractor:
 		print("\n--- Extracting Music Pointers ---")
 
 		# Calculate absolute offset in ROM
-		rom_offset = BANK1_START + (MUSIC_POINTERS_OFFSET - 0x8000)
-		data = self.rom_data[rom_offset:rom_offset + MUSIC_POINTERS_SIZE]
+		rom_offset = self.rom_image.cpu_to_offset(MUSIC_POINTERS_OFFSET, bank=MUSIC_BANK)
+		data = self.rom_image.read(rom_offset, MUSIC_POINTERS_SIZE)
 
 		print(f"  ROM Offset: 0x{rom_offset:04X} (Bank 1)")
 		print(f"  Data Size: {len(data)} bytes ({len(data)//2} pointers)")
@@ -406,8 +412,8 @@ class ROMExtractor:
 		print("\n--- Extracting SFX Pointers ---")
 
 		# Calculate absolute offset in ROM
-		rom_offset = BANK1_START + (SFX_POINTERS_OFFSET - 0x8000)
-		data = self.rom_data[rom_offset:rom_offset + SFX_POINTERS_SIZE]
+		rom_offset = self.rom_image.cpu_to_offset(SFX_POINTERS_OFFSET, bank=MUSIC_BANK)
+		data = self.rom_image.read(rom_offset, SFX_POINTERS_SIZE)
 
 		print(f"  ROM Offset: 0x{rom_offset:04X} (Bank 1)")
 		print(f"  Data Size: {len(data)} bytes ({len(data)//2} pointers)")
@@ -438,8 +444,8 @@ class ROMExtractor:
 		print("\n--- Extracting Note Table ---")
 
 		# Calculate absolute offset in ROM
-		rom_offset = BANK1_START + (NOTE_TABLE_OFFSET - 0x8000)
-		data = self.rom_data[rom_offset:rom_offset + NOTE_TABLE_SIZE]
+		rom_offset = self.rom_image.cpu_to_offset(NOTE_TABLE_OFFSET, bank=MUSIC_BANK)
+		data = self.rom_image.read(rom_offset, NOTE_TABLE_SIZE)
 
 		print(f"  ROM Offset: 0x{rom_offset:04X} (Bank 1)")
 		print(f"  Data Size: {len(data)} bytes ({len(data)//2} notes)")
@@ -545,7 +551,7 @@ class ROMExtractor:
 		shields = self.rom_data[SHIELD_BONUS_OFFSET:SHIELD_BONUS_OFFSET + SHIELD_BONUS_SIZE]
 
 		# Combine into single data block with header info
-		data = weapons + armor + shields
+		data = b''.join((weapons, armor, shields))
 
 		print(f"  Weapons Bonus at 0x{WEAPONS_BONUS_OFFSET:04X}: {' '.join(f'{b:02x}' for b in weapons)}")
 		print(f"  Armor Bonus at 0x{ARMOR_BONUS_OFFSET:04X}: {' '.join(f'{b:02x}' for b in armor)}")
@@ -564,65 +570,39 @@ class ROMExtractor:
 
 		return True
 
-	def extract_all(self, output_dir: str) -> Dict[str, bool]:
+	def extract_all(self, output_dir: str, decode: bool = False, workers: int = None,
+					pack: bool = False) -> Dict[str, bool]:
 		"""
 		Extract all data types to output directory
 
+		All regions are sliced from the one loaded ROM image and written in a
+		single batch (see extraction_engine.ExtractionEngine).
+
 		Args:
 			output_dir: Base directory for output files
+			decode: Also write decoded CHR/map/dialog JSON
+			workers: Decoder processes (default: CPU count)
+			pack: Write one .dwpack container instead of .dwdata files
 
 		Returns:
 			Dict mapping filenames to success status
 		"""
-		results = {}
-
-		# Ensure output directory exists
-		os.makedirs(output_dir, exist_ok=True)
-
-		# Extract each data type
-		results['monsters.dwdata'] = self.extract_monsters(
-			os.path.join(output_dir, 'monsters.dwdata')
-		)
+		from extraction_engine import ExtractionEngine
 
-		results['spells.dwdata'] = self.extract_spells(
-			os.path.join(output_dir, 'spells.dwdata')
-		)
+		if self.rom_image is None and not self.load_rom():
+			return {}
 
-		results['items.dwdata'] = self.extract_items(
-			os.path.join(output_dir, 'items.dwdata')
-		)
+		print("\n--- Extracting All Regions ---")
+		result = ExtractionEngine(self.rom_image).extract(output_dir, decode=decode, workers=workers, pack=pack)
 
-		results['graphics.dwdata'] = self.extract_graphics(
-			os.path.join(output_dir, 'graphics.dwdata')
-		)
+		for filename in result.written:
+			print(f"✓ Wrote: {os.path.join(output_dir, filename)}")
+		for filename in result.unchanged:
+			print(f"  Unchanged: {os.path.join(output_dir, filename)}")
+		for filename, error in result.errors.items():
+			print(f"❌ {filename}: {error}")
 
-		# Extract music/audio data
-		results['music_pointers.dwdata'] = self.extract_music_pointers(
-			os.path.join(output_dir, 'music_pointers.dwdata')
-		)
-
-		results['sfx_pointers.dwdata'] = self.extract_sfx_pointers(
-			os.path.join(output_dir, 'sfx_pointers.dwdata')
-		)
-
-		results['note_table.dwdata'] = self.extract_note_table(
-			os.path.join(output_dir, 'note_table.dwdata')
-		)
-
-		# Extract verified game data tables
-		results['spell_costs.dwdata'] = self.extract_spell_costs(
-			os.path.join(output_dir, 'spell_costs.dwdata')
-		)
-
-		results['item_costs.dwdata'] = self.extract_item_costs(
-			os.path.join(output_dir, 'item_costs.dwdata')
-		)
-
-		results['equipment_bonuses.dwdata'] = self.extract_equipment_bonuses(
-			os.path.join(output_dir, 'equipment_bonuses.dwdata')
-		)
-
-		return results
+		return result.files
 
 
 def verify_dwdata_file(path: str) -> bool:
@@ -679,6 +659,30 @@ def verify_dwdata_file(path: str) -> bool:
 		return False
 
 
+def verify_dwpack_file(path: str) -> bool:
+	"""
+	Verify every section of a .dwpack container
+
+	Args:
+		path: Path to .dwpack file
+
+	Returns:
+		True if all sections are valid
+	"""
+	from dwpack import DWPack, DWPackError
+
+	try:
+		with DWPack(path) as pack:
+			results = pack.verify()
+	except (OSError, DWPackError) as e:
+		print(f"  ❌ Error: {e}")
+		return False
+
+	for name, valid in results.items():
+		print(f"  {'✓' if valid else '❌'} {name}")
+	return bool(results) and all(results.values())
+
+
 def main():
 	"""Main entry point"""
 	parser = argparse.ArgumentParser(
@@ -711,6 +715,25 @@ Examples:
 		help='Verify existing .dwdata files instead of extracting'
 	)
 
+	parser.add_argument(
+		'--decode',
+		action='store_true',
+		help='Also write decoded CHR tiles, world map and dialogs as JSON'
+	)
+
+	parser.add_argument(
+		'--pack',
+		action='store_true',
+		help='Write one .dwpack container instead of separate .dwdata files'
+	)
+
+	parser.add_argument(
+		'--workers',
+		type=int,
+		default=None,
+		help='Worker processes for decoding (default: CPU count)'
+	)
+
 	args = parser.parse_args()
 
 	print("=" * 60)
@@ -720,6 +743,15 @@ Examples:
 	# Verify mode
 	if args.verify:
 		print("\n--- Verification Mode ---")
+		from dwpack import PACK_FILE
+		pack_path = os.path.join(args.output_dir, PACK_FILE)
+		if os.path.exists(pack_path):
+			print(f"\nVerifying: {PACK_FILE}")
+			valid = verify_dwpack_file(pack_path)
+			print("\n" + "=" * 60)
+			print("✅ All sections valid" if valid else "❌ Some sections invalid")
+			return 0 if valid else 1
+
 		files = [
 			'monsters.dwdata',
 			'spells.dwdata',
@@ -755,7 +787,7 @@ Examples:
 	if not extractor.load_rom():
 		return 1
 
-	results = extractor.extract_all(args.output_dir)
+	results = extractor.extract_all(args.output_dir, decode=args.decode, workers=args.workers, pack=args.pack)
 
 	# Summary
 	print("\n" + "=" * 60)
@@ -18,10 +18,12 @@ if hasattr(sys.stdout, 'buffer'):
 if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
 from PIL import Image, ImageDraw, ImageFont
 import json
 
+from rom_image import RomImage, open_rom
+
 # Tile type constants (upper nibble of RLE byte)
 TILE_TYPES = {
 	0x0: 'Grass',
@@ -65,9 +67,10 @@ TILE_COLORS = {
 class WorldMapExtractor:
 	"""Extract and decode Dragon Warrior overworld map"""
 
-	def __init__(self, rom_path: str):
-		"""Initialize extractor with ROM path"""
-		self.rom_path = Path(rom_path)
+	def __init__(self, rom_path: Union[str, Path, RomImage]):
+		"""Initialize extractor with ROM path (or a loaded RomImage)"""
+		self.rom = rom_path if isinstance(rom_path, RomImage) else None
+		self.rom_path = self.rom.path if self.rom else Path(rom_path)
 		self.rom_data = None
 		self.map_width = 120
 		self.map_height = 120
@@ -80,11 +83,12 @@ class WorldMapExtractor:
 
 	def load_rom(self):
 		"""Load ROM file into memory"""
-		if not self.rom_path.exists():
-			raise FileNotFoundError(f"ROM not found: {self.rom_path}")
+		if self.rom is None:
+			if not self.rom_path.exists():
+				raise FileNotFoundError(f"ROM not found: {self.rom_path}")
+			self.rom = open_rom(self.rom_path)
 
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		self.rom_data = self.rom.data
 
 		print(f"✓ Loaded ROM: {len(self.rom_data)} bytes")
 
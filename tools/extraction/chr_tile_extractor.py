@@ -24,6 +24,9 @@ from pathlib import Path
 from PIL import Image
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rom_image import open_rom
+
 # NES color palette (approximate NTSC colors)
 NES_PALETTE = [
 	(84, 84, 84),     # 0x00 - Dark gray
@@ -105,14 +108,13 @@ DW_PALETTES = {
 class CHRExtractor:
 	def __init__(self, rom_path, chr_offset=0x10010, chr_size=0x4000):
 		"""Initialize CHR extractor with ROM path and CHR-ROM location."""
-		self.rom_path = Path(rom_path)
+		self.rom = open_rom(rom_path)
+		self.rom_path = self.rom.path
 		self.chr_offset = chr_offset
 		self.chr_size = chr_size
 
-		# Read ROM
-		with open(self.rom_path, 'rb') as f:
-			f.seek(chr_offset)
-			self.chr_data = f.read(chr_size)
+		# Zero-copy view of CHR-ROM in the shared image
+		self.chr_data = self.rom[chr_offset:chr_offset + chr_size]
 
 		# Calculate tile count (16 bytes per tile)
 		self.tile_count = len(self.chr_data) // 16
@@ -23,14 +23,17 @@ console = Console()
 class DragonWarriorDataExtractor:
 	"""Extract complete game data from Dragon Warrior ROM"""
 
-	def __init__(self, rom_path: str, output_dir: str):
+	def __init__(self, rom_path: str, output_dir: str, rom_data: Optional[bytes] = None):
 		self.rom_path = Path(rom_path)
 		self.output_dir = Path(output_dir)
 		self.json_dir = self.output_dir / "json"
 		self.json_dir.mkdir(parents=True, exist_ok=True)
 
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		# Callers running several extractors can pass an already-loaded ROM
+		if rom_data is None:
+			with open(self.rom_path, 'rb') as f:
+				rom_data = f.read()
+		self.rom_data = rom_data
 
 	def extract_monster_stats(self) -> Dict[int, MonsterStats]:
 		"""Extract monster statistics from ROM EnStatTbl at Bank01:L9E4B"""
@@ -45,7 +45,7 @@ class NESPalette:
 class DragonWarriorGraphicsExtractor:
 	"""Extract and convert Dragon Warrior graphics to PNG"""
 
-	def __init__(self, rom_path: str, output_dir: str):
+	def __init__(self, rom_path: str, output_dir: str, rom_data: Optional[bytes] = None):
 		self.rom_path = Path(rom_path)
 		self.output_dir = Path(output_dir)
 		self.graphics_dir = self.output_dir / "graphics"
@@ -57,8 +57,11 @@ class DragonWarriorGraphicsExtractor:
 		for dir_path in [self.graphics_dir, self.palettes_dir, self.maps_dir, self.json_dir]:
 			dir_path.mkdir(parents=True, exist_ok=True)
 
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = f.read()
+		# Callers running several extractors can pass an already-loaded ROM
+		if rom_data is None:
+			with open(self.rom_path, 'rb') as f:
+				rom_data = f.read()
+		self.rom_data = rom_data
 
 		self.nes_palette = NESPalette()
 
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Extraction Engine
+
+Single-pass extraction of every table from one ROM load:
+
+- Regions are declared once (EXTRACTION_REGIONS): output name, data type,
+  offset (file offset, or CPU address in a PRG bank), size and record size.
+- The ROM is mapped once (rom_image.load_rom_image) and every region is
+  sliced from that mapping.
+- Heavy decoders (CHR tiles, the overworld map, dialog text) run across a
+  process pool while the raw .dwdata sections are built.
+- All outputs are written in one batch at the end; a .dwdata file whose
+  contents only differ in its timestamp is left alone.
+
+extract_corpus() runs whole-ROM extractions for many ROMs (e.g. a folder
+of hacks) on a bounded process pool, each into its own directory named
+after the ROM's path under the folder the ROMs share.
+
+Usage:
+	from extraction_engine import ExtractionEngine, extract_corpus
+
+	result = ExtractionEngine("roms/Dragon Warrior (U) (PRG1) [!].nes").extract("extracted_assets/binary")
+	results = extract_corpus(Path("hacks").rglob("*.nes"), "extracted_assets/corpus", workers=8)
+
+	python tools/extraction_engine.py roms/*.nes --output-dir extracted_assets/corpus --decode
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+from rom_image import RomImage, open_rom
+from dwpack import PACK_FILE, Section, build_pack
+from table_generation import atomic_write
+from extract_to_binary import (
+	DWDataBuilder,
+	TYPE_MONSTER, TYPE_SPELL, TYPE_ITEM, TYPE_GRAPHICS, TYPE_MUSIC, TYPE_SFX,
+	TYPE_SPELL_COST, TYPE_ITEM_COST, TYPE_EQUIPMENT,
+	MONSTER_OFFSET, MONSTER_SIZE, SPELL_OFFSET, SPELL_SIZE, ITEM_OFFSET, ITEM_SIZE,
+	CHR_OFFSET, CHR_SIZE, MUSIC_POINTERS_OFFSET, MUSIC_POINTERS_SIZE,
+	SFX_POINTERS_OFFSET, SFX_POINTERS_SIZE, NOTE_TABLE_OFFSET, NOTE_TABLE_SIZE,
+	SPELL_COST_OFFSET, SPELL_COST_SIZE, ITEM_COST_OFFSET, ITEM_COST_SIZE,
+	WEAPONS_BONUS_OFFSET, WEAPONS_BONUS_SIZE, ARMOR_BONUS_SIZE, SHIELD_BONUS_SIZE,
+	MUSIC_BANK,
+)
+
+
+# ============================================================================
+# REGION TABLE
+# ============================================================================
+
+@dataclass(frozen=True)
+class Region:
+	"""One extracted ROM region.
+
+	offset is a file offset, or a CPU address in PRG bank `bank` when bank
+	is set. data_type None means the region is only decoded (no .dwdata).
+	"""
+	name: str
+	data_type: Optional[int]
+	offset: int
+	size: int
+	record_size: int = 1
+	bank: Optional[int] = None
+	decoder: Optional[str] = None
+
+	@property
+	def filename(self) -> str:
+		return f"{self.name}.dwdata"
+
+	def file_offset(self, rom: RomImage) -> int:
+		return rom.cpu_to_offset(self.offset, bank=self.bank) if self.bank is not None else self.offset
+
+	def read(self, rom: RomImage) -> memoryview:
+		return rom.read(self.file_offset(rom), self.size)
+
+
+# Overworld RLE rows (see extract_world_map.WorldMapExtractor)
+WORLD_MAP_OFFSET = 0x5d6d
+WORLD_MAP_SIZE = 120
+WORLD_MAP_DATA_SIZE = 0x8010 - WORLD_MAP_OFFSET  # rows never cross the end of the bank
+
+# Dialog text region (see analyze_text_frequency)
+TEXT_OFFSET = 0x6400
+TEXT_SIZE = 0x8fff - 0x6400
+
+EXTRACTION_REGIONS: Tuple[Region, ...] = (
+	Region('monsters', TYPE_MONSTER, MONSTER_OFFSET, MONSTER_SIZE, 16),
+	Region('spells', TYPE_SPELL, SPELL_OFFSET, SPELL_SIZE, 8),
+	Region('items', TYPE_ITEM, ITEM_OFFSET, ITEM_SIZE, 8),
+	Region('graphics', TYPE_GRAPHICS, CHR_OFFSET, CHR_SIZE, 16, decoder='chr_tiles'),
+	Region('music_pointers', TYPE_MUSIC, MUSIC_POINTERS_OFFSET, MUSIC_POINTERS_SIZE, 2, bank=MUSIC_BANK),
+	Region('sfx_pointers', TYPE_SFX, SFX_POINTERS_OFFSET, SFX_POINTERS_SIZE, 2, bank=MUSIC_BANK),
+	Region('note_table', TYPE_MUSIC, NOTE_TABLE_OFFSET, NOTE_TABLE_SIZE, 2, bank=MUSIC_BANK),
+	Region('spell_costs', TYPE_SPELL_COST, SPELL_COST_OFFSET, SPELL_COST_SIZE, 1),
+	Region('item_costs', TYPE_ITEM_COST, ITEM_COST_OFFSET, ITEM_COST_SIZE, 2),
+	# Weapon, armor and shield bonus tables are contiguous
+	Region('equipment_bonuses', TYPE_EQUIPMENT, WEAPONS_BONUS_OFFSET,
+		   WEAPONS_BONUS_SIZE + ARMOR_BONUS_SIZE + SHIELD_BONUS_SIZE, 1),
+	Region('world_map', None, WORLD_MAP_OFFSET, WORLD_MAP_DATA_SIZE, decoder='world_map'),
+	Region('dialogs', None, TEXT_OFFSET, TEXT_SIZE, decoder='dialogs'),
+)
+
+
+# ============================================================================
+# DECODERS (run in worker processes)
+# ============================================================================
+
+def decode_chr_tiles(data: bytes) -> Dict[str, Any]:
+	"""2bpp tiles as 64-character strings of pixel values 0-3."""
+	tiles = []
+	for base in range(0, len(data) - 15, 16):
+		rows = []
+		for y in range(8):
+			low, high = data[base + y], data[base + y + 8]
+			rows.append(''.join(str(((low >> bit) & 1) | (((high >> bit) & 1) << 1)) for bit in range(7, -1, -1)))
+		tiles.append(''.join(rows))
+	return {'tile_count': len(tiles), 'tiles': tiles}
+
+
+def decode_world_map(data: bytes, width: int = WORLD_MAP_SIZE, height: int = WORLD_MAP_SIZE) -> Dict[str, Any]:
+	"""Overworld rows: high nibble tile type, low nibble repeat count - 1."""
+	rows = []
+	offset = 0
+	for _ in range(height):
+		tiles: List[int] = []
+		while len(tiles) < width and offset < len(data):
+			byte = data[offset]
+			offset += 1
+			tiles.extend([byte >> 4] * min((byte & 0x0f) + 1, width - len(tiles)))
+		rows.append(''.join(f"{tile:x}" for tile in tiles))
+	return {'width': width, 'height': height, 'encoded_size': offset, 'rows': rows}
+
+
+def decode_dialogs(data: bytes) -> Dict[str, Any]:
+	"""Text blocks split at the END control code."""
+	# Imported lazily: dw_text_encoding rewraps sys.stdout on import
+	from dw_text_encoding import CONTROL_TAGS, decode_bytes
+
+	end = CONTROL_TAGS['{END}']
+	blocks = [block for block in bytes(data).split(bytes([end])) if block.strip(b'\x00')]
+	return {'block_count': len(blocks), 'blocks': [decode_bytes(list(block)) for block in blocks]}
+
+
+DECODERS: Dict[str, Callable[[bytes], Dict[str, Any]]] = {
+	'chr_tiles': decode_chr_tiles,
+	'world_map': decode_world_map,
+	'dialogs': decode_dialogs,
+}
+
+
+def _run_decoder(name: str, data: bytes) -> Dict[str, Any]:
+	return DECODERS[name](data)
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def _same_dwdata(path: Path, data: bytes) -> bool:
+	"""Whether a .dwdata file already holds data (ignoring the header timestamp)."""
+	try:
+		existing = path.read_bytes()
+	except OSError:
+		return False
+	return (len(existing) == len(data) and existing[:0x14] == data[:0x14]
+			and existing[0x18:] == data[0x18:])
+
+
+@dataclass
+class ExtractionResult:
+	"""Outcome of extracting one ROM."""
+	rom: str
+	output_dir: Path
+	files: Dict[str, bool] = field(default_factory=dict)   # output filename -> success
+	written: List[str] = field(default_factory=list)
+	unchanged: List[str] = field(default_factory=list)
+	errors: Dict[str, str] = field(default_factory=dict)
+	elapsed: float = 0.0
+
+	@property
+	def success(self) -> bool:
+		return not self.errors and all(self.files.values())
+
+
+class ExtractionEngine:
+	"""Extract all regions of one ROM from a single load."""
+
+	def __init__(self, rom: Union[str, Path, RomImage, bytes], regions: Iterable[Region] = EXTRACTION_REGIONS):
+		self.rom = open_rom(rom)
+		self.regions = list(regions)
+		self.builder = DWDataBuilder()
+
+	def section(self, region: Region) -> bytes:
+		"""Complete .dwdata file (header + data) for a region."""
+		data = region.read(self.rom)
+		return self.builder.build_header(region.data_type, len(data), region.file_offset(self.rom), data) + data
+
+	def extract(self, output_dir: Union[str, Path], decode: bool = False,
+				workers: Optional[int] = None, pack: bool = False) -> ExtractionResult:
+		"""Extract every region to output_dir.
+
+		decode also writes <name>.json for regions with a decoder; decoders
+		run on a process pool of `workers` processes (in-process if 1).
+		pack writes all sections to one .dwpack (dwpack.PACK_FILE) instead
+		of separate .dwdata files.
+		"""
+		start = time.perf_counter()
+		output_dir = Path(output_dir)
+		result = ExtractionResult(str(self.rom.path or '<memory>'), output_dir)
+		outputs: Dict[str, bytes] = {}
+
+		decode_jobs = [region for region in self.regions if decode and region.decoder]
+		pool = None
+		futures: Dict[str, Any] = {}
+		if decode_jobs and (workers is None or workers > 1):
+			pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(len(decode_jobs), workers or os.cpu_count() or 1))
+
+		try:
+			# Decoders get plain bytes: mappings cannot be sent to other processes
+			for region in decode_jobs:
+				try:
+					data = bytes(region.read(self.rom))
+				except ValueError as e:
+					result.errors[f"{region.name}.json"] = str(e)
+					continue
+				if pool:
+					futures[region.name] = pool.submit(_run_decoder, region.decoder, data)
+				else:
+					futures[region.name] = _run_decoder(region.decoder, data)
+
+			# Raw sections are cheap slices of the mapping; build them meanwhile
+			for region in self.regions:
+				if region.data_type is None:
+					continue
+				try:
+					outputs[region.filename] = self.section(region)
+				except ValueError as e:
+					result.errors[region.filename] = str(e)
+
+			for name, future in futures.items():
+				try:
+					decoded = future.result() if pool else future
+				except Exception as e:
+					result.errors[f"{name}.json"] = str(e)
+					continue
+				outputs[f"{name}.json"] = json.dumps(decoded, indent=1).encode('utf-8')
+		finally:
+			if pool:
+				pool.shutdown()
+
+		if pack:
+			names = [filename for filename in outputs if filename.endswith('.dwdata')]
+			outputs[PACK_FILE] = build_pack(Section.parse(Path(filename).stem, outputs.pop(filename))
+											for filename in names)
+
+		self._write_outputs(output_dir, outputs, result)
+		for filename in result.errors:
+			result.files[filename] = False
+		result.elapsed = time.perf_counter() - start
+		return result
+
+	@staticmethod
+	def _write_outputs(output_dir: Path, outputs: Dict[str, bytes], result: ExtractionResult) -> None:
+		"""Write all outputs in one pass, skipping files that already match."""
+		output_dir.mkdir(parents=True, exist_ok=True)
+		for filename, data in outputs.items():
+			path = output_dir / filename
+			if filename.endswith('.dwdata'):
+				unchanged = _same_dwdata(path, data)
+			else:
+				unchanged = path.exists() and path.read_bytes() == data
+			if unchanged:
+				result.unchanged.append(filename)
+			else:
+				atomic_write(path, data)
+				result.written.append(filename)
+			result.files[filename] = True
+
+
+# ============================================================================
+# CORPUS EXTRACTION
+# ============================================================================
+
+def _extract_one(rom_path: str, output_dir: str, decode: bool) -> ExtractionResult:
+	"""Worker entry point: one ROM, decoded in-process (no nested pools)."""
+	try:
+		return ExtractionEngine(rom_path).extract(output_dir, decode=decode, workers=1)
+	except (OSError, ValueError) as e:
+		return ExtractionResult(rom_path, Path(output_dir), errors={'rom': str(e)})
+
+
+def corpus_output_dirs(rom_paths: Iterable[Union[str, Path]]) -> Dict[str, Path]:
+	"""Distinct relative output directory for each ROM path.
+
+	A ROM goes to its path under the folder common to all ROMs, minus the
+	extension (hackA/Dragon Warrior (U).nes -> hackA/Dragon Warrior (U)),
+	so same-named hacks in different folders never share a directory. The
+	extension is kept for files that would still collide (dw.nes, dw.bin).
+	"""
+	paths = list(dict.fromkeys(str(path) for path in rom_paths))
+	if not paths:
+		return {}
+	resolved = {path: Path(os.path.abspath(path)) for path in paths}
+	common = Path(os.path.commonpath([str(p.parent) for p in resolved.values()]))
+	relative = {path: resolved[path].relative_to(common) for path in paths}
+
+	stems: Dict[Path, int] = {}
+	for rel in relative.values():
+		stems[rel.with_suffix('')] = stems.get(rel.with_suffix(''), 0) + 1
+	return {path: rel.with_suffix('') if stems[rel.with_suffix('')] == 1 else rel
+			for path, rel in relative.items()}
+
+
+def extract_corpus(rom_paths: Iterable[Union[str, Path]], output_root: Union[str, Path],
+				   workers: Optional[int] = None, decode: bool = False,
+				   progress: Optional[Callable[[ExtractionResult], None]] = None) -> Dict[str, ExtractionResult]:
+	"""Extract many ROMs on a bounded process pool.
+
+	Each ROM goes to output_root/<path under the common folder, without
+	extension> (see corpus_output_dirs), so no two workers write the same
+	directory. At most 2 x workers ROMs are queued at a time, so very large
+	corpora do not build up a backlog of pending work in memory.
+	"""
+	output_root = Path(output_root)
+	workers = workers or os.cpu_count() or 1
+	results: Dict[str, ExtractionResult] = {}
+	output_dirs = corpus_output_dirs(rom_paths)
+	pending = iter(output_dirs)
+
+	with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+		running: Dict[concurrent.futures.Future, str] = {}
+
+		def submit_next() -> bool:
+			rom_path = next(pending, None)
+			if rom_path is None:
+				return False
+			future = pool.submit(_extract_one, rom_path, str(output_root / output_dirs[rom_path]), decode)
+			running[future] = rom_path
+			return True
+
+		while len(running) < workers * 2 and submit_next():
+			pass
+		while running:
+			done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				rom_path = running.pop(future)
+				results[rom_path] = future.result()
+				if progress:
+					progress(results[rom_path])
+				submit_next()
+	return results
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Extract all tables from one or more Dragon Warrior ROMs')
+	parser.add_argument('roms', nargs='+', help='ROM files')
+	parser.add_argument('--output-dir', default='extracted_assets/binary',
+						help='Output directory (one subdirectory per ROM when several are given)')
+	parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+	parser.add_argument('--decode', action='store_true', help='Also write decoded CHR/map/dialog JSON')
+	args = parser.parse_args()
+
+	def report(result: ExtractionResult) -> None:
+		status = "✓" if result.success else "✗"
+		print(f"{status} {result.rom}: {len(result.written)} written, {len(result.unchanged)} unchanged "
+			  f"({result.elapsed:.2f}s)")
+		for name, error in result.errors.items():
+			print(f"    {name}: {error}")
+
+	if len(args.roms) == 1:
+		result = ExtractionEngine(args.roms[0]).extract(args.output_dir, decode=args.decode, workers=args.workers)
+		report(result)
+		return 0 if result.success else 1
+
+	results = extract_corpus(args.roms, args.output_dir, workers=args.workers, decode=args.decode, progress=report)
+	failed = sum(1 for result in results.values() if not result.success)
+	print(f"\n{len(results) - failed}/{len(results)} ROMs extracted")
+	return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -5,13 +5,18 @@ Dragon Warrior - Unified Asset Generator
 Runs all JSON → ASM generators to create assembly include files from asset data.
 This ensures all game data is regenerated from the JSON source files before building.
 
+Generators run in this process and record their inputs in
+build/.cache/generation_manifest.json (see table_generation.py). A generator
+whose recorded inputs, script and outputs are all unchanged is not run at
+all, so an unchanged tree regenerates nothing.
+
 Usage:
 	python generate_all_assets.py [--verbose] [--only TYPE]
 
 Options:
 	--verbose    Show detailed output
 	--only TYPE  Only generate specific asset type (monsters, items, spells, etc.)
-	--force      Regenerate even if ASM is newer than JSON
+	--force      Regenerate even if inputs are unchanged
 
 Asset Types:
 	monsters     - Monster stat tables
@@ -35,12 +40,14 @@ if hasattr(sys.stdout, 'buffer'):
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
-import subprocess
 import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from pipeline_stages import ScriptRunner
+from table_generation import GenerationManifest
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 TOOLS_DIR = PROJECT_ROOT / 'tools'
@@ -121,32 +128,22 @@ GENERATORS: Dict[str, Tuple[str, str, str, str]] = {
 }
 
 
-def check_needs_regeneration(json_path: Path, asm_path: Path, force: bool = False) -> bool:
-	"""Check if ASM file needs to be regenerated from JSON."""
-	if force:
-		return True
-
-	if not asm_path.exists():
-		return True
-
-	if not json_path.exists():
-		return False
-
-	# Regenerate if JSON is newer than ASM
-	json_mtime = json_path.stat().st_mtime
-	asm_mtime = asm_path.stat().st_mtime
-
-	return json_mtime > asm_mtime
+_runner: Optional[ScriptRunner] = None
+_manifest: Optional[GenerationManifest] = None
 
 
 def run_generator(asset_type: str, config: Tuple[str, str, str, str],
 				  verbose: bool = False, force: bool = False) -> Tuple[bool, str]:
 	"""Run a single generator script."""
+	global _runner, _manifest
 	json_file, script_name, output_path, description = config
 
 	json_path = ASSETS_JSON / json_file
 	generator_path = TOOLS_DIR / script_name
-	asm_path = PROJECT_ROOT / output_path
+
+	if _runner is None:
+		_runner = ScriptRunner(PROJECT_ROOT)
+		_manifest = GenerationManifest(PROJECT_ROOT)
 
 	# Check if JSON exists
 	if not json_path.exists():
@@ -156,32 +153,22 @@ def run_generator(asset_type: str, config: Tuple[str, str, str, str],
 	if not generator_path.exists():
 		return False, f"Generator not found: {script_name}"
 
-	# Check if regeneration needed
-	if not check_needs_regeneration(json_path, asm_path, force):
+	# Skip without running when every recorded output is current
+	if force:
+		_manifest.forget(generator_path)
+	elif _manifest.generator_current(generator_path):
 		if verbose:
 			return True, f"Skipped (up to date)"
 		return True, "Up to date"
 
-	# Ensure output directory exists
-	asm_path.parent.mkdir(parents=True, exist_ok=True)
-
-	# Run generator
-	try:
-		result = subprocess.run(
-			['python', str(generator_path)],
-			capture_output=True,
-			text=True,
-			cwd=str(PROJECT_ROOT)
-		)
-
-		if result.returncode == 0:
-			return True, "Generated successfully"
-		else:
-			error = result.stderr[:200] if result.stderr else result.stdout[:200]
-			return False, f"Generator failed: {error}"
-
-	except Exception as e:
-		return False, f"Error running generator: {e}"
+	# Run generator in-process (its own manifest check skips unchanged outputs)
+	success, stdout, stderr = _runner.run(generator_path)
+	_manifest = GenerationManifest(PROJECT_ROOT)
+
+	if success:
+		return True, "Generated successfully"
+	error = stderr[:200] if stderr else stdout[:200]
+	return False, f"Generator failed: {error}"
 
 
 def print_summary_table(results: Dict[str, Tuple[bool, str]]):
@@ -23,6 +23,8 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+from table_generation import generate_file
+
 
 # Character encoding: character -> byte value
 # Reverse of the TBL encoding used in extraction
@@ -360,22 +362,20 @@ def main():
 		print(f"Error: Input file not found: {input_path}")
 		return 1
 
-	# Load dialogs
-	dialogs = load_dialogs_json(str(input_path))
-
-	if args.verbose:
-		print(f"Loaded {len(dialogs)} dialogs from: {input_path}")
+	dialogs: List[Dict[str, Any]] = []
 
-	# Generate assembly
-	asm_code = generate_dialog_asm(
-		dialogs,
-		include_comments=not args.no_comments
-	)
+	def render() -> str:
+		dialogs.extend(load_dialogs_json(str(input_path)))
+		if args.verbose:
+			print(f"Loaded {len(dialogs)} dialogs from: {input_path}")
+		return generate_dialog_asm(dialogs, include_comments=not args.no_comments)
 
-	# Save output
-	output_path.parent.mkdir(parents=True, exist_ok=True)
-	with open(output_path, 'w', encoding='utf-8') as f:
-		f.write(asm_code)
+	# Render in memory; skipped when the JSON and options are unchanged
+	result = generate_file(output_path, [input_path], render, generator=__file__,
+						   options={'include_comments': not args.no_comments})
+	if not result.changed:
+		print(result.describe())
+		return 0
 
 	print(f"Generated dialog assembly: {output_path}")
 	print(f"  Dialogs: {len(dialogs)}")
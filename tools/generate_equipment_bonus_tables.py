@@ -18,13 +18,15 @@ if hasattr(sys.stderr, 'buffer'):
 import json
 from pathlib import Path
 
+from table_generation import generate_file
+
 # Paths
 JSON_PATH = Path(__file__).parent.parent / "assets" / "json" / "equipment_bonuses.json"
 OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "equipment_bonus_tables.asm"
 
 
-def generate_equipment_bonus_tables():
-	"""Generate equipment bonus table assembly from JSON."""
+def render_equipment_bonus_tables() -> str:
+	"""Render equipment bonus table assembly from JSON."""
 	print(f"Reading: {JSON_PATH}")
 
 	with open(JSON_PATH, "r") as f:
@@ -84,14 +86,13 @@ def generate_equipment_bonus_tables():
 
 	lines.append("")
 
-	# Write output
-	print(f"Writing: {OUTPUT_PATH}")
-	OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+	return "\n".join(lines)
 
-	with open(OUTPUT_PATH, "w", newline="\n") as f:
-		f.write("\n".join(lines))
 
-	print("Done!")
+def generate_equipment_bonus_tables():
+	"""Generate the equipment bonus table assembly (written only if its content changed)."""
+	result = generate_file(OUTPUT_PATH, [JSON_PATH], render_equipment_bonus_tables, generator=__file__)
+	print(result.describe())
 
 
 if __name__ == "__main__":
@@ -22,6 +22,8 @@ if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 from pathlib import Path
 
+from table_generation import generate_file
+
 
 def load_experience_table(json_path: str) -> dict:
 	"""Load experience table definitions from JSON file."""
@@ -271,17 +273,14 @@ def main():
 		sys.exit(1)
 
 	print(f"Loading experience table from: {json_path}")
-	data = load_experience_table(str(json_path))
-
-	# Generate assembly
-	assembly = generate_full_assembly(data)
-
-	# Ensure output directory exists
-	output_path.parent.mkdir(parents=True, exist_ok=True)
 
-	# Write output
-	with open(output_path, 'w', encoding='utf-8') as f:
-		f.write(assembly)
+	# Render in memory; skipped when the JSON is unchanged since the last run
+	result = generate_file(output_path, [json_path],
+						   lambda: generate_full_assembly(load_experience_table(str(json_path))),
+						   generator=__file__)
+	if not result.changed:
+		print(result.describe())
+		return
 
 	print(f"Generated assembly file: {output_path}")
 	print(f"  - Level progression constants")
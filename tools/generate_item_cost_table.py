@@ -5,16 +5,27 @@ Generate Dragon Warrior Item Cost Table for Bank00.asm
 Reads item data from assets/json/items.json and generates ItemCostTbl assembly.
 Items.json uses correct ROM ordering where ID matches ItemCostTbl index.
 """
+import sys
+import io
+
+# Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
+# This fixes UnicodeEncodeError on Windows when printing to cp1252 console
+if hasattr(sys.stdout, 'buffer'):
+	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+if hasattr(sys.stderr, 'buffer'):
+	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import json
 from pathlib import Path
 
+from table_generation import generate_file
+
 # Paths
 JSON_PATH = Path(__file__).parent.parent / "assets" / "json" / "items.json"
 OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "item_cost_table.asm"
 
 
-def generate_item_cost_table():
-	"""Generate ItemCostTbl assembly from items.json."""
+def render_item_cost_table() -> str:
+	"""Render ItemCostTbl assembly from items.json."""
 	print(f"Reading: {JSON_PATH}")
 
 	with open(JSON_PATH, "r") as f:
@@ -44,14 +55,14 @@ def generate_item_cost_table():
 		# Generate word entry
 		lines.append(f"        .word ${price:04X}             ;{name:20s} - {price:5d}  gold.")
 
-	# Write output
-	print(f"Writing: {OUTPUT_PATH}")
-	OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+	print(f"Generated {len(items)} item costs")
+	return "\n".join(lines)
 
-	with open(OUTPUT_PATH, "w", newline="\n") as f:
-		f.write("\n".join(lines))
 
-	print(f"Generated {len(items)} item costs")
+def generate_item_cost_table():
+	"""Generate ItemCostTbl assembly from items.json (written only on change)."""
+	result = generate_file(OUTPUT_PATH, [JSON_PATH], render_item_cost_table, generator=__file__)
+	print(result.describe())
 
 
 def main():
@@ -61,13 +72,4 @@ def main():
 
 
 if __name__ == "__main__":
-	import sys
-import io
-
-# Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
-# This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
-	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
-	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 	sys.exit(main())
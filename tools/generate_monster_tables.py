@@ -26,6 +26,8 @@ import argparse
 from pathlib import Path
 from typing import Dict, List, Any
 
+from table_generation import generate_file
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 ASSETS_JSON = PROJECT_ROOT / "assets" / "json"
@@ -51,8 +53,8 @@ def load_monsters(json_path: Path) -> List[Dict[str, Any]]:
 	return []
 
 
-def generate_monster_asm(monsters: List[Dict], output_path: Path, verbose: bool = False) -> int:
-	"""Generate monster data assembly file."""
+def render_monster_asm(monsters: List[Dict], verbose: bool = False) -> str:
+	"""Render monster data assembly in memory."""
 	lines = []
 
 	# Header
@@ -145,12 +147,7 @@ def generate_monster_asm(monsters: List[Dict], output_path: Path, verbose: bool
 	lines.append(f'; End of Monster Data - {len(monsters)} monsters, ~{total_bytes} bytes stats')
 	lines.append(';' + '=' * 100)
 
-	# Write output
-	output_path.parent.mkdir(parents=True, exist_ok=True)
-	with open(output_path, 'w', encoding='utf-8') as f:
-		f.write('\n'.join(lines))
-
-	return len(monsters)
+	return '\n'.join(lines)
 
 
 def encode_name(name: str) -> List[int]:
@@ -201,17 +198,28 @@ def main():
 		return 1
 
 	print(f"Loading monsters from: {input_path}")
-	monsters = load_monsters(input_path)
-
-	if not monsters:
-		print("ERROR: No monsters loaded")
+	loaded: List[Dict[str, Any]] = []
+
+	def render() -> str:
+		loaded.extend(load_monsters(input_path))
+		if not loaded:
+			raise ValueError("No monsters loaded")
+		print(f"Found {len(loaded)} monsters")
+		return render_monster_asm(loaded, args.verbose)
+
+	# Skipped entirely when the JSON is unchanged since the last run
+	try:
+		result = generate_file(output_path, [input_path], render, generator=__file__)
+	except ValueError as e:
+		print(f"ERROR: {e}")
 		return 1
 
-	print(f"Found {len(monsters)} monsters")
+	if not result.changed:
+		print(result.describe())
+		return 0
 
-	count = generate_monster_asm(monsters, output_path, args.verbose)
 	print(f"Generated monster data: {output_path}")
-	print(f"  Monsters: {count}")
+	print(f"  Monsters: {len(loaded)}")
 
 	return 0
 
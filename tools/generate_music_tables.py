@@ -24,6 +24,8 @@ if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 from pathlib import Path
 
+from table_generation import generate_file
+
 
 def load_music_data(json_path: str) -> dict:
     """Load music data from JSON file."""
@@ -299,17 +301,17 @@ def main():
         sys.exit(1)
 
     print(f"Loading music data from: {json_path}")
-    data = load_music_data(str(json_path))
-
-    # Generate assembly
-    assembly = generate_full_assembly(data)
+    data = {}
 
-    # Ensure output directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    def render() -> str:
+        data.update(load_music_data(str(json_path)))
+        return generate_full_assembly(data)
 
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(assembly)
+    # Render in memory; skipped when the JSON is unchanged since the last run
+    result = generate_file(output_path, [json_path], render, generator=__file__)
+    if not result.changed:
+        print(result.describe())
+        return
 
     tracks = data.get('music_tracks', {})
     sfx = data.get('sound_effects', {})
@@ -18,6 +18,8 @@ if hasattr(sys.stderr, 'buffer'):
 import json
 from pathlib import Path
 
+from table_generation import generate_file
+
 # Paths
 INPUT_PATH = Path(__file__).parent.parent / "assets" / "json" / "npcs.json"
 OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "npc_tables.asm"
@@ -161,16 +163,9 @@ def main():
 	with open(INPUT_PATH, "r") as f:
 		data = json.load(f)
 
-	# Generate assembly
-	asm_content = generate_npc_tables(data)
-
-	# Ensure output directory exists
-	OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-	# Write output
-	print(f"Writing: {OUTPUT_PATH}")
-	with open(OUTPUT_PATH, "w") as f:
-		f.write(asm_content)
+	# Render in memory; the file is only rewritten when the tables change
+	result = generate_file(OUTPUT_PATH, [INPUT_PATH], lambda: generate_npc_tables(data), generator=__file__)
+	print(result.describe())
 
 	# Count tables and NPCs
 	total_npcs = sum(len(data.get(t, {}).get("npcs", [])) for t in TABLE_ORDER if t in data)
@@ -18,6 +18,8 @@ if hasattr(sys.stderr, 'buffer'):
 import json
 from pathlib import Path
 
+from table_generation import generate_file
+
 # Paths
 JSON_PATH = Path(__file__).parent.parent / "assets" / "json" / "shops.json"
 OUTPUT_PATH = Path(__file__).parent.parent / "source_files" / "generated" / "shop_items_table.asm"
@@ -50,8 +52,8 @@ ITEM_NAMES = {
 }
 
 
-def generate_shop_items_table():
-	"""Generate ShopItemsTbl assembly from JSON."""
+def render_shop_items_table() -> str:
+	"""Render ShopItemsTbl assembly from JSON."""
 	print(f"Reading: {JSON_PATH}")
 
 	with open(JSON_PATH, "r") as f:
@@ -96,14 +98,13 @@ def generate_shop_items_table():
 
 		lines.append("")
 
-	# Write output
-	print(f"Writing: {OUTPUT_PATH}")
-	OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+	return "\n".join(lines)
 
-	with open(OUTPUT_PATH, "w", newline="\n") as f:
-		f.write("\n".join(lines))
 
-	print("Done!")
+def generate_shop_items_table():
+	"""Generate the ShopItemsTbl assembly (written only if its content changed)."""
+	result = generate_file(OUTPUT_PATH, [JSON_PATH], render_shop_items_table, generator=__file__)
+	print(result.describe())
 
 
 if __name__ == "__main__":
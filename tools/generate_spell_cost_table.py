@@ -16,6 +16,8 @@ import json
 from pathlib import Path
 from typing import Dict
 
+from table_generation import generate_file
+
 # Spell order in Bank00 SpellCostTbl
 # Based on Bank00.asm at $9d53
 SPELL_ORDER = [
@@ -94,18 +96,13 @@ def main():
 
 	print(f"Generating spell cost table from {spells_json.name}...")
 
-	output_dir = Path("source_files/generated")
-	output_dir.mkdir(parents=True, exist_ok=True)
-
-	output_file = output_dir / "spell_cost_table.asm"
-
-	asm_code = generate_spell_cost_table(spells_json)
+	output_file = Path("source_files/generated") / "spell_cost_table.asm"
 
-	with open(output_file, 'w') as f:
-		f.write(asm_code)
-		f.write("\n")
+	result = generate_file(output_file, [spells_json],
+						   lambda: generate_spell_cost_table(spells_json) + "\n",
+						   generator=__file__)
 
-	print(f"✓ Generated {output_file}")
+	print(f"✓ {result.describe()}")
 	return 0
 
 
@@ -8,12 +8,16 @@ Author: Dragon Warrior ROM Hacking Toolkit
 Version: 1.0
 """
 
+import sys
 import json
 import struct
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from dataclasses import dataclass, asdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rom_image import RomImage, open_rom, write_rom_file
+
 
 @dataclass
 class Monster:
@@ -86,14 +90,15 @@ class DataManager:
 	ITEM_COUNT = 16
 	ITEM_SIZE = 16
 
-	def __init__(self, rom_path: str):
+	def __init__(self, rom_path: Union[str, RomImage]):
 		"""
 		Initialize data manager
 
 		Args:
-			rom_path: Path to ROM file
+			rom_path: Path to ROM file, or a loaded RomImage
 		"""
-		self.rom_path = rom_path
+		self.rom_image = rom_path if isinstance(rom_path, RomImage) else None
+		self.rom_path = str(self.rom_image.path) if self.rom_image else rom_path
 		self.rom_data = None
 
 		# Data storage
@@ -111,8 +116,11 @@ class DataManager:
 
 	def _load_rom(self):
 		"""Load ROM file"""
-		with open(self.rom_path, 'rb') as f:
-			self.rom_data = bytearray(f.read())
+		if self.rom_image is None:
+			self.rom_image = open_rom(self.rom_path)
+
+		# Editable copy; the shared image stays read-only
+		self.rom_data = bytearray(self.rom_image.data)
 
 		# Verify size (should be 40976 bytes with header)
 		if len(self.rom_data) != 40976:
@@ -318,9 +326,8 @@ class DataManager:
 		self._insert_spells()
 		self._insert_items()
 
-		# Write to file
-		with open(output_path, 'wb') as f:
-			f.write(self.rom_data)
+		# Write to file (by rename, so mapped images of the old ROM stay valid)
+		write_rom_file(output_path, self.rom_data)
 
 	def _insert_monsters(self):
 		"""Insert monster data into ROM"""
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Patch Composer
+
+Folds an ordered stack of IPS/UPS/BPS patches (e.g. a base hack, then
+advanced_rom_hacks/quality_of_life.py, then hard_mode_plus.py) into one
+equivalent patch, without building the intermediate ROMs:
+
+- Each layer is turned into an interval map of its output: segments that
+  are literal bytes, or references to base ROM bytes (optionally XOR-ed,
+  for UPS). A later layer's reads of its input resolve to the segments
+  of the layer below, so the whole stack collapses into a single map of
+  the final ROM in terms of the original one.
+- Every segment remembers which layer wrote it. When a layer rewrites
+  bytes an earlier layer wrote with different content, the overlap is
+  reported as a Conflict named after the DragonWarriorROMLayout sections
+  it touches (the later layer still wins, as with sequential patching).
+- The composed patch can be written as IPS, UPS or BPS. Source and
+  target CRCs come from the first and last layer when they carry them
+  (UPS/BPS); otherwise, and for bytes the patches do not spell out, the
+  base ROM is needed and is read through a memory map.
+
+Usage:
+	from patch_composer import compose
+
+	composed = compose(["hack.bps", "qol.ips", "hard_mode.ips"])
+	for conflict in composed.conflicts:
+		print(conflict)        # e.g. "hard_mode.ips overrides qol.ips at 0x05E60-0x05E63 (Monster Data)"
+	composed.write("combined.bps")
+
+	python tools/patch_composer.py hack.bps qol.ips hard_mode.ips -o combined.bps
+	python tools/patch_composer.py qol.ips hard_mode.ips -o combined.ups --base roms/dw.nes
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import io
+import sys
+import zlib
+import struct
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field, replace
+
+from patch_engine import (BPS_MAGIC, BPS_SOURCE_COPY, BPS_SOURCE_READ, BPS_TARGET_READ, FOOTER_SIZE,
+						  IPS_EOF, IPS_MAGIC, UPS_MAGIC, PatchError, PatchReader, check_declared_size,
+						  detect_format, encode_number, encode_signed, ips_records)
+from rom_image import RomImage, open_rom
+from rom_comparison_advanced import DragonWarriorROMLayout
+from table_generation import atomic_write
+
+
+IPS_MAX_OFFSET = 0xFFFFFF
+IPS_MAX_RECORD = 0xFFFF
+# A record at this offset would read as the EOF marker
+IPS_EOF_OFFSET = 0x454F46
+
+# Layer index of bytes still taken from the base ROM
+BASE_LAYER = -1
+
+PatchInput = Union[str, Path, Tuple[str, bytes]]
+BaseRom = Union[str, Path, RomImage, bytes, bytearray, None]
+
+
+class ComposeError(ValueError):
+	"""A patch stack that cannot be composed or written as requested."""
+
+
+# ============================================================================
+# SEGMENTS
+# ============================================================================
+
+def _xor(a: bytes, b: bytes) -> bytes:
+	return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(len(a), 'little')
+
+
+@dataclass(frozen=True)
+class Segment:
+	"""Output bytes [start, end): literal data, or base bytes from source (XOR mask applied)."""
+	start: int
+	end: int
+	data: Optional[bytes] = None
+	source: int = 0
+	mask: Optional[bytes] = None
+	layer: int = BASE_LAYER
+
+	@property
+	def size(self) -> int:
+		return self.end - self.start
+
+	@property
+	def unchanged(self) -> bool:
+		"""Base bytes at their own offset."""
+		return self.data is None and self.mask is None and self.source == self.start
+
+	def cut(self, start: int, end: int) -> 'Segment':
+		a, b = start - self.start, end - self.start
+		return Segment(start, end, None if self.data is None else self.data[a:b], self.source + a,
+					   None if self.mask is None else self.mask[a:b], self.layer)
+
+	def moved(self, start: int, layer: int) -> 'Segment':
+		return replace(self, start=start, end=start + self.size, layer=layer)
+
+	def xored(self, mask: bytes, layer: int) -> 'Segment':
+		if self.data is not None:
+			return replace(self, data=_xor(self.data, mask), layer=layer)
+		combined = mask if self.mask is None else _xor(self.mask, mask)
+		return replace(self, mask=combined if any(combined) else None, layer=layer)
+
+	def content(self) -> tuple:
+		return (self.data,) if self.data is not None else (self.source, self.mask)
+
+	def resolve(self, base: Optional[RomImage]) -> bytes:
+		"""The bytes of this segment (base ROM needed unless literal)."""
+		if self.data is not None:
+			return self.data
+		if base is None:
+			raise ComposeError("The patches copy data from the original ROM; pass the base ROM")
+		data = bytes(base[self.source:self.end - self.start + self.source])
+		return data if self.mask is None else _xor(data, self.mask)
+
+
+def _merge(segments: Sequence[Segment]) -> List[Segment]:
+	"""Join neighbouring segments of one layer that continue each other."""
+	merged: List[Segment] = []
+	for segment in segments:
+		if merged:
+			last = merged[-1]
+			if last.end == segment.start and last.layer == segment.layer:
+				if last.data is not None and segment.data is not None:
+					merged[-1] = replace(last, end=segment.end, data=last.data + segment.data)
+					continue
+				if (last.data is None and segment.data is None and last.source + last.size == segment.source
+						and (last.mask is None) == (segment.mask is None)):
+					mask = None if last.mask is None else last.mask + segment.mask
+					merged[-1] = replace(last, end=segment.end, mask=mask)
+					continue
+		merged.append(segment)
+	return merged
+
+
+def _same_content(first: Sequence[Segment], second: Sequence[Segment]) -> bool:
+	"""Whether two segment lists covering one range hold the same bytes."""
+	strip = lambda segments: [(s.start, s.end) + s.content() for s in
+							  _merge([replace(s, layer=0) for s in segments])]
+	return strip(first) == strip(second)
+
+
+class SegmentMap:
+	"""Bytes [0, size) as sorted, contiguous segments."""
+
+	def __init__(self, size: int, segments: List[Segment]):
+		self.size = size
+		self.segments = segments
+		self._starts = [segment.start for segment in segments]
+
+	@classmethod
+	def identity(cls, size: int) -> 'SegmentMap':
+		return cls(size, [Segment(0, size)] if size else [])
+
+	def copy(self) -> 'SegmentMap':
+		return SegmentMap(self.size, list(self.segments))
+
+	def slice(self, start: int, end: int) -> List[Segment]:
+		"""Segments covering [start, end), cut to the range."""
+		end = min(end, self.size)
+		pieces = []
+		index = max(0, bisect_right(self._starts, start) - 1)
+		while index < len(self.segments) and self.segments[index].start < end:
+			segment = self.segments[index]
+			a, b = max(start, segment.start), min(end, segment.end)
+			if a < b:
+				pieces.append(segment if (a, b) == (segment.start, segment.end) else segment.cut(a, b))
+			index += 1
+		return pieces
+
+	def assign(self, start: int, end: int, pieces: List[Segment]) -> None:
+		"""Replace [start, end) with pieces that cover exactly that range."""
+		first = max(0, bisect_right(self._starts, start) - 1)
+		last = first
+		while last < len(self.segments) and self.segments[last].start < end:
+			last += 1
+		replacement = []
+		if first < len(self.segments) and self.segments[first].start < start:
+			replacement.append(self.segments[first].cut(self.segments[first].start, start))
+		replacement.extend(pieces)
+		if last > first and self.segments[last - 1].end > end:
+			replacement.append(self.segments[last - 1].cut(end, self.segments[last - 1].end))
+		self.segments[first:last] = replacement
+		self._starts[first:last] = [segment.start for segment in replacement]
+
+	def resize(self, size: int, layer: int) -> None:
+		"""Truncate, or extend with zero bytes written by layer."""
+		if size < self.size:
+			self.segments = self.slice(0, size)
+			self._starts = [segment.start for segment in self.segments]
+		elif size > self.size:
+			self.segments.append(Segment(self.size, size, bytes(size - self.size), layer=layer))
+			self._starts.append(self.size)
+		self.size = size
+
+
+# ============================================================================
+# CONFLICTS
+# ============================================================================
+
+def layout_regions(start: int, end: int) -> List[str]:
+	"""Names of the most specific DragonWarriorROMLayout sections touching [start, end)."""
+	touching = [section for section in DragonWarriorROMLayout.SECTIONS
+				if section.offset < end and section.offset + section.size > start]
+	names = [section.name for section in touching
+			 if not any(other is not section and section.offset <= other.offset and
+						other.offset + other.size <= section.offset + section.size and
+						other.size < section.size for other in touching)]
+	return names or [DragonWarriorROMLayout.identify_section(start).name]
+
+
+@dataclass
+class Conflict:
+	"""A later patch rewriting bytes an earlier one wrote, with different content."""
+	first: str
+	second: str
+	start: int
+	end: int
+	regions: List[str] = field(default_factory=list)
+
+	def __str__(self) -> str:
+		return (f"{self.second} overrides {self.first} at 0x{self.start:05X}-0x{self.end - 1:05X} "
+				f"({', '.join(self.regions)})")
+
+
+def _find_conflicts(before: SegmentMap, after: SegmentMap, layer: int) -> List[Tuple[int, int, int]]:
+	"""(earlier_layer, start, end) where layer replaced another layer's bytes."""
+	found = []
+	for segment in after.segments:
+		if segment.layer != layer:
+			continue
+		for old in before.slice(segment.start, segment.end):
+			if old.layer in (BASE_LAYER, layer):
+				continue
+			if not _same_content([old], after.slice(old.start, old.end)):
+				if found and found[-1][0] == old.layer and found[-1][2] == old.start:
+					found[-1] = (old.layer, found[-1][1], old.end)
+				else:
+					found.append((old.layer, old.start, old.end))
+	return found
+
+
+# ============================================================================
+# LAYERS
+# ============================================================================
+
+@dataclass
+class _Layer:
+	name: str
+	format: str
+	data: bytes
+	source_crc: Optional[int] = None
+	target_crc: Optional[int] = None
+
+
+def _load(patch: PatchInput) -> _Layer:
+	if isinstance(patch, tuple):
+		name, data = patch
+	else:
+		name, data = Path(patch).name, Path(patch).read_bytes()
+	format = detect_format(data[:5])
+	if format is None:
+		raise ComposeError(f"{name}: unknown patch format")
+	layer = _Layer(name, format, bytes(data))
+	if format in ('ups', 'bps'):
+		if len(data) < FOOTER_SIZE + 4:
+			raise ComposeError(f"{name}: patch is too short")
+		layer.source_crc, layer.target_crc, patch_crc = struct.unpack('<III', data[-FOOTER_SIZE:])
+		if zlib.crc32(data[:-4]) & 0xffffffff != patch_crc:
+			raise ComposeError(f"{name}: patch CRC mismatch")
+	return layer
+
+
+def _apply_ips(state: SegmentMap, layer: _Layer, index: int) -> None:
+	reader = PatchReader(io.BytesIO(layer.data), len(layer.data))
+	for offset, length, value in ips_records(reader):
+		data = reader.read(length) if value is None else bytes([value]) * length
+		if not length:
+			continue
+		if offset + length > state.size:
+			state.resize(offset + length, index)
+		state.assign(offset, offset + length, [Segment(offset, offset + length, data, layer=index)])
+	if reader.remaining >= 3:
+		state.resize(int.from_bytes(reader.read(3), 'big'), index)
+
+
+def _apply_ups(state: SegmentMap, layer: _Layer, index: int) -> None:
+	reader = PatchReader(io.BytesIO(layer.data), len(layer.data) - FOOTER_SIZE)
+	reader.read(len(UPS_MAGIC))
+	input_size = check_declared_size(reader.number(), 'input')
+	output_size = check_declared_size(reader.number(), 'output')
+	if state.size != input_size:
+		raise ComposeError(f"{layer.name} expects a {input_size}-byte input, the stack has {state.size} bytes")
+	state.resize(output_size, index)
+
+	position = 0
+	while not reader.at_end:
+		position += reader.number()
+		mask = b''.join(reader.until_zero())[:-1]
+		start, end = position, min(position + len(mask), output_size)
+		if start < end:
+			pieces = [piece.xored(mask[piece.start - start:piece.end - start], index)
+					  for piece in state.slice(start, end)]
+			state.assign(start, end, pieces)
+		position += len(mask) + 1
+
+
+def _apply_bps(state: SegmentMap, layer: _Layer, index: int) -> SegmentMap:
+	reader = PatchReader(io.BytesIO(layer.data), len(layer.data) - FOOTER_SIZE)
+	reader.read(len(BPS_MAGIC))
+	source_size = check_declared_size(reader.number(), 'source')
+	target_size = check_declared_size(reader.number(), 'target')
+	reader.read(reader.number())
+	if state.size != source_size:
+		raise ComposeError(f"{layer.name} expects a {source_size}-byte input, the stack has {state.size} bytes")
+
+	output = SegmentMap(0, [])
+	source_relative = 0
+	target_relative = 0
+
+	def emit(pieces: List[Segment]) -> None:
+		for piece in pieces:
+			output.segments.append(piece)
+			output._starts.append(piece.start)
+		output.size = output.segments[-1].end if output.segments else 0
+
+	while not reader.at_end:
+		command = reader.number()
+		action = command & 3
+		length = (command >> 2) + 1
+		position = output.size
+		if position + length > target_size:
+			raise ComposeError(f"{layer.name}: action at 0x{position:X} runs past the end of the target")
+
+		if action == BPS_SOURCE_READ:
+			emit(state.slice(position, position + length))
+		elif action == BPS_TARGET_READ:
+			emit([Segment(position, position + length, reader.read(length), layer=index)])
+		elif action == BPS_SOURCE_COPY:
+			source_relative += reader.signed()
+			if source_relative < 0:
+				raise ComposeError(f"{layer.name}: SourceCopy from before the start of the input")
+			emit([piece.moved(piece.start - source_relative + position, index)
+				  for piece in state.slice(source_relative, source_relative + length)])
+			source_relative += length
+		else:
+			target_relative += reader.signed()
+			period = position - target_relative
+			if target_relative < 0 or period <= 0:
+				raise ComposeError(f"{layer.name}: TargetCopy from 0x{target_relative:X} reads unwritten output")
+			pattern = output.slice(target_relative, position)
+			if period >= length:
+				emit([piece.moved(piece.start - target_relative + position, index)
+					  for piece in output.slice(target_relative, target_relative + length)])
+			elif all(piece.data is not None for piece in pattern):
+				data = b''.join(piece.data for piece in pattern)
+				emit([Segment(position, position + length, (data * (length // period + 1))[:length], layer=index)])
+			else:
+				for offset in range(0, length, period):
+					size = min(period, length - offset)
+					emit([piece.moved(piece.start - target_relative + position + offset, index)
+						  for piece in output.slice(target_relative, target_relative + size)])
+			target_relative += length
+
+		if output.size != position + length:
+			raise ComposeError(f"{layer.name}: action at 0x{position:X} reads outside its input")
+
+	if output.size != target_size:
+		raise ComposeError(f"{layer.name} ends at 0x{output.size:X} of a 0x{target_size:X}-byte target")
+	merged = _merge(output.segments)
+	return SegmentMap(target_size, merged)
+
+
+# ============================================================================
+# COMPOSITION
+# ============================================================================
+
+@dataclass
+class ComposedPatch:
+	"""One patch equivalent to applying a stack of patches in order."""
+	map: SegmentMap
+	source_size: int
+	layers: List[str]
+	source_crc: Optional[int] = None
+	target_crc: Optional[int] = None
+	conflicts: List[Conflict] = field(default_factory=list)
+
+	@property
+	def target_size(self) -> int:
+		return self.map.size
+
+	def _crcs(self, base: Optional[RomImage]) -> Tuple[int, int]:
+		source_crc, target_crc = self.source_crc, self.target_crc
+		if source_crc is None or target_crc is None:
+			if base is None:
+				raise ComposeError("The outer patches carry no CRCs (IPS); pass the base ROM")
+			source_crc = zlib.crc32(base.data) & 0xffffffff
+			target_crc = 0
+			for segment in self.map.segments:
+				target_crc = zlib.crc32(segment.resolve(base), target_crc)
+			target_crc &= 0xffffffff
+		return source_crc, target_crc
+
+	def changed_runs(self, base: Optional[RomImage] = None) -> List[Tuple[int, bytes]]:
+		"""(offset, bytes) of every range that is not the base ROM's own bytes."""
+		runs: List[Tuple[int, bytes]] = []
+		for segment in self.map.segments:
+			if segment.unchanged:
+				continue
+			data = segment.resolve(base)
+			if runs and runs[-1][0] + len(runs[-1][1]) == segment.start:
+				runs[-1] = (runs[-1][0], runs[-1][1] + data)
+			else:
+				runs.append((segment.start, data))
+		return runs
+
+	def to_ips(self, base: BaseRom = None) -> bytes:
+		base = open_rom(base) if base is not None else None
+		if self.target_size > IPS_MAX_OFFSET + 1:
+			raise ComposeError(f"IPS cannot address a {self.target_size} byte ROM")
+		patch = bytearray(IPS_MAGIC)
+		for offset, data in self.changed_runs(base):
+			for start in range(0, len(data), IPS_MAX_RECORD):
+				chunk = data[start:start + IPS_MAX_RECORD]
+				if offset + start == IPS_EOF_OFFSET:
+					raise ComposeError("A record at 0x454F46 would read as the IPS EOF marker")
+				patch += struct.pack('>I', offset + start)[1:] + struct.pack('>H', len(chunk)) + chunk
+		patch += IPS_EOF
+		if self.target_size < self.source_size:
+			patch += self.target_size.to_bytes(3, 'big')
+		return bytes(patch)
+
+	def to_bps(self, base: BaseRom = None) -> bytes:
+		base = open_rom(base) if base is not None else None
+		source_crc, target_crc = self._crcs(base)
+		patch = bytearray(BPS_MAGIC)
+		patch += encode_number(self.source_size) + encode_number(self.target_size) + encode_number(0)
+
+		source_relative = 0
+		literal = bytearray()
+
+		def flush() -> None:
+			if literal:
+				patch.extend(encode_number((len(literal) - 1) << 2 | BPS_TARGET_READ))
+				patch.extend(literal)
+				literal.clear()
+
+		for segment in _merge([replace(s, layer=0) for s in self.map.segments]):
+			if segment.data is not None or segment.mask is not None:
+				literal.extend(segment.resolve(base))
+				continue
+			flush()
+			if segment.unchanged:
+				patch.extend(encode_number((segment.size - 1) << 2 | BPS_SOURCE_READ))
+			else:
+				patch.extend(encode_number((segment.size - 1) << 2 | BPS_SOURCE_COPY))
+				patch.extend(encode_signed(segment.source - source_relative))
+				source_relative = segment.source + segment.size
+		flush()
+
+		patch += struct.pack('<II', source_crc, target_crc)
+		patch += struct.pack('<I', zlib.crc32(patch) & 0xffffffff)
+		return bytes(patch)
+
+	def to_ups(self, base: BaseRom = None) -> bytes:
+		base = open_rom(base) if base is not None else None
+		source_crc, target_crc = self._crcs(base)
+		patch = bytearray(UPS_MAGIC)
+		patch += encode_number(self.source_size) + encode_number(self.target_size)
+
+		masks: List[Tuple[int, bytes]] = []
+		for segment in self.map.segments:
+			if segment.unchanged:
+				continue
+			if segment.data is None and segment.source == segment.start:
+				mask = segment.mask
+			else:
+				original = bytes(base[segment.start:min(segment.end, len(base))]) if base is not None else None
+				if original is None and segment.start < self.source_size:
+					raise ComposeError("UPS stores changes as XOR with the original ROM; pass the base ROM")
+				original = (original or b'') + bytes(segment.size - len(original or b''))
+				mask = _xor(segment.resolve(base), original)
+			if masks and masks[-1][0] + len(masks[-1][1]) == segment.start:
+				masks[-1] = (masks[-1][0], masks[-1][1] + mask)
+			else:
+				masks.append((segment.start, mask))
+
+		# Zero bytes end a UPS run, so each run of non-zero XOR bytes is one record
+		relative = 0
+		for position, mask in masks:
+			for run in mask.split(b'\x00'):
+				if run:
+					patch += encode_number(position - relative) + run + b'\x00'
+					relative = position + len(run) + 1
+				position += len(run) + 1
+
+		patch += struct.pack('<II', source_crc, target_crc)
+		patch += struct.pack('<I', zlib.crc32(patch) & 0xffffffff)
+		return bytes(patch)
+
+	def to_format(self, format: str, base: BaseRom = None) -> bytes:
+		writers = {'ips': self.to_ips, 'ups': self.to_ups, 'bps': self.to_bps}
+		if format not in writers:
+			raise ComposeError(f"Unsupported patch format: {format}")
+		return writers[format](base)
+
+	def write(self, path: Union[str, Path], format: Optional[str] = None, base: BaseRom = None) -> Path:
+		"""Write the composed patch (format from the suffix unless given)."""
+		path = Path(path)
+		atomic_write(path, self.to_format(format or path.suffix.lstrip('.').lower(), base))
+		return path
+
+
+def compose(patches: Sequence[PatchInput], base: BaseRom = None, strict: bool = False) -> ComposedPatch:
+	"""Compose patch files (or (name, bytes) pairs) applied in order.
+
+	base (the original ROM) is needed when the first patch does not record
+	the ROM size (IPS); when given, the stack is also checked against its
+	CRC. Conflicts raise ComposeError when strict.
+	"""
+	layers = [_load(patch) for patch in patches]
+	if not layers:
+		raise ComposeError("No patches to compose")
+	base_image = open_rom(base) if base is not None else None
+
+	first = layers[0]
+	if base_image is not None:
+		source_size = len(base_image)
+		chain_crc = zlib.crc32(base_image.data) & 0xffffffff
+	elif first.format == 'ips':
+		raise ComposeError(f"{first.name} is IPS, which does not record the ROM size; pass the base ROM")
+	else:
+		source_size = _header_size(first)
+		chain_crc = first.source_crc
+
+	state = SegmentMap.identity(source_size)
+	composed = ComposedPatch(state, source_size, [layer.name for layer in layers], chain_crc)
+
+	for index, layer in enumerate(layers):
+		if layer.source_crc is not None and chain_crc is not None and layer.source_crc != chain_crc:
+			raise ComposeError(f"{layer.name} expects a ROM with CRC32 {layer.source_crc:08X}, "
+							   f"the layers below produce {chain_crc:08X}")
+		before = state.copy()
+		try:
+			if layer.format == 'ips':
+				_apply_ips(state, layer, index)
+			elif layer.format == 'ups':
+				_apply_ups(state, layer, index)
+			else:
+				state = _apply_bps(state, layer, index)
+		except PatchError as e:
+			raise ComposeError(f"{layer.name}: {e}") from e
+
+		for earlier, start, end in _find_conflicts(before, state, index):
+			composed.conflicts.append(Conflict(layers[earlier].name, layer.name, start, end,
+											   layout_regions(start, end)))
+		chain_crc = layer.target_crc
+
+	composed.map = SegmentMap(state.size, _merge(state.segments))
+	# None when the last patch is IPS; the CRC is then computed from the base ROM on output
+	composed.target_crc = chain_crc
+	if strict and composed.conflicts:
+		raise ComposeError("Conflicting patches:\n" + "\n".join(f"  {c}" for c in composed.conflicts))
+	return composed
+
+
+def _header_size(layer: _Layer) -> int:
+	"""Source size recorded in a UPS/BPS header."""
+	reader = PatchReader(io.BytesIO(layer.data), len(layer.data))
+	reader.read(4)
+	return reader.number()
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Fold a stack of IPS/UPS/BPS patches into one patch')
+	parser.add_argument('patches', nargs='+', help='Patches in the order they apply')
+	parser.add_argument('-o', '--output', required=True, help='Combined patch (.ips, .ups or .bps)')
+	parser.add_argument('--base', help='Original ROM (needed for IPS-only stacks and UPS output)')
+	parser.add_argument('--strict', action='store_true', help='Fail if patches overwrite each other')
+	args = parser.parse_args()
+
+	try:
+		composed = compose(args.patches, base=args.base, strict=args.strict)
+		for conflict in composed.conflicts:
+			print(f"  ⚠️  {conflict}")
+		path = composed.write(args.output, base=args.base)
+	except (ComposeError, OSError) as e:
+		print(f"❌ {e}")
+		return 1
+
+	print(f"✓ {len(args.patches)} patches -> {path} ({path.stat().st_size:,} bytes, "
+		  f"{composed.source_size:,} -> {composed.target_size:,} byte ROM)")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
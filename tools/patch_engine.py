@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+Streaming Patch Engine
+
+Applies IPS, UPS and BPS patches without loading the patch, the source
+or the result into Python objects:
+
+- Patch records are streamed from the patch file through a small buffer.
+- The source ROM is memory-mapped (rom_image.RomImage); the output is a
+  memory-mapped temporary file next to the destination, renamed into
+  place only once the patch applied cleanly.
+- CRC32s are computed incrementally while bytes are copied. UPS and BPS
+  output is produced front to back, so the source, target and patch CRCs
+  stored in the patch footer are checked by the same pass that writes the
+  file. IPS stores no checksums; its output CRC is reported only.
+- apply_patch_queue() applies (patch, source, output) jobs one at a time,
+  so memory stays flat however long the queue is.
+
+Formats follow the published specifications: IPS with RLE records and
+the truncation extension, UPS (byuu) and BPS (beat).
+
+Usage:
+	from patch_engine import apply_patch_file, apply_patch_bytes
+
+	result = apply_patch_file("hack.bps", "roms/dw.nes", "build/hack.nes")
+	print(result.format, f"{result.target_crc32:08X}")
+
+	patched = apply_patch_bytes(patch_data, rom_data).data
+
+	python tools/patch_engine.py hack.bps roms/dw.nes build/hack.nes
+	python tools/patch_engine.py --queue jobs.tsv     # patch<TAB>source<TAB>output
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import io
+import os
+import sys
+import mmap
+import zlib
+import struct
+import tempfile
+import argparse
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+from rom_image import RomImage
+
+
+# Patch, source and output bytes are moved in pieces of this size
+CHUNK_SIZE = 64 * 1024
+
+IPS_MAGIC = b'PATCH'
+IPS_EOF = b'EOF'
+UPS_MAGIC = b'UPS1'
+BPS_MAGIC = b'BPS1'
+# source CRC32, target CRC32, patch CRC32
+FOOTER_SIZE = 12
+# Largest file size a UPS/BPS header may declare (well above any NES ROM);
+# larger sizes are rejected before any output is allocated
+MAX_FILE_SIZE = 32 * 1024 * 1024
+
+BPS_SOURCE_READ = 0
+BPS_TARGET_READ = 1
+BPS_SOURCE_COPY = 2
+BPS_TARGET_COPY = 3
+
+PathLike = Union[str, Path]
+
+
+class PatchError(ValueError):
+	"""A patch that is malformed or does not fit the source."""
+
+
+def check_declared_size(size: int, what: str) -> int:
+	"""A file size read from a patch header, rejected if it is implausibly large."""
+	if size > MAX_FILE_SIZE:
+		raise PatchError(f"Patch declares a {size:,} byte {what} (limit {MAX_FILE_SIZE:,} bytes)")
+	return size
+
+
+class ChecksumError(PatchError):
+	"""A CRC32 stored in a UPS/BPS patch does not match."""
+
+	def __init__(self, which: str, expected: int, actual: int):
+		super().__init__(f"{which.capitalize()} CRC mismatch: {actual:08X} != {expected:08X}")
+		self.which = which
+		self.expected = expected
+		self.actual = actual
+
+
+# ============================================================================
+# VARIABLE-LENGTH NUMBERS (UPS/BPS)
+# ============================================================================
+
+def encode_number(value: int) -> bytes:
+	"""Encode a UPS/BPS variable-length number."""
+	if value < 0:
+		raise ValueError(f"Cannot encode negative number {value}")
+	result = bytearray()
+	while True:
+		byte = value & 0x7f
+		value >>= 7
+		if value == 0:
+			result.append(byte | 0x80)
+			return bytes(result)
+		result.append(byte)
+		value -= 1
+
+
+def decode_number(data: bytes, offset: int) -> Tuple[int, int]:
+	"""Decode a UPS/BPS variable-length number, returning (value, new_offset)."""
+	value = 0
+	shift = 1
+	while True:
+		if offset >= len(data):
+			raise PatchError("Unexpected end of patch (number)")
+		byte = data[offset]
+		offset += 1
+		value += (byte & 0x7f) * shift
+		if byte & 0x80:
+			return value, offset
+		shift <<= 7
+		value += shift
+
+
+def encode_signed(value: int) -> bytes:
+	"""Encode a BPS relative offset (sign in the low bit)."""
+	return encode_number(abs(value) << 1 | (value < 0))
+
+
+# ============================================================================
+# STREAMING READER
+# ============================================================================
+
+class PatchReader:
+	"""Buffered reader over the body of a patch stream.
+
+	Only the first limit bytes are read (the body, without the footer);
+	the CRC32 of everything read is kept as it streams past.
+	"""
+
+	def __init__(self, stream: BinaryIO, limit: int):
+		self.stream = stream
+		self.limit = limit
+		self.position = 0
+		self.crc = 0
+		self._buffer = b''
+		self._index = 0
+		self._fed = 0
+
+	@property
+	def remaining(self) -> int:
+		return self.limit - self.position
+
+	@property
+	def at_end(self) -> bool:
+		return self.position >= self.limit
+
+	def _fill(self) -> None:
+		if self._fed >= self.limit:
+			raise PatchError("Unexpected end of patch")
+		chunk = self.stream.read(min(CHUNK_SIZE, self.limit - self._fed))
+		if not chunk:
+			raise PatchError("Unexpected end of patch")
+		self.crc = zlib.crc32(chunk, self.crc)
+		self._buffer = chunk
+		self._index = 0
+		self._fed += len(chunk)
+
+	def byte(self) -> int:
+		if self._index >= len(self._buffer):
+			self._fill()
+		value = self._buffer[self._index]
+		self._index += 1
+		self.position += 1
+		return value
+
+	def chunks(self, size: int) -> Iterator[bytes]:
+		"""The next size bytes, in pieces of at most CHUNK_SIZE."""
+		if size > self.remaining:
+			raise PatchError("Unexpected end of patch (data)")
+		while size:
+			if self._index >= len(self._buffer):
+				self._fill()
+			piece = self._buffer[self._index:self._index + size]
+			self._index += len(piece)
+			self.position += len(piece)
+			size -= len(piece)
+			yield piece
+
+	def read(self, size: int) -> bytes:
+		return b''.join(self.chunks(size))
+
+	def until_zero(self) -> Iterator[bytes]:
+		"""Pieces up to and including the next zero byte (a UPS XOR run)."""
+		while True:
+			if self._index >= len(self._buffer):
+				self._fill()
+			end = self._buffer.find(b'\x00', self._index)
+			stop = len(self._buffer) if end < 0 else end + 1
+			piece = self._buffer[self._index:stop]
+			self._index = stop
+			self.position += len(piece)
+			yield piece
+			if end >= 0:
+				return
+
+	def number(self) -> int:
+		value = 0
+		shift = 1
+		while True:
+			byte = self.byte()
+			value += (byte & 0x7f) * shift
+			if byte & 0x80:
+				return value
+			shift <<= 7
+			value += shift
+
+	def signed(self) -> int:
+		value = self.number()
+		return -(value >> 1) if value & 1 else value >> 1
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+class _MemorySink:
+	"""Output into a bytearray (for callers that want bytes back)."""
+
+	def __init__(self):
+		self.buffer = bytearray()
+
+	def allocate(self, size: int):
+		self.buffer = bytearray(size)
+		return self.buffer
+
+	def finish(self, size: int) -> bytes:
+		return bytes(memoryview(self.buffer)[:size])
+
+	def discard(self) -> None:
+		self.buffer = bytearray()
+
+
+class _FileSink:
+	"""Output into a memory-mapped temp file, renamed over path on success."""
+
+	def __init__(self, path: PathLike):
+		self.path = Path(path)
+		self._file = None
+		self._map = None
+		self._temp = None
+
+	def allocate(self, size: int):
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		fd, self._temp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+		self._file = os.fdopen(fd, 'r+b')
+		self._file.truncate(size)
+		if size == 0:
+			# mmap cannot map empty files
+			return bytearray()
+		self._map = mmap.mmap(self._file.fileno(), size)
+		return self._map
+
+	def _close(self) -> None:
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	def finish(self, size: int) -> Path:
+		if self._map is not None:
+			self._map.flush()
+			self._map.close()
+			self._map = None
+		self._file.truncate(size)
+		self._file.close()
+		self._file = None
+		os.replace(self._temp, self.path)
+		self._temp = None
+		return self.path
+
+	def discard(self) -> None:
+		self._close()
+		if self._temp is not None:
+			try:
+				os.unlink(self._temp)
+			except OSError:
+				pass
+			self._temp = None
+
+
+def _crc(buffer, start: int, end: int, crc: int = 0) -> int:
+	"""CRC32 of buffer[start:end], continued from crc, in bounded pieces."""
+	for offset in range(start, end, CHUNK_SIZE):
+		crc = zlib.crc32(buffer[offset:min(offset + CHUNK_SIZE, end)], crc)
+	return crc
+
+
+def _copy(output, target: int, source, start: int, size: int) -> None:
+	for offset in range(0, size, CHUNK_SIZE):
+		step = min(CHUNK_SIZE, size - offset)
+		output[target + offset:target + offset + step] = source[start + offset:start + offset + step]
+
+
+# ============================================================================
+# RESULT
+# ============================================================================
+
+@dataclass
+class PatchApplyResult:
+	"""Outcome of applying one patch."""
+	format: str
+	output_size: int
+	target_crc32: int
+	source_crc32: Optional[int] = None
+	records: int = 0
+	truncated_to: Optional[int] = None
+	reversed: bool = False
+	metadata: bytes = b''
+	mismatches: List[ChecksumError] = field(default_factory=list)
+	warnings: List[str] = field(default_factory=list)
+	output_path: Optional[Path] = None
+	data: Optional[bytes] = field(default=None, repr=False)
+
+	@property
+	def crc_match(self) -> bool:
+		return not self.mismatches
+
+
+def _check(result: PatchApplyResult, which: str, expected: int, actual: int, strict: bool) -> None:
+	if expected == actual:
+		return
+	error = ChecksumError(which, expected, actual)
+	if strict:
+		raise error
+	result.mismatches.append(error)
+
+
+# ============================================================================
+# FORMATS
+# ============================================================================
+
+def detect_format(header: bytes) -> Optional[str]:
+	"""'ips', 'ups' or 'bps' from the first bytes of a patch, else None."""
+	if header.startswith(IPS_MAGIC):
+		return 'ips'
+	if header.startswith(UPS_MAGIC):
+		return 'ups'
+	if header.startswith(BPS_MAGIC):
+		return 'bps'
+	return None
+
+
+def patch_format(patch: Union[PathLike, bytes, bytearray]) -> Optional[str]:
+	"""Format of a patch file or in-memory patch."""
+	if isinstance(patch, (bytes, bytearray)):
+		return detect_format(bytes(patch[:5]))
+	with open(patch, 'rb') as f:
+		return detect_format(f.read(5))
+
+
+def _read_footer(stream: BinaryIO, size: int, name: str) -> bytes:
+	if size < FOOTER_SIZE + 4:
+		raise PatchError(f"Invalid {name} patch: too short")
+	stream.seek(size - FOOTER_SIZE)
+	footer = stream.read(FOOTER_SIZE)
+	stream.seek(0)
+	return footer
+
+
+def ips_records(reader: PatchReader, found_eof: Optional[List[bool]] = None) -> Iterator[Tuple[int, int, Optional[int]]]:
+	"""(offset, length, rle_value) of each IPS record.
+
+	For plain records (rle_value None) the caller consumes the length data
+	bytes from the reader before asking for the next record. True is
+	appended to found_eof when the EOF marker is reached; any truncation
+	size follows it in the reader.
+	"""
+	if reader.read(len(IPS_MAGIC)) != IPS_MAGIC:
+		raise PatchError("Invalid IPS patch: missing PATCH header")
+	while not reader.at_end:
+		head = reader.read(min(3, reader.remaining))
+		if head == IPS_EOF:
+			if found_eof is not None:
+				found_eof.append(True)
+			return
+		if len(head) < 3:
+			raise PatchError("Unexpected end of patch (offset)")
+		offset = int.from_bytes(head, 'big')
+		length = int.from_bytes(reader.read(2), 'big')
+		if length == 0:
+			length = int.from_bytes(reader.read(2), 'big')
+			yield offset, length, reader.byte()
+		else:
+			yield offset, length, None
+
+
+def _apply_ips(stream: BinaryIO, size: int, source, sink) -> PatchApplyResult:
+	"""IPS: scan the records once for the output size, then apply them."""
+	found_eof = []
+	reader = PatchReader(stream, size)
+	extent = len(source)
+	count = 0
+	for offset, length, value in ips_records(reader, found_eof):
+		if value is None:
+			for _ in reader.chunks(length):
+				pass
+		extent = max(extent, offset + length)
+		count += 1
+	truncate = int.from_bytes(reader.read(3), 'big') if reader.remaining >= 3 else None
+
+	output = sink.allocate(max(extent, truncate or 0))
+	_copy(output, 0, source, 0, len(source))
+	stream.seek(0)
+	reader = PatchReader(stream, size)
+	for offset, length, value in ips_records(reader, found_eof):
+		if value is None:
+			for piece in reader.chunks(length):
+				output[offset:offset + len(piece)] = piece
+				offset += len(piece)
+		else:
+			for start in range(offset, offset + length, CHUNK_SIZE):
+				step = min(CHUNK_SIZE, offset + length - start)
+				output[start:start + step] = bytes([value]) * step
+
+	final_size = extent if truncate is None else truncate
+	result = PatchApplyResult('ips', final_size, _crc(output, 0, final_size) & 0xffffffff,
+							  records=count, truncated_to=truncate)
+	if not found_eof:
+		result.warnings.append("Patch has no EOF marker")
+	if truncate is not None:
+		result.warnings.append(f"File truncated to {truncate} bytes")
+	return result
+
+
+def _apply_ups(stream: BinaryIO, size: int, source, sink, strict: bool) -> PatchApplyResult:
+	"""UPS: copy the source through, XOR-ing the runs the patch lists."""
+	input_crc, output_crc, patch_crc = struct.unpack('<III', _read_footer(stream, size, 'UPS'))
+	reader = PatchReader(stream, size - FOOTER_SIZE)
+	if reader.read(len(UPS_MAGIC)) != UPS_MAGIC:
+		raise PatchError("Invalid UPS patch: missing UPS1 header")
+	input_size = check_declared_size(reader.number(), 'input')
+	output_size = check_declared_size(reader.number(), 'output')
+
+	# UPS patches apply in both directions
+	source_size = len(source)
+	if source_size == input_size:
+		target_size, reverse = output_size, False
+	elif source_size == output_size:
+		target_size, reverse = input_size, True
+	else:
+		raise PatchError(f"Source size {source_size} matches neither side of the UPS patch "
+						 f"({input_size} -> {output_size})")
+
+	output = sink.allocate(target_size)
+	end_of_data = max(source_size, target_size)
+	position = 0
+	source_crc = 0
+	target_crc = 0
+	records = 0
+
+	def emit(length: int, xor: Optional[bytes] = None) -> None:
+		nonlocal position, source_crc, target_crc
+		if position > end_of_data:
+			raise PatchError("UPS record starts past the end of the file")
+		original = source[position:min(position + length, source_size)]
+		source_crc = zlib.crc32(original, source_crc)
+		data = bytes(original) + bytes(length - len(original))
+		if xor is not None:
+			data = (int.from_bytes(data, 'little') ^ int.from_bytes(xor, 'little')).to_bytes(length, 'little')
+		written = max(0, min(length, target_size - position))
+		if written:
+			output[position:position + written] = data[:written]
+			target_crc = zlib.crc32(data[:written], target_crc)
+		position += length
+
+	def copy_to(end: int) -> None:
+		if end > end_of_data:
+			raise PatchError("UPS record starts past the end of the file")
+		while position < end:
+			emit(min(CHUNK_SIZE, end - position))
+
+	while not reader.at_end:
+		copy_to(position + reader.number())
+		for piece in reader.until_zero():
+			emit(len(piece), piece)
+		records += 1
+	copy_to(end_of_data)
+
+	result = PatchApplyResult('ups', target_size, target_crc & 0xffffffff, source_crc & 0xffffffff, records)
+	expected_source, expected_target = (output_crc, input_crc) if reverse else (input_crc, output_crc)
+	if input_size == output_size and result.source_crc32 == output_crc != input_crc:
+		# Same-size patch given the patched file: XOR runs undo the patch
+		reverse = True
+		expected_source, expected_target = output_crc, input_crc
+	result.reversed = reverse
+	_check(result, 'patch', patch_crc, zlib.crc32(struct.pack('<II', input_crc, output_crc), reader.crc) & 0xffffffff, strict)
+	_check(result, 'source', expected_source, result.source_crc32, strict)
+	_check(result, 'target', expected_target, result.target_crc32, strict)
+	return result
+
+
+def _target_copy(output, start: int, position: int, length: int) -> None:
+	"""BPS TargetCopy; the ranges may overlap, repeating the bytes between them."""
+	period = position - start
+	if period >= length or period >= CHUNK_SIZE:
+		for offset in range(0, length, min(CHUNK_SIZE, period)):
+			step = min(CHUNK_SIZE, period, length - offset)
+			output[position + offset:position + offset + step] = output[start + offset:start + offset + step]
+		return
+	pattern = bytes(output[start:position])
+	step = CHUNK_SIZE - CHUNK_SIZE % period
+	for offset in range(0, length, step):
+		size = min(step, length - offset)
+		output[position + offset:position + offset + size] = (pattern * (size // period + 1))[:size]
+
+
+def _apply_bps(stream: BinaryIO, size: int, source, sink, strict: bool) -> PatchApplyResult:
+	"""BPS: decode the actions front to back into the output."""
+	source_crc_stored, target_crc_stored, patch_crc = struct.unpack('<III', _read_footer(stream, size, 'BPS'))
+	reader = PatchReader(stream, size - FOOTER_SIZE)
+	if reader.read(len(BPS_MAGIC)) != BPS_MAGIC:
+		raise PatchError("Invalid BPS patch: missing BPS1 header")
+	source_size = check_declared_size(reader.number(), 'source')
+	target_size = check_declared_size(reader.number(), 'target')
+	metadata = reader.read(reader.number())
+
+	if len(source) != source_size:
+		raise PatchError(f"Source size mismatch: expected {source_size}, got {len(source)}")
+
+	# The source is read out of order, so it is checked up front (before
+	# anything is written) instead of while streaming
+	result = PatchApplyResult('bps', target_size, 0, _crc(source, 0, source_size) & 0xffffffff, metadata=metadata)
+	_check(result, 'source', source_crc_stored, result.source_crc32, strict)
+
+	output = sink.allocate(target_size)
+	position = 0
+	source_relative = 0
+	target_relative = 0
+	target_crc = 0
+	while not reader.at_end:
+		command = reader.number()
+		action = command & 3
+		length = (command >> 2) + 1
+		if position + length > target_size:
+			raise PatchError(f"BPS action at target 0x{position:X} runs past the end of the target")
+
+		if action == BPS_SOURCE_READ:
+			if position + length > source_size:
+				raise PatchError(f"BPS SourceRead at 0x{position:X} runs past the end of the source")
+			_copy(output, position, source, position, length)
+		elif action == BPS_TARGET_READ:
+			offset = position
+			for piece in reader.chunks(length):
+				output[offset:offset + len(piece)] = piece
+				offset += len(piece)
+		elif action == BPS_SOURCE_COPY:
+			source_relative += reader.signed()
+			if source_relative < 0 or source_relative + length > source_size:
+				raise PatchError(f"BPS SourceCopy from 0x{source_relative:X} is outside the source")
+			_copy(output, position, source, source_relative, length)
+			source_relative += length
+		else:
+			target_relative += reader.signed()
+			if target_relative < 0 or target_relative >= position:
+				raise PatchError(f"BPS TargetCopy from 0x{target_relative:X} reads unwritten output")
+			_target_copy(output, target_relative, position, length)
+			target_relative += length
+
+		target_crc = _crc(output, position, position + length, target_crc)
+		position += length
+		result.records += 1
+
+	if position != target_size:
+		raise PatchError(f"BPS patch ended at 0x{position:X} of a 0x{target_size:X}-byte target")
+
+	result.target_crc32 = target_crc & 0xffffffff
+	_check(result, 'patch', patch_crc,
+		   zlib.crc32(struct.pack('<II', source_crc_stored, target_crc_stored), reader.crc) & 0xffffffff, strict)
+	_check(result, 'target', target_crc_stored, result.target_crc32, strict)
+	return result
+
+
+def _apply(stream: BinaryIO, size: int, source, sink, format: Optional[str], strict: bool) -> PatchApplyResult:
+	if format is None:
+		format = detect_format(stream.read(5))
+		stream.seek(0)
+		if format is None:
+			raise PatchError("Unknown patch format")
+	try:
+		if format == 'ips':
+			result = _apply_ips(stream, size, source, sink)
+		elif format == 'ups':
+			result = _apply_ups(stream, size, source, sink, strict)
+		elif format == 'bps':
+			result = _apply_bps(stream, size, source, sink, strict)
+		else:
+			raise PatchError(f"Unsupported patch format: {format}")
+		finished = sink.finish(result.output_size)
+	except BaseException:
+		sink.discard()
+		raise
+	if isinstance(finished, Path):
+		result.output_path = finished
+	else:
+		result.data = finished
+	return result
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+def apply_patch_file(patch_path: PathLike, source_path: PathLike, output_path: PathLike,
+					 format: Optional[str] = None, strict: bool = True) -> PatchApplyResult:
+	"""Apply a patch file to a ROM file, writing output_path.
+
+	With strict (the default) any CRC mismatch raises ChecksumError and
+	output_path is left untouched; otherwise mismatches are listed in the
+	result and the output is written anyway.
+	"""
+	with open(patch_path, 'rb') as stream, RomImage.open(source_path) as source:
+		size = os.fstat(stream.fileno()).st_size
+		return _apply(stream, size, source.data, _FileSink(output_path), format, strict)
+
+
+def apply_patch_bytes(patch: Union[bytes, bytearray], source: Union[bytes, bytearray],
+					  format: Optional[str] = None, strict: bool = True) -> PatchApplyResult:
+	"""Apply an in-memory patch to in-memory source data; the output is result.data."""
+	return _apply(io.BytesIO(patch), len(patch), memoryview(source), _MemorySink(), format, strict)
+
+
+def apply_patch_queue(jobs: Iterable[Tuple[PathLike, PathLike, PathLike]], strict: bool = True
+					  ) -> Iterator[Tuple[Tuple[PathLike, PathLike, PathLike], Union[PatchApplyResult, Exception]]]:
+	"""Apply (patch, source, output) jobs one at a time.
+
+	Yields (job, result) per job, with the PatchError or OSError in place
+	of the result when a job fails; failed jobs leave no output behind.
+	"""
+	for job in jobs:
+		patch_path, source_path, output_path = job
+		try:
+			yield job, apply_patch_file(patch_path, source_path, output_path, strict=strict)
+		except (PatchError, OSError) as e:
+			yield job, e
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def _read_jobs(path: PathLike) -> Iterator[Tuple[str, str, str]]:
+	with open(path, encoding='utf-8') as f:
+		for line_number, line in enumerate(f, 1):
+			line = line.strip()
+			if not line or line.startswith('#'):
+				continue
+			fields = line.split('\t')
+			if len(fields) != 3:
+				raise SystemExit(f"{path}:{line_number}: expected patch<TAB>source<TAB>output")
+			yield tuple(fields)
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Apply IPS/UPS/BPS patches with streaming I/O')
+	parser.add_argument('patch', nargs='?')
+	parser.add_argument('source', nargs='?')
+	parser.add_argument('output', nargs='?')
+	parser.add_argument('--queue', help='Tab-separated file of patch, source and output paths')
+	parser.add_argument('--no-verify', action='store_true', help='Write the output even if CRCs do not match')
+	args = parser.parse_args()
+
+	if args.queue:
+		jobs = _read_jobs(args.queue)
+	elif args.patch and args.source and args.output:
+		jobs = [(args.patch, args.source, args.output)]
+	else:
+		parser.error('give patch, source and output, or --queue')
+
+	failures = 0
+	for (patch_path, _, output_path), result in apply_patch_queue(jobs, strict=not args.no_verify):
+		if isinstance(result, Exception):
+			failures += 1
+			print(f"❌ {patch_path}: {result}")
+			continue
+		print(f"✓ {patch_path} -> {output_path} ({result.format.upper()}, "
+			  f"{result.output_size:,} bytes, CRC32 {result.target_crc32:08X})")
+		for message in result.warnings + [str(m) for m in result.mismatches]:
+			print(f"  ⚠️  {message}")
+	return 1 if failures else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -41,9 +41,9 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
@@ -57,6 +57,9 @@ from enum import Enum
 import argparse
 from datetime import datetime
 
+from bps_delta import DeltaStats, create_bps_patch
+from patch_engine import apply_patch_bytes, decode_number, encode_number
+
 
 class PatchFormat(Enum):
 	"""Supported patch formats."""
@@ -186,45 +189,7 @@ class IPSPatchGenerator:
 
 	def apply_patch(self, original: bytes, patch_data: bytes) -> bytes:
 		"""Apply IPS patch to original ROM."""
-		result = bytearray(original)
-
-		if not patch_data.startswith(b'PATCH'):
-			raise ValueError("Invalid IPS patch: missing PATCH header")
-
-		offset = 5  # Skip "PATCH"
-
-		while offset < len(patch_data):
-			# Check for EOF
-			if patch_data[offset:offset + 3] == b'EOF':
-				break
-
-			# Read record offset (24-bit)
-			record_offset = struct.unpack('>I', b'\x00' + patch_data[offset:offset + 3])[0]
-			offset += 3
-
-			# Read record size (16-bit)
-			record_size = struct.unpack('>H', patch_data[offset:offset + 2])[0]
-			offset += 2
-
-			# RLE encoding check
-			if record_size == 0:
-				# RLE record: next 2 bytes = run length, next 1 byte = value
-				rle_size = struct.unpack('>H', patch_data[offset:offset + 2])[0]
-				offset += 2
-				rle_value = patch_data[offset]
-				offset += 1
-
-				# Apply RLE
-				result[record_offset:record_offset + rle_size] = bytes([rle_value] * rle_size)
-			else:
-				# Normal record: copy data
-				record_data = patch_data[offset:offset + record_size]
-				offset += record_size
-
-				# Apply patch
-				result[record_offset:record_offset + record_size] = record_data
-
-		return bytes(result)
+		return apply_patch_bytes(patch_data, original, 'ips').data
 
 
 # ============================================================================
@@ -251,22 +216,30 @@ class UPSPatchGenerator:
 		patch_data.extend(self._encode_vlq(len(original)))
 		patch_data.extend(self._encode_vlq(len(modified)))
 
-		# XOR encoding for differences
+		# XOR-encoded runs of differences, each preceded by the number of
+		# unchanged bytes since the previous run and ended by a zero byte
 		max_len = max(len(original), len(modified))
 		relative_offset = 0
+		i = 0
 
-		for i in range(max_len):
+		while i < max_len:
 			orig_byte = original[i] if i < len(original) else 0
 			mod_byte = modified[i] if i < len(modified) else 0
 
-			if orig_byte != mod_byte:
-				# Encode offset delta
-				patch_data.extend(self._encode_vlq(i - relative_offset))
-				relative_offset = i + 1
+			if orig_byte == mod_byte:
+				i += 1
+				continue
 
-				# XOR-encode byte
-				xor_byte = orig_byte ^ mod_byte
+			patch_data.extend(self._encode_vlq(i - relative_offset))
+			while i < max_len:
+				xor_byte = (original[i] if i < len(original) else 0) ^ (modified[i] if i < len(modified) else 0)
+				if xor_byte == 0:
+					break
 				patch_data.append(xor_byte)
+				i += 1
+			patch_data.append(0)
+			i += 1
+			relative_offset = i
 
 		# Append CRCs
 		patch_data.extend(struct.pack('<I', input_crc))
@@ -279,91 +252,17 @@ class UPSPatchGenerator:
 		return bytes(patch_data)
 
 	def apply_patch(self, original: bytes, patch_data: bytes) -> bytes:
-		"""Apply UPS patch with validation."""
-		if not patch_data.startswith(b'UPS1'):
-			raise ValueError("Invalid UPS patch: missing UPS1 header")
-
-		offset = 4  # Skip magic
-
-		# Decode input/output sizes
-		input_size, bytes_read = self._decode_vlq(patch_data, offset)
-		offset += bytes_read
-
-		output_size, bytes_read = self._decode_vlq(patch_data, offset)
-		offset += bytes_read
-
-		# Validate input CRC (read from end of patch)
-		input_crc_stored = struct.unpack('<I', patch_data[-12:-8])[0]
-		input_crc_actual = zlib.crc32(original) & 0xffffffff
-
-		if input_crc_actual != input_crc_stored:
-			raise ValueError(f"Input ROM CRC mismatch: {input_crc_actual:08X} != {input_crc_stored:08X}")
-
-		# Apply XOR patches
-		result = bytearray(original)
-		if len(result) < output_size:
-			result.extend(b'\x00' * (output_size - len(result)))
-
-		relative_offset = 0
-
-		while offset < len(patch_data) - 12:  # Stop before CRCs
-			# Decode offset delta
-			offset_delta, bytes_read = self._decode_vlq(patch_data, offset)
-			offset += bytes_read
-			relative_offset += offset_delta
-
-			# Apply XOR
-			if offset < len(patch_data) - 12:
-				xor_byte = patch_data[offset]
-				offset += 1
-
-				if relative_offset < len(result):
-					result[relative_offset] ^= xor_byte
-				relative_offset += 1
-
-		# Validate output
-		output_crc_stored = struct.unpack('<I', patch_data[-8:-4])[0]
-		output_crc_actual = zlib.crc32(result) & 0xffffffff
-
-		if output_crc_actual != output_crc_stored:
-			raise ValueError(f"Output ROM CRC mismatch: {output_crc_actual:08X} != {output_crc_stored:08X}")
-
-		return bytes(result[:output_size])
+		"""Apply UPS patch with validation (raises ValueError on a CRC mismatch)."""
+		return apply_patch_bytes(patch_data, original, 'ups').data
 
 	def _encode_vlq(self, value: int) -> bytes:
 		"""Encode integer as variable-length quantity."""
-		result = bytearray()
-		done = False
-
-		while not done:
-			byte = value & 0x7f
-			value >>= 7
-
-			if value == 0:
-				done = True
-				byte |= 0x80  # Set high bit on last byte
-
-			result.append(byte)
-
-		return bytes(result)
+		return encode_number(value)
 
 	def _decode_vlq(self, data: bytes, offset: int) -> Tuple[int, int]:
-		"""Decode variable-length quantity from data."""
-		value = 0
-		shift = 0
-		bytes_read = 0
-
-		while True:
-			byte = data[offset + bytes_read]
-			bytes_read += 1
-
-			value |= (byte & 0x7f) << shift
-			shift += 7
-
-			if byte & 0x80:  # High bit set = last byte
-				break
-
-		return value, bytes_read
+		"""Decode variable-length quantity from data, returning (value, bytes_read)."""
+		value, end = decode_number(data, offset)
+		return value, end - offset
 
 
 # ============================================================================
@@ -379,119 +278,12 @@ class BPSPatchGenerator:
 	ACTION_TARGET_COPY = 3
 
 	def __init__(self):
-		self.actions: List[Tuple[int, int]] = []
+		self.stats = DeltaStats()
 
 	def generate(self, original: bytes, modified: bytes) -> bytes:
-		"""Generate BPS patch using delta encoding."""
-		patch = bytearray()
-
-		# Header
-		patch.extend(b'BPS1')
-
-		# Sizes
-		patch.extend(self._encode_number(len(original)))
-		patch.extend(self._encode_number(len(modified)))
-
-		# Metadata (optional, empty for now)
-		patch.extend(self._encode_number(0))
-
-		# Generate delta encoding
-		delta = self._create_delta(original, modified)
-		patch.extend(delta)
-
-		# CRCs
-		patch.extend(struct.pack('<I', zlib.crc32(original) & 0xffffffff))
-		patch.extend(struct.pack('<I', zlib.crc32(modified) & 0xffffffff))
-		patch.extend(struct.pack('<I', zlib.crc32(patch) & 0xffffffff))
-
-		return bytes(patch)
-
-	def _create_delta(self, original: bytes, modified: bytes) -> bytes:
-		"""Create delta-encoded patch data."""
-		delta = bytearray()
-		output_offset = 0
-		source_relative = 0
-		target_relative = 0
-
-		while output_offset < len(modified):
-			# Try to find match in source (original)
-			match_length_source, match_offset_source = self._find_match(
-				original, modified, output_offset, source_relative
-			)
-
-			# Try to find match in target (already-processed output)
-			match_length_target, match_offset_target = self._find_match(
-				modified[:output_offset], modified, output_offset, target_relative
-			)
-
-			# Choose best action
-			if match_length_source >= 4:
-				# Source copy
-				delta.extend(self._encode_number(
-					(match_length_source - 1) << 2 | self.ACTION_SOURCE_COPY
-				))
-				delta.extend(self._encode_signed(match_offset_source - source_relative))
-				output_offset += match_length_source
-				source_relative = match_offset_source + match_length_source
-			elif match_length_target >= 4:
-				# Target copy
-				delta.extend(self._encode_number(
-					(match_length_target - 1) << 2 | self.ACTION_TARGET_COPY
-				))
-				delta.extend(self._encode_signed(match_offset_target - target_relative))
-				output_offset += match_length_target
-				target_relative = match_offset_target + match_length_target
-			else:
-				# Direct byte (no match found)
-				delta.append(modified[output_offset] << 2 | self.ACTION_TARGET_READ)
-				output_offset += 1
-
-		return bytes(delta)
-
-	def _find_match(self, haystack: bytes, needle: bytes, needle_offset: int,
-					relative_offset: int) -> Tuple[int, int]:
-		"""Find longest match in haystack for needle[needle_offset:]."""
-		best_length = 0
-		best_offset = 0
-
-		search_window = 1024  # Limit search window for performance
-
-		start = max(0, relative_offset - search_window)
-		end = min(len(haystack), relative_offset + search_window)
-
-		for i in range(start, end):
-			length = 0
-			while (i + length < len(haystack) and
-				   needle_offset + length < len(needle) and
-				   haystack[i + length] == needle[needle_offset + length]):
-				length += 1
-
-			if length > best_length:
-				best_length = length
-				best_offset = i
-
-		return best_length, best_offset
-
-	def _encode_number(self, value: int) -> bytes:
-		"""Encode number in BPS variable-length format."""
-		result = bytearray()
-		while True:
-			byte = value & 0x7f
-			value >>= 7
-			if value == 0:
-				result.append(byte | 0x80)
-				break
-			else:
-				result.append(byte)
-				value -= 1
-		return bytes(result)
-
-	def _encode_signed(self, value: int) -> bytes:
-		"""Encode signed number in BPS format."""
-		encoded = abs(value) << 1
-		if value < 0:
-			encoded |= 1
-		return self._encode_number(encoded)
+		"""Generate BPS patch using delta encoding (see bps_delta)."""
+		self.stats = DeltaStats()
+		return create_bps_patch(original, modified, stats=self.stats)
 
 
 # ============================================================================
@@ -681,6 +473,8 @@ class AdvancedPatchGenerator:
 				result = self.ips_gen.apply_patch(original, patch_data)
 			elif format == PatchFormat.UPS:
 				result = self.ups_gen.apply_patch(original, patch_data)
+			elif format == PatchFormat.BPS:
+				result = apply_patch_bytes(patch_data, original, 'bps').data
 			else:
 				print(f"Validation not implemented for {format.value}")
 				return False
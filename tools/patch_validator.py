@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Batch Patch Validator
+
+Checks a directory of community patches against one base ROM and writes
+a machine-readable (JSON) report, one entry per patch:
+
+- Format detection (IPS/UPS/BPS) and, for UPS/BPS, the patch, source and
+  target CRCs recorded in the footer.
+- A dry run of the patch against the base ROM through patch_engine (in
+  memory, nothing is written), with its warnings (missing IPS EOF,
+  truncation) and output size.
+- The bytes the patch actually changes, grouped into runs and named after
+  the DragonWarriorROMLayout sections they touch.
+
+Patches are validated on a process pool. Each worker maps the base ROM
+once when it starts (rom_image.RomImage.open, read-only), so every worker
+reads the same page-cache pages and the ROM is never reloaded or pickled
+per patch; only patch paths go to the workers and only reports come back.
+
+Usage:
+	python tools/patch_validator.py roms/dw.nes patches/ -o build/patch_report.json
+	python tools/patch_validator.py roms/dw.nes patches/ --workers 4 --recursive
+
+	from patch_validator import validate_directory
+
+	report = validate_directory("roms/dw.nes", "patches/")
+	for entry in report.failed:
+		print(entry.path, entry.error or entry.mismatches)
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+import concurrent.futures
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict, dataclass, field
+
+from patch_engine import FOOTER_SIZE, PatchError, apply_patch_bytes, detect_format
+from patch_composer import layout_regions
+from diff_engine import diff_spans
+from rom_image import RomImage
+from table_generation import atomic_write
+
+
+PATCH_EXTENSIONS = ('.ips', '.ups', '.bps')
+# Patches per task sent to a worker
+CHUNK_SIZE = 8
+
+# The base ROM, mapped once per worker process
+_base: Optional[RomImage] = None
+
+
+@dataclass
+class TouchedRun:
+	"""A run of bytes the patch changes, with the layout sections it touches."""
+	start: int
+	end: int
+	regions: List[str] = field(default_factory=list)
+
+	@property
+	def size(self) -> int:
+		return self.end - self.start
+
+
+@dataclass
+class PatchReport:
+	"""Validation outcome for one patch."""
+	path: str
+	format: Optional[str] = None
+	patch_size: int = 0
+	valid: bool = False
+	error: Optional[str] = None
+	patch_crc32: Optional[int] = None
+	source_crc32: Optional[int] = None
+	target_crc32: Optional[int] = None
+	mismatches: List[str] = field(default_factory=list)
+	warnings: List[str] = field(default_factory=list)
+	records: int = 0
+	output_size: int = 0
+	output_crc32: Optional[int] = None
+	bytes_changed: int = 0
+	touched: List[TouchedRun] = field(default_factory=list)
+	regions: List[str] = field(default_factory=list)
+	elapsed: float = 0.0
+
+	def to_dict(self) -> Dict[str, Any]:
+		data = asdict(self)
+		for key in ('patch_crc32', 'source_crc32', 'target_crc32', 'output_crc32'):
+			if data[key] is not None:
+				data[key] = f"{data[key]:08X}"
+		return data
+
+
+@dataclass
+class BatchReport:
+	"""Validation outcome for a directory of patches."""
+	base: str
+	base_size: int
+	base_crc32: int
+	patches: List[PatchReport] = field(default_factory=list)
+	elapsed: float = 0.0
+
+	@property
+	def failed(self) -> List[PatchReport]:
+		return [report for report in self.patches if not report.valid]
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			'base': self.base,
+			'base_size': self.base_size,
+			'base_crc32': f"{self.base_crc32:08X}",
+			'patches': len(self.patches),
+			'valid': len(self.patches) - len(self.failed),
+			'failed': len(self.failed),
+			'elapsed': round(self.elapsed, 3),
+			'results': [report.to_dict() for report in self.patches],
+		}
+
+	def save(self, path: Union[str, Path]) -> Path:
+		path = Path(path)
+		atomic_write(path, json.dumps(self.to_dict(), indent=2).encode('utf-8'))
+		return path
+
+
+def touched_runs(original: Union[bytes, memoryview], modified: bytes) -> List[TouchedRun]:
+	"""Runs of bytes that differ between original and modified (growth counts as changed)."""
+	common = min(len(original), len(modified))
+	runs = diff_spans(original[:common], modified[:common])
+	if len(modified) > common:
+		if runs and runs[-1][1] == common:
+			runs[-1] = (runs[-1][0], len(modified))
+		else:
+			runs.append((common, len(modified)))
+	return [TouchedRun(start, end, layout_regions(start, end)) for start, end in runs]
+
+
+def validate_patch(path: Union[str, Path], base: Union[bytes, bytearray, memoryview, RomImage]) -> PatchReport:
+	"""Validate one patch file against the base ROM (nothing is written)."""
+	start = time.perf_counter()
+	report = PatchReport(str(path))
+	base_data = base.data if isinstance(base, RomImage) else memoryview(base)
+	try:
+		patch = Path(path).read_bytes()
+		report.patch_size = len(patch)
+		report.format = detect_format(patch[:5])
+		if report.format is None:
+			raise PatchError("Unknown patch format")
+		if report.format in ('ups', 'bps') and len(patch) >= FOOTER_SIZE:
+			report.source_crc32, report.target_crc32, report.patch_crc32 = struct.unpack('<III', patch[-FOOTER_SIZE:])
+
+		result = apply_patch_bytes(patch, base_data, report.format, strict=False)
+		report.mismatches = [str(mismatch) for mismatch in result.mismatches]
+		report.warnings = list(result.warnings)
+		report.records = result.records
+		report.output_size = result.output_size
+		report.output_crc32 = result.target_crc32
+		report.touched = touched_runs(base_data, result.data)
+		report.bytes_changed = sum(run.size for run in report.touched)
+		report.regions = list(dict.fromkeys(name for run in report.touched for name in run.regions))
+		report.valid = result.crc_match
+	except (PatchError, OSError) as e:
+		report.error = str(e)
+	except Exception as e:
+		# Anything else (e.g. MemoryError) fails this patch, not the whole batch
+		report.error = f"{type(e).__name__}: {e}"
+	report.elapsed = time.perf_counter() - start
+	return report
+
+
+def _init_worker(base_path: str) -> None:
+	global _base
+	_base = RomImage.open(base_path)
+
+
+def _validate_in_worker(path: str) -> PatchReport:
+	return validate_patch(path, _base)
+
+
+def find_patches(directory: Union[str, Path], recursive: bool = False) -> List[Path]:
+	"""Patch files in directory, sorted by path."""
+	directory = Path(directory)
+	candidates = directory.rglob('*') if recursive else directory.iterdir()
+	return sorted(path for path in candidates if path.suffix.lower() in PATCH_EXTENSIONS and path.is_file())
+
+
+def validate_directory(base_path: Union[str, Path], directory: Union[str, Path], workers: Optional[int] = None,
+					   recursive: bool = False) -> BatchReport:
+	"""Validate every patch in directory against the base ROM on a process pool."""
+	start = time.perf_counter()
+	patches = [str(path) for path in find_patches(directory, recursive)]
+	workers = min(workers or os.cpu_count() or 1, max(1, len(patches)))
+
+	with RomImage.open(base_path) as base:
+		report = BatchReport(str(base_path), len(base), zlib.crc32(base.data) & 0xffffffff)
+		if workers == 1:
+			report.patches = [validate_patch(path, base) for path in patches]
+		else:
+			with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+														initargs=(str(base_path),)) as pool:
+				report.patches = list(pool.map(_validate_in_worker, patches, chunksize=CHUNK_SIZE))
+
+	report.elapsed = time.perf_counter() - start
+	return report
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def _summary(report: PatchReport) -> Tuple[str, str]:
+	if report.error:
+		return '❌', report.error
+	if report.mismatches:
+		return '❌', '; '.join(report.mismatches)
+	detail = f"{report.format.upper()}, {report.bytes_changed:,} bytes changed"
+	if report.regions:
+		detail += f" ({', '.join(report.regions)})"
+	if report.warnings:
+		return '⚠️ ', f"{detail}; {'; '.join(report.warnings)}"
+	return '✓', detail
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Validate a directory of IPS/UPS/BPS patches against a base ROM')
+	parser.add_argument('base', help='Base ROM the patches apply to')
+	parser.add_argument('directory', help='Directory of patches')
+	parser.add_argument('-o', '--output', help='JSON report (default: print JSON to stdout)')
+	parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+	parser.add_argument('--recursive', action='store_true', help='Include subdirectories')
+	args = parser.parse_args()
+
+	try:
+		report = validate_directory(args.base, args.directory, workers=args.workers, recursive=args.recursive)
+	except OSError as e:
+		print(f"❌ {e}", file=sys.stderr)
+		return 1
+
+	if not args.output:
+		print(json.dumps(report.to_dict(), indent=2))
+		return 1 if report.failed else 0
+
+	for entry in report.patches:
+		mark, detail = _summary(entry)
+		print(f"{mark} {Path(entry.path).name}: {detail}")
+	path = report.save(args.output)
+	print(f"\n{len(report.patches) - len(report.failed)}/{len(report.patches)} valid "
+		  f"in {report.elapsed:.2f}s -> {path}")
+	return 1 if report.failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
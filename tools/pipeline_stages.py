@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Pipeline Stages
+
+Registry of in-process pipeline stages shared by dragon_warrior_build.py,
+tools/asset_pipeline.py and tools/toolkit_master.py. Stages run in the
+caller's process, share one loaded ROM buffer and parsed JSON assets
+through a PipelineContext, and return StageResult objects instead of
+stdout text.
+
+Registered stages:
+- extract_graphics: graphics/palettes/maps to PNG + JSON
+- extract_data: monsters, items, spells, shops, dialog, NPCs to JSON
+- extract_assets: both extractors plus the merged data file
+- generate_assembly: reinsertion assembly from edited assets
+- patch_sources / restore_sources: switch the assembler to asset includes
+  through in-memory source overlays (sources on disk are never modified)
+- recover_source_backups: opt-in, confirmed restore of source_files_backup
+  left by the old in-place patching (refused if a backup is outdated)
+- run_script: any tool script run as __main__ (output captured)
+
+Usage:
+	from pipeline_stages import PipelineContext, STAGES
+
+	context = PipelineContext(rom_path="roms/Dragon Warrior (U) (PRG1) [!].nes")
+	result = STAGES.run('extract_data', context, output_dir="extracted_assets")
+	print(result.success, result.data['counts'])
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import builtins
+import contextlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+# Stages import sibling tools and the extraction package by module name
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / 'extraction'))
+
+
+# ============================================================================
+# SCRIPT RUNNER
+# ============================================================================
+
+class ScriptRunner:
+	"""Run tool scripts as __main__ inside this process.
+
+	Compiled code is kept until the script changes. Output is captured, and
+	the scripts' module-level stdout re-wrapping is neutralised (it would
+	otherwise close the real stdout when the wrapper is discarded).
+	"""
+
+	def __init__(self, project_root: Union[str, Path]):
+		self.project_root = Path(project_root)
+		self._compiled: Dict[Path, Tuple[int, Any]] = {}
+
+	def _code(self, script: Path) -> Any:
+		mtime = script.stat().st_mtime_ns
+		cached = self._compiled.get(script)
+		if cached is None or cached[0] != mtime:
+			cached = (mtime, compile(script.read_text(encoding='utf-8-sig'), str(script), 'exec'))
+			self._compiled[script] = cached
+		return cached[1]
+
+	def run(self, script: Union[str, Path], args: Optional[List[str]] = None) -> Tuple[bool, str, str]:
+		"""Run a script; returns (success, stdout, stderr)."""
+		script = Path(script)
+		if not script.is_absolute():
+			script = self.project_root / script
+
+		stdout, stderr = io.StringIO(), io.StringIO()
+		saved_argv, saved_path, saved_cwd = sys.argv, list(sys.path), os.getcwd()
+		namespace = {'__name__': '__main__', '__file__': str(script), '__builtins__': builtins}
+		success = True
+		try:
+			sys.argv = [str(script)] + list(args or [])
+			sys.path.insert(0, str(script.parent))
+			os.chdir(self.project_root)
+			with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+				exec(self._code(script), namespace)
+		except SystemExit as e:
+			# Only sys.exit(), sys.exit(0) and sys.exit(None) are success (1 == True, so no tuple test)
+			success = e.code is None or e.code == 0
+			if isinstance(e.code, str):
+				stderr.write(f"{e.code}\n")
+		except Exception as e:
+			stderr.write(f"{type(e).__name__}: {e}\n")
+			success = False
+		finally:
+			sys.argv = saved_argv
+			sys.path[:] = saved_path
+			os.chdir(saved_cwd)
+		return success, stdout.getvalue(), stderr.getvalue()
+
+
+# ============================================================================
+# CONTEXT AND RESULTS
+# ============================================================================
+
+@dataclass
+class StageResult:
+	"""Structured outcome of one stage."""
+	stage: str
+	success: bool
+	outputs: List[Path] = field(default_factory=list)
+	data: Dict[str, Any] = field(default_factory=dict)
+	error: str = ""
+	duration: float = 0.0
+
+
+class PipelineContext:
+	"""State shared by every stage run in one process."""
+
+	def __init__(self, project_root: Union[str, Path] = ".", rom_path: Optional[Union[str, Path]] = None,
+				 assets_dir: Union[str, Path] = "extracted_assets", source_dir: Union[str, Path] = "source_files",
+				 build_dir: Union[str, Path] = "build"):
+		self.project_root = Path(project_root)
+		self.rom_path = Path(rom_path) if rom_path else None
+		self.assets_dir = Path(assets_dir)
+		self.source_dir = Path(source_dir)
+		self.build_dir = Path(build_dir)
+		self.runner = ScriptRunner(self.project_root)
+		self.game_data: Any = None
+		# source_overlay.SourceOverlay set by patch_sources; pass as the assembler loader
+		self.overlay: Any = None
+		self._rom_data: Optional[bytes] = None
+		self._json: Dict[Path, Tuple[int, Any]] = {}
+
+	@property
+	def rom_data(self) -> bytes:
+		"""ROM contents, read once."""
+		if self._rom_data is None:
+			if self.rom_path is None:
+				raise ValueError("No ROM path configured for this pipeline")
+			self._rom_data = self.rom_path.read_bytes()
+		return self._rom_data
+
+	def load_json(self, path: Union[str, Path]) -> Any:
+		"""Parse a JSON asset, reusing the parsed value until the file changes."""
+		path = Path(path)
+		mtime = path.stat().st_mtime_ns
+		cached = self._json.get(path)
+		if cached is None or cached[0] != mtime:
+			with open(path, 'r', encoding='utf-8') as f:
+				cached = (mtime, json.load(f))
+			self._json[path] = cached
+		return cached[1]
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+StageFunction = Callable[..., StageResult]
+
+
+class StageRegistry:
+	"""Named pipeline stages."""
+
+	def __init__(self):
+		self._stages: Dict[str, Tuple[StageFunction, str]] = {}
+
+	def register(self, name: str, description: str = "") -> Callable[[StageFunction], StageFunction]:
+		"""Decorator registering fn(context, **options) -> StageResult."""
+		def decorator(function: StageFunction) -> StageFunction:
+			self._stages[name] = (function, description or (function.__doc__ or "").strip().split('\n')[0])
+			return function
+		return decorator
+
+	def names(self) -> List[str]:
+		return sorted(self._stages)
+
+	def describe(self, name: str) -> str:
+		return self._stages[name][1]
+
+	def __contains__(self, name: str) -> bool:
+		return name in self._stages
+
+	def run(self, name: str, context: PipelineContext, **options) -> StageResult:
+		"""Run a stage; exceptions become failed results."""
+		if name not in self._stages:
+			return StageResult(name, False, error=f"Unknown stage: {name}")
+
+		function = self._stages[name][0]
+		start = time.perf_counter()
+		try:
+			result = function(context, **options)
+		except Exception as e:
+			result = StageResult(name, False, error=f"{type(e).__name__}: {e}")
+		result.duration = time.perf_counter() - start
+		return result
+
+
+STAGES = StageRegistry()
+
+
+def _count(mapping: Any) -> int:
+	return len(mapping) if mapping is not None else 0
+
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+@STAGES.register('extract_graphics')
+def extract_graphics(context: PipelineContext, output_dir: Optional[Union[str, Path]] = None) -> StageResult:
+	"""Extract graphics, palettes and maps to PNG + JSON."""
+	from graphics_extractor import DragonWarriorGraphicsExtractor
+
+	output_dir = Path(output_dir or context.assets_dir)
+	extractor = DragonWarriorGraphicsExtractor(str(context.rom_path), str(output_dir), rom_data=context.rom_data)
+	game_data = extractor.extract_all_graphics()
+	return StageResult('extract_graphics', True, outputs=[extractor.graphics_dir, extractor.json_dir], data={
+		'game_data': game_data,
+		'counts': {'graphics': _count(game_data.graphics), 'palettes': _count(game_data.palettes),
+				   'maps': _count(game_data.maps)},
+	})
+
+
+@STAGES.register('extract_data')
+def extract_data(context: PipelineContext, output_dir: Optional[Union[str, Path]] = None) -> StageResult:
+	"""Extract game data tables to JSON."""
+	from data_extractor import DragonWarriorDataExtractor
+
+	output_dir = Path(output_dir or context.assets_dir)
+	extractor = DragonWarriorDataExtractor(str(context.rom_path), str(output_dir), rom_data=context.rom_data)
+	game_data = extractor.extract_all_data()
+	context.game_data = game_data
+	return StageResult('extract_data', True, outputs=[extractor.json_dir], data={
+		'game_data': game_data,
+		'counts': {'monsters': _count(game_data.monsters), 'items': _count(game_data.items),
+				   'spells': _count(game_data.spells), 'shops': _count(game_data.shops),
+				   'dialogs': _count(game_data.dialogs), 'npcs': _count(game_data.npcs)},
+	})
+
+
+@STAGES.register('extract_assets')
+def extract_assets(context: PipelineContext, output_dir: Optional[Union[str, Path]] = None) -> StageResult:
+	"""Run the full asset extraction (graphics, data, merged file)."""
+	from asset_pipeline import AssetPipeline
+
+	pipeline = AssetPipeline(str(context.rom_path), str(output_dir or context.assets_dir), context=context)
+	success = pipeline.extract_all_assets()
+	return StageResult('extract_assets', success, outputs=[pipeline.json_dir, pipeline.graphics_dir],
+					   error="" if success else "Asset extraction failed")
+
+
+@STAGES.register('generate_assembly')
+def generate_assembly(context: PipelineContext, output_dir: Union[str, Path] = "build/generated",
+					  extract_defaults: bool = False) -> StageResult:
+	"""Generate reinsertion assembly from edited assets."""
+	from asset_reinserter import AssetReinserter
+
+	reinserter = AssetReinserter(str(context.assets_dir), str(output_dir))
+	generated = reinserter.generate_all_assembly(extract_defaults=extract_defaults) or []
+	return StageResult('generate_assembly', True, outputs=[Path(p) for p in generated],
+					   data={'files': len(generated)})
+
+
+@STAGES.register('patch_sources')
+def patch_sources(context: PipelineContext, generated_dir: Optional[Union[str, Path]] = None) -> StageResult:
+	"""Overlay source files with asset includes (in memory)."""
+	from source_patcher import SourcePatcher
+
+	generated_dir = Path(generated_dir) if generated_dir else context.build_dir / "generated"
+	patcher = SourcePatcher(str(context.source_dir), generated_dir=str(generated_dir),
+							default_dir=str(context.build_dir / "default_assets"))
+	overlay = patcher.create_overlay()
+	if overlay is None:
+		return StageResult('patch_sources', False, error="Source overlays could not be created")
+
+	context.overlay = overlay
+	return StageResult('patch_sources', True, data={
+		'overlay': overlay,
+		'files': [path.name for path in overlay.files()],
+		'overlays': len(overlay),
+	})
+
+
+@STAGES.register('restore_sources')
+def restore_sources(context: PipelineContext) -> StageResult:
+	"""Drop source overlays (the files on disk are never touched)."""
+	context.overlay = None
+	return StageResult('restore_sources', True)
+
+
+@STAGES.register('recover_source_backups')
+def recover_source_backups(context: PipelineContext, confirm: Optional[Callable[[List[Path]], bool]] = None,
+						   backup_dir: Union[str, Path] = "source_files_backup") -> StageResult:
+	"""Overwrite sources with the backups left by the old in-place patching.
+
+	Opt-in only: confirm(backups) must return True, and nothing is restored
+	if any backup is older than the source file it would replace.
+	"""
+	from source_patcher import SourcePatcher
+
+	backup_dir = Path(backup_dir)
+	if not backup_dir.is_absolute():
+		backup_dir = context.project_root / backup_dir
+	patcher = SourcePatcher(str(context.source_dir), str(backup_dir))
+	backups = patcher.backup_files()
+	if not backups:
+		return StageResult('recover_source_backups', False, error=f"No source backups in {backup_dir}")
+
+	outdated = patcher.outdated_backups()
+	if outdated:
+		return StageResult('recover_source_backups', False, data={'outdated': outdated},
+						   error="Backups older than the live sources: " + ', '.join(p.name for p in outdated))
+	if confirm is None or not confirm(backups):
+		return StageResult('recover_source_backups', False, error="Backup recovery not confirmed")
+
+	context.overlay = None
+	restored = patcher.restore_backups()
+	return StageResult('recover_source_backups', restored, outputs=[context.source_dir / p.name for p in backups],
+					   error="" if restored else "No backups could be restored")
+
+
+@STAGES.register('run_script')
+def run_script(context: PipelineContext, script: Union[str, Path], args: Optional[List[str]] = None) -> StageResult:
+	"""Run a tool script as __main__ in this process."""
+	script = Path(script)
+	if not (script if script.is_absolute() else context.project_root / script).exists():
+		return StageResult('run_script', False, error=f"Tool not found: {script}")
+
+	success, stdout, stderr = context.runner.run(script, args)
+	return StageResult('run_script', success, data={'stdout': stdout, 'stderr': stderr},
+					   error="" if success else (stderr.strip() or "Script exited with an error"))
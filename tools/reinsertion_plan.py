@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Reinsertion Planner
+
+Plans and applies the reinsertion of .dwdata sections into a ROM as one
+batch instead of file by file:
+
+1. plan_reinsertion() collects every section, checks it fits the ROM and
+   sorts the ranges into an interval index. Overlapping sections are fine
+   while they agree on the shared bytes (the extracted tables share some
+   ROM ranges); sections that write different bytes to the same offsets
+   are reported as conflicts and left out of the plan.
+2. apply_plan() writes all planned sections into the ROM buffer, then
+   compares the result against the original once (diff_engine, with
+   NumPy when it is available).
+3. The returned ModificationLog holds one record per section plus the
+   changed runs of the whole ROM, and can be written as an IPS patch.
+
+Usage:
+	from dwpack import Section
+	from reinsertion_plan import plan_reinsertion, apply_plan
+
+	plan = plan_reinsertion(sections, len(rom_data))
+	log = apply_plan(rom_data, plan)        # rom_data is a bytearray
+	log.write_ips("build/reinsertion.ips")
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import zlib
+import struct
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+from dataclasses import dataclass, field
+
+from dwpack import Section
+from diff_engine import changed_runs, count_changes, diff_mask, np
+from table_generation import atomic_write
+
+
+IPS_MAGIC = b'PATCH'
+IPS_EOF = b'EOF'
+IPS_MAX_OFFSET = 0xFFFFFF
+IPS_MAX_RECORD = 0xFFFF
+# A record at this offset would read as the EOF marker
+IPS_EOF_OFFSET = 0x454F46
+
+
+class ReinsertionError(ValueError):
+	"""A modification log that cannot be expressed (e.g. as IPS)."""
+
+
+# ============================================================================
+# PLAN
+# ============================================================================
+
+@dataclass(frozen=True)
+class Overlap:
+	"""Two sections covering the same ROM bytes."""
+	first: str
+	second: str
+	start: int
+	end: int
+
+	def __str__(self) -> str:
+		return f"{self.first} and {self.second} overlap at 0x{self.start:05X}-0x{self.end - 1:05X}"
+
+
+@dataclass
+class ReinsertionPlan:
+	"""Sections to write (sorted by ROM offset) and the ones rejected."""
+	sections: List[Section] = field(default_factory=list)
+	overlaps: List[Overlap] = field(default_factory=list)     # agree on the shared bytes
+	conflicts: List[Overlap] = field(default_factory=list)    # write different bytes
+	out_of_bounds: List[Section] = field(default_factory=list)
+
+	@property
+	def rejected(self) -> List[str]:
+		names = [section.name for section in self.out_of_bounds]
+		for conflict in self.conflicts:
+			names.extend(name for name in (conflict.first, conflict.second) if name not in names)
+		return names
+
+	@property
+	def ok(self) -> bool:
+		return not self.conflicts and not self.out_of_bounds
+
+
+def find_overlaps(sections: Iterable[Section]) -> List[Overlap]:
+	"""Every pair of sections whose ROM ranges intersect.
+
+	Sections are sorted by start offset and swept once; the active list only
+	holds ranges still open at the current start, so disjoint layouts cost
+	O(n log n).
+	"""
+	ordered = sorted((s for s in sections if s.data), key=lambda s: (s.rom_offset, s.name))
+	overlaps = []
+	active: List[Section] = []
+	for section in ordered:
+		start = section.rom_offset
+		active = [other for other in active if other.rom_offset + len(other.data) > start]
+		for other in active:
+			end = min(other.rom_offset + len(other.data), start + len(section.data))
+			overlaps.append(Overlap(other.name, section.name, start, end))
+		active.append(section)
+	return overlaps
+
+
+def _shared_bytes(section: Section, start: int, end: int) -> bytes:
+	return bytes(section.data[start - section.rom_offset:end - section.rom_offset])
+
+
+def plan_reinsertion(sections: Iterable[Section], rom_size: int) -> ReinsertionPlan:
+	"""Check sections against the ROM size and each other."""
+	plan = ReinsertionPlan()
+	in_bounds = []
+	for section in sections:
+		if section.rom_offset < 0 or section.rom_offset + len(section.data) > rom_size:
+			plan.out_of_bounds.append(section)
+		else:
+			in_bounds.append(section)
+
+	by_name = {section.name: section for section in in_bounds}
+	for overlap in find_overlaps(in_bounds):
+		first, second = by_name[overlap.first], by_name[overlap.second]
+		if _shared_bytes(first, overlap.start, overlap.end) == _shared_bytes(second, overlap.start, overlap.end):
+			plan.overlaps.append(overlap)
+		else:
+			plan.conflicts.append(overlap)
+	rejected = set(plan.rejected)
+	plan.sections = sorted((s for s in in_bounds if s.name not in rejected), key=lambda s: s.rom_offset)
+	return plan
+
+
+# ============================================================================
+# MODIFICATION LOG
+# ============================================================================
+
+@dataclass
+class Modification:
+	"""One reinserted section."""
+	name: str
+	data_type: int
+	offset: int
+	size: int
+	changes: int
+	crc32: int
+
+	@property
+	def percent(self) -> float:
+		return (self.changes / self.size) * 100 if self.size else 0.0
+
+	@property
+	def end(self) -> int:
+		return self.offset + self.size
+
+
+@dataclass
+class ModificationLog:
+	"""Result of apply_plan(): per-section records and the changed runs."""
+	rom_size: int
+	modifications: List[Modification] = field(default_factory=list)
+	runs: List[Tuple[int, bytes]] = field(default_factory=list)
+
+	@property
+	def total_changes(self) -> int:
+		return sum(len(data) for _, data in self.runs)
+
+	def touched_ranges(self) -> List[Tuple[int, int]]:
+		"""(start, end) of every changed run."""
+		return [(offset, offset + len(data)) for offset, data in self.runs]
+
+	def to_ips(self) -> bytes:
+		"""The changed runs as an IPS patch."""
+		if self.rom_size > IPS_MAX_OFFSET + 1:
+			raise ReinsertionError(f"IPS cannot address a {self.rom_size} byte ROM")
+		patch = bytearray(IPS_MAGIC)
+		for offset, data in self.runs:
+			for start in range(0, len(data), IPS_MAX_RECORD):
+				chunk = data[start:start + IPS_MAX_RECORD]
+				if offset + start == IPS_EOF_OFFSET:
+					raise ReinsertionError("A record at 0x454F46 would read as the IPS EOF marker")
+				patch += struct.pack('>I', offset + start)[1:] + struct.pack('>H', len(chunk)) + chunk
+		patch += IPS_EOF
+		return bytes(patch)
+
+	def write_ips(self, path: Union[str, Path]) -> Path:
+		path = Path(path)
+		atomic_write(path, self.to_ips())
+		return path
+
+
+def apply_plan(rom_data: bytearray, plan: ReinsertionPlan) -> ModificationLog:
+	"""Write every planned section into rom_data and diff the result once."""
+	original = bytes(rom_data)
+	for section in plan.sections:
+		rom_data[section.rom_offset:section.rom_offset + len(section.data)] = section.data
+
+	log = ModificationLog(len(rom_data), runs=changed_runs(original, rom_data))
+
+	if np is not None:
+		counts = np.concatenate(([0], np.cumsum(diff_mask(original, bytes(rom_data)), dtype=np.int64)))
+		changes_in = lambda start, end: int(counts[end] - counts[start])
+	else:
+		changes_in = lambda start, end: _changes_in_runs(log.runs, original, rom_data, start, end)
+
+	for section in plan.sections:
+		size = len(section.data)
+		log.modifications.append(Modification(section.name, section.data_type, section.rom_offset, size,
+											  changes_in(section.rom_offset, section.rom_offset + size),
+											  zlib.crc32(section.data) & 0xffffffff))
+	return log
+
+
+def _changes_in_runs(runs: List[Tuple[int, bytes]], original: bytes, modified: bytearray,
+					 start: int, end: int) -> int:
+	return sum(count_changes(original[max(start, offset):min(end, offset + len(data))],
+							 modified[max(start, offset):min(end, offset + len(data))])
+			   for offset, data in runs if offset < end and offset + len(data) > start)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Repeated-Sequence Finder
+
+Finds the byte sequences that repeat across a ROM (dictionary
+compression candidates) with a suffix array instead of a table of every
+substring:
+
+- The selected spans of the ROM (the whole file, named regions or PRG
+  banks) are joined into one integer text, with a distinct separator
+  value above 0xFF after each span so no repeat crosses a span boundary.
+- The suffix array is built by prefix doubling (one np.lexsort per
+  doubling step with NumPy, sorted() without it) and the LCP array with
+  Kasai's algorithm, both in linear memory.
+- One stack pass over the LCP array enumerates the LCP intervals. Each
+  interval is a right-maximal repeat (length = its LCP, occurrences = its
+  suffixes); the byte before each occurrence is merged bottom-up, so the
+  left-maximal check costs nothing extra. Only maximal repeats are kept.
+- Repeats are ranked by length x occurrences (the savings metric of
+  analyze_rom_space). Occurrence lists are built only for the top results.
+
+Usage:
+	from repeat_finder import find_repeats
+
+	for repeat in find_repeats(rom_data, spans=[(0x8010, 0xC010)], limit=20):
+		print(f"{repeat.length} bytes x {repeat.count}: {repeat.sequence[:16].hex()}")
+
+	python tools/repeat_finder.py roms/dw.nes --bank 2 --min-length 6
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import heapq
+import argparse
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+# Merged left context of an interval whose occurrences are preceded by
+# different bytes (or by a span boundary)
+MIXED = -1
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+@dataclass
+class Repeat:
+	"""A maximal repeated byte sequence and every offset it occurs at."""
+	sequence: bytes
+	offsets: List[int] = field(default_factory=list)
+
+	@property
+	def length(self) -> int:
+		return len(self.sequence)
+
+	@property
+	def count(self) -> int:
+		return len(self.offsets)
+
+	@property
+	def savings(self) -> int:
+		return self.length * self.count
+
+
+# ============================================================================
+# SUFFIX AND LCP ARRAYS
+# ============================================================================
+
+def suffix_array(text: Sequence[int]) -> List[int]:
+	"""Start positions of the suffixes of text in sorted order (prefix doubling)."""
+	n = len(text)
+	if n == 0:
+		return []
+
+	if np is not None:
+		rank = np.asarray(text, dtype=np.int64)
+		step = 1
+		while True:
+			second = np.full(n, -1, dtype=np.int64)
+			second[:n - step] = rank[step:]
+			order = np.lexsort((second, rank))
+			first_sorted, second_sorted = rank[order], second[order]
+			boundary = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+			rank = np.empty(n, dtype=np.int64)
+			rank[order] = np.concatenate(([0], np.cumsum(boundary)))
+			if rank[order[-1]] == n - 1 or step >= n:
+				return order.tolist()
+			step *= 2
+
+	rank = list(text)
+	step = 1
+	while True:
+		keys = [(rank[i], rank[i + step] if i + step < n else -1) for i in range(n)]
+		order = sorted(range(n), key=keys.__getitem__)
+		rank = [0] * n
+		current = 0
+		for previous, index in zip(order, order[1:]):
+			if keys[index] != keys[previous]:
+				current += 1
+			rank[index] = current
+		if current == n - 1 or step >= n:
+			return order
+		step *= 2
+
+
+def lcp_array(text: Sequence[int], sa: Sequence[int]) -> List[int]:
+	"""lcp[i] = common prefix length of suffixes sa[i - 1] and sa[i] (lcp[0] = 0), Kasai's algorithm."""
+	n = len(text)
+	rank = [0] * n
+	for index, position in enumerate(sa):
+		rank[position] = index
+	lcp = [0] * n
+	common = 0
+	for position in range(n):
+		index = rank[position]
+		if index == 0:
+			common = 0
+			continue
+		other = sa[index - 1]
+		while position + common < n and other + common < n and text[position + common] == text[other + common]:
+			common += 1
+		lcp[index] = common
+		if common:
+			common -= 1
+	return lcp
+
+
+# ============================================================================
+# MAXIMAL REPEATS
+# ============================================================================
+
+def _merge(left: Optional[int], other: Optional[int]) -> Optional[int]:
+	if left is None:
+		return other
+	if other is None or left == other:
+		return left
+	return MIXED
+
+
+def _join_spans(data: Buffer, spans: Sequence[Tuple[int, int]]) -> Tuple[List[int], List[Tuple[int, int]]]:
+	"""Integer text of the (merged) spans, and (text position, file offset) of each span."""
+	merged: List[List[int]] = []
+	for start, end in sorted((max(0, start), min(len(data), end)) for start, end in spans):
+		if start >= end:
+			continue
+		if merged and start <= merged[-1][1]:
+			merged[-1][1] = max(merged[-1][1], end)
+		else:
+			merged.append([start, end])
+
+	text: List[int] = []
+	starts = []
+	for separator, (start, end) in enumerate(merged):
+		starts.append((len(text), start))
+		text.extend(data[start:end])
+		text.append(0x100 + separator)
+	return text, starts
+
+
+def find_repeats(data: Buffer, spans: Optional[Sequence[Tuple[int, int]]] = None, min_length: int = 4,
+				 min_occurrences: int = 3, limit: Optional[int] = 50, skip_uniform: bool = True) -> List[Repeat]:
+	"""
+	Maximal repeated sequences in data, best savings (length x occurrences) first
+
+	Args:
+		data: ROM bytes
+		spans: (start, end) file offsets to search (default: all of data);
+			repeats never cross from one span into the next
+		min_length: Minimum sequence length
+		min_occurrences: Minimum number of occurrences
+		limit: Number of repeats to return (None for all)
+		skip_uniform: Skip runs of one byte value (padding, found by
+			ROMSpaceAnalyzer.find_unused_regions)
+
+	Returns:
+		List of Repeat, offsets sorted
+	"""
+	text, starts = _join_spans(data, [(0, len(data))] if spans is None else spans)
+	n = len(text)
+	if n == 0:
+		return []
+	sa = suffix_array(text)
+	lcp = lcp_array(text, sa)
+
+	# Length of the run of equal values starting at each position
+	run = [1] * n
+	for position in range(n - 2, -1, -1):
+		if text[position] == text[position + 1]:
+			run[position] = run[position + 1] + 1
+
+	def left_of(position: int) -> int:
+		return MIXED if position == 0 else text[position - 1]
+
+	# Bounded min-heap of (savings, length, lb, rb) over the LCP intervals
+	best: List[Tuple[int, int, int, int]] = []
+
+	def report(length: int, lb: int, rb: int, left: Optional[int]) -> None:
+		count = rb - lb + 1
+		if length < min_length or count < min_occurrences or left != MIXED:
+			return
+		if skip_uniform and run[sa[lb]] >= length:
+			return
+		entry = (length * count, length, lb, rb)
+		if limit is None or len(best) < limit:
+			heapq.heappush(best, entry)
+		elif entry > best[0]:
+			heapq.heapreplace(best, entry)
+
+	# Stack of [lcp, left bound, merged left context] (the root has lcp 0)
+	stack: List[list] = [[0, 0, None]]
+	for index in range(1, n + 1):
+		current = lcp[index] if index < n else 0
+		leaf = left_of(sa[index - 1])
+		if current > stack[-1][0]:
+			stack.append([current, index - 1, leaf])
+			continue
+		stack[-1][2] = _merge(stack[-1][2], leaf)
+		while stack[-1][0] > current:
+			length, lb, left = stack.pop()
+			report(length, lb, index - 1, left)
+			if stack[-1][0] >= current:
+				stack[-1][2] = _merge(stack[-1][2], left)
+			else:
+				stack.append([current, lb, left])
+
+	# Text positions back to file offsets
+	text_starts = [position for position, _ in starts]
+	repeats = []
+	for _, length, lb, rb in best:
+		offsets = []
+		for position in sorted(sa[lb:rb + 1]):
+			span = bisect_right(text_starts, position) - 1
+			offsets.append(starts[span][1] + position - starts[span][0])
+		repeats.append(Repeat(bytes(data[offsets[0]:offsets[0] + length]), offsets))
+	repeats.sort(key=lambda repeat: (-repeat.savings, -repeat.length, repeat.offsets[0]))
+	return repeats
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def main() -> int:
+	from rom_image import open_rom
+
+	parser = argparse.ArgumentParser(description='Find repeated byte sequences in a Dragon Warrior ROM')
+	parser.add_argument('rom')
+	parser.add_argument('--bank', type=int, action='append', help='Only search this PRG bank (repeatable)')
+	parser.add_argument('--min-length', type=int, default=4)
+	parser.add_argument('--min-occurrences', type=int, default=3)
+	parser.add_argument('--limit', type=int, default=20)
+	args = parser.parse_args()
+
+	try:
+		rom = open_rom(args.rom)
+		spans = None
+		if args.bank:
+			spans = [(bank.offset, bank.offset + len(bank.data)) for bank in map(rom.prg_bank, args.bank)]
+	except (OSError, ValueError) as e:
+		print(f"❌ {e}", file=sys.stderr)
+		return 1
+
+	repeats = find_repeats(rom.data, spans, args.min_length, args.min_occurrences, args.limit)
+	for repeat in repeats:
+		where = ', '.join(f"0x{offset:05X}" for offset in repeat.offsets[:4])
+		more = f" (+{repeat.count - 4})" if repeat.count > 4 else ""
+		print(f"{repeat.length:4} bytes x {repeat.count:3} = {repeat.savings:6}  {repeat.sequence[:16].hex()}  @ {where}{more}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
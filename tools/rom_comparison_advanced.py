@@ -44,9 +44,9 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
@@ -58,6 +58,10 @@ import argparse
 import json
 import csv
 from datetime import datetime
+from bisect import bisect_right
+from collections.abc import Sequence
+
+from diff_engine import DiffRun, RomDiff
 
 
 class ChangeType(Enum):
@@ -171,74 +175,111 @@ class DragonWarriorROMLayout:
 		else:
 			return ROMSection("Unknown CHR", offset, 1, SectionType.CHR_ROM, ChangeType.GRAPHICS)
 
+	@classmethod
+	def section_spans(cls, start: int, end: int) -> List[Tuple[ROMSection, int, int]]:
+		"""[start, end) split into (section, start, end) pieces that identify_section maps to one section."""
+		boundaries = sorted({edge for section in cls.SECTIONS
+							 for edge in (section.offset, section.offset + section.size)} | {cls.PRG_ROM_SIZE})
+		spans = []
+		while start < end:
+			index = bisect_right(boundaries, start)
+			piece_end = min(end, boundaries[index]) if index < len(boundaries) else end
+			spans.append((cls.identify_section(start), start, piece_end))
+			start = piece_end
+		return spans
+
 
 # ============================================================================
 # ROM COMPARATOR
 # ============================================================================
 
+class ChangeList(Sequence):
+	"""Per-byte ChangeRecords of a RomDiff, built (with context) only when accessed."""
+
+	def __init__(self, diff: RomDiff, context_bytes: int, runs: Optional[List[DiffRun]] = None):
+		self.diff = diff
+		self.context_bytes = context_bytes
+		self.runs = diff.runs if runs is None else runs
+		# Index of the first change of each run
+		self._firsts = []
+		total = 0
+		for run in self.runs:
+			self._firsts.append(total)
+			total += run.size
+		self._length = total
+
+	def __len__(self) -> int:
+		return self._length
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(self._length))]
+		if index < 0:
+			index += self._length
+		if not 0 <= index < self._length:
+			raise IndexError("change index out of range")
+		run_index = bisect_right(self._firsts, index) - 1
+		return self._record(self.runs[run_index], index - self._firsts[run_index])
+
+	def __iter__(self):
+		for run in self.runs:
+			for position in range(run.size):
+				yield self._record(run, position)
+
+	def _record(self, run: DiffRun, position: int) -> ChangeRecord:
+		offset = run.offset + position
+		section = DragonWarriorROMLayout.identify_section(offset)
+		context_before, context_after = self.diff.context(offset, self.context_bytes)
+		return ChangeRecord(
+			offset=offset,
+			original_value=run.original[position],
+			modified_value=run.modified[position],
+			section=section.section_type,
+			change_type=section.change_type,
+			context_before=context_before,
+			context_after=context_after,
+			description=f"Changed in {section.name}"
+		)
+
+
 class ROMComparator:
 	"""Compare two ROMs and analyze differences."""
 
 	def __init__(self, context_bytes: int = 8):
 		self.context_bytes = context_bytes
-		self.changes: List[ChangeRecord] = []
+		self.diff: Optional[RomDiff] = None
+		self.changes: ChangeList = ChangeList(RomDiff(b'', b''), context_bytes)
 		self.stats: Optional[ComparisonStats] = None
 
-	def compare(self, rom1: bytes, rom2: bytes) -> List[ChangeRecord]:
-		"""Compare two ROMs and find all differences."""
-		self.changes = []
-
-		# Ensure same length (pad with zeros if needed)
-		max_len = max(len(rom1), len(rom2))
-		if len(rom1) < max_len:
-			rom1 = rom1 + b'\x00' * (max_len - len(rom1))
-		if len(rom2) < max_len:
-			rom2 = rom2 + b'\x00' * (max_len - len(rom2))
-
-		# Find all differences
-		for offset in range(max_len):
-			if rom1[offset] != rom2[offset]:
-				section = DragonWarriorROMLayout.identify_section(offset)
-
-				# Get context
-				context_start = max(0, offset - self.context_bytes)
-				context_end = min(max_len, offset + self.context_bytes + 1)
-
-				change = ChangeRecord(
-					offset=offset,
-					original_value=rom1[offset],
-					modified_value=rom2[offset],
-					section=section.section_type,
-					change_type=section.change_type,
-					context_before=rom1[context_start:offset],
-					context_after=rom1[offset + 1:context_end],
-					description=f"Changed in {section.name}"
-				)
-
-				self.changes.append(change)
+	def compare(self, rom1: bytes, rom2: bytes) -> ChangeList:
+		"""Compare two ROMs and find all differences.
+
+		The shorter ROM is compared as if padded with zeros. Changes are
+		found as runs; the per-byte ChangeRecords are built on access.
+		"""
+		self.diff = RomDiff(rom1, rom2, pad=0)
+		self.changes = ChangeList(self.diff, self.context_bytes)
 
 		# Calculate statistics
-		self._calculate_stats(len(rom1))
+		self._calculate_stats(self.diff.size)
 
 		return self.changes
 
 	def _calculate_stats(self, total_bytes: int) -> None:
 		"""Calculate comparison statistics."""
-		changed_bytes = len(self.changes)
+		changed_bytes = self.diff.changed_bytes
 		unchanged_bytes = total_bytes - changed_bytes
 		percent_changed = (changed_bytes / total_bytes * 100) if total_bytes > 0 else 0
 
-		# Count by type
+		# Count by type and section, one piece of a run at a time
 		changes_by_type = {}
-		for change in self.changes:
-			type_name = change.change_type.value
-			changes_by_type[type_name] = changes_by_type.get(type_name, 0) + 1
-
-		# Count by section
 		changes_by_section = {}
-		for change in self.changes:
-			section_name = change.section.value
-			changes_by_section[section_name] = changes_by_section.get(section_name, 0) + 1
+		for run in self.diff.runs:
+			for section, start, end in DragonWarriorROMLayout.section_spans(run.offset, run.end):
+				type_name = section.change_type.value
+				changes_by_type[type_name] = changes_by_type.get(type_name, 0) + end - start
+				section_name = section.section_type.value
+				changes_by_section[section_name] = changes_by_section.get(section_name, 0) + end - start
 
 		# Find change clusters
 		clusters = self._find_clusters()
@@ -259,37 +300,24 @@ class ROMComparator:
 
 	def _find_clusters(self, max_gap: int = 16) -> List[Tuple[int, int]]:
 		"""Find clusters of changes (groups separated by small gaps)."""
-		if not self.changes:
+		if self.diff is None:
 			return []
+		return self.diff.clusters(max_gap)
 
-		clusters = []
-		cluster_start = self.changes[0].offset
-		cluster_end = self.changes[0].offset
-
-		for i in range(1, len(self.changes)):
-			offset = self.changes[i].offset
-
-			if offset - cluster_end <= max_gap:
-				# Extend current cluster
-				cluster_end = offset
-			else:
-				# Start new cluster
-				clusters.append((cluster_start, cluster_end))
-				cluster_start = offset
-				cluster_end = offset
-
-		# Add final cluster
-		clusters.append((cluster_start, cluster_end))
-
-		return clusters
-
-	def get_changes_in_range(self, start: int, end: int) -> List[ChangeRecord]:
+	def get_changes_in_range(self, start: int, end: int) -> ChangeList:
 		"""Get all changes within an address range."""
-		return [c for c in self.changes if start <= c.offset < end]
+		if self.diff is None:
+			return self.changes
+		return ChangeList(self.diff, self.context_bytes, self.diff.runs_between(start, end))
 
-	def get_changes_by_type(self, change_type: ChangeType) -> List[ChangeRecord]:
+	def get_changes_by_type(self, change_type: ChangeType) -> ChangeList:
 		"""Get all changes of a specific type."""
-		return [c for c in self.changes if c.change_type == change_type]
+		if self.diff is None:
+			return self.changes
+		runs = [run.cut(start, end) for run in self.diff.runs
+				for section, start, end in DragonWarriorROMLayout.section_spans(run.offset, run.end)
+				if section.change_type == change_type]
+		return ChangeList(self.diff, self.context_bytes, runs)
 
 
 # ============================================================================
@@ -518,10 +546,14 @@ class HTMLDiffVisualizer:
 
 		# Heatmap (sample every 256 bytes)
 		heatmap_cells = []
-		changed_offsets = {c.offset for c in changes}
+		if isinstance(changes, ChangeList):
+			changed_blocks = {block for run in changes.runs
+							  for block in range(run.offset // 256, (run.end - 1) // 256 + 1)}
+		else:
+			changed_blocks = {c.offset // 256 for c in changes}
 
 		for i in range(0, stats.total_bytes, 256):
-			has_change = any(i <= offset < i + 256 for offset in changed_offsets)
+			has_change = i // 256 in changed_blocks
 			cell_class = "heatmap-cell changed" if has_change else "heatmap-cell"
 			heatmap_cells.append(f'<div class="{cell_class}" title="0x{i:06X}"></div>')
 
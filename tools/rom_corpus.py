@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior ROM Corpus Index
+
+Indexes a directory tree of ROMs (revisions, hacks, translations) into a
+SQLite catalog so questions about the whole library are answered with a
+query instead of re-analyzing every file:
+
+- The tree is walked by a thread pool (one directory listing per task).
+- Files whose path, size and mtime are already in the catalog are skipped
+  without being read; changed files are re-hashed (SHA-1) and only
+  contents not seen before are analyzed, on a bounded process pool.
+- Each ROM content is stored once, keyed by its SHA-1: iNES header fields,
+  detected revision (PRG0/PRG1), per-region checksums (rom_manifest) and
+  the decoded monster stats, spell MP costs and item prices.
+
+Usage:
+	python tools/rom_corpus.py index hacks/ --db build/rom_corpus.sqlite3
+	python tools/rom_corpus.py monsters "Dragonlord%" --min-hp 200
+	python tools/rom_corpus.py query "SELECT revision, COUNT(*) FROM roms GROUP BY revision"
+
+	from rom_corpus import CorpusIndex
+
+	with CorpusIndex("build/rom_corpus.sqlite3") as index:
+		index.update("hacks/")
+		strong = index.find_monsters("Dragonlord%", min_hp=200)
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import concurrent.futures
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+from rom_image import DW_ROM_SIZE, RomImage
+from rom_manifest import RomManifest
+
+
+DEFAULT_DB = Path("build") / "rom_corpus.sqlite3"
+SCHEMA_VERSION = 1
+ROM_EXTENSIONS = ('.nes',)
+
+# File offsets of the bytes that differ between the two US releases
+REVISION_SIGNATURES = {
+	'PRG0': {0x3FAE: 0x37, 0x3FAF: 0x32, 0xAF7C: 0xEF},
+	'PRG1': {0x3FAE: 0x32, 0x3FAF: 0x29, 0xAF7C: 0xF0},
+}
+
+MONSTER_FIELDS = ('strength', 'defense', 'hp', 'spell_pattern', 'agility', 'resistance', 'experience', 'gold')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS roms (
+	sha1 TEXT PRIMARY KEY,
+	size INTEGER NOT NULL,
+	crc32 TEXT,
+	md5 TEXT,
+	sha256 TEXT,
+	is_ines INTEGER,
+	mapper INTEGER,
+	prg_banks INTEGER,
+	chr_banks INTEGER,
+	mirroring TEXT,
+	battery INTEGER,
+	trainer INTEGER,
+	revision TEXT,
+	indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+	path TEXT PRIMARY KEY,
+	rom_sha1 TEXT NOT NULL REFERENCES roms(sha1),
+	size INTEGER NOT NULL,
+	mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS regions (
+	rom_sha1 TEXT NOT NULL REFERENCES roms(sha1),
+	name TEXT NOT NULL,
+	offset INTEGER NOT NULL,
+	size INTEGER NOT NULL,
+	crc32 TEXT,
+	sha1 TEXT,
+	sha256 TEXT,
+	PRIMARY KEY (rom_sha1, name)
+);
+CREATE TABLE IF NOT EXISTS monsters (
+	rom_sha1 TEXT NOT NULL REFERENCES roms(sha1),
+	id INTEGER NOT NULL,
+	name TEXT,
+	strength INTEGER, defense INTEGER, hp INTEGER, spell_pattern INTEGER,
+	agility INTEGER, resistance INTEGER, experience INTEGER, gold INTEGER,
+	PRIMARY KEY (rom_sha1, id)
+);
+CREATE TABLE IF NOT EXISTS spells (
+	rom_sha1 TEXT NOT NULL REFERENCES roms(sha1),
+	id INTEGER NOT NULL,
+	name TEXT,
+	mp_cost INTEGER,
+	PRIMARY KEY (rom_sha1, id)
+);
+CREATE TABLE IF NOT EXISTS items (
+	rom_sha1 TEXT NOT NULL REFERENCES roms(sha1),
+	id INTEGER NOT NULL,
+	name TEXT,
+	price INTEGER,
+	PRIMARY KEY (rom_sha1, id)
+);
+CREATE INDEX IF NOT EXISTS files_rom ON files(rom_sha1);
+CREATE INDEX IF NOT EXISTS regions_sha1 ON regions(name, sha1);
+CREATE INDEX IF NOT EXISTS monsters_name_hp ON monsters(name, hp);
+CREATE INDEX IF NOT EXISTS items_name_price ON items(name, price);
+CREATE INDEX IF NOT EXISTS spells_name_cost ON spells(name, mp_cost);
+"""
+
+
+# ============================================================================
+# ANALYSIS (runs in worker processes)
+# ============================================================================
+
+def detect_revision(data: bytes) -> Optional[str]:
+	"""'PRG0' or 'PRG1' from the revision signature bytes, or None."""
+	if len(data) != DW_ROM_SIZE:
+		return None
+	for revision, signature in REVISION_SIGNATURES.items():
+		if all(data[offset] == value for offset, value in signature.items()):
+			return revision
+	return None
+
+
+def _table_names() -> Tuple[List[str], List[str], List[str]]:
+	from binary_to_json import ITEM_NAMES, MONSTER_NAMES, SPELL_NAMES
+	return MONSTER_NAMES, SPELL_NAMES, ITEM_NAMES
+
+
+def decode_tables(rom: RomImage) -> Dict[str, List[Dict[str, Any]]]:
+	"""Monster stats, spell MP costs and item prices of a Dragon Warrior ROM."""
+	from extraction_engine import EXTRACTION_REGIONS
+
+	regions = {region.name: region for region in EXTRACTION_REGIONS}
+	monster_names, spell_names, item_names = _table_names()
+
+	def name(names: List[str], index: int, prefix: str) -> str:
+		return names[index] if index < len(names) else f"{prefix}_{index:02d}"
+
+	monster_data = bytes(regions['monsters'].read(rom))
+	monsters = []
+	for index in range(len(monster_data) // 16):
+		record = monster_data[index * 16:index * 16 + len(MONSTER_FIELDS)]
+		monsters.append({'id': index, 'name': name(monster_names, index, 'Monster'),
+						 **dict(zip(MONSTER_FIELDS, record))})
+
+	spell_data = bytes(regions['spell_costs'].read(rom))
+	spells = [{'id': index, 'name': name(spell_names, index, 'Spell'), 'mp_cost': cost}
+			  for index, cost in enumerate(spell_data)]
+
+	item_data = bytes(regions['item_costs'].read(rom))
+	items = [{'id': index, 'name': name(item_names, index, 'Item'),
+			  'price': int.from_bytes(item_data[index * 2:index * 2 + 2], 'little')}
+			 for index in range(len(item_data) // 2)]
+
+	return {'monsters': monsters, 'spells': spells, 'items': items}
+
+
+def analyze_rom_file(path: str) -> Dict[str, Any]:
+	"""Catalog record of one ROM file (picklable, for the process pool)."""
+	image = RomImage.open(path)
+	try:
+		manifest = RomManifest.build(image)
+		header = bytes(image.header) if image.is_ines else bytes(16)
+		file_digest = manifest.digest('file')
+		record = {
+			'sha1': file_digest.sha1,
+			'size': len(image),
+			'crc32': file_digest.crc32,
+			'md5': file_digest.md5,
+			'sha256': file_digest.sha256,
+			'is_ines': int(image.is_ines),
+			'mapper': (header[6] >> 4) | (header[7] & 0xF0) if image.is_ines else None,
+			'prg_banks': image.prg_bank_count,
+			'chr_banks': image.chr_bank_count,
+			'mirroring': ('vertical' if header[6] & 0x01 else 'horizontal') if image.is_ines else None,
+			'battery': int(bool(header[6] & 0x02)),
+			'trainer': int(bool(header[6] & 0x04)),
+			'revision': detect_revision(image.data),
+			'regions': [(d.name, d.offset, d.size, d.crc32, d.sha1, d.sha256)
+						for d in manifest.regions.values() if d.name != 'file'],
+			'tables': {},
+		}
+		if image.is_ines and len(image) == DW_ROM_SIZE:
+			record['tables'] = decode_tables(image)
+		return record
+	finally:
+		image.close()
+
+
+# ============================================================================
+# WALKING AND HASHING (threads)
+# ============================================================================
+
+@dataclass
+class FileEntry:
+	"""A ROM file found by the walk."""
+	path: str
+	size: int
+	mtime_ns: int
+	sha1: Optional[str] = None
+
+
+def _scan_directory(directory: str) -> Tuple[List[FileEntry], List[str]]:
+	files, subdirs = [], []
+	try:
+		with os.scandir(directory) as entries:
+			for entry in entries:
+				try:
+					if entry.is_dir(follow_symlinks=False):
+						subdirs.append(entry.path)
+					elif entry.is_file() and entry.name.lower().endswith(ROM_EXTENSIONS):
+						stat = entry.stat()
+						files.append(FileEntry(os.path.abspath(entry.path), stat.st_size, stat.st_mtime_ns))
+				except OSError:
+					continue
+	except OSError:
+		pass
+	return files, subdirs
+
+
+def walk_roms(root: Union[str, Path], workers: int = 8) -> List[FileEntry]:
+	"""Every ROM file under root, listing directories concurrently."""
+	root = str(root)
+	if os.path.isfile(root):
+		stat = os.stat(root)
+		return [FileEntry(os.path.abspath(root), stat.st_size, stat.st_mtime_ns)]
+
+	found: List[FileEntry] = []
+	with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+		running = {pool.submit(_scan_directory, root)}
+		while running:
+			done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				files, subdirs = future.result()
+				found.extend(files)
+				running.update(pool.submit(_scan_directory, subdir) for subdir in subdirs)
+	return sorted(found, key=lambda entry: entry.path)
+
+
+def _sha1_file(path: str) -> Optional[str]:
+	digest = hashlib.sha1()
+	try:
+		with open(path, 'rb') as f:
+			for chunk in iter(lambda: f.read(1 << 20), b''):
+				digest.update(chunk)
+	except OSError:
+		return None
+	return digest.hexdigest()
+
+
+# ============================================================================
+# CATALOG
+# ============================================================================
+
+@dataclass
+class IndexResult:
+	"""Outcome of CorpusIndex.update()."""
+	scanned: int = 0
+	unchanged: int = 0
+	hashed: int = 0
+	analyzed: int = 0
+	removed: int = 0
+	errors: Dict[str, str] = field(default_factory=dict)
+	elapsed: float = 0.0
+
+
+class CorpusIndex:
+	"""SQLite catalog of a ROM library."""
+
+	def __init__(self, db_path: Union[str, Path] = DEFAULT_DB):
+		self.db_path = Path(db_path)
+		if str(db_path) != ':memory:':
+			self.db_path.parent.mkdir(parents=True, exist_ok=True)
+		self.connection = sqlite3.connect(str(db_path))
+		self.connection.row_factory = sqlite3.Row
+		self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("PRAGMA foreign_keys=ON")
+		self.connection.executescript(SCHEMA)
+		self.connection.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+		self.connection.commit()
+
+	def close(self) -> None:
+		self.connection.close()
+
+	def __enter__(self) -> 'CorpusIndex':
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	# ------------------------------------------------------------------
+	# Indexing
+	# ------------------------------------------------------------------
+
+	def update(self, root: Union[str, Path], workers: Optional[int] = None, prune: bool = True,
+			   progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> IndexResult:
+		"""Bring the catalog up to date with the ROMs under root.
+
+		prune removes catalog entries for files under root that no longer
+		exist (ROM records stay while any path still refers to them).
+		"""
+		start = time.perf_counter()
+		workers = workers or os.cpu_count() or 1
+		result = IndexResult()
+
+		entries = walk_roms(root, workers=max(4, workers))
+		result.scanned = len(entries)
+
+		known_files = {row['path']: (row['size'], row['mtime_ns'])
+					   for row in self.connection.execute("SELECT path, size, mtime_ns FROM files")}
+		changed = [entry for entry in entries if known_files.get(entry.path) != (entry.size, entry.mtime_ns)]
+		result.unchanged = len(entries) - len(changed)
+
+		# Hash changed files on threads (hashlib releases the GIL)
+		with concurrent.futures.ThreadPoolExecutor(max_workers=max(4, workers)) as pool:
+			for entry, sha1 in zip(changed, pool.map(_sha1_file, [entry.path for entry in changed])):
+				entry.sha1 = sha1
+		result.hashed = len(changed)
+		for entry in changed:
+			if entry.sha1 is None:
+				result.errors[entry.path] = "unreadable"
+
+		# Analyze only contents the catalog has not seen
+		known_roms = {row[0] for row in self.connection.execute("SELECT sha1 FROM roms")}
+		to_analyze: Dict[str, str] = {}
+		for entry in changed:
+			if entry.sha1 and entry.sha1 not in known_roms and entry.sha1 not in to_analyze:
+				to_analyze[entry.sha1] = entry.path
+
+		with self.connection:
+			for sha1, record in self._analyze(list(to_analyze.items()), workers, result):
+				if record['sha1'] != sha1:
+					# The file changed between hashing and analysis; catalog what was analyzed
+					for entry in changed:
+						if entry.path == to_analyze[sha1]:
+							entry.sha1 = record['sha1']
+				self._insert_rom(record)
+				result.analyzed += 1
+				if progress:
+					progress(to_analyze[sha1], record)
+
+			analyzed_ok = {row[0] for row in self.connection.execute("SELECT sha1 FROM roms")}
+			self.connection.executemany(
+				"INSERT OR REPLACE INTO files (path, rom_sha1, size, mtime_ns) VALUES (?, ?, ?, ?)",
+				[(entry.path, entry.sha1, entry.size, entry.mtime_ns)
+				 for entry in changed if entry.sha1 in analyzed_ok])
+
+			if prune:
+				result.removed = self._prune(root, {entry.path for entry in entries})
+
+		result.elapsed = time.perf_counter() - start
+		return result
+
+	def _analyze(self, queue: List[Tuple[str, str]], workers: int,
+				 result: IndexResult) -> Iterable[Tuple[str, Dict[str, Any]]]:
+		"""(queued SHA-1, record) for each (sha1, path) in queue, on a bounded process pool."""
+		if workers == 1 or len(queue) == 1:
+			for sha1, path in queue:
+				try:
+					yield sha1, analyze_rom_file(path)
+				except (OSError, ValueError) as e:
+					result.errors[path] = str(e)
+			return
+
+		pending = iter(queue)
+		with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+			running: Dict[concurrent.futures.Future, Tuple[str, str]] = {}
+
+			def submit_next() -> bool:
+				item = next(pending, None)
+				if item is None:
+					return False
+				running[pool.submit(analyze_rom_file, item[1])] = item
+				return True
+
+			while len(running) < workers * 2 and submit_next():
+				pass
+			while running:
+				done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					sha1, path = running.pop(future)
+					try:
+						record = future.result()
+					except (OSError, ValueError) as e:
+						result.errors[path] = str(e)
+					else:
+						yield sha1, record
+					submit_next()
+
+	def _insert_rom(self, record: Dict[str, Any]) -> None:
+		sha1 = record['sha1']
+		columns = ('sha1', 'size', 'crc32', 'md5', 'sha256', 'is_ines', 'mapper', 'prg_banks', 'chr_banks',
+				   'mirroring', 'battery', 'trainer', 'revision')
+		self.connection.execute(
+			f"INSERT OR REPLACE INTO roms ({', '.join(columns)}, indexed_at) "
+			f"VALUES ({', '.join('?' * len(columns))}, ?)",
+			[record[column] for column in columns] + [time.time()])
+		for table in ('regions', 'monsters', 'spells', 'items'):
+			self.connection.execute(f"DELETE FROM {table} WHERE rom_sha1 = ?", (sha1,))
+		self.connection.executemany("INSERT INTO regions VALUES (?, ?, ?, ?, ?, ?, ?)",
+									[(sha1,) + tuple(region) for region in record['regions']])
+
+		tables = record['tables']
+		self.connection.executemany(
+			f"INSERT INTO monsters VALUES (?, ?, ?, {', '.join('?' * len(MONSTER_FIELDS))})",
+			[(sha1, m['id'], m['name']) + tuple(m[f] for f in MONSTER_FIELDS) for m in tables.get('monsters', [])])
+		self.connection.executemany("INSERT INTO spells VALUES (?, ?, ?, ?)",
+									[(sha1, s['id'], s['name'], s['mp_cost']) for s in tables.get('spells', [])])
+		self.connection.executemany("INSERT INTO items VALUES (?, ?, ?, ?)",
+									[(sha1, i['id'], i['name'], i['price']) for i in tables.get('items', [])])
+
+	def _prune(self, root: Union[str, Path], present: set) -> int:
+		root = os.path.abspath(str(root))
+		prefix = root if os.path.isfile(root) else os.path.join(root, '')
+		stale = [row[0] for row in self.connection.execute(
+			"SELECT path FROM files WHERE path = ? OR substr(path, 1, ?) = ?", (root, len(prefix), prefix))
+			if row[0] not in present]
+		self.connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in stale])
+		orphans = [row[0] for row in self.connection.execute(
+			"SELECT sha1 FROM roms WHERE sha1 NOT IN (SELECT rom_sha1 FROM files)")]
+		for table in ('regions', 'monsters', 'spells', 'items'):
+			self.connection.executemany(f"DELETE FROM {table} WHERE rom_sha1 = ?", [(sha1,) for sha1 in orphans])
+		self.connection.executemany("DELETE FROM roms WHERE sha1 = ?", [(sha1,) for sha1 in orphans])
+		return len(stale)
+
+	# ------------------------------------------------------------------
+	# Queries
+	# ------------------------------------------------------------------
+
+	def query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+		"""Rows of an arbitrary SQL query as dicts."""
+		return [dict(row) for row in self.connection.execute(sql, tuple(params))]
+
+	def find_monsters(self, name: str = '%', min_hp: Optional[int] = None,
+					  revision: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""Files whose monster `name` (SQL LIKE pattern) matches, e.g. min_hp=200."""
+		sql = ("SELECT f.path, r.revision, m.* FROM monsters m "
+			   "JOIN roms r ON r.sha1 = m.rom_sha1 JOIN files f ON f.rom_sha1 = m.rom_sha1 "
+			   "WHERE m.name LIKE ?")
+		params: List[Any] = [name]
+		if min_hp is not None:
+			sql += " AND m.hp >= ?"
+			params.append(min_hp)
+		if revision is not None:
+			sql += " AND r.revision = ?"
+			params.append(revision)
+		return self.query(sql + " ORDER BY f.path, m.id", params)
+
+	def files_with_region(self, name: str, sha1: str) -> List[str]:
+		"""Paths whose region `name` (e.g. prg_bank_2) has the given SHA-1."""
+		return [row['path'] for row in self.query(
+			"SELECT f.path FROM regions g JOIN files f ON f.rom_sha1 = g.rom_sha1 "
+			"WHERE g.name = ? AND g.sha1 = ? ORDER BY f.path", (name, sha1))]
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			'files': self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+			'roms': self.connection.execute("SELECT COUNT(*) FROM roms").fetchone()[0],
+			'revisions': {row[0] or 'unknown': row[1] for row in self.connection.execute(
+				"SELECT revision, COUNT(*) FROM roms GROUP BY revision")},
+		}
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Index a library of Dragon Warrior ROMs into SQLite')
+	parser.add_argument('--db', default=str(DEFAULT_DB), help=f'Catalog database (default: {DEFAULT_DB})')
+	sub = parser.add_subparsers(dest='command', required=True)
+
+	index_cmd = sub.add_parser('index', help='Add or refresh the ROMs under a directory')
+	index_cmd.add_argument('root')
+	index_cmd.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+	index_cmd.add_argument('--no-prune', action='store_true', help='Keep entries for files that were removed')
+
+	monsters_cmd = sub.add_parser('monsters', help='Find ROMs by monster stats')
+	monsters_cmd.add_argument('name', nargs='?', default='%', help='Monster name (SQL LIKE pattern)')
+	monsters_cmd.add_argument('--min-hp', type=int, default=None)
+	monsters_cmd.add_argument('--revision', choices=sorted(REVISION_SIGNATURES), default=None)
+
+	query_cmd = sub.add_parser('query', help='Run an SQL query against the catalog')
+	query_cmd.add_argument('sql')
+
+	sub.add_parser('stats', help='Catalog summary')
+
+	args = parser.parse_args()
+
+	with CorpusIndex(args.db) as index:
+		if args.command == 'index':
+			result = index.update(args.root, workers=args.workers, prune=not args.no_prune)
+			print(f"✓ {result.scanned} files: {result.unchanged} unchanged, {result.hashed} hashed, "
+				  f"{result.analyzed} analyzed, {result.removed} removed ({result.elapsed:.2f}s)")
+			for path, error in result.errors.items():
+				print(f"  ❌ {path}: {error}")
+			return 1 if result.errors else 0
+
+		if args.command == 'monsters':
+			rows = index.find_monsters(args.name, args.min_hp, args.revision)
+			for row in rows:
+				print(f"{row['path']}  [{row['revision'] or '?'}]  {row['name']}: HP {row['hp']}, "
+					  f"STR {row['strength']}, DEF {row['defense']}, AGI {row['agility']}")
+			print(f"{len(rows)} matches")
+		elif args.command == 'query':
+			try:
+				rows = index.query(args.sql)
+			except sqlite3.Error as e:
+				print(f"❌ {e}")
+				return 1
+			for row in rows:
+				print("\t".join(str(value) for value in row.values()))
+		else:
+			stats = index.stats()
+			print(f"{stats['files']} files, {stats['roms']} distinct ROMs")
+			for revision, count in stats['revisions'].items():
+				print(f"  {revision}: {count}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -9,6 +9,7 @@ Features:
 - Identify changed regions
 - Detect modified data types
 - Generate visual diff reports
+- Decoded field-level changes (structural_diff) with --detailed
 - Export patch suggestions
 
 Usage:
@@ -36,6 +37,9 @@ from typing import List, Tuple, Dict, Optional
 import struct
 import json
 
+from diff_engine import RomDiff
+from structural_diff import StructuralDiff
+
 # Known data regions
 ROM_REGIONS = {
 	'header': (0x0000, 0x0010, 'iNES Header'),
@@ -63,6 +67,7 @@ class ROMDiff:
 		self.rom1_data = None
 		self.rom2_data = None
 		self.differences = []
+		self.diff: Optional[RomDiff] = None
 
 	def load_roms(self) -> bool:
 		"""Load both ROM files"""
@@ -106,17 +111,38 @@ class ROMDiff:
 		Returns:
 			List of (offset, old_byte, new_byte) tuples
 		"""
-		diffs = []
+		return list(self.find_runs().byte_changes())
+
+	def find_runs(self) -> RomDiff:
+		"""
+		Find the runs of changed bytes (computed once per ROM pair)
+
+		Returns:
+			RomDiff over the loaded ROMs
+		"""
+		if self.diff is None:
+			self.diff = RomDiff(self.rom1_data, self.rom2_data)
+		return self.diff
+
+	def group_runs(self, max_gap: int = 16) -> List[Dict]:
+		"""
+		Group nearby runs of changes into regions
 
-		for offset in range(len(self.rom1_data)):
-			if self.rom1_data[offset] != self.rom2_data[offset]:
-				diffs.append((
-					offset,
-					self.rom1_data[offset],
-					self.rom2_data[offset]
-				))
+		Args:
+			max_gap: Maximum gap to consider part of same region
 
-		return diffs
+		Returns:
+			List of region dicts (start, end = last changed offset, size, runs)
+		"""
+		return [
+			{
+				'start': runs[0].offset,
+				'end': runs[-1].end - 1,
+				'size': sum(run.size for run in runs),
+				'runs': runs
+			}
+			for runs in self.find_runs().groups(max_gap)
+		]
 
 	def group_differences(
 		self,
@@ -298,10 +324,10 @@ class ROMDiff:
 
 		# Find differences
 		print("\n--- Finding Differences ---")
-		diffs = self.find_differences()
+		diff = self.find_runs()
 
 		total_bytes = len(self.rom1_data)
-		changed_bytes = len(diffs)
+		changed_bytes = diff.changed_bytes
 		unchanged_bytes = total_bytes - changed_bytes
 		change_percent = (changed_bytes / total_bytes * 100) if total_bytes > 0 else 0
 
@@ -315,7 +341,7 @@ class ROMDiff:
 
 		# Group differences into regions
 		print("\n--- Grouping Changes ---")
-		regions = self.group_differences(diffs)
+		regions = self.group_runs()
 
 		print(f"Changed regions: {len(regions)}")
 
@@ -325,7 +351,7 @@ class ROMDiff:
 		for i, region in enumerate(regions[:20], 1):  # Show top 20
 			start = region['start']
 			end = region['end']
-			size = len(region['changes'])
+			size = region['size']
 			region_type = self.identify_region_type(start)
 
 			print(f"\nRegion {i}:")
@@ -341,8 +367,8 @@ class ROMDiff:
 
 			if detailed and size <= 16:
 				# Show hex diff for small regions
-				old_bytes = [c[1] for c in region['changes']]
-				new_bytes = [c[2] for c in region['changes']]
+				old_bytes = [c[1] for run in region['runs'] for c in run.byte_changes()]
+				new_bytes = [c[2] for run in region['runs'] for c in run.byte_changes()]
 
 				print("\n" + self.format_hex_diff(start, old_bytes, new_bytes))
 
@@ -363,11 +389,23 @@ class ROMDiff:
 				}
 
 			type_summary[region_type]['regions'] += 1
-			type_summary[region_type]['bytes'] += len(region['changes'])
+			type_summary[region_type]['bytes'] += region['size']
 
 		for region_type, stats in sorted(type_summary.items()):
 			print(f"{region_type:30} {stats['regions']:3} regions, {stats['bytes']:5} bytes")
 
+		field_changes = []
+		if detailed:
+			print("\n--- Field Changes ---")
+			try:
+				field_changes = StructuralDiff().compare(self.rom1_data, self.rom2_data)
+			except ValueError as e:
+				print(f"⚠️  {e}")
+			for change in field_changes[:50]:
+				print(f"  {change}")
+			if len(field_changes) > 50:
+				print(f"  ... and {len(field_changes) - 50} more field changes")
+
 		print("\n" + "=" * 70)
 
 		# Build report dict
@@ -383,12 +421,14 @@ class ROMDiff:
 			'top_regions': [
 				{
 					'offset': f"0x{r['start']:05X}",
-					'size': len(r['changes']),
+					'size': r['size'],
 					'type': self.identify_region_type(r['start'])
 				}
 				for r in regions[:20]
 			]
 		}
+		if detailed:
+			report['field_changes'] = [change.to_dict() for change in field_changes]
 
 		return report
 
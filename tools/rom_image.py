@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior ROM Image
+
+Shared, memory-mapped view of an iNES ROM for the extractors and
+analyzers. Instead of every tool reading the whole file into a fresh
+bytes object and repeating its own `0x10 + (cpu - 0x8000)` arithmetic:
+
+- The file is mapped read-only with mmap; PRG banks, CHR-ROM and any
+  region are exposed as zero-copy memoryview slices.
+- Each PRG bank translates CPU addresses ($8000-$BFFF for the switchable
+  banks, $C000-$FFFF for the fixed last bank) to file offsets and back.
+- load_rom_image() keeps a process-wide cache keyed by path, reused while
+  the file's mtime and size are unchanged, so batch jobs over many ROM
+  variants map each file once.
+
+Usage:
+	from rom_image import load_rom_image
+
+	rom = load_rom_image("roms/Dragon Warrior (U) (PRG1) [!].nes")
+	enemy_stats = rom.read_cpu(0x9E4B, 39 * 16, bank=1)   # memoryview
+	tiles = rom.chr                                        # memoryview
+	bank3 = rom.prg_bank(3)
+	print(hex(bank3.cpu_to_offset(0xC000)))                # 0xC010
+
+Mapped files must not be truncated or rewritten in place while an image
+is in use; tools that write ROMs use write_rom_file(), which replaces the
+file by rename. It first drops the cache's reference to the file, whose
+mapping then closes once no caller holds the image; images still held
+keep the old contents (on Windows the replace fails while any are alive).
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import mmap
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+
+# ============================================================================
+# iNES LAYOUT
+# ============================================================================
+
+INES_MAGIC = b'NES\x1a'
+HEADER_SIZE = 0x10
+TRAINER_SIZE = 0x200
+PRG_BANK_SIZE = 0x4000
+CHR_BANK_SIZE = 0x2000
+
+# MMC1 in 16KB PRG mode: switchable bank at $8000, last bank fixed at $C000
+SWITCHABLE_CPU_BASE = 0x8000
+FIXED_CPU_BASE = 0xC000
+
+# Dragon Warrior (U): 4 x 16KB PRG + 2 x 8KB CHR
+DW_ROM_SIZE = HEADER_SIZE + 4 * PRG_BANK_SIZE + 2 * CHR_BANK_SIZE
+
+ROM_CACHE_SIZE = 64
+
+
+class RomImageError(ValueError):
+	"""A ROM image access outside the file or its layout."""
+
+
+# ============================================================================
+# BANK VIEWS
+# ============================================================================
+
+@dataclass(frozen=True)
+class BankView:
+	"""One 16KB PRG bank: zero-copy data plus CPU address translation."""
+	index: int
+	offset: int           # file offset of the bank's first byte
+	cpu_base: int         # CPU address the bank is mapped at
+	data: memoryview
+
+	def contains_cpu(self, cpu_address: int) -> bool:
+		return self.cpu_base <= cpu_address < self.cpu_base + len(self.data)
+
+	def cpu_to_offset(self, cpu_address: int) -> int:
+		"""File offset of a CPU address in this bank."""
+		if not self.contains_cpu(cpu_address):
+			raise RomImageError(f"CPU ${cpu_address:04X} is outside bank {self.index} "
+								f"(${self.cpu_base:04X}-${self.cpu_base + len(self.data) - 1:04X})")
+		return self.offset + cpu_address - self.cpu_base
+
+	def offset_to_cpu(self, offset: int) -> int:
+		"""CPU address of a file offset in this bank."""
+		if not self.offset <= offset < self.offset + len(self.data):
+			raise RomImageError(f"Offset 0x{offset:05X} is outside bank {self.index}")
+		return self.cpu_base + offset - self.offset
+
+	def read(self, cpu_address: int, size: int) -> memoryview:
+		"""Zero-copy slice starting at a CPU address."""
+		start = cpu_address - self.cpu_base
+		if not self.contains_cpu(cpu_address) or start + size > len(self.data):
+			raise RomImageError(f"CPU ${cpu_address:04X}+{size} is outside bank {self.index}")
+		return self.data[start:start + size]
+
+
+# ============================================================================
+# ROM IMAGE
+# ============================================================================
+
+class RomImage:
+	"""Read-only iNES image backed by mmap (or an in-memory buffer).
+
+	Supports len(), indexing and slicing like the bytes the tools used to
+	load; slices are memoryviews into the mapping, so callers that need to
+	modify or keep data past close() should copy with bytes().
+	"""
+
+	def __init__(self, buffer: Union[bytes, bytearray, mmap.mmap], path: Optional[Path] = None,
+				 mtime_ns: int = 0):
+		self.path = path
+		self.mtime_ns = mtime_ns
+		self._buffer = buffer
+		self.data = memoryview(buffer).toreadonly()
+		self.closed = False
+
+	@classmethod
+	def open(cls, path: Union[str, Path]) -> 'RomImage':
+		"""Map a ROM file (uncached; see load_rom_image)."""
+		path = Path(path)
+		with open(path, 'rb') as f:
+			stat = os.fstat(f.fileno())
+			if stat.st_size == 0:
+				# mmap cannot map empty files
+				return cls(b'', path, stat.st_mtime_ns)
+			mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		return cls(mapping, path, stat.st_mtime_ns)
+
+	@classmethod
+	def from_bytes(cls, data: Union[bytes, bytearray], path: Optional[Union[str, Path]] = None) -> 'RomImage':
+		"""Image over data already in memory (e.g. a freshly built ROM)."""
+		return cls(bytes(data), Path(path) if path else None)
+
+	def close(self) -> None:
+		"""Release the mapping (slices taken from it must be released first)."""
+		self.data.release()
+		if isinstance(self._buffer, mmap.mmap):
+			try:
+				self._buffer.close()
+			except BufferError:
+				# Slices are still alive: keep the image usable
+				self.data = memoryview(self._buffer).toreadonly()
+				raise
+		self.closed = True
+
+	def __enter__(self) -> 'RomImage':
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	# ------------------------------------------------------------------
+	# bytes-like access
+	# ------------------------------------------------------------------
+
+	def __len__(self) -> int:
+		return len(self.data)
+
+	def __getitem__(self, key):
+		return self.data[key]
+
+	def __bytes__(self) -> bytes:
+		return bytes(self.data)
+
+	def __repr__(self) -> str:
+		return f"RomImage({str(self.path) if self.path else '<memory>'!r}, {len(self.data)} bytes)"
+
+	# ------------------------------------------------------------------
+	# Layout
+	# ------------------------------------------------------------------
+
+	@property
+	def header(self) -> memoryview:
+		return self.data[:HEADER_SIZE]
+
+	@property
+	def is_ines(self) -> bool:
+		return len(self.data) >= HEADER_SIZE and self.data[:4] == INES_MAGIC
+
+	@property
+	def prg_bank_count(self) -> int:
+		return self.data[4] if self.is_ines else 0
+
+	@property
+	def chr_bank_count(self) -> int:
+		return self.data[5] if self.is_ines else 0
+
+	@property
+	def prg_offset(self) -> int:
+		"""File offset of PRG-ROM (after the header and optional trainer)."""
+		has_trainer = self.is_ines and self.data[6] & 0x04
+		return HEADER_SIZE + (TRAINER_SIZE if has_trainer else 0)
+
+	@property
+	def chr_offset(self) -> int:
+		return self.prg_offset + self.prg_bank_count * PRG_BANK_SIZE
+
+	@property
+	def prg(self) -> memoryview:
+		return self.data[self.prg_offset:self.chr_offset]
+
+	@property
+	def chr(self) -> memoryview:
+		return self.data[self.chr_offset:self.chr_offset + self.chr_bank_count * CHR_BANK_SIZE]
+
+	def prg_bank(self, index: int) -> BankView:
+		"""PRG bank view; the last bank is mapped at $C000, the others at $8000."""
+		count = self.prg_bank_count
+		if not 0 <= index < count:
+			raise RomImageError(f"PRG bank {index} does not exist ({count} banks)")
+		offset = self.prg_offset + index * PRG_BANK_SIZE
+		if offset + PRG_BANK_SIZE > len(self.data):
+			raise RomImageError(f"PRG bank {index} is truncated ({len(self.data)} byte file)")
+		cpu_base = FIXED_CPU_BASE if index == count - 1 else SWITCHABLE_CPU_BASE
+		return BankView(index, offset, cpu_base, self.data[offset:offset + PRG_BANK_SIZE])
+
+	@property
+	def banks(self) -> List[BankView]:
+		return [self.prg_bank(index) for index in range(self.prg_bank_count)]
+
+	def bank_for_cpu(self, cpu_address: int, bank: Optional[int] = None) -> BankView:
+		"""Bank a CPU address refers to.
+
+		$C000-$FFFF is always the fixed last bank. $8000-$BFFF needs the
+		switchable bank number; it defaults to bank 0, matching the
+		`0x10 + (cpu - 0x8000)` offsets used throughout the tools.
+		"""
+		if cpu_address >= FIXED_CPU_BASE:
+			return self.prg_bank(self.prg_bank_count - 1)
+		return self.prg_bank(0 if bank is None else bank)
+
+	def cpu_to_offset(self, cpu_address: int, bank: Optional[int] = None) -> int:
+		"""File offset of a CPU address (see bank_for_cpu)."""
+		return self.bank_for_cpu(cpu_address, bank).cpu_to_offset(cpu_address)
+
+	def offset_to_cpu(self, offset: int) -> Tuple[int, int]:
+		"""(bank, CPU address) of a PRG file offset."""
+		relative = offset - self.prg_offset
+		if not 0 <= relative < self.prg_bank_count * PRG_BANK_SIZE:
+			raise RomImageError(f"Offset 0x{offset:05X} is not in PRG-ROM")
+		index = relative // PRG_BANK_SIZE
+		return index, self.prg_bank(index).offset_to_cpu(offset)
+
+	def read(self, offset: int, size: int) -> memoryview:
+		"""Zero-copy slice of the file."""
+		if offset < 0 or size < 0 or offset + size > len(self.data):
+			raise RomImageError(f"Read 0x{offset:05X}+{size} is outside the {len(self.data)} byte ROM")
+		return self.data[offset:offset + size]
+
+	def read_cpu(self, cpu_address: int, size: int, bank: Optional[int] = None) -> memoryview:
+		"""Zero-copy slice starting at a CPU address (see bank_for_cpu)."""
+		return self.bank_for_cpu(cpu_address, bank).read(cpu_address, size)
+
+
+# ============================================================================
+# PROCESS CACHE
+# ============================================================================
+
+_cache: 'OrderedDict[Path, RomImage]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_rom_image(path: Union[str, Path]) -> RomImage:
+	"""Mapped image of a ROM file, shared across the process.
+
+	The cached image is reused while the file's mtime and size match;
+	otherwise the file is mapped again. The least recently used images are
+	dropped past ROM_CACHE_SIZE (their mappings close once unreferenced).
+	"""
+	path = Path(path).resolve()
+	stat = path.stat()
+	with _cache_lock:
+		image = _cache.get(path)
+		if image is not None and image.mtime_ns == stat.st_mtime_ns and len(image) == stat.st_size:
+			_cache.move_to_end(path)
+			return image
+
+	image = RomImage.open(path)
+	with _cache_lock:
+		_cache[path] = image
+		_cache.move_to_end(path)
+		while len(_cache) > ROM_CACHE_SIZE:
+			_cache.popitem(last=False)
+	return image
+
+
+def open_rom(rom: Union[str, Path, RomImage, bytes, bytearray]) -> RomImage:
+	"""RomImage for a path (through the cache), raw bytes, or an image as-is."""
+	if isinstance(rom, RomImage):
+		return rom
+	if isinstance(rom, (bytes, bytearray)):
+		return RomImage.from_bytes(rom)
+	return load_rom_image(rom)
+
+
+def _evict(path: Path) -> None:
+	"""Drop the cached image of path (its mapping closes once unreferenced)."""
+	with _cache_lock:
+		_cache.pop(path, None)
+
+
+def clear_rom_cache() -> None:
+	"""Forget all cached images."""
+	with _cache_lock:
+		_cache.clear()
+
+
+def write_rom_file(path: Union[str, Path], data: Union[bytes, bytearray, memoryview]) -> Path:
+	"""Write a ROM by writing a temp file and renaming it over path.
+
+	Unlike truncating and rewriting in place, this never changes bytes
+	under an existing mapping of the old file. The cache's reference to
+	path is dropped first, so the cache alone never keeps the file mapped
+	(Windows refuses to replace a mapped file). Images already handed out
+	stay open and keep reading the old contents; on Windows the replace
+	fails while one of them is still alive.
+	"""
+	path = Path(path)
+	path.parent.mkdir(parents=True, exist_ok=True)
+	fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			f.write(data)
+		_evict(path.resolve())
+		os.replace(temp_name, path)
+	except BaseException:
+		try:
+			os.unlink(temp_name)
+		except OSError:
+			pass
+		raise
+	return path
+
+
+def cached_images() -> Dict[Path, RomImage]:
+	"""Snapshot of the cache (for diagnostics)."""
+	with _cache_lock:
+		return dict(_cache)
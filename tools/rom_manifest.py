@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior ROM Checksum Manifest
+
+Per-region checksums of a ROM, so verification does not have to rehash
+the whole file (with several algorithms) on every run:
+
+- A manifest stores CRC32, MD5, SHA-1 and SHA-256 for the iNES header,
+  each 16KB PRG bank, each 4KB CHR half (pattern table), the whole
+  PRG/CHR areas, the whole file and every known data region
+  (extraction_engine.EXTRACTION_REGIONS).
+- Manifests are saved next to the ROM (<rom>.manifest.json) and reused
+  while the file's mtime and size match, so a reference ROM is hashed once.
+- updated() recomputes only the regions touched by a list of changed
+  ranges (e.g. reinsertion_plan.ModificationLog.touched_ranges()). The
+  aggregate regions (file, prg, chr) overlap every change, so updated()
+  leaves them pending and digest() hashes them only when asked for.
+- compare_manifests() names exactly which regions differ between two ROMs.
+
+Usage:
+	from rom_manifest import RomManifest, compare_manifests
+
+	reference = RomManifest.load_or_build("roms/Dragon Warrior (U) (PRG1) [!].nes")
+	built = RomManifest.load_or_build("build/dragon_warrior_modified.nes")
+	for mismatch in compare_manifests(reference, built):
+		print(mismatch)              # e.g. "prg_bank_1 differs (0x04010-0x0800F)"
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import json
+import zlib
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, asdict
+
+from diff_engine import diff_spans
+from rom_image import CHR_BANK_SIZE, DW_ROM_SIZE, RomImage, RomImageError, open_rom
+from table_generation import atomic_write
+
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.manifest.json'
+CHR_HALF_SIZE = CHR_BANK_SIZE // 2
+# Regions made up of other regions; any change touches them, and the
+# regions inside them already locate it
+AGGREGATE_REGIONS = ('file', 'prg', 'chr')
+
+
+# ============================================================================
+# REGIONS
+# ============================================================================
+
+@dataclass
+class RegionDigest:
+	"""Checksums of one byte range of the ROM."""
+	name: str
+	offset: int
+	size: int
+	crc32: str
+	md5: str
+	sha1: str
+	sha256: str
+
+	@property
+	def end(self) -> int:
+		return self.offset + self.size
+
+	@classmethod
+	def compute(cls, name: str, data: bytes, offset: int) -> 'RegionDigest':
+		return cls(name, offset, len(data), format(zlib.crc32(data) & 0xffffffff, '08x'),
+				   hashlib.md5(data).hexdigest(), hashlib.sha1(data).hexdigest(),
+				   hashlib.sha256(data).hexdigest())
+
+	def same_content(self, other: 'RegionDigest') -> bool:
+		return (self.offset, self.size, self.crc32, self.sha256) == (other.offset, other.size, other.crc32, other.sha256)
+
+
+def manifest_regions(rom: RomImage) -> List[Tuple[str, int, int]]:
+	"""(name, offset, size) of every region a manifest covers."""
+	regions = [('file', 0, len(rom))]
+	if not rom.is_ines:
+		return regions
+
+	regions.append(('header', 0, min(len(rom), rom.prg_offset)))
+	regions.append(('prg', rom.prg_offset, len(rom.prg)))
+	for bank in range(rom.prg_bank_count):
+		try:
+			view = rom.prg_bank(bank)
+		except RomImageError:
+			break
+		regions.append((f'prg_bank_{bank}', view.offset, len(view.data)))
+
+	chr_size = len(rom.chr)
+	if chr_size:
+		regions.append(('chr', rom.chr_offset, chr_size))
+		for half in range(chr_size // CHR_HALF_SIZE):
+			regions.append((f'chr_{half}', rom.chr_offset + half * CHR_HALF_SIZE, CHR_HALF_SIZE))
+
+	if len(rom) == DW_ROM_SIZE:
+		from extraction_engine import EXTRACTION_REGIONS
+		for region in EXTRACTION_REGIONS:
+			offset = region.file_offset(rom)
+			if offset + region.size <= len(rom):
+				regions.append((region.name, offset, region.size))
+	return regions
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+@dataclass
+class RegionMismatch:
+	"""A region whose checksums differ between two manifests."""
+	name: str
+	offset: int
+	size: int
+	expected: Optional[RegionDigest]
+	actual: Optional[RegionDigest]
+
+	def __str__(self) -> str:
+		if self.expected is None or self.actual is None:
+			return f"{self.name} missing from {'reference' if self.expected is None else 'built'} manifest"
+		return f"{self.name} differs (0x{self.offset:05X}-0x{self.offset + self.size - 1:05X})"
+
+
+@dataclass
+class RomManifest:
+	"""Checksums of every manifest region of one ROM."""
+	size: int
+	mtime_ns: int = 0
+	path: Optional[str] = None
+	regions: Dict[str, RegionDigest] = field(default_factory=dict)
+	version: int = MANIFEST_VERSION
+	# Aggregate regions not hashed yet: name -> (offset, size)
+	pending: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+	_image: Optional[RomImage] = field(default=None, repr=False, compare=False)
+
+	@classmethod
+	def build(cls, rom: Union[str, Path, RomImage, bytes, bytearray]) -> 'RomManifest':
+		"""Hash every region of a ROM."""
+		image = open_rom(rom)
+		manifest = cls(len(image), image.mtime_ns, str(image.path) if image.path else None)
+		for name, offset, size in manifest_regions(image):
+			manifest.regions[name] = RegionDigest.compute(name, image.read(offset, size), offset)
+		return manifest
+
+	def updated(self, rom: Union[str, Path, RomImage, bytes, bytearray],
+				touched: Iterable[Tuple[int, int]]) -> 'RomManifest':
+		"""Manifest of a modified ROM, rehashing only regions that intersect touched ranges.
+
+		touched holds (start, end) file ranges, e.g. the changed runs of a
+		ModificationLog. A size change invalidates the layout, so the whole
+		ROM is rehashed. Stale aggregate regions are left pending (see
+		digest()) instead of rehashing the whole file.
+		"""
+		image = open_rom(rom)
+		if len(image) != self.size:
+			return RomManifest.build(image)
+
+		touched = list(touched)
+		manifest = RomManifest(self.size, image.mtime_ns, str(image.path) if image.path else self.path, _image=image)
+		for name, offset, size in manifest_regions(image):
+			previous = self.regions.get(name)
+			stale = previous is None or (previous.offset, previous.size) != (offset, size) or \
+				name in self.pending or any(start < offset + size and end > offset for start, end in touched)
+			if not stale:
+				manifest.regions[name] = previous
+			elif name in AGGREGATE_REGIONS:
+				manifest.pending[name] = (offset, size)
+			else:
+				manifest.regions[name] = RegionDigest.compute(name, image.read(offset, size), offset)
+		return manifest
+
+	def verify(self, rom: Union[str, Path, RomImage, bytes, bytearray],
+			   touched: Optional[Iterable[Tuple[int, int]]] = None) -> List[RegionMismatch]:
+		"""Regions of rom that no longer match this manifest.
+
+		With touched ranges only the regions they intersect are rehashed;
+		without them, an image whose mtime and size still match is taken as
+		unchanged and anything else is rehashed in full.
+		"""
+		image = open_rom(rom)
+		if touched is None:
+			if image.path and image.mtime_ns == self.mtime_ns and len(image) == self.size:
+				return []
+			current = RomManifest.build(image)
+		else:
+			current = self.updated(image, touched)
+		return compare_manifests(self, current)
+
+	# ------------------------------------------------------------------
+	# Persistence
+	# ------------------------------------------------------------------
+
+	@staticmethod
+	def path_for(rom_path: Union[str, Path]) -> Path:
+		rom_path = Path(rom_path)
+		return rom_path.with_name(rom_path.name + MANIFEST_SUFFIX)
+
+	def to_dict(self) -> Dict:
+		return {
+			'version': self.version,
+			'path': self.path,
+			'size': self.size,
+			'mtime_ns': self.mtime_ns,
+			'regions': [asdict(digest) for digest in self.regions.values()],
+			'pending': [[name, offset, size] for name, (offset, size) in self.pending.items()],
+		}
+
+	@classmethod
+	def from_dict(cls, data: Dict) -> 'RomManifest':
+		regions = {item['name']: RegionDigest(**item) for item in data.get('regions', [])}
+		pending = {name: (offset, size) for name, offset, size in data.get('pending', [])}
+		return cls(data['size'], data.get('mtime_ns', 0), data.get('path'), regions, data.get('version', 0), pending)
+
+	def save(self, path: Union[str, Path]) -> Path:
+		path = Path(path)
+		atomic_write(path, json.dumps(self.to_dict(), indent=2).encode('utf-8'))
+		return path
+
+	@classmethod
+	def load(cls, path: Union[str, Path]) -> Optional['RomManifest']:
+		"""Manifest saved at path, or None if missing, unreadable or outdated."""
+		try:
+			manifest = cls.from_dict(json.loads(Path(path).read_text(encoding='utf-8')))
+		except (OSError, ValueError, KeyError, TypeError):
+			return None
+		return manifest if manifest.version == MANIFEST_VERSION else None
+
+	@classmethod
+	def load_current(cls, rom_path: Union[str, Path]) -> Optional['RomManifest']:
+		"""Saved manifest of a ROM file if its mtime and size still match."""
+		rom_path = Path(rom_path)
+		try:
+			stat = rom_path.stat()
+		except OSError:
+			return None
+		manifest = cls.load(cls.path_for(rom_path))
+		if manifest is not None and manifest.mtime_ns == stat.st_mtime_ns and manifest.size == stat.st_size:
+			return manifest
+		return None
+
+	@classmethod
+	def load_or_build(cls, rom_path: Union[str, Path], save: bool = True) -> 'RomManifest':
+		"""Saved manifest of a ROM file if still current, otherwise a fresh one."""
+		manifest = cls.load_current(rom_path)
+		if manifest is not None:
+			return manifest
+		manifest = cls.build(rom_path)
+		if save:
+			try:
+				manifest.save(cls.path_for(rom_path))
+			except OSError:
+				pass
+		return manifest
+
+	def digest(self, name: str) -> Optional[RegionDigest]:
+		"""Checksums of a region; pending aggregates are hashed on first request."""
+		if name in self.pending:
+			image = self._image
+			if (image is None or image.closed) and self.path:
+				# A loaded manifest: hash the file it describes, if it has not changed since
+				try:
+					stat = Path(self.path).stat()
+				except OSError:
+					return None
+				if (stat.st_mtime_ns, stat.st_size) != (self.mtime_ns, self.size):
+					return None
+				image = self._image = open_rom(self.path)
+			if image is None or image.closed:
+				return None
+			offset, size = self.pending.pop(name)
+			self.regions[name] = RegionDigest.compute(name, image.read(offset, size), offset)
+		return self.regions.get(name)
+
+
+def refresh_manifest(rom_path: Union[str, Path], previous: Optional[RomManifest],
+					 touched: Optional[Iterable[Tuple[int, int]]]) -> RomManifest:
+	"""Save the manifest of a just-written ROM file.
+
+	previous is the manifest of the content it replaced (or of the ROM it
+	was derived from) and touched the ranges that changed since; without
+	either, the file is hashed in full.
+	"""
+	if previous is None or touched is None:
+		manifest = RomManifest.build(rom_path)
+	else:
+		manifest = previous.updated(rom_path, touched)
+	manifest.save(RomManifest.path_for(rom_path))
+	return manifest
+
+
+def changed_ranges(original: bytes, modified: bytes) -> Optional[List[Tuple[int, int]]]:
+	"""(start, end) of the bytes that differ, or None if the sizes differ."""
+	if len(original) != len(modified):
+		return None
+	return diff_spans(original, modified)
+
+
+def compare_manifests(expected: RomManifest, actual: RomManifest) -> List[RegionMismatch]:
+	"""Regions whose checksums differ, in expected's order (missing regions included).
+
+	Aggregates pending on either side are skipped; the regions inside them
+	report any difference.
+	"""
+	mismatches = []
+	for name in list(expected.regions) + [name for name in actual.regions if name not in expected.regions]:
+		if name in expected.pending or name in actual.pending:
+			continue
+		want = expected.regions.get(name)
+		got = actual.regions.get(name)
+		if want is not None and got is not None and want.same_content(got):
+			continue
+		where = want or got
+		mismatches.append(RegionMismatch(name, where.offset, where.size, want, got))
+	return mismatches
@@ -65,14 +65,14 @@ if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import os
 import struct
-import hashlib
-import binascii
 import json
 import xml.etree.ElementTree as ET
 import csv
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
+
+from rom_manifest import RegionDigest, RomManifest
 from enum import Enum
 import argparse
 
@@ -309,18 +309,20 @@ class ROMAnalyzer:
 		return header
 
 	def calculate_checksums(self) -> ROMChecksums:
-		"""Calculate all checksums."""
-		# Full ROM
-		md5 = hashlib.md5(self.rom_data).hexdigest()
-		sha1 = hashlib.sha1(self.rom_data).hexdigest()
-		sha256 = hashlib.sha256(self.rom_data).hexdigest()
-		crc32 = format(binascii.crc32(self.rom_data) & 0xffffffff, '08x')
+		"""Calculate all checksums.
 
+		Reads them from the ROM's checksum manifest (rom_manifest.py), which
+		is saved next to the ROM and reused while the file is unchanged.
+		"""
+		manifest = self._load_manifest()
+
+		# Full ROM
+		full = self._region_digest(manifest, "file", 0, len(self.rom_data))
 		checksums = ROMChecksums(
-			md5=md5,
-			sha1=sha1,
-			sha256=sha256,
-			crc32=crc32
+			md5=full.md5,
+			sha1=full.sha1,
+			sha256=full.sha256,
+			crc32=full.crc32
 		)
 
 		# PRG-ROM only
@@ -328,20 +330,36 @@ class ROMAnalyzer:
 			prg_size = self.metadata.header.prg_rom_size * 16384
 			chr_size = self.metadata.header.chr_rom_size * 8192
 
-			prg_data = self.rom_data[16:16 + prg_size]
-			checksums.prg_md5 = hashlib.md5(prg_data).hexdigest()
-			checksums.prg_sha1 = hashlib.sha1(prg_data).hexdigest()
-			checksums.prg_crc32 = format(binascii.crc32(prg_data) & 0xffffffff, '08x')
+			prg = self._region_digest(manifest, "prg", 16, prg_size)
+			checksums.prg_md5 = prg.md5
+			checksums.prg_sha1 = prg.sha1
+			checksums.prg_crc32 = prg.crc32
 
 			# CHR-ROM only (if present)
 			if chr_size > 0:
-				chr_data = self.rom_data[16 + prg_size:16 + prg_size + chr_size]
-				checksums.chr_md5 = hashlib.md5(chr_data).hexdigest()
-				checksums.chr_sha1 = hashlib.sha1(chr_data).hexdigest()
-				checksums.chr_crc32 = format(binascii.crc32(chr_data) & 0xffffffff, '08x')
+				chr_digest = self._region_digest(manifest, "chr", 16 + prg_size, chr_size)
+				checksums.chr_md5 = chr_digest.md5
+				checksums.chr_sha1 = chr_digest.sha1
+				checksums.chr_crc32 = chr_digest.crc32
 
 		return checksums
 
+	def _load_manifest(self) -> Optional[RomManifest]:
+		"""Checksum manifest of the ROM file (saved one if current, else built and saved)."""
+		try:
+			manifest = RomManifest.load_or_build(self.rom_path)
+		except (OSError, ValueError):
+			return None
+		return manifest if manifest.size == len(self.rom_data) else None
+
+	def _region_digest(self, manifest: Optional[RomManifest], name: str, offset: int, size: int) -> RegionDigest:
+		"""A manifest region's checksums, or freshly computed ones if it has no matching region."""
+		data = self.rom_data[offset:offset + size]
+		digest = manifest.digest(name) if manifest else None
+		if digest is not None and digest.offset == offset and digest.size == len(data):
+			return digest
+		return RegionDigest.compute(name, data, offset)
+
 	def validate_rom(self, header: NESHeader) -> Tuple[List[str], List[str]]:
 		"""Validate ROM structure."""
 		errors = []
@@ -22,6 +22,8 @@ from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 
+from patch_engine import apply_patch_bytes
+
 
 @dataclass
 class PatchChunk:
@@ -105,56 +107,8 @@ class IPSPatcher:
 
 	@staticmethod
 	def apply_patch(rom_data: bytes, patch_data: bytes) -> bytes:
-		"""Apply IPS patch to ROM"""
-		# Validate header
-		if not patch_data.startswith(IPSPatcher.HEADER):
-			raise ValueError("Invalid IPS patch: missing PATCH header")
-
-		# Create mutable copy
-		result = bytearray(rom_data)
-		pos = len(IPSPatcher.HEADER)
-
-		while pos < len(patch_data):
-			# Check for EOF
-			if patch_data[pos:pos+3] == IPSPatcher.EOF:
-				break
-
-			# Read offset (3 bytes, big-endian)
-			offset = struct.unpack('>I', b'\x00' + patch_data[pos:pos+3])[0]
-			pos += 3
-
-			# Read size (2 bytes, big-endian)
-			size = struct.unpack('>H', patch_data[pos:pos+2])[0]
-			pos += 2
-
-			if size == 0x0000:
-				# RLE record
-				count = struct.unpack('>H', patch_data[pos:pos+2])[0]
-				pos += 2
-				byte_value = patch_data[pos]
-				pos += 1
-
-				# Extend ROM if needed
-				required_size = offset + count
-				if required_size > len(result):
-					result.extend(b'\x00' * (required_size - len(result)))
-
-				# Write RLE data
-				result[offset:offset+count] = bytes([byte_value] * count)
-			else:
-				# Normal record
-				data = patch_data[pos:pos+size]
-				pos += size
-
-				# Extend ROM if needed
-				required_size = offset + size
-				if required_size > len(result):
-					result.extend(b'\x00' * (required_size - len(result)))
-
-				# Write data
-				result[offset:offset+size] = data
-
-		return bytes(result)
+		"""Apply IPS patch to ROM (streamed by patch_engine; raises ValueError if invalid)"""
+		return apply_patch_bytes(patch_data, rom_data, 'ips').data
 
 	@staticmethod
 	def _find_changes(original: bytes, modified: bytes) -> List[Tuple[int, bytes]]:
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior N-Way ROM Comparison
+
+Compares many variants (hacks, translations, builds) against one base ROM
+in a single run, for triaging which hacks can be combined with our
+patches and with each other:
+
+- Each variant is diffed against the base once (diff_engine, vectorized)
+  on a process pool. Workers map the base ROM read-only when they start,
+  so it is neither reloaded nor pickled per variant; only the changed
+  runs come back.
+- A region x variant change matrix counts the changed bytes of every
+  variant in every DragonWarriorROMLayout section (sections nest, so a
+  byte can count in more than one; bytes outside all sections are
+  counted under "Other").
+- Every pair of variants that changes the same bytes is reported with
+  its shared bytes, similarity (Jaccard index of the changed offsets) and
+  conflicts: shared bytes the two variants set to different values, with
+  the sections they fall in. Pairs are found through an index of touched
+  256-byte blocks, so variants that never come near each other are never
+  compared.
+
+Variants found in a directory are named by their path under it, so
+same-named hacks in different folders stay distinct in every report.
+Variants longer than the base are compared as if the base were padded
+with zeros.
+
+Usage:
+	python tools/rom_variants.py roms/dw.nes hacks/ -o build/variants.json
+	python tools/rom_variants.py roms/dw.nes a.nes b.nes --matrix-csv matrix.csv --pairs-csv pairs.csv
+
+	from rom_variants import compare_variants
+
+	report = compare_variants("roms/dw.nes", ["hacks/"])
+	for pair in report.pairs:
+		if pair.conflicting_bytes:
+			print(pair.first, pair.second, pair.conflict_regions)
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import time
+import zlib
+import argparse
+import concurrent.futures
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+from itertools import combinations
+
+from diff_engine import RomDiff, diff_spans
+from patch_composer import layout_regions
+from rom_comparison_advanced import DragonWarriorROMLayout
+from rom_corpus import ROM_EXTENSIONS
+from rom_image import RomImage
+from table_generation import atomic_write
+
+
+# Granularity of the index used to find pairs of variants that overlap
+BLOCK_SIZE = 256
+OTHER_REGION = "Other"
+# Conflicting ranges listed per pair (the byte count covers all of them)
+MAX_CONFLICT_RANGES = 32
+
+# The base ROM, mapped once per worker process
+_base: Optional[RomImage] = None
+
+
+# ============================================================================
+# VARIANT DIFFS
+# ============================================================================
+
+@dataclass
+class VariantDiff:
+	"""One variant's changes against the base ROM."""
+	name: str
+	path: str
+	size: int = 0
+	crc32: int = 0
+	runs: List[Tuple[int, bytes]] = field(default_factory=list, repr=False)
+	regions: Dict[str, int] = field(default_factory=dict)
+	error: Optional[str] = None
+
+	@property
+	def changed_bytes(self) -> int:
+		return sum(len(data) for _, data in self.runs)
+
+	def blocks(self) -> set:
+		"""BLOCK_SIZE blocks this variant changes."""
+		return {block for offset, data in self.runs
+				for block in range(offset // BLOCK_SIZE, (offset + len(data) - 1) // BLOCK_SIZE + 1)}
+
+
+def _section_union() -> List[Tuple[int, int]]:
+	"""(start, end) of the disjoint ranges covered by any layout section."""
+	spans: List[Tuple[int, int]] = []
+	for section in sorted(DragonWarriorROMLayout.SECTIONS, key=lambda section: section.offset):
+		start, end = section.offset, section.offset + section.size
+		if spans and start <= spans[-1][1]:
+			spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+		else:
+			spans.append((start, end))
+	return spans
+
+
+def region_counts(diff: RomDiff) -> Dict[str, int]:
+	"""Changed bytes per DragonWarriorROMLayout section, plus bytes outside all of them."""
+	counts = {section.name: diff.changes_between(section.offset, section.offset + section.size)
+			  for section in DragonWarriorROMLayout.SECTIONS}
+	counts[OTHER_REGION] = diff.changed_bytes - sum(diff.changes_between(start, end)
+													for start, end in _section_union())
+	return counts
+
+
+def diff_variant(path: Union[str, Path], base: Union[bytes, bytearray, memoryview, RomImage],
+				 name: Optional[str] = None) -> VariantDiff:
+	"""Diff one variant ROM against the base (named after its file unless name is given)."""
+	path = Path(path)
+	variant = VariantDiff(name or path.name, str(path))
+	base_data = base.data if isinstance(base, RomImage) else memoryview(base)
+	try:
+		data = path.read_bytes()
+	except OSError as e:
+		variant.error = str(e)
+		return variant
+	variant.size = len(data)
+	variant.crc32 = zlib.crc32(data) & 0xffffffff
+	diff = RomDiff(base_data, data, pad=0)
+	variant.runs = [(run.offset, run.modified) for run in diff.runs]
+	variant.regions = region_counts(diff)
+	return variant
+
+
+def _init_worker(base_path: str) -> None:
+	global _base
+	_base = RomImage.open(base_path)
+
+
+def _diff_in_worker(path: str, name: str) -> VariantDiff:
+	return diff_variant(path, _base, name)
+
+
+# ============================================================================
+# PAIRS
+# ============================================================================
+
+@dataclass
+class VariantPair:
+	"""Two variants that change some of the same bytes."""
+	first: str
+	second: str
+	shared_bytes: int
+	similarity: float
+	conflicting_bytes: int = 0
+	conflicts: List[Tuple[int, int]] = field(default_factory=list)
+	conflict_regions: List[str] = field(default_factory=list)
+
+	@property
+	def compatible(self) -> bool:
+		return not self.conflicting_bytes
+
+
+def compare_pair(first: VariantDiff, second: VariantDiff) -> Optional[VariantPair]:
+	"""Shared and conflicting bytes of two variants (None if they share none)."""
+	shared = 0
+	conflicting = 0
+	conflicts: List[Tuple[int, int]] = []
+	i = j = 0
+	while i < len(first.runs) and j < len(second.runs):
+		a_offset, a_data = first.runs[i]
+		b_offset, b_data = second.runs[j]
+		a_end = a_offset + len(a_data)
+		b_end = b_offset + len(b_data)
+		start = max(a_offset, b_offset)
+		end = min(a_end, b_end)
+		if start < end:
+			shared += end - start
+			a_bytes = a_data[start - a_offset:end - a_offset]
+			b_bytes = b_data[start - b_offset:end - b_offset]
+			if a_bytes != b_bytes:
+				for span_start, span_end in diff_spans(a_bytes, b_bytes):
+					conflicting += span_end - span_start
+					if conflicts and conflicts[-1][1] == start + span_start:
+						conflicts[-1] = (conflicts[-1][0], start + span_end)
+					else:
+						conflicts.append((start + span_start, start + span_end))
+		if a_end <= b_end:
+			i += 1
+		else:
+			j += 1
+	if not shared:
+		return None
+
+	union = first.changed_bytes + second.changed_bytes - shared
+	regions = list(dict.fromkeys(name for start, end in conflicts for name in layout_regions(start, end)))
+	return VariantPair(first.name, second.name, shared, round(shared / union, 4) if union else 1.0,
+					   conflicting, conflicts[:MAX_CONFLICT_RANGES], regions)
+
+
+def overlapping_pairs(variants: Sequence[VariantDiff]) -> List[Tuple[int, int]]:
+	"""Index pairs of variants that change at least one common BLOCK_SIZE block."""
+	by_block: Dict[int, List[int]] = {}
+	for index, variant in enumerate(variants):
+		for block in variant.blocks():
+			by_block.setdefault(block, []).append(index)
+	pairs = set()
+	for indices in by_block.values():
+		pairs.update(combinations(indices, 2))
+	return sorted(pairs)
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+@dataclass
+class VariantReport:
+	"""N-way comparison of variants against one base ROM."""
+	base: str
+	base_size: int
+	base_crc32: int
+	variants: List[VariantDiff] = field(default_factory=list)
+	pairs: List[VariantPair] = field(default_factory=list)
+	elapsed: float = 0.0
+
+	@property
+	def regions(self) -> List[str]:
+		return [section.name for section in DragonWarriorROMLayout.SECTIONS] + [OTHER_REGION]
+
+	def matrix(self) -> List[List[int]]:
+		"""Changed bytes per region (rows) and variant (columns)."""
+		return [[variant.regions.get(region, 0) for variant in self.variants] for region in self.regions]
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			'base': self.base,
+			'base_size': self.base_size,
+			'base_crc32': f"{self.base_crc32:08X}",
+			'elapsed': round(self.elapsed, 3),
+			'variants': [
+				{
+					'name': variant.name,
+					'path': variant.path,
+					'size': variant.size,
+					'crc32': f"{variant.crc32:08X}",
+					'changed_bytes': variant.changed_bytes,
+					'runs': len(variant.runs),
+					**({'error': variant.error} if variant.error else {}),
+				}
+				for variant in self.variants
+			],
+			'matrix': {
+				'regions': self.regions,
+				'variants': [variant.name for variant in self.variants],
+				'changed_bytes': self.matrix(),
+			},
+			'pairs': [
+				{
+					'first': pair.first,
+					'second': pair.second,
+					'shared_bytes': pair.shared_bytes,
+					'similarity': pair.similarity,
+					'conflicting_bytes': pair.conflicting_bytes,
+					'conflicts': [[f"0x{start:05X}", f"0x{end - 1:05X}"] for start, end in pair.conflicts],
+					'conflict_regions': pair.conflict_regions,
+				}
+				for pair in self.pairs
+			],
+		}
+
+	def save(self, path: Union[str, Path]) -> Path:
+		path = Path(path)
+		atomic_write(path, json.dumps(self.to_dict(), indent=2).encode('utf-8'))
+		return path
+
+	def matrix_csv(self) -> str:
+		output = io.StringIO()
+		writer = csv.writer(output, lineterminator='\n')
+		writer.writerow(['Region'] + [variant.name for variant in self.variants])
+		for region, row in zip(self.regions, self.matrix()):
+			writer.writerow([region] + row)
+		return output.getvalue()
+
+	def pairs_csv(self) -> str:
+		output = io.StringIO()
+		writer = csv.writer(output, lineterminator='\n')
+		writer.writerow(['First', 'Second', 'Shared Bytes', 'Similarity', 'Conflicting Bytes', 'Conflict Regions'])
+		for pair in self.pairs:
+			writer.writerow([pair.first, pair.second, pair.shared_bytes, pair.similarity,
+							 pair.conflicting_bytes, '; '.join(pair.conflict_regions)])
+		return output.getvalue()
+
+
+def named_variants(paths: Iterable[Union[str, Path]]) -> List[Tuple[str, Path]]:
+	"""(name, path) of the ROM files given directly or found (recursively) in the given directories.
+
+	A ROM found in a directory is named by its path under that directory
+	(hackA/dw.nes), one given directly by its file name. Names that still
+	clash (the same relative path under two arguments) fall back to the
+	path as given, so every report row traces back to one file.
+	"""
+	found: Dict[Path, str] = {}
+	for path in map(Path, paths):
+		if path.is_dir():
+			for rom in sorted(p for p in path.rglob('*') if p.suffix.lower() in ROM_EXTENSIONS and p.is_file()):
+				found.setdefault(rom, rom.relative_to(path).as_posix())
+		else:
+			found.setdefault(path, path.name)
+
+	counts: Dict[str, int] = {}
+	for name in found.values():
+		counts[name] = counts.get(name, 0) + 1
+	return [(name if counts[name] == 1 else path.as_posix(), path) for path, name in found.items()]
+
+
+def find_variants(paths: Iterable[Union[str, Path]]) -> List[Path]:
+	"""ROM files given directly or found (recursively) in the given directories."""
+	return [path for _, path in named_variants(paths)]
+
+
+def compare_variants(base_path: Union[str, Path], paths: Iterable[Union[str, Path]],
+					 workers: Optional[int] = None) -> VariantReport:
+	"""Diff every variant against the base on a process pool and cross-check the pairs."""
+	start = time.perf_counter()
+	named = named_variants(paths)
+	names = [name for name, _ in named]
+	variants = [str(path) for _, path in named]
+	workers = min(workers or os.cpu_count() or 1, max(1, len(variants)))
+
+	with RomImage.open(base_path) as base:
+		report = VariantReport(str(base_path), len(base), zlib.crc32(base.data) & 0xffffffff)
+		if workers == 1:
+			report.variants = [diff_variant(path, base, name) for path, name in zip(variants, names)]
+		else:
+			with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+														initargs=(str(base_path),)) as pool:
+				report.variants = list(pool.map(_diff_in_worker, variants, names, chunksize=4))
+
+	for i, j in overlapping_pairs(report.variants):
+		pair = compare_pair(report.variants[i], report.variants[j])
+		if pair is not None:
+			report.pairs.append(pair)
+	report.elapsed = time.perf_counter() - start
+	return report
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Compare many ROM variants against one base ROM')
+	parser.add_argument('base', help='Base ROM')
+	parser.add_argument('variants', nargs='+', help='Variant ROMs or directories of ROMs')
+	parser.add_argument('-o', '--output', help='JSON report')
+	parser.add_argument('--matrix-csv', help='Region x variant change matrix as CSV')
+	parser.add_argument('--pairs-csv', help='Overlapping variant pairs as CSV')
+	parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+	args = parser.parse_args()
+
+	try:
+		report = compare_variants(args.base, args.variants, workers=args.workers)
+	except OSError as e:
+		print(f"❌ {e}", file=sys.stderr)
+		return 1
+
+	if args.matrix_csv:
+		atomic_write(Path(args.matrix_csv), report.matrix_csv().encode('utf-8'))
+	if args.pairs_csv:
+		atomic_write(Path(args.pairs_csv), report.pairs_csv().encode('utf-8'))
+	if not args.output:
+		if not (args.matrix_csv or args.pairs_csv):
+			print(json.dumps(report.to_dict(), indent=2))
+		return 0
+
+	report.save(args.output)
+	conflicting = [pair for pair in report.pairs if not pair.compatible]
+	print(f"✓ {len(report.variants)} variants, {len(report.pairs)} overlapping pairs "
+		  f"({len(conflicting)} conflicting) in {report.elapsed:.2f}s -> {args.output}")
+	for pair in conflicting[:20]:
+		print(f"  ⚠️  {pair.first} / {pair.second}: {pair.conflicting_bytes:,} bytes "
+			  f"({', '.join(pair.conflict_regions)})")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -13,7 +13,6 @@ if hasattr(sys.stdout, 'buffer'):
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 if hasattr(sys.stderr, 'buffer'):
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
-import hashlib
 import struct
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
@@ -26,6 +25,8 @@ from rich.panel import Panel
 from rich.progress import Progress, BarColumn, TextColumn
 from rich import box
 
+from rom_manifest import RomManifest, compare_manifests
+
 console = Console()
 
 class ROMVerifier:
@@ -78,21 +79,26 @@ class ROMVerifier:
 		with open(self.built_rom, 'rb') as f:
 			built_data = f.read()
 
+		# Per-region checksums (saved manifests are reused while the ROMs are unchanged)
+		ref_manifest = RomManifest.load_or_build(self.reference_rom)
+		built_manifest = RomManifest.load_or_build(self.built_rom)
+
 		# Perform comprehensive verification
 		verification_results = {
 			"timestamp": datetime.now().isoformat(),
 			"reference_rom": {
 				"filename": self.reference_rom.name,
 				"size": len(ref_data),
-				"md5": hashlib.md5(ref_data).hexdigest(),
-				"sha1": hashlib.sha1(ref_data).hexdigest(),
+				"md5": ref_manifest.digest("file").md5,
+				"sha1": ref_manifest.digest("file").sha1,
 			},
 			"built_rom": {
 				"filename": self.built_rom.name,
 				"size": len(built_data),
-				"md5": hashlib.md5(built_data).hexdigest(),
-				"sha1": hashlib.sha1(built_data).hexdigest(),
+				"md5": built_manifest.digest("file").md5,
+				"sha1": built_manifest.digest("file").sha1,
 			},
+			"region_checksums": self._compare_region_checksums(ref_manifest, built_manifest),
 			"comparison": self._compare_roms(ref_data, built_data),
 			"segment_analysis": self._analyze_segments(ref_data, built_data),
 			"critical_areas": self._check_critical_areas(ref_data, built_data),
@@ -115,6 +121,15 @@ class ROMVerifier:
 			"size_difference": len(built_data) - len(ref_data),
 		}
 
+	def _compare_region_checksums(self, ref_manifest: RomManifest, built_manifest: RomManifest) -> List[Dict[str, Any]]:
+		"""Header, PRG banks, CHR halves and data regions whose checksums differ"""
+		return [{
+			"region": mismatch.name,
+			"range": f"0x{mismatch.offset:05X}-0x{mismatch.offset + mismatch.size - 1:05X}",
+			"reference_sha256": mismatch.expected.sha256 if mismatch.expected else None,
+			"built_sha256": mismatch.actual.sha256 if mismatch.actual else None,
+		} for mismatch in compare_manifests(ref_manifest, built_manifest)]
+
 	def _analyze_segments(self, ref_data: bytes, built_data: bytes) -> Dict[str, Dict[str, Any]]:
 		"""Analyze specific ROM segments"""
 		segment_results = {}
@@ -290,6 +305,12 @@ class ROMVerifier:
 			diff = results["comparison"]["size_difference"]
 			console.print(f"[yellow]Size difference: {diff:+d} bytes[/yellow]")
 
+		# Regions whose checksums differ
+		if results["region_checksums"]:
+			console.print("\n[bold]Differing Regions:[/bold]")
+			for region in results["region_checksums"]:
+				console.print(f"[red]{region['region']}[/red] {region['range']}")
+
 		# Segment analysis table
 		console.print("\n[bold]ROM Segment Analysis:[/bold]")
 		table = Table(box=box.ROUNDED)
@@ -378,6 +399,11 @@ class ROMVerifier:
 			f.write(f"\tMatch Percentage: {results['match_percentage']:.2f}%\n")
 			f.write(f"\tSize Difference: {results['comparison']['size_difference']:+d} bytes\n\n")
 
+			f.write("DIFFERING REGIONS:\n")
+			for region in results["region_checksums"]:
+				f.write(f"\t{region['region']}: {region['range']}\n")
+			f.write("\n")
+
 			f.write("SEGMENT ANALYSIS:\n")
 			for segment_name, segment_info in results["segment_analysis"].items():
 				f.write(f"\t{segment_name}:\n")
@@ -407,7 +433,9 @@ class ROMVerifier:
 					f.write(f"\t\tContext: ...{diff['context_before']} [{diff['reference_hex']}] {diff['context_after']}...\n")
 					f.write(f"\t\tReference: {diff['reference_hex']}\n")
 					f.write(f"\t\tBuilt:     {diff['built_hex']}\n")
-					f.write("\n")        console.print(f"[dim]Detailed text report: {report_file}[/dim]")
+					f.write("\n")
+
+		console.print(f"[dim]Detailed text report: {report_file}[/dim]")
 		return report_file
 
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Source Overlays
+
+Virtual patch layer for the assembler. Instead of rewriting the checked-in
+source files, patched regions are kept in memory as (file, line range,
+replacement) overlays and applied when the assembler loads a file:
+
+	overlay = SourceOverlay("source_files")
+	overlay.add(Overlay("Bank01.asm", 120, 160, 'EnStatTbl:\\n.include "..."'))
+	result = build_rom("source_files", loader=overlay)
+
+Sources on disk are never modified, so several builds with different
+asset sets can run from the same checkout at once, and a crash cannot
+leave the tree half-patched. Each overlay can record a digest of the lines
+it replaces; if the file has changed since the overlay was made, loading
+fails instead of patching the wrong lines.
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from dataclasses import dataclass
+
+from assembler import AssemblerError, read_source_file
+
+
+# ============================================================================
+# OVERLAYS
+# ============================================================================
+
+class OverlayError(AssemblerError):
+	"""An overlay does not fit the file it patches."""
+
+
+def lines_digest(lines: Iterable[str]) -> str:
+	"""Digest of source lines (line endings ignored)."""
+	return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class Overlay:
+	"""Replace lines start..end (1-based, inclusive) of a source file.
+
+	end == start - 1 inserts before line start without removing anything.
+	file is relative to the overlay's source directory.
+	"""
+	file: str
+	start: int
+	end: int
+	replacement: str
+	description: str = ""
+	original_digest: Optional[str] = None
+
+	@property
+	def replacement_lines(self) -> List[str]:
+		return self.replacement.splitlines()
+
+	def overlaps(self, other: 'Overlay') -> bool:
+		if self.file != other.file:
+			return False
+		# Two insertions at the same line would have an undefined order
+		if self.start == other.start:
+			return True
+		return self.start <= other.end and other.start <= self.end
+
+	def fingerprint(self) -> str:
+		return f"{self.file}:{self.start}-{self.end}:{hashlib.sha256(self.replacement.encode('utf-8')).hexdigest()}"
+
+
+class SourceOverlay:
+	"""Assembler loader that applies overlays on top of a source directory.
+
+	Instances are callable (path -> text) and can be passed anywhere the
+	assembler accepts a loader. overlay_digest(path) identifies the
+	overlays on one file, for cache keys.
+	"""
+
+	def __init__(self, source_dir: Union[str, Path], overlays: Iterable[Overlay] = (),
+				 base_loader: Optional[Callable[[Path], str]] = None):
+		self.source_dir = Path(source_dir)
+		self.base_loader = base_loader or read_source_file
+		self._overlays: Dict[Path, List[Overlay]] = {}
+		for overlay in overlays:
+			self.add(overlay)
+
+	def _path(self, file: Union[str, Path]) -> Path:
+		path = Path(file)
+		return (path if path.is_absolute() else self.source_dir / path).resolve()
+
+	def add(self, overlay: Overlay) -> None:
+		"""Register an overlay; overlapping ranges in one file are rejected."""
+		if overlay.start < 1 or overlay.end < overlay.start - 1:
+			raise OverlayError(f"Invalid line range {overlay.start}-{overlay.end}", overlay.file)
+		existing = self._overlays.setdefault(self._path(overlay.file), [])
+		for other in existing:
+			if overlay.overlaps(other):
+				raise OverlayError(f"Overlay lines {overlay.start}-{overlay.end} overlap "
+								   f"lines {other.start}-{other.end}", overlay.file, overlay.start)
+		existing.append(overlay)
+		existing.sort(key=lambda o: o.start)
+
+	def overlays(self) -> List[Overlay]:
+		"""All overlays, by file and line."""
+		return [overlay for path in sorted(self._overlays) for overlay in self._overlays[path]]
+
+	def files(self) -> List[Path]:
+		"""Files that have at least one overlay."""
+		return sorted(path for path, overlays in self._overlays.items() if overlays)
+
+	def __len__(self) -> int:
+		return sum(len(overlays) for overlays in self._overlays.values())
+
+	def overlay_digest(self, path: Union[str, Path]) -> str:
+		"""Identity of the overlays on a file ('' if none)."""
+		overlays = self._overlays.get(Path(path).resolve())
+		if not overlays:
+			return ''
+		return hashlib.sha256('\n'.join(o.fingerprint() for o in overlays).encode('utf-8')).hexdigest()
+
+	def apply(self, path: Path, text: str) -> str:
+		"""Apply a file's overlays to its text."""
+		overlays = self._overlays.get(Path(path).resolve())
+		if not overlays:
+			return text
+
+		lines = text.splitlines()
+		# Bottom-up so earlier line numbers stay valid
+		for overlay in reversed(overlays):
+			if overlay.end > len(lines):
+				raise OverlayError(f"Overlay lines {overlay.start}-{overlay.end} past end of file "
+								   f"({len(lines)} lines)", path, overlay.start)
+			replaced = lines[overlay.start - 1:overlay.end]
+			if overlay.original_digest is not None and lines_digest(replaced) != overlay.original_digest:
+				raise OverlayError(f"Source changed under overlay lines {overlay.start}-{overlay.end}"
+								   + (f" ({overlay.description})" if overlay.description else ""),
+								   path, overlay.start)
+			lines[overlay.start - 1:overlay.end] = overlay.replacement_lines
+		return '\n'.join(lines) + '\n'
+
+	def __call__(self, path: Path) -> str:
+		return self.apply(path, self.base_loader(path))
+
+	def write_patched(self, output_dir: Union[str, Path]) -> List[Path]:
+		"""Write patched copies of overlaid files (for inspection) under output_dir."""
+		output_dir = Path(output_dir)
+		root = self.source_dir.resolve()
+		written = []
+		for path in self.files():
+			try:
+				relative = path.relative_to(root)
+			except ValueError:
+				relative = Path(path.name)
+			target = output_dir / relative
+			target.parent.mkdir(parents=True, exist_ok=True)
+			target.write_text(self(path), encoding='utf-8')
+			written.append(target)
+		return written
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Dragon Warrior Source File Patcher
-Modifies original source files to use asset includes instead of hardcoded data
+Makes the original source files use asset includes instead of hardcoded data,
+through in-memory overlays resolved by the assembler (sources stay untouched)
 """
 
 import sys
@@ -9,9 +10,10 @@ import io
 
 # Force UTF-8 output encoding for Unicode support (emoji, checkmarks, arrows)
 # This fixes UnicodeEncodeError on Windows when printing to cp1252 console
-if hasattr(sys.stdout, 'buffer'):
+# (Skipped when the stream is already UTF-8, e.g. when imported by other tools.)
+if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
 	sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-if hasattr(sys.stderr, 'buffer'):
+if hasattr(sys.stderr, 'buffer') and (sys.stderr.encoding or '').lower() != 'utf-8':
 	sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 import re
 from pathlib import Path
@@ -19,123 +21,143 @@ from typing import List, Optional, Tuple
 import click
 from rich.console import Console
 
+from source_overlay import Overlay, SourceOverlay, lines_digest
+
 console = Console()
 
+# Separator line that ends a data table in the bank sources
+TABLE_SEPARATOR = ';' + '-' * 100
+
+
 class SourcePatcher:
-	"""Patches Dragon Warrior source files to use asset includes"""
+	"""Builds in-memory overlays that make the bank sources use asset includes
 
-	def __init__(self, source_dir: str = "source_files", backup_dir: str = "source_files_backup"):
+	The checked-in source files are never modified: the overlays are
+	applied by the assembler's loader at include time (see
+	source_overlay.SourceOverlay).
+	"""
+
+	def __init__(self, source_dir: str = "source_files", backup_dir: str = "source_files_backup",
+				 generated_dir: str = "build/generated", default_dir: str = "build/default_assets"):
 		self.source_dir = Path(source_dir)
 		self.backup_dir = Path(backup_dir)
+		self.generated_dir = Path(generated_dir)
+		self.default_dir = Path(default_dir)
 
-	def patch_all_sources(self) -> bool:
-		"""Patch all source files to use asset includes"""
-		console.print("[blue]🔧 Patching source files to use asset includes...[/blue]\n")
+	def create_overlay(self) -> Optional[SourceOverlay]:
+		"""Collect the asset-include overlays for all source files
 
-		# Create backup directory
-		self.backup_dir.mkdir(parents=True, exist_ok=True)
+		Returns None if any table could not be located.
+		"""
+		console.print("[blue]🔧 Preparing source overlays for asset includes...[/blue]\n")
 
+		overlay = SourceOverlay(self.source_dir)
 		success = True
 
-		# Patch Bank01.asm for monster data
-		bank01_success = self._patch_bank01_monster_data()
-		if not bank01_success:
+		# Bank01.asm monster data
+		monster_overlay = self._bank01_monster_data_overlay()
+		if monster_overlay is None:
 			success = False
+		else:
+			overlay.add(monster_overlay)
 
-		# TODO: Add patching for other data tables in other banks
+		# TODO: Add overlays for other data tables in other banks
 
 		if success:
-			console.print("[green]✅ All source files patched successfully![/green]")
-		else:
-			console.print("[red]❌ Some source file patches failed[/red]")
-
-		return success
-
-	def _patch_bank01_monster_data(self) -> bool:
-		"""Patch Bank01.asm to include monster data instead of hardcoded table"""
-		try:
-			bank01_file = self.source_dir / "Bank01.asm"
-			backup_file = self.backup_dir / "Bank01.asm"
-
-			if not bank01_file.exists():
-				console.print(f"[red]❌ Bank01.asm not found: {bank01_file}[/red]")
-				return False
-
-			# Create backup
-			console.print(f"[dim]Creating backup: {backup_file}[/dim]")
-			with open(bank01_file, 'r', encoding='utf-8') as f:
-				original_content = f.read()
-			with open(backup_file, 'w', encoding='utf-8') as f:
-				f.write(original_content)
-
-			# Find and replace the EnStatTbl section
-			lines = original_content.split('\n')
-
-			# Find the EnStatTbl section
-			enstattbl_start = -1
-			enstattbl_end = -1
-
-			for i, line in enumerate(lines):
-				if 'EnStatTblPtr:' in line:
-					# Keep the pointer but look for the table
-					continue
-				elif 'EnStatTbl:' in line:
-					enstattbl_start = i
-				elif enstattbl_start != -1 and line.strip().startswith(';----------------------------------------------------------------------------------------------------'):
-					# Found the separator line that marks end of monster table
-					enstattbl_end = i
-					break
-
-			if enstattbl_start == -1:
-				console.print("[yellow]⚠️  Could not find EnStatTbl in Bank01.asm[/yellow]")
-				return False
-
-			if enstattbl_end == -1:
-				console.print("[yellow]⚠️  Could not find end of EnStatTbl table[/yellow]")
-				return False
-
-			console.print(f"[dim]Found EnStatTbl at lines {enstattbl_start+1}-{enstattbl_end}[/dim]")
-
-			# Replace the table section with an include
-			new_lines = (
-				lines[:enstattbl_start] +
-				[
-					"EnStatTbl:",
-					".ifdef USE_EDITED_ASSETS",
-					"\t.include \"build/generated/monster_data.asm\"",
-					".else",
-					"\t.include \"build/default_assets/default_monster_data.asm\"",
-					".endif",
-					""
-				] +
-				lines[enstattbl_end:]
-			)
-
-			# Write modified file
-			modified_content = '\n'.join(new_lines)
-			with open(bank01_file, 'w', encoding='utf-8') as f:
-				f.write(modified_content)
-
-			console.print(f"[green]✅ Patched {bank01_file}[/green]")
-			console.print(f"[dim]Replaced {enstattbl_end - enstattbl_start} lines with asset include[/dim]")
-
-			return True
-
-		except Exception as e:
-			console.print(f"[red]❌ Error patching Bank01.asm: {e}[/red]")
-			return False
+			console.print(f"[green]✅ {len(overlay)} source overlay(s) ready (sources unchanged)[/green]")
+			return overlay
+
+		console.print("[red]❌ Some source overlays could not be created[/red]")
+		return None
+
+	def _include_path(self, path: Path) -> str:
+		"""Absolute include path, so each build can point at its own asset set"""
+		return path.resolve().as_posix()
+
+	def _find_table(self, lines: List[str], label: str, skip: Tuple[str, ...] = ()) -> Tuple[int, int]:
+		"""(start, end) 0-based indices of a table from its label to the next separator line"""
+		start = -1
+		for i, line in enumerate(lines):
+			if any(name in line for name in skip):
+				continue
+			if start == -1 and f'{label}:' in line:
+				start = i
+			elif start != -1 and line.strip().startswith(TABLE_SEPARATOR):
+				return start, i
+		return start, -1
+
+	def _bank01_monster_data_overlay(self) -> Optional[Overlay]:
+		"""Overlay replacing the hardcoded EnStatTbl in Bank01.asm with an asset include"""
+		bank01_file = self.source_dir / "Bank01.asm"
+		if not bank01_file.exists():
+			console.print(f"[red]❌ Bank01.asm not found: {bank01_file}[/red]")
+			return None
+
+		lines = bank01_file.read_text(encoding='utf-8-sig', errors='replace').splitlines()
+		enstattbl_start, enstattbl_end = self._find_table(lines, 'EnStatTbl', skip=('EnStatTblPtr:',))
+
+		if enstattbl_start == -1:
+			console.print("[yellow]⚠️  Could not find EnStatTbl in Bank01.asm[/yellow]")
+			return None
+
+		if enstattbl_end == -1:
+			console.print("[yellow]⚠️  Could not find end of EnStatTbl table[/yellow]")
+			return None
+
+		console.print(f"[dim]Found EnStatTbl at lines {enstattbl_start+1}-{enstattbl_end}[/dim]")
+
+		replacement = '\n'.join([
+			"EnStatTbl:",
+			".ifdef USE_EDITED_ASSETS",
+			f"\t.include \"{self._include_path(self.generated_dir / 'monster_data.asm')}\"",
+			".else",
+			f"\t.include \"{self._include_path(self.default_dir / 'default_monster_data.asm')}\"",
+			".endif",
+			"",
+		])
+
+		console.print(f"[dim]Overlaying {enstattbl_end - enstattbl_start} lines with asset include[/dim]")
+		return Overlay(
+			"Bank01.asm", enstattbl_start + 1, enstattbl_end, replacement,
+			description="EnStatTbl monster data",
+			original_digest=lines_digest(lines[enstattbl_start:enstattbl_end])
+		)
+
+	def backup_files(self) -> List[Path]:
+		"""Backed-up sources from the old in-place patching workflow"""
+		return sorted(self.backup_dir.glob("*.asm")) if self.backup_dir.exists() else []
+
+	def outdated_backups(self) -> List[Path]:
+		"""Backups older than the live source file they would overwrite"""
+		outdated = []
+		for backup_file in self.backup_files():
+			original_file = self.source_dir / backup_file.name
+			if original_file.exists() and backup_file.stat().st_mtime_ns < original_file.stat().st_mtime_ns:
+				outdated.append(backup_file)
+		return outdated
 
 	def restore_backups(self) -> bool:
-		"""Restore original source files from backups"""
+		"""Restore source files left patched by older in-place patching
+
+		Overlays never touch the sources; this only recovers trees that still
+		have a source_files_backup directory from the old workflow. Refuses
+		when any backup is older than the source it would overwrite.
+		"""
 		console.print("[blue]🔄 Restoring source files from backups...[/blue]\n")
 
 		if not self.backup_dir.exists():
 			console.print(f"[red]❌ Backup directory not found: {self.backup_dir}[/red]")
 			return False
 
+		outdated = self.outdated_backups()
+		if outdated:
+			names = ', '.join(path.name for path in outdated)
+			console.print(f"[red]❌ Backups older than the live sources, not restoring: {names}[/red]")
+			return False
+
 		restored_count = 0
 
-		for backup_file in self.backup_dir.glob("*.asm"):
+		for backup_file in self.backup_files():
 			original_file = self.source_dir / backup_file.name
 
 			try:
@@ -155,17 +177,29 @@ class SourcePatcher:
 
 @click.command()
 @click.option('--source-dir', default='source_files', help='Source files directory')
-@click.option('--backup-dir', default='source_files_backup', help='Backup directory')
-@click.option('--restore', is_flag=True, help='Restore from backups instead of patching')
-def patch_sources(source_dir: str, backup_dir: str, restore: bool):
-	"""Patch Dragon Warrior source files to use asset includes"""
+@click.option('--backup-dir', default='source_files_backup', help='Backup directory (old in-place patching)')
+@click.option('--restore', is_flag=True, help='Restore sources left patched by old in-place patching')
+@click.option('--write-dir', default=None, help='Write patched copies of overlaid files here for inspection')
+def patch_sources(source_dir: str, backup_dir: str, restore: bool, write_dir: Optional[str]):
+	"""Show (or materialize) the asset-include overlays for the Dragon Warrior sources"""
 
 	patcher = SourcePatcher(source_dir, backup_dir)
 
 	if restore:
+		names = ', '.join(path.name for path in patcher.backup_files()) or 'nothing'
+		if not click.confirm(f"Overwrite {names} in {source_dir} with the copies in {backup_dir}?"):
+			console.print("[yellow]Restore cancelled[/yellow]")
+			return
 		success = patcher.restore_backups()
 	else:
-		success = patcher.patch_all_sources()
+		overlay = patcher.create_overlay()
+		success = overlay is not None
+		if overlay is not None:
+			for item in overlay.overlays():
+				console.print(f"  {item.file}:{item.start}-{item.end}  {item.description}")
+			if write_dir:
+				for path in overlay.write_patched(write_dir):
+					console.print(f"[dim]Wrote {path}[/dim]")
 
 	if not success:
 		console.print("[red]❌ Operation failed[/red]")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Structural Diff
+
+Compares two ROMs table by table and reports decoded, field-level edits
+("Golem.hp 70 -> 120") instead of changed bytes:
+
+- The game's tables are described once in a declarative schema (SCHEMA,
+  plain dicts that can also be loaded from JSON): which extraction region
+  holds the table, the record size, the fields (offset and type) and the
+  name list for the records. Record tables are compiled into one
+  struct.Struct per table and decoded with struct.iter_unpack; compiled
+  schemas are cached and reused across comparisons.
+- Tables whose raw bytes are identical are skipped before decoding.
+- Record tables are compared record by record and field by field.
+  Overworld RLE rows are decoded (extraction_engine.decode_world_map) and
+  compared tile by tile; dialog text is decoded into blocks
+  (extraction_engine.decode_dialogs) and aligned with difflib, so an
+  inserted line is one insertion rather than every later block changing.
+
+Usage:
+	from structural_diff import StructuralDiff
+
+	for change in StructuralDiff().compare("roms/dw.nes", "hacks/hard.nes"):
+		print(change)          # e.g. "Golem.hp 70 -> 120"
+
+	python tools/structural_diff.py original.nes modified.nes
+	python tools/structural_diff.py original.nes modified.nes --table monsters --json
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import sys
+import json
+import struct
+import difflib
+import argparse
+from pathlib import Path
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from dataclasses import asdict, dataclass
+
+from extraction_engine import EXTRACTION_REGIONS, DECODERS, Region
+from rom_corpus import MONSTER_FIELDS
+from rom_image import RomImage, open_rom
+
+
+FIELD_TYPES = {'u8': 'B', 'u16': 'H'}
+# Longer text values are shortened when a change is printed
+MAX_TEXT = 60
+
+SCHEMA: Dict[str, Dict[str, Any]] = {
+	'monsters': {
+		'region': 'monsters', 'record_size': 16, 'names': 'monsters',
+		'fields': [[name, index, 'u8'] for index, name in enumerate(MONSTER_FIELDS)],
+	},
+	'spells': {
+		'region': 'spell_costs', 'record_size': 1, 'names': 'spells',
+		'fields': [['mp_cost', 0, 'u8']],
+	},
+	'items': {
+		'region': 'item_costs', 'record_size': 2, 'names': 'items',
+		'fields': [['price', 0, 'u16']],
+	},
+	'weapons': {
+		'region': 'equipment_bonuses', 'start': 0, 'count': 8, 'record_size': 1, 'names': 'weapons',
+		'fields': [['attack', 0, 'u8']],
+	},
+	'armor': {
+		'region': 'equipment_bonuses', 'start': 8, 'count': 8, 'record_size': 1, 'names': 'armor',
+		'fields': [['defense', 0, 'u8']],
+	},
+	'shields': {
+		'region': 'equipment_bonuses', 'start': 16, 'count': 4, 'record_size': 1, 'names': 'shields',
+		'fields': [['defense', 0, 'u8']],
+	},
+	'world_map': {'region': 'world_map', 'decoder': 'world_map'},
+	'dialogs': {'region': 'dialogs', 'decoder': 'dialogs'},
+}
+
+
+def _name_lists() -> Dict[str, Sequence[str]]:
+	from binary_to_json import ITEM_NAMES, MONSTER_NAMES, SPELL_NAMES
+	# The bonus tables start with an entry for "nothing equipped"
+	return {
+		'monsters': MONSTER_NAMES,
+		'spells': SPELL_NAMES,
+		'items': ITEM_NAMES,
+		'weapons': ['(none)'] + ITEM_NAMES[0:7],
+		'armor': ['(none)'] + ITEM_NAMES[7:14],
+		'shields': ['(none)'] + ITEM_NAMES[14:17],
+	}
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+@dataclass(frozen=True)
+class TableSchema:
+	"""One compiled table of the schema."""
+	name: str
+	region: Region
+	start: int = 0
+	size: Optional[int] = None
+	record: Optional[struct.Struct] = None
+	fields: Tuple[str, ...] = ()
+	names: Tuple[str, ...] = ()
+	decoder: Optional[str] = None
+
+	def raw(self, rom: RomImage) -> bytes:
+		data = self.region.read(rom)
+		end = len(data) if self.size is None else self.start + self.size
+		return bytes(data[self.start:end])
+
+	def record_name(self, index: int) -> str:
+		return self.names[index] if index < len(self.names) else f"{self.name}[{index}]"
+
+
+def compile_table(name: str, spec: Dict[str, Any], names: Dict[str, Sequence[str]]) -> TableSchema:
+	"""TableSchema for one schema entry."""
+	regions = {region.name: region for region in EXTRACTION_REGIONS}
+	if spec['region'] not in regions:
+		raise ValueError(f"{name}: unknown region {spec['region']!r}")
+	region = regions[spec['region']]
+	if 'decoder' in spec:
+		if spec['decoder'] not in DECODERS:
+			raise ValueError(f"{name}: unknown decoder {spec['decoder']!r}")
+		return TableSchema(name, region, decoder=spec['decoder'])
+
+	record_size = spec['record_size']
+	fields = sorted(spec['fields'], key=lambda field: field[1])
+	layout = '<'
+	position = 0
+	for field_name, offset, field_type in fields:
+		if field_type not in FIELD_TYPES or offset < position:
+			raise ValueError(f"{name}.{field_name}: bad type or overlapping offset")
+		layout += 'x' * (offset - position) + FIELD_TYPES[field_type]
+		position = offset + struct.calcsize('<' + FIELD_TYPES[field_type])
+	if position > record_size:
+		raise ValueError(f"{name}: fields run past the {record_size} byte record")
+	layout += 'x' * (record_size - position)
+
+	size = spec['count'] * record_size if 'count' in spec else None
+	return TableSchema(name, region, spec.get('start', 0), size, struct.Struct(layout),
+					   tuple(field[0] for field in fields), tuple(names.get(spec.get('names'), ())))
+
+
+@lru_cache(maxsize=None)
+def _compiled(schema_json: str) -> Tuple[TableSchema, ...]:
+	names = _name_lists()
+	return tuple(compile_table(name, spec, names) for name, spec in json.loads(schema_json).items())
+
+
+def load_schema(schema: Union[Dict[str, Dict[str, Any]], str, Path, None] = None) -> Tuple[TableSchema, ...]:
+	"""Compiled tables of a schema dict or JSON file (SCHEMA by default), compiled once per schema."""
+	if schema is None:
+		schema = SCHEMA
+	elif not isinstance(schema, dict):
+		schema = json.loads(Path(schema).read_text(encoding='utf-8'))
+	return _compiled(json.dumps(schema))
+
+
+# ============================================================================
+# CHANGES
+# ============================================================================
+
+@dataclass
+class FieldChange:
+	"""A decoded value that differs between the two ROMs.
+
+	old is None for inserted entries and new is None for removed ones.
+	"""
+	table: str
+	record: str
+	field: str
+	old: Any
+	new: Any
+
+	def __str__(self) -> str:
+		label = f"{self.record}.{self.field}" if self.field else self.record
+		if self.old is None:
+			return f"{label} + {_short(self.new)}"
+		if self.new is None:
+			return f"{label} - {_short(self.old)}"
+		return f"{label} {_short(self.old)} -> {_short(self.new)}"
+
+	def to_dict(self) -> Dict[str, Any]:
+		return asdict(self)
+
+
+def _short(value: Any) -> str:
+	if not isinstance(value, str):
+		return str(value)
+	return repr(value if len(value) <= MAX_TEXT else value[:MAX_TEXT - 3] + '...')
+
+
+def _diff_records(table: TableSchema, old: bytes, new: bytes) -> List[FieldChange]:
+	record_size = table.record.size
+	old_records = list(table.record.iter_unpack(old[:len(old) // record_size * record_size]))
+	new_records = list(table.record.iter_unpack(new[:len(new) // record_size * record_size]))
+	changes = []
+	for index, (before, after) in enumerate(zip(old_records, new_records)):
+		if before == after:
+			continue
+		record = table.record_name(index)
+		changes.extend(FieldChange(table.name, record, field, a, b)
+					   for field, a, b in zip(table.fields, before, after) if a != b)
+	return changes
+
+
+def _diff_world_map(table: TableSchema, old: bytes, new: bytes) -> List[FieldChange]:
+	old_rows = DECODERS['world_map'](old)['rows']
+	new_rows = DECODERS['world_map'](new)['rows']
+	changes = []
+	for row, (before, after) in enumerate(zip(old_rows, new_rows)):
+		if before == after:
+			continue
+		# One change per run of changed tiles in the row
+		column = 0
+		while column < max(len(before), len(after)):
+			if before[column:column + 1] == after[column:column + 1]:
+				column += 1
+				continue
+			start = column
+			while column < max(len(before), len(after)) and before[column:column + 1] != after[column:column + 1]:
+				column += 1
+			span = f"x{start}" if column - start == 1 else f"x{start}-{column - 1}"
+			changes.append(FieldChange(table.name, f"{table.name}.row[{row}]", span,
+									   before[start:column], after[start:column]))
+	return changes
+
+
+def _diff_dialogs(table: TableSchema, old: bytes, new: bytes) -> List[FieldChange]:
+	old_blocks = DECODERS['dialogs'](old)['blocks']
+	new_blocks = DECODERS['dialogs'](new)['blocks']
+	changes = []
+	matcher = difflib.SequenceMatcher(None, old_blocks, new_blocks, autojunk=False)
+	for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+		if tag == 'equal':
+			continue
+		if tag == 'replace' and a_end - a_start == b_end - b_start:
+			changes.extend(FieldChange(table.name, f"{table.name}[{b_start + k}]", 'text',
+									   old_blocks[a_start + k], new_blocks[b_start + k])
+						   for k in range(a_end - a_start))
+			continue
+		changes.extend(FieldChange(table.name, f"{table.name}[{b_start}]", 'text', block, None)
+					   for block in old_blocks[a_start:a_end])
+		changes.extend(FieldChange(table.name, f"{table.name}[{b_start + k}]", 'text', None, block)
+					   for k, block in enumerate(new_blocks[b_start:b_end]))
+	return changes
+
+
+_SEQUENCE_DIFFS = {
+	'world_map': _diff_world_map,
+	'dialogs': _diff_dialogs,
+}
+
+
+class StructuralDiff:
+	"""Field-level comparison of ROMs against a compiled table schema."""
+
+	def __init__(self, schema: Union[Dict[str, Dict[str, Any]], str, Path, None] = None,
+				 tables: Optional[Sequence[str]] = None):
+		self.tables = [table for table in load_schema(schema) if tables is None or table.name in tables]
+
+	def compare(self, original: Union[str, Path, RomImage, bytes, bytearray],
+				modified: Union[str, Path, RomImage, bytes, bytearray]) -> List[FieldChange]:
+		"""Decoded changes from original to modified, table by table."""
+		original = open_rom(original)
+		modified = open_rom(modified)
+		changes = []
+		for table in self.tables:
+			old = table.raw(original)
+			new = table.raw(modified)
+			if old == new:
+				continue
+			if table.decoder is None:
+				changes.extend(_diff_records(table, old, new))
+			else:
+				changes.extend(_SEQUENCE_DIFFS[table.decoder](table, old, new))
+		return changes
+
+	def summary(self, changes: Sequence[FieldChange]) -> Dict[str, int]:
+		"""Number of changes per table."""
+		counts: Dict[str, int] = {}
+		for change in changes:
+			counts[change.table] = counts.get(change.table, 0) + 1
+		return counts
+
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Field-level diff of two Dragon Warrior ROMs')
+	parser.add_argument('original')
+	parser.add_argument('modified')
+	parser.add_argument('--table', action='append', help='Only compare this table (repeatable)')
+	parser.add_argument('--schema', help='JSON schema file (default: built-in SCHEMA)')
+	parser.add_argument('--json', action='store_true', help='Print changes as JSON')
+	args = parser.parse_args()
+
+	try:
+		differ = StructuralDiff(args.schema, args.table)
+		changes = differ.compare(args.original, args.modified)
+	except (OSError, ValueError) as e:
+		print(f"❌ {e}", file=sys.stderr)
+		return 1
+
+	if args.json:
+		print(json.dumps([change.to_dict() for change in changes], indent=2))
+		return 0
+
+	for change in changes:
+		print(change)
+	summary = ', '.join(f"{table}: {count}" for table, count in differ.summary(changes).items())
+	print(f"\n{len(changes)} field changes" + (f" ({summary})" if summary else ""))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
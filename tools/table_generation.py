@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Dragon Warrior Table Generation Framework
+
+Shared write-if-changed support for the JSON -> ASM table generators
+(generate_*_table(s).py):
+
+- Output is rendered in memory and only written (atomically) when its
+  hash differs from the file on disk, so unchanged tables keep their
+  mtime and downstream incremental checks stay valid.
+- Each output's input digests, generator digest and options are recorded
+  in build/.cache/generation_manifest.json. When none of them changed and
+  the output is still the recorded one, rendering is skipped entirely.
+
+Usage:
+	from table_generation import generate_file
+
+	result = generate_file(OUTPUT_PATH, [JSON_PATH], lambda: render(load(JSON_PATH)),
+						   generator=__file__)
+	print(result.status)   # 'written', 'unchanged' or 'up-to-date'
+
+Author: Dragon Warrior ROM Hacking Toolkit
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from dataclasses import dataclass
+
+
+MANIFEST_FILE = Path("build") / ".cache" / "generation_manifest.json"
+MANIFEST_VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+# ============================================================================
+# FILE HELPERS
+# ============================================================================
+
+def content_digest(data: bytes) -> str:
+	"""SHA-256 of raw bytes."""
+	return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path) -> Optional[str]:
+	"""SHA-256 of a file, or None if it does not exist."""
+	try:
+		return content_digest(path.read_bytes())
+	except FileNotFoundError:
+		return None
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+	"""Write via a temp file in the same directory and rename over the target."""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			f.write(data)
+		os.replace(temp_name, path)
+	except BaseException:
+		try:
+			os.unlink(temp_name)
+		except OSError:
+			pass
+		raise
+
+
+def write_if_changed(path: PathLike, content: Union[str, bytes], encoding: str = 'utf-8') -> bool:
+	"""Write content unless the file already holds it; returns True if written."""
+	path = Path(path)
+	data = content.encode(encoding) if isinstance(content, str) else content
+	if file_digest(path) == content_digest(data):
+		return False
+	atomic_write(path, data)
+	return True
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+class GenerationManifest:
+	"""Input -> output digest records for generated files.
+
+	Entries are keyed by output path (project-relative where possible):
+		{'generator': ..., 'generator_digest': ..., 'options': {...},
+		 'inputs': {path: [digest, size, mtime_ns]}, 'output_digest': ...}
+
+	Each save re-reads the file and replaces only the entries this process
+	changed, so generators run concurrently do not drop each other's
+	records. A lost record only costs one extra render.
+	"""
+
+	def __init__(self, project_root: PathLike):
+		self.project_root = Path(project_root)
+		self.path = self.project_root / MANIFEST_FILE
+		self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+	def _load(self) -> Dict[str, Dict[str, Any]]:
+		try:
+			with open(self.path, 'r', encoding='utf-8') as f:
+				data = json.load(f)
+		except (OSError, json.JSONDecodeError):
+			return {}
+		if data.get('version') != MANIFEST_VERSION:
+			return {}
+		return data.get('outputs', {})
+
+	def key(self, path: PathLike) -> str:
+		"""Manifest key for a file path."""
+		path = Path(path)
+		if not path.is_absolute():
+			path = Path.cwd() / path
+		try:
+			return path.resolve().relative_to(self.project_root.resolve()).as_posix()
+		except ValueError:
+			return path.resolve().as_posix()
+
+	def _absolute(self, key: str) -> Path:
+		path = Path(key)
+		return path if path.is_absolute() else self.project_root / path
+
+	def _input_record(self, path: Path, previous: Optional[List[Any]] = None) -> Optional[List[Any]]:
+		"""[digest, size, mtime_ns], rehashing only when the stat changed."""
+		try:
+			stat = path.stat()
+		except FileNotFoundError:
+			return None
+		if previous and previous[1] == stat.st_size and previous[2] == stat.st_mtime_ns:
+			return previous
+		return [file_digest(path), stat.st_size, stat.st_mtime_ns]
+
+	def fingerprint(self, inputs: Iterable[PathLike], generator: PathLike,
+					options: Optional[Dict[str, Any]] = None,
+					previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+		"""Current digests of everything an output is rendered from."""
+		old_inputs = (previous or {}).get('inputs', {})
+		records = {}
+		for path in inputs:
+			key = self.key(path)
+			records[key] = self._input_record(self._absolute(key), old_inputs.get(key))
+		return {
+			'generator': self.key(generator),
+			'generator_digest': file_digest(Path(generator)),
+			'options': options or {},
+			'inputs': records,
+		}
+
+	@staticmethod
+	def _same_sources(entry: Dict[str, Any], fingerprint: Dict[str, Any]) -> bool:
+		if entry.get('generator_digest') != fingerprint['generator_digest']:
+			return False
+		if entry.get('options') != fingerprint['options']:
+			return False
+		old_inputs = entry.get('inputs', {})
+		if set(old_inputs) != set(fingerprint['inputs']):
+			return False
+		return all(old_inputs[key] is not None and record is not None and old_inputs[key][0] == record[0]
+				   for key, record in fingerprint['inputs'].items())
+
+	def is_current(self, output: PathLike, fingerprint: Dict[str, Any]) -> bool:
+		"""Whether output was rendered from exactly these sources and is untouched."""
+		entry = self.entries.get(self.key(output))
+		if not entry or not self._same_sources(entry, fingerprint):
+			return False
+		return file_digest(Path(output)) == entry.get('output_digest')
+
+	def record(self, output: PathLike, fingerprint: Dict[str, Any], output_digest: str) -> None:
+		"""Store an output's sources and digest, and save."""
+		key = self.key(output)
+		self.entries[key] = dict(fingerprint, output_digest=output_digest)
+
+		current = self._load()
+		current[key] = self.entries[key]
+		self._save(current)
+
+	def _save(self, outputs: Dict[str, Dict[str, Any]]) -> None:
+		atomic_write(self.path, json.dumps({'version': MANIFEST_VERSION, 'outputs': outputs},
+										   indent=1, sort_keys=True).encode('utf-8'))
+
+	def outputs_of(self, generator: PathLike) -> List[str]:
+		"""Recorded outputs of one generator script."""
+		key = self.key(generator)
+		return sorted(output for output, entry in self.entries.items() if entry.get('generator') == key)
+
+	def generator_current(self, generator: PathLike) -> bool:
+		"""True if every recorded output of a generator is up to date.
+
+		Lets callers skip running the generator at all. A generator with no
+		records (never run through the framework) is never current.
+		"""
+		outputs = self.outputs_of(generator)
+		if not outputs:
+			return False
+		for output in outputs:
+			entry = self.entries[output]
+			inputs = [self._absolute(key) for key in entry.get('inputs', {})]
+			fingerprint = self.fingerprint(inputs, generator, entry.get('options'), entry)
+			if not self.is_current(self._absolute(output), fingerprint):
+				return False
+		return True
+
+	def forget(self, generator: PathLike) -> None:
+		"""Drop a generator's records so its outputs are rendered again."""
+		outputs = self.outputs_of(generator)
+		if not outputs:
+			return
+		for output in outputs:
+			del self.entries[output]
+		current = self._load()
+		for output in outputs:
+			current.pop(output, None)
+		self._save(current)
+
+
+# ============================================================================
+# GENERATION
+# ============================================================================
+
+@dataclass
+class GenerationResult:
+	"""Outcome of one generate_file() call."""
+	output: Path
+	status: str  # 'written', 'unchanged' (rendered, same content) or 'up-to-date' (not rendered)
+
+	@property
+	def changed(self) -> bool:
+		return self.status == 'written'
+
+	def describe(self) -> str:
+		return {
+			'written': f"Generated {self.output}",
+			'unchanged': f"Unchanged {self.output}",
+			'up-to-date': f"Up to date {self.output}",
+		}[self.status]
+
+
+def project_root_of(generator: PathLike) -> Path:
+	"""Project root for a generator script in <root>/tools/."""
+	return Path(generator).resolve().parent.parent
+
+
+def generate_file(output: PathLike, inputs: Iterable[PathLike], render: Callable[[], Union[str, bytes]],
+				  generator: PathLike, options: Optional[Dict[str, Any]] = None,
+				  force: bool = False) -> GenerationResult:
+	"""Render output from inputs unless nothing changed; write only new content.
+
+	render() is only called when the inputs, generator script or options
+	differ from the last recorded run (or the output was edited/deleted).
+	"""
+	output = Path(output)
+	manifest = GenerationManifest(project_root_of(generator))
+	previous = manifest.entries.get(manifest.key(output))
+	fingerprint = manifest.fingerprint(list(inputs), generator, options, previous)
+
+	if not force and manifest.is_current(output, fingerprint):
+		return GenerationResult(output, 'up-to-date')
+
+	content = render()
+	data = content.encode('utf-8') if isinstance(content, str) else content
+	written = write_if_changed(output, data)
+	manifest.record(output, fingerprint, content_digest(data))
+	return GenerationResult(output, 'written' if written else 'unchanged')
@@ -76,6 +76,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import argparse
 
+from pipeline_stages import PipelineContext, STAGES
+
 
 # ============================================================================
 # DATA STRUCTURES
@@ -196,15 +198,29 @@ WORKFLOWS = {
 class ToolExecutor:
 	"""Execute toolkit tools."""
 
+	# Shared by every tool run in this process (one interpreter, warm imports)
+	context: Optional[PipelineContext] = None
+
 	@staticmethod
-	def run_tool(tool_name: str, args: List[str]) -> Tuple[int, str, str]:
-		"""Run a toolkit tool and return result."""
+	def run_tool(tool_name: str, args: List[str], in_process: bool = True) -> Tuple[int, str, str]:
+		"""Run a toolkit tool and return result.
+
+		Tools run in-process through the shared pipeline stage registry;
+		pass in_process=False to use a separate interpreter with a timeout.
+		"""
 		tools_dir = Path(__file__).parent
 		tool_path = tools_dir / tool_name
 
 		if not tool_path.exists():
 			return (1, "", f"Tool not found: {tool_name}")
 
+		if in_process:
+			if ToolExecutor.context is None:
+				ToolExecutor.context = PipelineContext(project_root=Path.cwd())
+			result = STAGES.run('run_script', ToolExecutor.context, script=tool_path, args=args)
+			return (0 if result.success else 1, result.data.get('stdout', ''),
+					result.data.get('stderr', '') or result.error)
+
 		cmd = [sys.executable, str(tool_path)] + args
 
 		try:
@@ -62,7 +62,19 @@ class BinaryValidator:
             self.json_dir = project_root / 'assets' / 'json'
 
     def load_dwdata(self, filename: str) -> Optional[bytes]:
-        """Load data section from .dwdata file."""
+        """Load data section from the .dwpack container (unless stale) or a .dwdata file."""
+        from dwpack import DWPack, DWPackError, current_pack
+
+        pack_path = current_pack(self.dwdata_dir)
+        if pack_path is not None:
+            try:
+                with DWPack(pack_path) as pack:
+                    name = Path(filename).stem
+                    if name in pack:
+                        return bytes(pack.read(name))
+            except (OSError, DWPackError):
+                pass
+
         path = self.dwdata_dir / filename
         if not path.exists():
             return None